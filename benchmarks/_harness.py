@@ -0,0 +1,132 @@
+"""Shared helpers for the dispike benchmarks.
+
+Everything here runs in-process: requests are fed straight into an ASGI
+application, so the numbers reflect dispike's own overhead and not the network.
+"""
+import asyncio
+import json
+import statistics
+import time
+import typing
+
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey
+
+
+class SignedFixture(object):
+    """A signing key plus helpers to produce Discord-style signed requests."""
+
+    def __init__(self, signing_key: SigningKey = None):
+        self.signing_key = signing_key or SigningKey.generate()
+        self.public_key = self.signing_key.verify_key.encode(encoder=HexEncoder).decode()
+
+    def sign(self, body: bytes, timestamp: str = None) -> typing.Tuple[str, str]:
+        """Signs a body, returns (signature, timestamp)."""
+        timestamp = timestamp or str(int(time.time()))
+        signature = self.signing_key.sign(timestamp.encode() + body).signature.hex()
+        return signature, timestamp
+
+    def scope(self, body: bytes, path: str = "/interactions", timestamp: str = None) -> dict:
+        """Returns a ready to use ASGI http scope for a signed POST request."""
+        signature, timestamp = self.sign(body, timestamp=timestamp)
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "client": ("127.0.0.1", 1234),
+            "server": ("127.0.0.1", 80),
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-signature-ed25519", signature.encode()),
+                (b"x-signature-timestamp", timestamp.encode()),
+            ],
+        }
+
+
+def ping_body() -> bytes:
+    return json.dumps({"id": "1111222", "token": "random", "type": 1, "version": 1}).encode()
+
+
+async def call_asgi(app, scope: dict, body: bytes) -> typing.Tuple[int, bytes]:
+    """Runs a single request through an ASGI app, returns (status, body)."""
+    _sent = False
+    _status = 0
+    _chunks = []
+
+    async def receive():
+        nonlocal _sent
+        if not _sent:
+            _sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)  # pragma: no cover
+
+    async def send(message):
+        nonlocal _status
+        if message["type"] == "http.response.start":
+            _status = message["status"]
+        elif message["type"] == "http.response.body":
+            _chunks.append(message.get("body", b""))
+
+    await app(dict(scope), receive, send)
+    return _status, b"".join(_chunks)
+
+
+def percentile(samples: typing.List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def measure(
+    app, scope_factory: typing.Callable[[], typing.Tuple[dict, bytes]], requests: int, concurrency: int
+) -> dict:
+    """Drives an app with ``requests`` calls at ``concurrency`` in-flight calls.
+
+    Returns:
+        dict: throughput (req/s) and latency statistics (ms).
+    """
+    latencies = []
+    _queue = [scope_factory() for _ in range(requests)]
+    _iterator = iter(_queue)
+
+    async def worker():
+        for scope, body in _iterator:
+            started = time.perf_counter()
+            status, _ = await call_asgi(app, scope, body)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if status >= 400:
+                raise RuntimeError(f"benchmark request failed with status {status}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput_rps": requests / elapsed,
+        "mean_ms": statistics.mean(latencies),
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def print_table(title: str, rows: typing.List[typing.Tuple[str, dict]]):
+    print(f"\n{title}")
+    print(f"{'variant':<28}{'conc':>6}{'req/s':>12}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, result in rows:
+        if "error" in result:
+            print(f"{name:<28}  unavailable: {result['error']}")
+            continue
+        print(
+            f"{name:<28}{result['concurrency']:>6}{result['throughput_rps']:>12.0f}"
+            f"{result['mean_ms']:>10.3f}{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+        )
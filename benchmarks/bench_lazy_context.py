@@ -0,0 +1,76 @@
+"""Eager pydantic parsing vs lazy context views.
+
+Simulates a hot handler that only reads one option and ``ctx.token``, and
+reports per-request CPU time plus allocations (via tracemalloc).
+
+    python -m benchmarks.bench_lazy_context
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from dispike.eventer_helpers.determine_event_information import (
+    determine_event_information,
+)
+from dispike.incoming import IncomingDiscordSlashInteraction
+from dispike.incoming.lazy import lazy_view_class
+
+from .fixtures import slash_command_body
+
+
+def eager(body: dict):
+    ctx = IncomingDiscordSlashInteraction(**body)
+    _, arguments = determine_event_information(ctx)
+    return arguments["message"], ctx.token, ctx
+
+
+def lazy(body: dict):
+    ctx = lazy_view_class(IncomingDiscordSlashInteraction)(body)
+    _, arguments = determine_event_information(ctx)
+    return arguments["message"], ctx.token, ctx
+
+
+def measure_cpu(function, body: dict, number: int) -> float:
+    started = time.process_time()
+    for _ in range(number):
+        function(json.loads(body))
+    return (time.process_time() - started) / number * 1e6
+
+
+def measure_allocations(function, body: dict, number: int) -> tuple:
+    """Returns (blocks retained by the context, bytes retained, peak bytes) per request.
+
+    The context is kept alive like it would be for the duration of a handler.
+    """
+    blocks, retained, peak = 0, 0, 0
+    for _ in range(number):
+        decoded = json.loads(body)
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        result = function(decoded)
+        _, peak_size = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        stats = after.compare_to(before, "filename")
+        blocks += sum(stat.count_diff for stat in stats if "tracemalloc" not in stat.traceback[0].filename)
+        retained += sum(stat.size_diff for stat in stats if "tracemalloc" not in stat.traceback[0].filename)
+        peak += peak_size
+        del result
+    return blocks / number, retained / number, peak / number
+
+
+def main(number: int):
+    body = json.dumps(slash_command_body()).encode()
+    print(f"{'mode':<8}{'cpu us/req':>12}{'blocks/req':>12}{'retained B':>12}{'peak B':>10}")
+    for name, function in (("eager", eager), ("lazy", lazy)):
+        function(json.loads(body))  # warm up caches (view classes, validators)
+        cpu = measure_cpu(function, body, number)
+        blocks, retained, peak = measure_allocations(function, body, 200)
+        print(f"{name:<8}{cpu:>12.2f}{blocks:>12.1f}{retained:>12.0f}{peak:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    main(parser.parse_args().number)
@@ -0,0 +1,95 @@
+"""Hot-path logging cost on the /interactions endpoint.
+
+Drives a full Dispike app with a slash command while loguru writes to a sink
+that discards everything, so the numbers only show the cost of producing the
+records. Also times the httpx network hooks on their own.
+
+    python -m benchmarks.bench_logging --requests 3000 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import httpx
+from loguru import logger
+
+from dispike import Dispike
+from dispike.helper.logging_control import configure_logging
+from dispike.helper.network_request_log import (
+    dispike_httpx_event_hook_incoming_request,
+    dispike_httpx_event_hook_outgoing_request,
+)
+from dispike.response import DiscordResponse
+
+from ._harness import SignedFixture, measure, print_table
+from .fixtures import slash_command_body
+
+_DEFAULT_LEVELS = {"server": "TRACE", "verification": "TRACE", "network": "TRACE"}
+
+VARIANTS = (
+    ("default (everything)", _DEFAULT_LEVELS, 1),
+    ("bodies sampled 1/100", _DEFAULT_LEVELS, 100),
+    ("warnings only", {"server": "WARNING", "verification": "WARNING", "network": "WARNING"}, 0),
+    ("off", {"server": "OFF", "verification": "OFF", "network": "OFF"}, 0),
+)
+
+
+def build_bot(public_key: str) -> Dispike:
+    bot = Dispike(client_public_key=public_key, bot_token="Null", application_id="Null")
+
+    @bot.on("sendmessage")
+    async def handle_send_message(message: str, ctx) -> DiscordResponse:
+        return DiscordResponse(content=message)
+
+    return bot
+
+
+def time_network_hooks(number: int) -> float:
+    request = httpx.Request(
+        "POST",
+        "https://discord.com/api/v8/webhooks/1/token",
+        headers={"Authorization": "Bot token", "Content-Type": "application/json"},
+    )
+    response = httpx.Response(200, request=request)
+    started = time.perf_counter()
+    for _ in range(number):
+        dispike_httpx_event_hook_outgoing_request(request)
+        dispike_httpx_event_hook_incoming_request(response)
+    return (time.perf_counter() - started) / number * 1e6
+
+
+async def main(requests: int, concurrency: int):
+    logger.remove()
+    logger.add(lambda message: None, level="TRACE")
+
+    fixture = SignedFixture()
+    bot = build_bot(fixture.public_key)
+    app = bot.referenced_application
+    body = json.dumps(slash_command_body()).encode()
+
+    def scope_factory():
+        return fixture.scope(body), body
+
+    rows = []
+    hook_rows = []
+    for name, levels, sample_rate in VARIANTS:
+        configure_logging(levels=levels, body_sample_rate=sample_rate)
+        await measure(app, scope_factory, 200, concurrency)  # warm up
+        rows.append((name, await measure(app, scope_factory, requests, concurrency)))
+        hook_rows.append((name, time_network_hooks(requests)))
+
+    configure_logging(levels=_DEFAULT_LEVELS, body_sample_rate=1)
+    print_table("/interactions with a discarding loguru sink", rows)
+    print(f"\n{'network hooks':<28}{'us/call pair':>12}")
+    for name, micros in hook_rows:
+        print(f"{name:<28}{micros:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
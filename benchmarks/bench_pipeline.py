@@ -0,0 +1,277 @@
+"""Per-stage micro-benchmarks of the interaction pipeline.
+
+Times every stage an interaction goes through on its own, so a slowdown after an
+upgrade (pydantic, PyNaCl, orjson, ...) can be pinned on a stage:
+
+    verify.*        signature verification, alone and through DiscordVerificationMiddleware
+    json.decode.*   decoding the request body with each installed JSON backend
+    parse.*         pydantic parsing of every Incoming*Interaction model
+    route.*         determine_event_information
+    dispatch.emit   Dispike.emit to a registered handler
+    serialize.*     DiscordResponse.response, Embed.to_dict and encoding the response
+
+Requests are signed with a key generated per run. Results can be saved as a
+baseline and later runs compared against it; a stage slower than the baseline by
+more than ``--threshold`` is reported as a regression (exit status 1). Baselines
+are only comparable on the same machine and Python version.
+
+    python -m benchmarks.bench_pipeline --save
+    python -m benchmarks.bench_pipeline --compare
+    python -m benchmarks.bench_pipeline --stage parse --number 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import typing
+
+from loguru import logger
+
+import dispike
+from dispike import Dispike
+from dispike.eventer_helpers.determine_event_information import (
+    determine_event_information,
+)
+from dispike.helper.embed import Embed
+from dispike.helper.json_backend import resolve_json_backend
+from dispike.creating.components import ActionRow, Button
+from dispike.incoming.incoming_interactions import (
+    IncomingDiscordButtonInteraction,
+    IncomingDiscordMessageCommandInteraction,
+    IncomingDiscordSelectMenuInteraction,
+    IncomingDiscordSlashInteraction,
+    IncomingDiscordUserCommandInteraction,
+)
+from dispike.middlewares.verification import DiscordVerificationMiddleware
+from dispike.response import DiscordResponse
+
+from ._harness import SignedFixture, call_asgi
+from .fixtures import (
+    button_body,
+    message_command_body,
+    select_menu_body,
+    slash_command_body,
+    subcommand_body,
+    user_command_body,
+)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "pipeline.json")
+
+# (stage name, function, is a coroutine function)
+Stage = typing.Tuple[str, typing.Callable, bool]
+
+
+async def _accept(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def _embed() -> Embed:
+    embed = Embed(title="Forex", description="Latest rates", color=0x00FF00, url="https://example.com")
+    embed.set_author(name="dispike", url="https://example.com", icon_url="https://example.com/icon.png")
+    embed.set_footer(text="updated every minute", icon_url="https://example.com/footer.png")
+    for symbol in ("USD", "GBP", "EUR", "JPY", "CHF"):
+        embed.add_field(name=symbol, value="1.2345", inline=True)
+    return embed
+
+
+def build_stages() -> typing.List[Stage]:
+    fixture = SignedFixture()
+    stages = []  # type: typing.List[Stage]
+
+    body = json.dumps(slash_command_body()).encode()
+    signature, timestamp = fixture.sign(body)
+    scope = fixture.scope(body, timestamp=timestamp)
+    middleware = DiscordVerificationMiddleware(_accept, client_public_key=fixture.public_key)
+    stages.append(
+        ("verify.signature", lambda: middleware.verify_request(signature, timestamp, body), False)
+    )
+    stages.append(("verify.middleware", lambda: call_asgi(middleware, scope, body), True))
+
+    for backend_name in ("json", "orjson"):
+        try:
+            backend = resolve_json_backend(backend_name)
+        except ImportError:
+            continue
+        stages.append((f"json.decode.{backend_name}", lambda backend=backend: backend.loads(body), False))
+
+    for model, payload in (
+        (IncomingDiscordSlashInteraction, slash_command_body()),
+        (IncomingDiscordButtonInteraction, button_body()),
+        (IncomingDiscordSelectMenuInteraction, select_menu_body()),
+        (IncomingDiscordUserCommandInteraction, user_command_body()),
+        (IncomingDiscordMessageCommandInteraction, message_command_body()),
+    ):
+        stages.append((f"parse.{model.__name__}", lambda model=model, payload=payload: model(**payload), False))
+    subcommand_payload = subcommand_body()
+    stages.append(
+        ("parse.IncomingDiscordSlashInteraction.subcommand", lambda: IncomingDiscordSlashInteraction(**subcommand_payload), False)
+    )
+
+    slash = IncomingDiscordSlashInteraction(**slash_command_body())
+    subcommand = IncomingDiscordSlashInteraction(**subcommand_payload)
+    stages.append(("route.determine_event_information", lambda: determine_event_information(slash), False))
+    stages.append(
+        ("route.determine_event_information.subcommand", lambda: determine_event_information(subcommand), False)
+    )
+
+    bot = Dispike(client_public_key=fixture.public_key, bot_token="Null", application_id="Null")
+
+    @bot.on("sendmessage")
+    async def sendmessage(ctx, message: str) -> DiscordResponse:
+        return DiscordResponse(content=message)
+
+    stages.append(("dispatch.emit", lambda: bot.emit("sendmessage", "command", slash, message="test"), True))
+
+    embed = _embed()
+    action_row = ActionRow(components=[Button(label="Refresh", custom_id="refresh")])
+    stages.append(("serialize.Embed.to_dict", embed.to_dict, False))
+    stages.append(
+        ("serialize.DiscordResponse.response", lambda: DiscordResponse(content="test").response, False)
+    )
+    stages.append(
+        (
+            "serialize.DiscordResponse.response.embeds",
+            lambda: DiscordResponse(content="test", embeds=[embed], action_row=action_row).response,
+            False,
+        )
+    )
+    response = DiscordResponse(content="test", embeds=[embed], action_row=action_row).response
+    for backend_name in ("json", "orjson"):
+        try:
+            backend = resolve_json_backend(backend_name)
+        except ImportError:
+            continue
+        stages.append((f"serialize.encode.{backend_name}", lambda backend=backend: backend.dumps(response), False))
+    return stages
+
+
+def time_stage(function: typing.Callable, is_async: bool, number: int, repeat: int) -> dict:
+    """Time ``number`` calls, ``repeat`` times. Returns microseconds per call."""
+    runs = []
+    if is_async:
+
+        async def _run():
+            started = time.perf_counter()
+            for _ in range(number):
+                await function()
+            return time.perf_counter() - started
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(_run())  # warm up
+            for _ in range(repeat):
+                runs.append(loop.run_until_complete(_run()))
+        finally:
+            loop.close()
+    else:
+        for _ in range(max(1, number // 10)):
+            function()  # warm up
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(number):
+                function()
+            runs.append(time.perf_counter() - started)
+    per_call = [run / number * 1e6 for run in runs]
+    return {
+        "best_us": round(min(per_call), 3),
+        "median_us": round(statistics.median(per_call), 3),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run(stage_filter: typing.List[str] = None, number: int = 2000, repeat: int = 5) -> dict:
+    results = {}
+    for name, function, is_async in build_stages():
+        if stage_filter and not any(part in name for part in stage_filter):
+            continue
+        results[name] = time_stage(function, is_async, number, repeat)
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "dispike": dispike.__version__,
+        },
+        "stages": results,
+    }
+
+
+def load_baseline(path: str) -> typing.Optional[dict]:
+    try:
+        with open(path) as baseline_file:
+            return json.load(baseline_file)
+    except (OSError, ValueError):
+        return None
+
+
+def save_baseline(path: str, results: dict):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as baseline_file:
+        json.dump(results, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write("\n")
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> typing.List[str]:
+    """Return the stages slower than the baseline by more than ``threshold`` (e.g. 1.2 for 20%)."""
+    regressions = []
+    _baseline_stages = baseline.get("stages", {})
+    for name, result in results["stages"].items():
+        _before = _baseline_stages.get(name)
+        if _before and result["best_us"] > _before["best_us"] * threshold:
+            regressions.append(name)
+    return regressions
+
+
+def print_results(results: dict, baseline: dict = None, threshold: float = 1.2):
+    _baseline_stages = (baseline or {}).get("stages", {})
+    print(f"\n{'stage':<48}{'best us':>10}{'median us':>11}{'baseline':>10}{'change':>9}")
+    for name, result in results["stages"].items():
+        _line = f"{name:<48}{result['best_us']:>10.2f}{result['median_us']:>11.2f}"
+        _before = _baseline_stages.get(name)
+        if _before:
+            _ratio = result["best_us"] / _before["best_us"]
+            _flag = "  <- slower" if _ratio > threshold else ""
+            _line += f"{_before['best_us']:>10.2f}{(_ratio - 1) * 100:>+8.1f}%{_flag}"
+        print(_line)
+    if baseline and baseline.get("environment") != results["environment"]:
+        print(f"\nbaseline was recorded on {baseline.get('environment')}, numbers may not be comparable.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=2000, help="calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per stage, the best one counts")
+    parser.add_argument("--stage", nargs="+", help="only run stages whose name contains one of these")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file")
+    parser.add_argument("--save", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="exit with status 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown counted as a regression")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+    logger.remove()
+
+    results = run(args.stage, args.number, args.repeat)
+    baseline = load_baseline(args.baseline)
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+    else:
+        print_results(results, baseline, args.threshold)
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"\nbaseline saved to {args.baseline}")
+    elif args.compare:
+        if baseline is None:
+            print(f"\nno baseline at {args.baseline}, run with --save first.")
+            sys.exit(2)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} stages regressed: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nno regressions.")
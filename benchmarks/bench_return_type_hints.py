@@ -0,0 +1,41 @@
+"""Per request cost of resolving a command's return type hint.
+
+"before" runs ``typing.get_type_hints`` on every request (what
+``Dispike.view_event_function_return_type`` does), "after" reads the
+strategy that ``EventInvoker`` resolved at registration.
+
+    python -m benchmarks.bench_return_type_hints
+"""
+import argparse
+import timeit
+import typing
+
+from dispike.eventer import EventTypes
+from dispike.eventer_helpers.dispatch import EventInvoker
+from dispike.incoming import IncomingDiscordSlashInteraction
+from dispike.response import DiscordResponse
+
+
+async def handler(
+    message: str, ctx: "IncomingDiscordSlashInteraction" = None
+) -> "DiscordResponse":
+    return DiscordResponse(content=message)
+
+
+
+def main(number: int):
+    invoker = EventInvoker("sample", EventTypes.COMMAND, handler)
+
+    before = timeit.timeit(lambda: typing.get_type_hints(handler)["return"], number=number)
+    after = timeit.timeit(lambda: invoker.response_strategy, number=number)
+
+    print(f"{'variant':<32}{'ns/request':>12}")
+    print(f"{'get_type_hints per request':<32}{before / number * 1e9:>12.0f}")
+    print(f"{'strategy cached at registration':<32}{after / number * 1e9:>12.0f}")
+    print(f"saving: {(before - after) / number * 1e9:.0f} ns per request ({before / after:.0f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=200000)
+    main(parser.parse_args().number)
@@ -0,0 +1,85 @@
+"""Before/after benchmark for the request verification middleware.
+
+Compares the previous ``BaseHTTPMiddleware`` based implementation with the
+pure ASGI ``DiscordVerificationMiddleware``.
+
+    python -m benchmarks.bench_verification_middleware --requests 5000
+"""
+import argparse
+import asyncio
+import json
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from dispike.middlewares.verification import DiscordVerificationMiddleware
+
+from ._harness import SignedFixture, measure, ping_body, print_table
+
+
+class LegacyDiscordVerificationMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware implementation dispike shipped before, kept for comparison."""
+
+    def __init__(self, app, *, client_public_key: str):
+        super().__init__(app)
+        self._inner = DiscordVerificationMiddleware(app, client_public_key=client_public_key)
+
+    async def dispatch(self, request: Request, call_next):
+        try:
+            get_signature = request.headers["X-Signature-Ed25519"]
+            get_timestamp = request.headers["X-Signature-Timestamp"]
+            get_body = await request.body()
+            request.state._cached_body = get_body
+        except Exception:
+            return JSONResponse(status_code=400, content={"error_message": "Incorrect request."})
+
+        _status_bool, _status_code = self._inner.verify_request(
+            passed_signature=get_signature, timestamp=get_timestamp, body=get_body
+        )
+        if _status_bool:
+            return await call_next(request)
+        return JSONResponse(status_code=_status_code)
+
+
+def build_app(middleware_class, public_key: str) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middleware_class, client_public_key=public_key)
+
+    @app.post("/interactions")
+    async def interactions(request: Request):
+        return json.loads(request.state._cached_body)
+
+    return app
+
+
+async def main(requests: int, concurrency_levels):
+    fixture = SignedFixture()
+    body = ping_body()
+
+    def scope_factory():
+        return fixture.scope(body), body
+
+    rows = []
+    for concurrency in concurrency_levels:
+        for name, middleware in (
+            ("BaseHTTPMiddleware (before)", LegacyDiscordVerificationMiddleware),
+            ("pure ASGI (after)", DiscordVerificationMiddleware),
+        ):
+            app = build_app(middleware, fixture.public_key)
+            try:
+                rows.append((name, await measure(app, scope_factory, requests, concurrency)))
+            except Exception as exc:
+                rows.append((name, {"error": repr(exc)}))
+    print_table("verification middleware", rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 32])
+    args = parser.parse_args()
+    from loguru import logger
+
+    logger.remove()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,94 @@
+"""Inline vs pooled signature verification.
+
+Besides throughput and latency, reports event loop lag: how late a 1ms
+ticker task wakes up while verification load runs. That is the delay other
+work on the loop (deferred tasks, followups) sees.
+
+    python -m benchmarks.bench_verification_pool --concurrency 1 8 32 128
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+
+from dispike.middlewares.verification import (
+    DiscordVerificationMiddleware,
+    VerificationMode,
+)
+
+from ._harness import SignedFixture, measure, percentile, ping_body
+
+
+def build_app(public_key: str, **middleware_kwargs) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        DiscordVerificationMiddleware, client_public_key=public_key, **middleware_kwargs
+    )
+
+    @app.post("/interactions")
+    async def interactions():
+        return {"type": 1}
+
+    return app
+
+
+async def _run_with_lag_monitor(coroutine):
+    lags = []
+    running = True
+
+    async def ticker():
+        while running:
+            expected = time.perf_counter() + 0.001
+            await asyncio.sleep(0.001)
+            lags.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+    ticker_task = asyncio.ensure_future(ticker())
+    try:
+        result = await coroutine
+    finally:
+        running = False
+        await ticker_task
+    result["loop_lag_p99_ms"] = percentile(lags, 99)
+    result["loop_lag_max_ms"] = max(lags) if lags else 0.0
+    return result
+
+
+async def main(requests: int, concurrency_levels, workers: int):
+    fixture = SignedFixture()
+    body = ping_body()
+
+    def scope_factory():
+        return fixture.scope(body), body
+
+    print(
+        f"{'mode':<8}{'conc':>6}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'lag p99':>10}{'lag max':>10}"
+    )
+    for concurrency in concurrency_levels:
+        for mode in (VerificationMode.INLINE, VerificationMode.POOL):
+            app = build_app(
+                fixture.public_key,
+                verification_mode=mode,
+                verification_workers=workers,
+                verification_max_pending=max(concurrency, 1),
+            )
+            result = await _run_with_lag_monitor(
+                measure(app, scope_factory, requests, concurrency)
+            )
+            print(
+                f"{mode.value:<8}{concurrency:>6}{result['throughput_rps']:>10.0f}"
+                f"{result['p50_ms']:>9.3f}{result['p99_ms']:>9.3f}"
+                f"{result['loop_lag_p99_ms']:>10.3f}{result['loop_lag_max_ms']:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    from loguru import logger
+
+    logger.remove()
+    asyncio.run(main(args.requests, args.concurrency, args.workers))
@@ -0,0 +1,135 @@
+"""Interaction payloads shared by the benchmarks."""
+
+
+def member() -> dict:
+    return {
+        "deaf": False,
+        "is_pending": False,
+        "joined_at": "2019-05-12T18:36:16.878000+00:00",
+        "mute": False,
+        "nick": None,
+        "pending": False,
+        "permissions": "2147483647",
+        "premium_since": None,
+        "roles": ["123123", "1231233", "1231233133", "12412412414"],
+        "user": {
+            "avatar": "b723979992a56",
+            "discriminator": "3333",
+            "id": "234234213122123",
+            "public_flags": 768,
+            "username": "exo",
+        },
+    }
+
+
+def slash_command_body(name: str = "sendmessage") -> dict:
+    return {
+        "channel_id": "123123",
+        "data": {
+            "id": "12312312",
+            "name": name,
+            "options": [{"name": "message", "value": "test"}],
+            "type": 1,
+        },
+        "guild_id": "123123",
+        "id": "123123123132",
+        "member": member(),
+        "token": "Null",
+        "type": 2,
+        "version": 1,
+    }
+
+
+def _interaction(interaction_type: int, data: dict) -> dict:
+    return {
+        "channel_id": "123123",
+        "data": data,
+        "guild_id": "123123",
+        "id": "123123123132",
+        "member": member(),
+        "token": "Null",
+        "type": interaction_type,
+        "version": 1,
+    }
+
+
+def subcommand_body(name: str = "forex") -> dict:
+    return _interaction(
+        2,
+        {
+            "id": "12312344231",
+            "name": name,
+            "options": [
+                {
+                    "name": "latest",
+                    "options": [
+                        {
+                            "name": "convert",
+                            "options": [
+                                {"name": "symbol_1", "value": "USD"},
+                                {"name": "symbol_2", "value": "GBP"},
+                            ],
+                        }
+                    ],
+                }
+            ],
+            "type": 1,
+        },
+    )
+
+
+def button_body(custom_id: str = "click_me") -> dict:
+    return _interaction(3, {"component_type": 2, "custom_id": custom_id})
+
+
+def select_menu_body(custom_id: str = "pick_one") -> dict:
+    return _interaction(3, {"component_type": 3, "custom_id": custom_id, "values": ["a", "b"]})
+
+
+def user_command_body(name: str = "High Five") -> dict:
+    _member = member()
+    _user = _member.pop("user")
+    return _interaction(
+        2,
+        {
+            "id": "866818195033292850",
+            "name": name,
+            "resolved": {"members": {_user["id"]: _member}, "users": {_user["id"]: _user}},
+            "target_id": _user["id"],
+            "type": 2,
+        },
+    )
+
+
+def message_command_body(name: str = "Bookmark") -> dict:
+    return _interaction(
+        2,
+        {
+            "id": "866818195033292851",
+            "name": name,
+            "resolved": {
+                "messages": {
+                    "867793854505943041": {
+                        "attachments": [],
+                        "author": member()["user"],
+                        "channel_id": "123123",
+                        "components": [],
+                        "content": "Some message content",
+                        "edited_timestamp": None,
+                        "embeds": [],
+                        "flags": 0,
+                        "id": "867793854505943041",
+                        "mention_everyone": False,
+                        "mention_roles": [],
+                        "mentions": [],
+                        "pinned": False,
+                        "timestamp": "2021-07-22T15:42:57.744000+00:00",
+                        "tts": False,
+                        "type": 0,
+                    }
+                }
+            },
+            "target_id": "867793854505943041",
+            "type": 3,
+        },
+    )
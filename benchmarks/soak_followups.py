@@ -0,0 +1,126 @@
+"""Soak test for followup messages: open file descriptors and memory over many followups.
+
+Starts a stub webhook server on localhost (uvicorn in a background thread) and
+sends followups to it. Every ``--report-every`` followups it prints the number of
+open file descriptors and the resident memory of this process, which should stay
+flat with pooled clients.
+
+``--mode per-followup`` gives every followup its own clients, like followups did
+before they borrowed from the bot's pool, for comparison.
+
+    python -m benchmarks.soak_followups --followups 100000
+    python -m benchmarks.soak_followups --mode per-followup --followups 5000
+"""
+import argparse
+import asyncio
+import gc
+import os
+import socket
+import threading
+import time
+
+import uvicorn
+from loguru import logger
+from nacl.signing import SigningKey
+from nacl.encoding import HexEncoder
+
+from dispike import Dispike
+from dispike.followup import FollowUpMessages
+from dispike.helper.http_pool import HTTPClientPool
+from dispike.helper.logging_control import configure_logging
+from dispike.incoming import IncomingDiscordSlashInteraction
+from dispike.response import DiscordResponse
+
+from .fixtures import slash_command_body
+
+
+async def stub_webhook_app(scope, receive, send):
+    """Accepts any webhook call and answers like Discord does for a created message."""
+    if scope["type"] != "http":
+        return
+    while (await receive()).get("more_body"):
+        pass
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": b'{"id": "1"}'})
+
+
+def start_stub_server() -> int:
+    with socket.socket() as _socket:
+        _socket.bind(("127.0.0.1", 0))
+        port = _socket.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(stub_webhook_app, host="127.0.0.1", port=port, log_level="error")
+    )
+    server.install_signal_handlers = lambda: None
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return port
+
+
+def open_fds() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+async def main(followups: int, concurrency: int, report_every: int, mode: str):
+    port = start_stub_server()
+    bot = Dispike(
+        client_public_key=SigningKey.generate().verify_key.encode(encoder=HexEncoder).decode(),
+        bot_token="BOTTOKEN",
+        application_id="APPID",
+    )
+    interaction = IncomingDiscordSlashInteraction(**slash_command_body())
+    base_url = f"http://127.0.0.1:{port}/api/v8/webhooks/APPID/{interaction.token}"
+
+    sent = 0
+    started = time.perf_counter()
+    print(f"{'followups':>10}{'open fds':>10}{'rss MB':>10}{'req/s':>10}")
+
+    async def send_followups(count: int):
+        nonlocal sent
+        for _ in range(count):
+            followup = FollowUpMessages(bot, interaction)
+            followup.base_url = base_url
+            if mode == "per-followup":
+                followup._http_pool = HTTPClientPool()
+            await followup.async_create_follow_up_message(DiscordResponse(content="soak"))
+            sent += 1
+
+    while sent < followups:
+        _batch = min(report_every, followups - sent)
+        await asyncio.gather(
+            *[
+                send_followups(_batch // concurrency + (1 if i < _batch % concurrency else 0))
+                for i in range(concurrency)
+            ]
+        )
+        gc.collect()
+        print(
+            f"{sent:>10}{open_fds():>10}{rss_mb():>10.1f}"
+            f"{sent / (time.perf_counter() - started):>10.0f}"
+        )
+
+    await bot.http_pool.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--followups", type=int, default=100000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--report-every", type=int, default=10000)
+    parser.add_argument("--mode", choices=("pooled", "per-followup"), default="pooled")
+    args = parser.parse_args()
+    logger.remove()
+    configure_logging(levels={"network": "OFF"})
+    asyncio.run(main(args.followups, args.concurrency, args.report_every, args.mode))
@@ -0,0 +1,192 @@
+import asyncio
+import typing
+
+from loguru import logger
+
+from .models import DiscordCommand
+from ..interactions import PerCommandRegistrationSettings
+
+if typing.TYPE_CHECKING:
+    from ..main import Dispike  # pragma: no cover
+    from ..incoming import IncomingApplicationCommand  # pragma: no cover
+    from .models.permissions import NewApplicationPermission  # pragma: no cover
+
+
+GLOBAL_SCOPE = "global"
+
+
+class GuildOperationResult(object):
+    """Outcome of one request made for a guild.
+
+    Attributes:
+        operation (str): What was done, e.g. ``"register wave"``.
+        result (Any): What the call returned, None if it failed.
+        error (Exception): The exception raised, None if it succeeded.
+    """
+
+    __slots__ = ("operation", "result", "error")
+
+    def __init__(self, operation: str, result: typing.Any = None, error: Exception = None):
+        self.operation = operation
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        return f"<GuildOperationResult {self.operation} {'ok' if self.ok else repr(self.error)}>"
+
+
+class GuildReport(object):
+    """Every operation made for one guild (or ``"global"``), in order.
+
+    Attributes:
+        guild_id (str): The guild, or ``"global"`` for global commands.
+        operations (List[GuildOperationResult]): Outcome of every operation.
+    """
+
+    def __init__(self, guild_id: str):
+        self.guild_id = guild_id
+        self.operations = []  # type: typing.List[GuildOperationResult]
+
+    @property
+    def ok(self) -> bool:
+        return all(operation.ok for operation in self.operations)
+
+    @property
+    def errors(self) -> typing.List[GuildOperationResult]:
+        return [operation for operation in self.operations if not operation.ok]
+
+    def __repr__(self) -> str:
+        return f"<GuildReport {self.guild_id} {len(self.operations)} operations, {len(self.errors)} failed>"
+
+
+class FanOutReport(object):
+    """Per-guild results of a fan-out. A failure in one guild never stops the others.
+
+    Attributes:
+        guilds (Dict[str, GuildReport]): Report per guild.
+    """
+
+    def __init__(self):
+        self.guilds = {}  # type: typing.Dict[str, GuildReport]
+
+    @property
+    def ok(self) -> bool:
+        return all(report.ok for report in self.guilds.values())
+
+    @property
+    def failed_guilds(self) -> typing.List[str]:
+        return [guild_id for guild_id, report in self.guilds.items() if not report.ok]
+
+    @property
+    def succeeded_guilds(self) -> typing.List[str]:
+        return [guild_id for guild_id, report in self.guilds.items() if report.ok]
+
+    def __getitem__(self, guild_id) -> GuildReport:
+        return self.guilds[str(guild_id)]
+
+    def __repr__(self) -> str:
+        return f"<FanOutReport {len(self.guilds)} guilds, {len(self.failed_guilds)} failed>"
+
+
+# (operation name, function creating the coroutine to run)
+_Operation = typing.Tuple[str, typing.Callable[[], typing.Awaitable]]
+
+
+async def fan_out(
+    operations: typing.Dict[str, typing.List[_Operation]],
+    max_concurrency: int = 10,
+) -> FanOutReport:
+    """Run operations for many guilds concurrently.
+
+    Operations of the same guild run one after another (they share rate limit buckets),
+    while up to ``max_concurrency`` guilds are worked on at once. Exceptions are recorded
+    in the report instead of being raised. A call returning ``False`` (the permission setters
+    report failures that way) counts as failed.
+
+    Args:
+        operations (Dict[str, List[Tuple[str, Callable[[], Awaitable]]]]): Named operations per guild id.
+        max_concurrency (int, optional): Guilds worked on at once. Defaults to 10.
+
+    Returns:
+        FanOutReport: Results per guild.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1.")
+    _semaphore = asyncio.Semaphore(max_concurrency)
+    _report = FanOutReport()
+
+    async def _run_guild(guild_id: str, guild_operations: typing.List[_Operation]):
+        _guild_report = _report.guilds[guild_id] = GuildReport(guild_id)
+        async with _semaphore:
+            for name, operation in guild_operations:
+                try:
+                    _result = await operation()
+                except Exception as error:
+                    logger.warning(f"{name} failed in guild {guild_id}: {error}")
+                    _guild_report.operations.append(GuildOperationResult(name, error=error))
+                    continue
+                if _result is False:
+                    _guild_report.operations.append(
+                        GuildOperationResult(name, error=RuntimeError(f"{name} was refused by Discord"))
+                    )
+                else:
+                    _guild_report.operations.append(GuildOperationResult(name, result=_result))
+
+    await asyncio.gather(
+        *[_run_guild(str(guild_id), guild_operations) for guild_id, guild_operations in operations.items()]
+    )
+    logger.info(
+        f"Fan-out finished: {len(_report.succeeded_guilds)} guilds succeeded, {len(_report.failed_guilds)} failed."
+    )
+    return _report
+
+
+def register_operations(
+    bot: "Dispike",
+    commands: typing.Iterable[typing.Union[DiscordCommand, PerCommandRegistrationSettings]],
+) -> typing.Dict[str, typing.List[_Operation]]:
+    """Group registrations per guild, commands without a guild are registered globally."""
+    _operations = {}  # type: typing.Dict[str, typing.List[_Operation]]
+    for command in commands:
+        if isinstance(command, PerCommandRegistrationSettings) and command.guild_id is not None:
+            _schema, _guild_id = command.schema, command.guild_id
+            _operation = lambda _schema=_schema, _guild_id=_guild_id: bot.async_register(
+                command=_schema, guild_only=True, guild_to_target=_guild_id
+            )
+        else:
+            if isinstance(command, PerCommandRegistrationSettings):
+                command = command.schema
+            _schema, _guild_id = command, GLOBAL_SCOPE
+            _operation = lambda _schema=_schema: bot.async_register(command=_schema)
+        _operations.setdefault(str(_guild_id), []).append((f"register {_schema.name}", _operation))
+    return _operations
+
+
+def permission_operations(
+    bot: "Dispike",
+    permissions: typing.Dict[
+        typing.Any,
+        typing.List[
+            typing.Tuple[typing.Union[int, "IncomingApplicationCommand"], "NewApplicationPermission"]
+        ],
+    ],
+) -> typing.Dict[str, typing.List[_Operation]]:
+    """Turn ``{guild_id: [(command_id, new_permissions), ...]}`` into operations."""
+    _operations = {}  # type: typing.Dict[str, typing.List[_Operation]]
+    for guild_id, guild_permissions in permissions.items():
+        for command_id, new_permissions in guild_permissions:
+            _operations.setdefault(str(guild_id), []).append(
+                (
+                    f"permissions {getattr(command_id, 'id', command_id)}",
+                    lambda command_id=command_id, new_permissions=new_permissions, guild_id=guild_id: bot.async_set_command_permission(
+                        command_id=command_id,
+                        guild_id=guild_id,
+                        new_permissions=new_permissions,
+                    ),
+                )
+            )
+    return _operations
@@ -40,3 +40,11 @@ class GuildApplicationCommandPermissions(BaseModel):
 @static_check_init_args
 class NewApplicationPermission(BaseModel):
     permissions: typing.List[ApplicationCommandPermissions]
+
+
+@static_check_init_args
+class PartialGuildApplicationCommandPermissions(BaseModel):
+    """ Permissions of one command, as sent to the batch guild permissions endpoint. """
+
+    id: int
+    permissions: typing.List[ApplicationCommandPermissions]
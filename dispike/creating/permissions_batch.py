@@ -0,0 +1,95 @@
+import typing
+
+from .models.permissions import (
+    ApplicationCommandPermissions,
+    GuildApplicationCommandPermissions,
+    NewApplicationPermission,
+    PartialGuildApplicationCommandPermissions,
+)
+from ..helper.permissions_generator import PermissionGenerator
+from ..incoming import IncomingApplicationCommand
+
+
+_PermissionKey = typing.Tuple[int, int, bool]
+
+
+def _permission_key(permission: ApplicationCommandPermissions) -> _PermissionKey:
+    return int(permission.id), int(permission.type), bool(permission.permission)
+
+
+def _as_permission_list(
+    permissions: typing.Union[
+        NewApplicationPermission, PermissionGenerator, typing.List[ApplicationCommandPermissions]
+    ]
+) -> typing.List[ApplicationCommandPermissions]:
+    if isinstance(permissions, PermissionGenerator):
+        permissions = permissions.created
+    if isinstance(permissions, NewApplicationPermission):
+        return list(permissions.permissions)
+    return list(permissions)
+
+
+def _as_command_id(command_id: typing.Union[int, str, IncomingApplicationCommand]) -> int:
+    if isinstance(command_id, IncomingApplicationCommand):
+        return command_id.id
+    elif isinstance(command_id, (str, int)):
+        return int(command_id)
+    raise TypeError("The command ID must be either an interger or an IncomingApplicationCommand object.")
+
+
+class GuildPermissionsDiff(object):
+    """Difference between the current and wanted command permissions of a guild.
+
+    Discord's batch endpoint replaces the permissions of every command in the guild,
+    so ``body`` carries the untouched commands' current permissions along with the changes.
+
+    Attributes:
+        guild_id (str): The guild.
+        changed (Dict[int, List[ApplicationCommandPermissions]]): New permissions of commands that differ.
+        unchanged (List[int]): Commands whose wanted permissions are already set.
+        body (List[PartialGuildApplicationCommandPermissions]): Everything to send in the batch request.
+    """
+
+    def __init__(
+        self,
+        guild_id,
+        current: typing.List[GuildApplicationCommandPermissions],
+        wanted: typing.Dict[
+            typing.Union[int, str, IncomingApplicationCommand],
+            typing.Union[NewApplicationPermission, PermissionGenerator, typing.List[ApplicationCommandPermissions]],
+        ],
+    ):
+        self.guild_id = str(guild_id)
+        self.changed = {}  # type: typing.Dict[int, typing.List[ApplicationCommandPermissions]]
+        self.unchanged = []  # type: typing.List[int]
+
+        _current = {int(command.id): list(command.permissions) for command in current}
+        _merged = dict(_current)
+        for command_id, permissions in wanted.items():
+            _command_id = _as_command_id(command_id)
+            _wanted = _as_permission_list(permissions)
+            if sorted(map(_permission_key, _wanted)) == sorted(
+                map(_permission_key, _current.get(_command_id, []))
+            ):
+                self.unchanged.append(_command_id)
+            else:
+                self.changed[_command_id] = _wanted
+            _merged[_command_id] = _wanted
+
+        self.body = [
+            PartialGuildApplicationCommandPermissions(id=command_id, permissions=permissions)
+            for command_id, permissions in _merged.items()
+            # commands without permissions fall back to default_permission.
+            if permissions
+        ]
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.changed
+
+    def json(self) -> typing.List[dict]:
+        """The batch request body."""
+        return [command.dict() for command in self.body]
+
+    def __repr__(self) -> str:
+        return f"<GuildPermissionsDiff {self.guild_id} {len(self.changed)} changed, {len(self.unchanged)} unchanged>"
@@ -7,6 +7,18 @@ from ..helper.network_request_log import (
     dispike_httpx_event_hook_outgoing_request,
     dispike_httpx_event_hook_incoming_request,
 )
+from ..rest.ratelimit import RateLimiter, install_rate_limiter
+from ..rest.retry import RetryPolicy, install_retry_policy
+from ..rest.metrics import install_metrics
+from ..rest.tracing import install_tracing
+from ..rest import DEFAULT_API_BASE_URL
+from ..helper.http_pool import HTTPClientPool
+
+if typing.TYPE_CHECKING:
+    import httpx  # pragma: no cover
+    from ..helper.command_cache import CommandCache  # pragma: no cover
+    from ..helper.metrics import Metrics  # pragma: no cover
+    from ..helper.tracing import Tracer  # pragma: no cover
 
 
 class RegisterCommands(object):
@@ -14,26 +26,124 @@ class RegisterCommands(object):
     While you shouldn't need to import this directly, it's still accessible if you
     prefer not to initalize a Dispike object.
 
-    Important to remember all methods are not async.
+    Methods are sync, unless prefixed with ``async_``. The async methods share
+    the validation and error handling of their sync versions and are sent through
+    a pooled async client.
 
     """
 
-    def __init__(self, application_id: str, bot_token: str):
+    def __init__(
+        self,
+        application_id: str,
+        bot_token: str,
+        rate_limiter: "RateLimiter" = None,
+        retry_policy: "RetryPolicy" = None,
+        http_pool: "HTTPClientPool" = None,
+        command_cache: "CommandCache" = None,
+        api_base_url: str = DEFAULT_API_BASE_URL,
+        metrics: "Metrics" = None,
+        tracer: "Tracer" = None,
+    ):
         """Initalize object provided with application_id and a bot token
 
         Args:
             application_id (str): Client ID
             bot_token (str): Bot user Token
+            rate_limiter (RateLimiter, optional): Shared rate limiter to send requests through.
+            retry_policy (RetryPolicy, optional): Retry policy for failed requests.
+            http_pool (HTTPClientPool, optional): Pool of async clients used by the ``async_`` methods. A new pool is created if not provided.
+            command_cache (CommandCache, optional): Cache of command lookups to invalidate when commands are registered.
+            api_base_url (str, optional): Base url of the Discord API. Defaults to "https://discord.com/api/v8".
+            metrics (Metrics, optional): Metrics to record the latency of requests to.
+            tracer (Tracer, optional): Tracer to record requests as spans with.
         """
         self.__bot_token = bot_token
         self._application_id = application_id
         self._client = Client(
-            base_url=f"https://discord.com/api/v8/applications/{self._application_id}/",
+            base_url=f"{api_base_url.rstrip('/')}/applications/{self._application_id}/",
             event_hooks={
                 "response": [dispike_httpx_event_hook_incoming_request],
                 "request": [dispike_httpx_event_hook_outgoing_request],
             },
         )
+        if metrics is not None:
+            install_metrics(self._client, metrics)
+        if rate_limiter is not None:
+            install_rate_limiter(self._client, rate_limiter)
+        if retry_policy is not None:
+            install_retry_policy(self._client, retry_policy)
+        if tracer is not None:
+            install_tracing(self._client, tracer)
+        if http_pool is None:
+            http_pool = HTTPClientPool(
+                event_hooks={
+                    "response": [dispike_httpx_event_hook_incoming_request],
+                    "request": [dispike_httpx_event_hook_outgoing_request],
+                },
+                rate_limiter=rate_limiter,
+                retry_policy=retry_policy,
+                metrics=metrics,
+                tracer=tracer,
+            )
+        self._http_pool = http_pool
+        self._command_cache = command_cache
+
+    def _commands_path(self, guild_only: bool, guild_to_target: int = None) -> str:
+        """Path of the global or guild command list, relative to the application."""
+        if guild_only == True:
+            if guild_to_target is None:
+                raise TypeError(
+                    "if guild_only is set to true, a guild id must be provided."
+                )
+
+            logger.info(f"Targeting a specific guild -> {guild_to_target}")
+            return f"guilds/{guild_to_target}/commands"
+        return f"commands"
+
+    def _invalidate_commands(self, guild_only: bool, guild_to_target: int = None):
+        if self._command_cache is not None:
+            self._command_cache.invalidate_commands(guild_to_target if guild_only else None)
+
+    def _absolute_url(self, path: str) -> str:
+        return f"{self._client.base_url}{path.lstrip('/')}"
+
+    async def _async_request(
+        self, method: str, path: str, **kwargs
+    ) -> "httpx.Response":
+        """Send an authorized request through the shared async client pool.
+
+        Args:
+            method (str): HTTP method
+            path (str): Path relative to the application, like the sync client's base url.
+        """
+        return await self._http_pool.request(
+            method, self._absolute_url(path), headers=self.request_headers, **kwargs
+        )
+
+    def _handle_bulk_overwrite_response(
+        self,
+        response: "httpx.Response",
+        commands_json: typing.List[dict],
+        guild_only: bool,
+        guild_to_target: int,
+    ) -> bool:
+        if response.status_code == 200:
+            logger.info(
+                f"Overwritten {len(response.json())} commands.. Recieved ({len(commands_json)}"
+            )
+            return True
+        else:
+            logger.debug(
+                f"BULK Overwrite failed ({guild_only} = {guild_to_target}): Body: {commands_json}.. Status code: {response.status_code}"
+            )
+            raise DiscordAPIError(response.status_code, response.text)
+
+    @staticmethod
+    def _handle_register_response(response: "httpx.Response") -> bool:
+        if response.status_code in [200, 201]:
+            return True
+
+        raise DiscordAPIError(response.status_code, response.text)
 
     @logger.catch(reraise=True, message="Issue with bulk overrwriting commands")
     def bulk_overwrite_commands(
@@ -49,31 +159,39 @@ class RegisterCommands(object):
             guild_only (bool, optional): Default to set global mode (True). Set to False to let the function know to expect a guild_id
             guild_to_target (int, optional): A guild Id if guild_only is set to True.
         """
-        if guild_only == True:
-            if guild_to_target is None:
-                raise TypeError(
-                    "if guild_only is set to true, a guild id must be provided."
-                )
-
-            logger.info(f"Targeting a specific guild -> {guild_to_target}")
-            _request_url = f"guilds/{guild_to_target}/commands"
-        else:
-            _request_url = f"commands"
-
+        _request_url = self._commands_path(guild_only, guild_to_target)
         _commands_to_json = [command.dict(exclude_none=True) for command in commands]
         _send_request = self._client.put(
             url=_request_url, json=_commands_to_json, headers=self.request_headers
         )
-        if _send_request.status_code == 200:
-            logger.info(
-                f"Overwritten {len(_send_request.json())} commands.. Recieved ({len(_commands_to_json)}"
-            )
-            return True
-        else:
-            logger.debug(
-                f"BULK Overwrite failed ({guild_only} = {guild_to_target}): Body: {_commands_to_json}.. Status code: {_send_request.status_code}"
-            )
-            raise DiscordAPIError(_send_request.status_code, _send_request.text)
+        self._invalidate_commands(guild_only, guild_to_target)
+        return self._handle_bulk_overwrite_response(
+            _send_request, _commands_to_json, guild_only, guild_to_target
+        )
+
+    @logger.catch(reraise=True, message="Issue with bulk overrwriting commands")
+    async def async_bulk_overwrite_commands(
+        self,
+        commands: typing.List[DiscordCommand],
+        guild_only: bool = False,
+        guild_to_target: int = None,
+    ):
+        """Async version of ``bulk_overwrite_commands``, sent through the shared async client.
+
+        Args:
+            commands (typing.List[DiscordCommand]): List of new commands (these commands will be overwritten)
+            guild_only (bool, optional): Default to set global mode (True). Set to False to let the function know to expect a guild_id
+            guild_to_target (int, optional): A guild Id if guild_only is set to True.
+        """
+        _request_url = self._commands_path(guild_only, guild_to_target)
+        _commands_to_json = [command.dict(exclude_none=True) for command in commands]
+        _send_request = await self._async_request(
+            "PUT", _request_url, json=_commands_to_json
+        )
+        self._invalidate_commands(guild_only, guild_to_target)
+        return self._handle_bulk_overwrite_response(
+            _send_request, _commands_to_json, guild_only, guild_to_target
+        )
 
     def register(
         self, command: DiscordCommand, guild_only=False, guild_to_target: int = None
@@ -85,28 +203,31 @@ class RegisterCommands(object):
             guild_only (bool, optional): Default to set global mode (True). Set to False to let the function know to expect a guild_id
             guild_to_target (int, optional): A guild Id if guild_only is set to True.
         """
-        if guild_only == True:
-            if guild_to_target is None:
-                raise TypeError(
-                    "if guild_only is set to true, a guild id must be provided."
-                )
-
-            logger.info(f"Targeting a specific guild -> {guild_to_target}")
-            _request_url = f"guilds/{guild_to_target}/commands"
-        else:
-            _request_url = f"commands"
+        _request_url = self._commands_path(guild_only, guild_to_target)
+        _send_request = self._client.post(
+            _request_url,
+            headers=self.request_headers,
+            json=command.dict(exclude_none=True),
+        )
+        self._invalidate_commands(guild_only, guild_to_target)
+        return self._handle_register_response(_send_request)
 
-        try:
-            _command_to_json = command.dict(exclude_none=True)
-            _send_request = self._client.post(
-                _request_url, headers=self.request_headers, json=_command_to_json
-            )
-            if _send_request.status_code in [200, 201]:
-                return True
+    async def async_register(
+        self, command: DiscordCommand, guild_only=False, guild_to_target: int = None
+    ):
+        """Async version of ``register``, sent through the shared async client.
 
-            raise DiscordAPIError(_send_request.status_code, _send_request.text)
-        except Exception:
-            raise
+        Args:
+            command (DiscordCommand): A properly configured DiscordCommand
+            guild_only (bool, optional): Default to set global mode (True). Set to False to let the function know to expect a guild_id
+            guild_to_target (int, optional): A guild Id if guild_only is set to True.
+        """
+        _request_url = self._commands_path(guild_only, guild_to_target)
+        _send_request = await self._async_request(
+            "POST", _request_url, json=command.dict(exclude_none=True)
+        )
+        self._invalidate_commands(guild_only, guild_to_target)
+        return self._handle_register_response(_send_request)
 
     @property
     def request_headers(self):
@@ -0,0 +1,409 @@
+from enum import Enum
+import hashlib
+import json
+import os
+import typing
+
+from loguru import logger
+
+from .models import DiscordCommand
+from ..errors.network import DiscordAPIError
+from ..interactions import PerCommandRegistrationSettings
+
+if typing.TYPE_CHECKING:
+    import httpx  # pragma: no cover
+    from ..main import Dispike  # pragma: no cover
+    from ..incoming import IncomingApplicationCommand  # pragma: no cover
+
+
+GLOBAL_SCOPE = "global"
+_CACHE_VERSION = 1
+
+
+class SyncActionType(str, Enum):
+    """What a sync does with one command.
+
+    Attributes:
+        CREATE: The command does not exist on Discord yet.
+        PATCH: The command exists on Discord but differs.
+        DELETE: The command exists on Discord but not locally.
+    """
+
+    CREATE = "create"
+    PATCH = "patch"
+    DELETE = "delete"
+
+
+class SyncAction(object):
+    """One request a sync will make.
+
+    Attributes:
+        type (SyncActionType): create, patch or delete.
+        scope (str): ``"global"`` or the guild id.
+        name (str): Name of the command.
+        command (DiscordCommand): The local command, None for deletes.
+        command_id (int): Id of the command on Discord, None for creates.
+    """
+
+    __slots__ = ("type", "scope", "name", "command", "command_id")
+
+    def __init__(
+        self,
+        type: SyncActionType,
+        scope: str,
+        name: str,
+        command: DiscordCommand = None,
+        command_id: int = None,
+    ):
+        self.type = type
+        self.scope = scope
+        self.name = name
+        self.command = command
+        self.command_id = command_id
+
+    def __repr__(self) -> str:
+        return f"<SyncAction {self.type.value} {self.name} ({self.scope})>"
+
+
+class SyncPlan(object):
+    """Minimal set of requests bringing Discord in line with the local commands.
+
+    Attributes:
+        actions (List[SyncAction]): Requests to make.
+        hashes (Dict[str, str]): Hash of the local commands per scope, saved to the cache once applied.
+        unchanged (List[str]): Scopes skipped because their hash matched the cache, no requests were made for them.
+        fetched (List[str]): Scopes whose commands were fetched from Discord to compute the plan.
+    """
+
+    def __init__(self):
+        self.actions = []  # type: typing.List[SyncAction]
+        self.hashes = {}  # type: typing.Dict[str, str]
+        self.unchanged = []  # type: typing.List[str]
+        self.fetched = []  # type: typing.List[str]
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.actions
+
+    def for_scope(self, scope: str) -> typing.List[SyncAction]:
+        return [action for action in self.actions if action.scope == scope]
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def __repr__(self) -> str:
+        return f"<SyncPlan {len(self.actions)} actions, {len(self.unchanged)} unchanged scopes>"
+
+
+def _normalize_option(option: dict) -> dict:
+    _normalized = {
+        key: value
+        for key, value in option.items()
+        if value is not None and value != [] and not (key == "required" and value is False)
+    }
+    if "options" in _normalized:
+        _normalized["options"] = [_normalize_option(sub) for sub in _normalized["options"]]
+    return _normalized
+
+
+def normalize_command(command: typing.Union[DiscordCommand, "IncomingApplicationCommand", dict]) -> dict:
+    """Return the fields of a command that Discord stores, with defaults filled in.
+
+    Local ``DiscordCommand`` objects and commands fetched from Discord normalize to
+    the same dict when they are equal, so they can be compared and hashed.
+    """
+    if not isinstance(command, dict):
+        command = command.dict(exclude_none=True)
+    return _normalize_option(
+        {
+            "name": command["name"],
+            "description": command.get("description") or "",
+            "type": int(command.get("type") or 1),
+            "default_permission": command.get("default_permission", True) is not False,
+            "options": [
+                option if isinstance(option, dict) else option.dict(exclude_none=True)
+                for option in command.get("options") or []
+            ],
+        }
+    )
+
+
+def _command_key(normalized: dict) -> typing.Tuple[int, str]:
+    # names are unique per command type.
+    return normalized["type"], normalized["name"]
+
+
+def hash_commands(commands: typing.Iterable[DiscordCommand]) -> str:
+    """Canonical hash of a set of commands, independent of their order."""
+    _normalized = sorted((normalize_command(command) for command in commands), key=_command_key)
+    return hashlib.sha256(
+        json.dumps(_normalized, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+
+
+def _scope_of(guild_id) -> str:
+    return GLOBAL_SCOPE if guild_id is None else str(guild_id)
+
+
+class CommandSyncEngine(object):
+    """Incrementally syncs local command schemas with Discord.
+
+    A hash of the local commands of every scope (global, or one guild) is kept in a
+    cache file. When the hash of a scope matches the cache, nothing is requested from
+    Discord for it, so a deploy without command changes makes no requests at all.
+    Otherwise the scope's commands are fetched and only the commands that differ are
+    created, patched or deleted.
+
+    Deleting the cache file forces a full comparison on the next sync.
+
+    Attributes:
+        cache_path (str): Path of the hash cache file.
+        delete_unknown (bool): Delete commands that exist on Discord but not locally.
+    """
+
+    def __init__(
+        self,
+        bot: "Dispike",
+        cache_path: str = ".dispike_commands.json",
+        delete_unknown: bool = True,
+    ):
+        """Initialize a sync engine.
+
+        Args:
+            bot (Dispike): Dispike instance with a bot token.
+            cache_path (str, optional): Path of the hash cache file.
+            delete_unknown (bool, optional): Delete remote commands that are not defined locally. Defaults to True.
+        """
+        self._bot = bot
+        self.cache_path = cache_path
+        self.delete_unknown = delete_unknown
+
+    def load_cache(self) -> typing.Dict[str, str]:
+        """Return the cached hash per scope, empty if the cache is missing or for another application."""
+        try:
+            with open(self.cache_path) as cache_file:
+                _cache = json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+        if (
+            not isinstance(_cache, dict)
+            or _cache.get("version") != _CACHE_VERSION
+            or _cache.get("application_id") != str(self._bot._application_id)
+        ):
+            return {}
+        return dict(_cache.get("scopes") or {})
+
+    def save_cache(self, hashes: typing.Dict[str, str]):
+        """Write the hash per scope, replacing the cache file atomically."""
+        _temporary_path = f"{self.cache_path}.tmp"
+        with open(_temporary_path, "w") as cache_file:
+            json.dump(
+                {
+                    "version": _CACHE_VERSION,
+                    "application_id": str(self._bot._application_id),
+                    "scopes": hashes,
+                },
+                cache_file,
+                sort_keys=True,
+                indent=2,
+            )
+        os.replace(_temporary_path, self.cache_path)
+
+    @staticmethod
+    def group_by_scope(
+        commands: typing.Iterable[typing.Union[DiscordCommand, PerCommandRegistrationSettings]]
+    ) -> typing.Dict[str, typing.List[DiscordCommand]]:
+        """Group commands (as returned by ``EventCollection.command_schemas``) per scope."""
+        _scopes = {}  # type: typing.Dict[str, typing.List[DiscordCommand]]
+        for command in commands:
+            if isinstance(command, PerCommandRegistrationSettings):
+                _scopes.setdefault(_scope_of(command.guild_id), []).append(command.schema)
+            else:
+                _scopes.setdefault(GLOBAL_SCOPE, []).append(command)
+        return _scopes
+
+    def _start_plan(
+        self,
+        commands: typing.Iterable[typing.Union[DiscordCommand, PerCommandRegistrationSettings]],
+        force: bool,
+    ) -> typing.Tuple[SyncPlan, typing.Dict[str, typing.List[DiscordCommand]]]:
+        """Hash every scope and return the plan so far, with the scopes whose remote state is needed."""
+        _scopes = self.group_by_scope(commands)
+        _cache = {} if force else self.load_cache()
+        _plan = SyncPlan()
+        # scopes that had commands before but have none now still need their commands deleted.
+        for scope in _cache:
+            if self.delete_unknown:
+                _scopes.setdefault(scope, [])
+
+        _to_fetch = {}
+        for scope, scope_commands in _scopes.items():
+            _hash = hash_commands(scope_commands)
+            _plan.hashes[scope] = _hash
+            if _cache.get(scope) == _hash:
+                _plan.unchanged.append(scope)
+            else:
+                _to_fetch[scope] = scope_commands
+        return _plan, _to_fetch
+
+    def _diff_scope(
+        self,
+        plan: SyncPlan,
+        scope: str,
+        local_commands: typing.List[DiscordCommand],
+        remote_commands: typing.List["IncomingApplicationCommand"],
+    ):
+        plan.fetched.append(scope)
+        _remote = {_command_key(normalize_command(command)): command for command in remote_commands}
+        for command in local_commands:
+            _normalized = normalize_command(command)
+            _existing = _remote.pop(_command_key(_normalized), None)
+            if _existing is None:
+                plan.actions.append(SyncAction(SyncActionType.CREATE, scope, command.name, command))
+            elif normalize_command(_existing) != _normalized:
+                plan.actions.append(
+                    SyncAction(SyncActionType.PATCH, scope, command.name, command, _existing.id)
+                )
+        if self.delete_unknown:
+            for command in _remote.values():
+                plan.actions.append(
+                    SyncAction(SyncActionType.DELETE, scope, command.name, command_id=command.id)
+                )
+
+    def plan(
+        self,
+        commands: typing.Iterable[typing.Union[DiscordCommand, PerCommandRegistrationSettings]],
+        force: bool = False,
+    ) -> SyncPlan:
+        """Compute what a sync would do.
+
+        Args:
+            commands (Iterable[Union[DiscordCommand, PerCommandRegistrationSettings]]): Every local command. Commands in PerCommandRegistrationSettings with a guild id are guild commands.
+            force (bool, optional): Ignore the cache and compare every scope with Discord.
+
+        Returns:
+            SyncPlan: The plan, nothing has been changed on Discord yet.
+        """
+        _plan, _to_fetch = self._start_plan(commands, force)
+        for scope, scope_commands in _to_fetch.items():
+            self._diff_scope(_plan, scope, scope_commands, self._fetch(scope))
+        return _plan
+
+    async def async_plan(
+        self,
+        commands: typing.Iterable[typing.Union[DiscordCommand, PerCommandRegistrationSettings]],
+        force: bool = False,
+    ) -> SyncPlan:
+        """Async version of ``plan``."""
+        _plan, _to_fetch = self._start_plan(commands, force)
+        for scope, scope_commands in _to_fetch.items():
+            self._diff_scope(_plan, scope, scope_commands, await self._async_fetch(scope))
+        return _plan
+
+    def _scope_guild(self, scope: str):
+        return None if scope == GLOBAL_SCOPE else scope
+
+    def _fetch(self, scope: str) -> typing.List["IncomingApplicationCommand"]:
+        # plan against what is on Discord right now, not a cached lookup.
+        self._bot._invalidate_commands(self._scope_guild(scope))
+        if scope == GLOBAL_SCOPE:
+            return self._bot.get_commands()
+        return self._bot.get_commands(guild_only=True, guild_id_passed=scope)
+
+    async def _async_fetch(self, scope: str) -> typing.List["IncomingApplicationCommand"]:
+        self._bot._invalidate_commands(self._scope_guild(scope))
+        if scope == GLOBAL_SCOPE:
+            return await self._bot.async_get_commands()
+        return await self._bot.async_get_commands(guild_only=True, guild_id_passed=scope)
+
+    @staticmethod
+    def _request_for(action: SyncAction) -> typing.Tuple[str, str, typing.Optional[dict]]:
+        _path = "commands" if action.scope == GLOBAL_SCOPE else f"guilds/{action.scope}/commands"
+        if action.type is SyncActionType.CREATE:
+            return "POST", _path, action.command.dict(exclude_none=True, exclude={"id"})
+        if action.type is SyncActionType.PATCH:
+            return (
+                "PATCH",
+                f"{_path}/{action.command_id}",
+                action.command.dict(exclude_none=True, exclude={"id"}),
+            )
+        return "DELETE", f"{_path}/{action.command_id}", None
+
+    def _check_response(self, action: SyncAction, response: "httpx.Response"):
+        self._bot._invalidate_commands(self._scope_guild(action.scope))
+        if response.status_code not in (200, 201, 204):
+            logger.error(f"Unable to {action.type.value} command {action.name} ({action.scope})")
+            raise DiscordAPIError(response.status_code, response.text)
+        logger.info(f"{action.type.value}d command {action.name} ({action.scope})")
+
+    def _finish(self, plan: SyncPlan):
+        _cache = self.load_cache()
+        _cache.update(plan.hashes)
+        for scope, _hash in plan.hashes.items():
+            # nothing left locally and nothing left remotely, forget the scope.
+            if _hash == hash_commands([]) and self.delete_unknown:
+                _cache.pop(scope, None)
+        self.save_cache(_cache)
+
+    def apply(self, plan: SyncPlan):
+        """Send the requests of a plan, then save the new hashes to the cache.
+
+        Raises:
+            DiscordAPIError: A request failed. The cache is left untouched, so the next sync compares again.
+        """
+        _registrator = self._bot._registrator
+        for action in plan.actions:
+            _method, _path, _body = self._request_for(action)
+            _response = _registrator._client.request(
+                _method, _path, headers=_registrator.request_headers, json=_body
+            )
+            self._check_response(action, _response)
+        self._finish(plan)
+
+    async def async_apply(self, plan: SyncPlan):
+        """Async version of ``apply``."""
+        _registrator = self._bot._registrator
+        for action in plan.actions:
+            _method, _path, _body = self._request_for(action)
+            _response = await _registrator._async_request(_method, _path, json=_body)
+            self._check_response(action, _response)
+        self._finish(plan)
+
+    def sync(
+        self,
+        commands: typing.Iterable[typing.Union[DiscordCommand, PerCommandRegistrationSettings]],
+        force: bool = False,
+        dry_run: bool = False,
+    ) -> SyncPlan:
+        """Plan and apply a sync.
+
+        Args:
+            commands (Iterable[Union[DiscordCommand, PerCommandRegistrationSettings]]): Every local command.
+            force (bool, optional): Ignore the cache and compare every scope with Discord.
+            dry_run (bool, optional): Only compute the plan.
+
+        Returns:
+            SyncPlan: The plan that was applied.
+        """
+        _plan = self.plan(commands, force=force)
+        if not dry_run:
+            if _plan.is_empty and not _plan.fetched:
+                logger.info("Commands are unchanged, nothing to sync.")
+            else:
+                self.apply(_plan)
+        return _plan
+
+    async def async_sync(
+        self,
+        commands: typing.Iterable[typing.Union[DiscordCommand, PerCommandRegistrationSettings]],
+        force: bool = False,
+        dry_run: bool = False,
+    ) -> SyncPlan:
+        """Async version of ``sync``."""
+        _plan = await self.async_plan(commands, force=force)
+        if not dry_run:
+            if _plan.is_empty and not _plan.fetched:
+                logger.info("Commands are unchanged, nothing to sync.")
+            else:
+                await self.async_apply(_plan)
+        return _plan
@@ -10,4 +10,18 @@ class BotTokenNotProvided(Exception):
         return f"This functionality ({self.func_name}) cannot be used without supplying a bot token to Dispike"
 
     def __repr__(self) -> str:
-        return f"This functionality ({self.func_name}) cannot be used without supplying a bot token to Dispike"
\ No newline at end of file
+        return f"This functionality ({self.func_name}) cannot be used without supplying a bot token to Dispike"
+
+class DeferredTaskQueueFull(Exception):
+    """Exception that is raised when the deferred task supervisor
+    is at capacity and cannot accept another task.
+    """
+
+    def __init__(self, capacity: int = None):
+        self.capacity = capacity
+
+    def __str__(self) -> str:
+        return f"The deferred task supervisor is full ({self.capacity} tasks running or queued)."
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -5,6 +5,7 @@ from dispike.incoming import (
     IncomingDiscordOption,
     SubcommandIncomingDiscordOptionListChild,
 )
+from dispike.incoming.lazy import is_instance_of_model
 import typing
 from loguru import logger
 
@@ -13,7 +14,7 @@ def determine_event_information(
     interaction: IncomingDiscordSlashInteraction,
 ) -> typing.Tuple[str, dict]:
 
-    if isinstance(interaction, IncomingDiscordSlashInteraction):
+    if is_instance_of_model(interaction, IncomingDiscordSlashInteraction):
 
         if interaction.data.options is None:
             return interaction.data.name, {}
@@ -0,0 +1,219 @@
+from dispike.eventer import EventTypes
+from dispike.response import (
+    DiscordResponse,
+    DeferredResponse,
+    DeferredEmphericalResponse,
+)
+from enum import Enum
+from loguru import logger
+import typing
+
+
+class ResponseStrategy(str, Enum):
+    """How the ``/interactions`` endpoint turns a command callback into a response,
+    decided from the callback's return type hint.
+
+    Attributes:
+        IMMEDIATE: Hinted ``DiscordResponse``, await it and respond with ``.response``.
+        DEFERRED: Hinted ``DeferredResponse`` or ``DeferredEmphericalResponse``, run it in the background.
+        DICT: Hinted ``dict``, respond with whatever it returns.
+        GUESS: No usable hint, inspect the returned value instead.
+    """
+
+    IMMEDIATE = "immediate"
+    DEFERRED = "deferred"
+    DICT = "dict"
+    GUESS = "guess"
+
+
+_HINTED_STRATEGIES = {
+    DiscordResponse: ResponseStrategy.IMMEDIATE,
+    DeferredResponse: ResponseStrategy.DEFERRED,
+    DeferredEmphericalResponse: ResponseStrategy.DEFERRED,
+    dict: ResponseStrategy.DICT,
+}
+
+
+def dispatch_key(event_type: typing.Union[EventTypes, str], event: str) -> tuple:
+    """Return the dispatch table key for an event.
+
+    Event types are stored as plain strings, hashing an ``EventTypes`` member
+    goes through ``Enum.__hash__`` which is noticeably slower on the hot path.
+
+    Args:
+        event_type (Union[EventTypes, str]): Event type
+        event (str): Event name
+
+    Returns:
+        tuple: (event type, event name)
+    """
+    if isinstance(event_type, EventTypes):
+        event_type = event_type.value
+    return event_type, event
+
+
+class EventInvoker(object):
+    """A registered callback, prepared once at registration so a request only
+    needs a single dictionary lookup to find and call its handler.
+
+    Attributes:
+        event (str): Event name
+        type (str): Event type
+        function (typing.Callable): The registered async callback
+        settings (dict): Settings stored alongside the callback
+        return_hint (typing.Any): The resolved return type hint, None if there isn't one.
+    """
+
+    __slots__ = ("event", "type", "function", "settings", "return_hint", "_response_strategy")
+
+    def __init__(
+        self,
+        event: str,
+        type: typing.Union[EventTypes, str],
+        function: typing.Callable,
+        settings: dict = None,
+    ):
+        self.event = event
+        self.type = dispatch_key(type, event)[0]
+        self.function = function
+        self.settings = settings if settings is not None else {}
+        self.return_hint = None
+        self._response_strategy = None
+        self._resolve_response_strategy(at_registration=True)
+
+    def _resolve_response_strategy(self, at_registration: bool = False):
+        """Resolve the return type hint once.
+
+        Forward references that cannot be resolved yet (a class defined after the callback)
+        are retried on first dispatch instead.
+        """
+        try:
+            _hints = typing.get_type_hints(self.function)
+        except Exception:
+            if at_registration:
+                logger.debug(
+                    f"unable to resolve type hints for {self.event} yet, retrying on first dispatch."
+                )
+                return
+            logger.warning(
+                f"unable to resolve type hints for {self.event}, resorting to guessing."
+            )
+            _hints = {}
+
+        self.return_hint = _hints.get("return")
+        try:
+            self._response_strategy = _HINTED_STRATEGIES.get(
+                self.return_hint, ResponseStrategy.GUESS
+            )
+        except TypeError:
+            # unhashable hint, nothing we can act on.
+            self._response_strategy = ResponseStrategy.GUESS
+
+    @property
+    def response_strategy(self) -> ResponseStrategy:
+        """The response strategy, resolved from the callback's return type hint."""
+        if self._response_strategy is None:
+            self._resolve_response_strategy()
+        return self._response_strategy
+
+    def __call__(self, *args, **kwargs) -> typing.Awaitable:
+        return self.function(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"<EventInvoker {self.type}:{self.event} -> {self.function!r}>"
+
+
+def compile_dispatch_table(callbacks: dict) -> typing.Dict[tuple, EventInvoker]:
+    """Compile a ``Dispike.callbacks`` style dict into a flat dispatch table.
+
+    Args:
+        callbacks (dict): {event type: {event name: {"function": ..., "settings": ...}}}
+
+    Returns:
+        typing.Dict[tuple, EventInvoker]: {(event type, event name): EventInvoker}
+    """
+    _table = {}
+    for event_type, events in callbacks.items():
+        for event_name, registered in events.items():
+            _invoker = EventInvoker(
+                event=event_name,
+                type=event_type,
+                function=registered["function"],
+                settings=registered.get("settings"),
+            )
+            _table[dispatch_key(event_type, event_name)] = _invoker
+    return _table
+
+
+class CallbackRegistry(dict):
+    """``Dispike.callbacks``, a dict that reports every in-place edit.
+
+    Event types map to event names, which map to ``{"function": ..., "settings": ...}``.
+    Dicts stored at these three levels are wrapped as well, so adding, replacing or
+    deleting a callback anywhere calls ``on_change``, which lets the dispatch table be
+    recompiled only after an edit instead of being checked on every request. Settings
+    dicts are left as they are, invokers share them with the registry.
+    """
+
+    __slots__ = ("_on_change", "_depth")
+
+    def __init__(
+        self,
+        mapping: dict = None,
+        on_change: typing.Callable[[], None] = None,
+        _depth: int = 0,
+    ):
+        super().__init__()
+        self._on_change = on_change
+        self._depth = _depth
+        for key, value in (mapping or {}).items():
+            dict.__setitem__(self, key, self._wrap(value))
+
+    def _wrap(self, value):
+        if self._depth < 2 and isinstance(value, dict):
+            return CallbackRegistry(value, self._on_change, self._depth + 1)
+        return value
+
+    def _changed(self):
+        if self._on_change is not None:
+            self._on_change()
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, self._wrap(value))
+        self._changed()
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._changed()
+
+    def pop(self, *args):
+        _value = dict.pop(self, *args)
+        self._changed()
+        return _value
+
+    def popitem(self):
+        _item = dict.popitem(self)
+        self._changed()
+        return _item
+
+    def clear(self):
+        dict.clear(self)
+        self._changed()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            dict.__setitem__(self, key, self._wrap(value))
+        self._changed()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __reduce__(self):
+        # copies and pickles are plain dicts, they are not tied to a Dispike instance.
+        return dict, (dict(self),)
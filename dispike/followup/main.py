@@ -25,12 +25,22 @@ class FollowUpMessages(object):
         self._application_id = bot._application_id
         self._interaction_token = interaction.token
 
-        self.base_url = f"https://discord.com/api/v8/webhooks/{self._application_id}/{self._interaction_token}"
-        self._async_client = httpx.AsyncClient(base_url=self.base_url)
-        self._sync_client = httpx.Client(base_url=self.base_url)
+        self.base_url = f"{bot.api_base_url}/webhooks/{self._application_id}/{self._interaction_token}"
+        # connections are borrowed from the bot's pool, nothing to close per followup.
+        self._http_pool = bot.http_pool
 
         self._message_id = None
 
+    @property
+    def _async_client(self) -> httpx.AsyncClient:
+        """The pooled async client used for this followup's webhook host."""
+        return self._http_pool.get_async_client(self.base_url)
+
+    @property
+    def _sync_client(self) -> httpx.Client:
+        """The pooled sync client used for this followup's webhook host."""
+        return self._http_pool.get_sync_client(self.base_url)
+
     @logger.catch(reraise=True)
     def create_follow_up_message(self, message: DiscordResponse):
         """Create an initial follow up message. (Sync)
@@ -52,7 +62,9 @@ class FollowUpMessages(object):
         if self._message_id is not None:
             raise TypeError("Creating a followup message can only be done once.")
         try:
-            _request = self._sync_client.post(url=self.base_url, json=message.response)
+            _request = self._http_pool.sync_request(
+                "POST", self.base_url, json=message.response
+            )
             logger.info("sent request for creation of follow up to discord..")
             if _request.status_code in [200, 201]:
                 _parse_request = _request.json()
@@ -87,8 +99,8 @@ class FollowUpMessages(object):
         if self._message_id is not None:
             raise TypeError("Creating a followup message can only be done once.")
         try:
-            _request = await self._async_client.post(
-                url=self.base_url, json=message.response
+            _request = await self._http_pool.request(
+                "POST", self.base_url, json=message.response
             )
             logger.info("sent request for creation of follow up to discord..")
             if _request.status_code in [200, 201]:
@@ -120,8 +132,10 @@ class FollowUpMessages(object):
         if self._message_id is None:
             raise TypeError("a followup message must be sent first!")
         try:
-            _request = self._sync_client.patch(
-                f"/messages/{self._message_id}", json=updated_message.response
+            _request = self._http_pool.sync_request(
+                "PATCH",
+                f"{self.base_url}/messages/{self._message_id}",
+                json=updated_message.response,
             )
             logger.info(
                 f"sent request for edit of follow up to discord [{self._message_id}].."
@@ -152,8 +166,10 @@ class FollowUpMessages(object):
         if self._message_id is None:
             raise TypeError("a followup message must be sent first!")
         try:
-            _request = await self._async_client.patch(
-                f"/messages/{self._message_id}", json=updated_message.response
+            _request = await self._http_pool.request(
+                "PATCH",
+                f"{self.base_url}/messages/{self._message_id}",
+                json=updated_message.response,
             )
             logger.info(
                 f"sent request for edit of follow up to discord [{self._message_id}].."
@@ -181,7 +197,9 @@ class FollowUpMessages(object):
         if self._message_id is None:
             raise TypeError("a followup message must be sent first.")
         try:
-            _request = self._sync_client.delete(f"/messages/{self._message_id}")
+            _request = self._http_pool.sync_request(
+                "DELETE", f"{self.base_url}/messages/{self._message_id}"
+            )
             logger.info(
                 f"sent request for deletion of follow up to discord [{self._message_id}].."
             )
@@ -207,7 +225,9 @@ class FollowUpMessages(object):
         if self._message_id is None:
             raise TypeError("a followup message must be sent first.")
         try:
-            _request = await self._async_client.delete(f"/messages/{self._message_id}")
+            _request = await self._http_pool.request(
+                "DELETE", f"{self.base_url}/messages/{self._message_id}"
+            )
             logger.info(
                 f"sent request for deletion of follow up to discord [{self._message_id}].."
             )
@@ -0,0 +1,94 @@
+from collections import OrderedDict
+import time
+import typing
+
+
+_MISSING = object()
+
+
+class TTLCache(object):
+    """A small LRU cache where every entry also expires after ``ttl`` seconds.
+
+    Not thread-safe, it is meant to be used from a single event loop.
+
+    Attributes:
+        hits (int): Number of lookups that returned a live entry.
+        misses (int): Number of lookups that found nothing (or an expired entry).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 60.0,
+        timer: typing.Callable[[], float] = time.monotonic,
+    ):
+        """Initialize a cache.
+
+        Args:
+            maxsize (int, optional): Maximum number of entries before the least recently used one is evicted.
+            ttl (float, optional): Seconds an entry stays valid for.
+            timer (typing.Callable[[], float], optional): Clock used for expiry, mainly for testing.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._entries = OrderedDict()  # type: OrderedDict[typing.Hashable, typing.Tuple[float, typing.Any]]
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: typing.Hashable, default: typing.Any = None) -> typing.Any:
+        """Return the value for key if it exists and has not expired."""
+        _entry = self._entries.get(key, _MISSING)
+        if _entry is _MISSING:
+            self.misses += 1
+            return default
+        _expires_at, _value = _entry
+        if _expires_at <= self._timer():
+            del self._entries[key]
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return _value
+
+    def set(self, key: typing.Hashable, value: typing.Any, ttl: float = None):
+        """Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key (typing.Hashable): Key
+            value (typing.Any): Value
+            ttl (float, optional): Override the cache wide ttl for this entry.
+        """
+        self._entries[key] = (self._timer() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: typing.Hashable, default: typing.Any = None) -> typing.Any:
+        """Remove key and return its value (expired or not)."""
+        _entry = self._entries.pop(key, _MISSING)
+        if _entry is _MISSING:
+            return default
+        return _entry[1]
+
+    def invalidate(self, predicate: typing.Callable[[typing.Hashable], bool] = None):
+        """Remove every entry, or only the entries whose key matches ``predicate``."""
+        if predicate is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if predicate(key)]:
+            del self._entries[key]
+
+    def __contains__(self, key: typing.Hashable) -> bool:
+        _entry = self._entries.get(key, _MISSING)
+        return _entry is not _MISSING and _entry[0] > self._timer()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current size."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
@@ -0,0 +1,163 @@
+import time
+import typing
+
+from .cache import TTLCache
+
+if typing.TYPE_CHECKING:
+    from ..incoming import IncomingApplicationCommand  # pragma: no cover
+    from ..creating.models.permissions import (  # pragma: no cover
+        GuildApplicationCommandPermissions,
+    )
+
+
+MISSING = object()
+GLOBAL_SCOPE = "global"
+
+
+def _scope(guild_id) -> str:
+    return GLOBAL_SCOPE if guild_id is None else str(guild_id)
+
+
+def _permissions_key(guild_id, command_id=None) -> tuple:
+    if command_id is None:
+        return ("permissions", str(guild_id))
+    return ("permission", str(guild_id), str(command_id))
+
+
+class CommandCache(object):
+    """Caches command and command permission lookups made through Dispike.
+
+    Commands are cached per scope (global or one guild) together with a name to id
+    index. Entries expire after ``ttl`` seconds and the least recently used entries are
+    evicted past ``maxsize``. Dispike invalidates the affected entries whenever it
+    registers, edits or deletes commands or sets permissions, so only changes made
+    elsewhere (another process, the Discord client) can be up to ``ttl`` seconds stale.
+
+    Lookups return ``MISSING`` when nothing is cached, since None is a valid cached value.
+
+    A lookup that started before an invalidation may finish after it and would write the
+    old value back for a full ``ttl``. To avoid that, read ``commands_generation`` or
+    ``permissions_generation`` before the request and pass it to the matching setter,
+    which drops the write if an invalidation touched the entry in between.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl: float = 60.0,
+        timer: typing.Callable[[], float] = time.monotonic,
+    ):
+        """Initialize a command cache.
+
+        Args:
+            maxsize (int, optional): Entries (command lists and permission lookups) kept at most.
+            ttl (float, optional): Seconds an entry stays valid for.
+            timer (typing.Callable[[], float], optional): Clock used for expiry, mainly for testing.
+        """
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, timer=timer)
+        # invalidation counters, per entry key and per guild; _epoch covers everything.
+        self._generations = {}
+        self._epoch = 0
+
+    def _bump(self, key):
+        self._generations[key] = self._generations.get(key, 0) + 1
+
+    def commands_generation(self, guild_id=None) -> tuple:
+        """Generation of the commands of a scope, read before fetching them."""
+        return (self._epoch, self._generations.get(("commands", _scope(guild_id)), 0))
+
+    def permissions_generation(self, guild_id, command_id=None) -> tuple:
+        """Generation of a permission lookup, read before fetching it."""
+        return (
+            self._epoch,
+            self._generations.get(("guild", str(guild_id)), 0),
+            self._generations.get(_permissions_key(guild_id, command_id), 0),
+        )
+
+    def get_commands(self, guild_id=None) -> typing.Union[typing.List["IncomingApplicationCommand"], object]:
+        """Cached commands of a guild (or global commands if guild_id is None), or MISSING."""
+        _entry = self._cache.get(("commands", _scope(guild_id)), MISSING)
+        if _entry is MISSING:
+            return MISSING
+        return list(_entry[0])
+
+    def set_commands(
+        self, commands: typing.List["IncomingApplicationCommand"], guild_id=None, generation: tuple = None
+    ):
+        """Cache the commands of a scope, unless they were invalidated since ``generation`` was read."""
+        if generation is not None and generation != self.commands_generation(guild_id):
+            return
+        self._cache.set(
+            ("commands", _scope(guild_id)),
+            (list(commands), {command.name: command.id for command in commands}),
+        )
+
+    def command_id(self, name: str, guild_id=None) -> typing.Union[int, None, object]:
+        """Id of a command by name from the cached commands.
+
+        Returns:
+            Union[int, None, object]: The id, None if the cached commands have no such command, or MISSING if the commands are not cached.
+        """
+        _entry = self._cache.get(("commands", _scope(guild_id)), MISSING)
+        if _entry is MISSING:
+            return MISSING
+        return _entry[1].get(name)
+
+    def get_permissions(self, guild_id, command_id=None) -> typing.Any:
+        """Cached permissions of one command, or of all commands if command_id is None, or MISSING."""
+        return self._cache.get(_permissions_key(guild_id, command_id), MISSING)
+
+    def set_permissions(
+        self,
+        permissions: typing.Union[
+            None, "GuildApplicationCommandPermissions", typing.List["GuildApplicationCommandPermissions"]
+        ],
+        guild_id,
+        command_id=None,
+        generation: tuple = None,
+    ):
+        """Cache a permission lookup, unless it was invalidated since ``generation`` was read."""
+        if generation is not None and generation != self.permissions_generation(guild_id, command_id):
+            return
+        self._cache.set(_permissions_key(guild_id, command_id), permissions)
+
+    def invalidate_commands(self, guild_id=None):
+        """Forget the commands of a scope, and the permissions that may belong to them."""
+        _scope_name = _scope(guild_id)
+        self._cache.pop(("commands", _scope_name))
+        self._bump(("commands", _scope_name))
+        if _scope_name == GLOBAL_SCOPE:
+            # global commands have permissions in every guild.
+            self._epoch += 1
+            self._cache.invalidate(lambda key: key[0] != "commands")
+        else:
+            self.invalidate_permissions(guild_id)
+
+    def invalidate_permissions(self, guild_id, command_id=None):
+        """Forget permissions of one command in a guild, or of every command if command_id is None."""
+        _guild_id = str(guild_id)
+        self._cache.pop(_permissions_key(_guild_id))
+        self._bump(_permissions_key(_guild_id))
+        if command_id is not None:
+            self._cache.pop(_permissions_key(_guild_id, command_id))
+            self._bump(_permissions_key(_guild_id, command_id))
+        else:
+            self._cache.invalidate(lambda key: key[0] == "permission" and key[1] == _guild_id)
+            self._bump(("guild", _guild_id))
+
+    def clear(self):
+        self._epoch += 1
+        self._cache.invalidate()
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    @property
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current size."""
+        return self._cache.stats
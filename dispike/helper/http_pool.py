@@ -0,0 +1,235 @@
+import asyncio
+import typing
+
+import httpx
+
+from .logging_control import get_subsystem_logger, LoggingSubsystems
+from ..rest.ratelimit import RateLimiter, install_rate_limiter
+from ..rest.retry import RetryPolicy, install_retry_policy
+from ..rest.metrics import install_metrics
+from ..rest.tracing import install_tracing
+
+if typing.TYPE_CHECKING:
+    from .metrics import Metrics
+    from .tracing import Tracer
+
+
+_log = get_subsystem_logger(LoggingSubsystems.NETWORK)
+
+
+def _origin(url: typing.Union[str, httpx.URL]) -> tuple:
+    _url = httpx.URL(url)
+    return _url.scheme, _url.host, _url.port
+
+
+def _running_loop() -> typing.Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except AttributeError:
+        # Python 3.6, returns None outside of a running loop as well.
+        return asyncio._get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _as_async_hook(hook: typing.Callable) -> typing.Callable:
+    """``httpx.AsyncClient`` awaits its event hooks, wrap plain functions."""
+    if asyncio.iscoroutinefunction(hook):
+        return hook
+
+    async def _hook(value):
+        hook(value)
+
+    return _hook
+
+
+class HTTPClientPool(object):
+    """Keep-alive httpx clients shared by a Dispike instance, one per host.
+
+    Clients are created on first use and reused for every later request to the same
+    host, so connections (and TLS sessions) are kept alive between calls. An async
+    client belongs to the event loop it was created on; if it is used from a different
+    loop (for example a script calling ``asyncio.run`` twice) a fresh client is created,
+    and the replaced one is closed on its own loop: right away if that loop is running in
+    another thread, otherwise when ``aclose`` is awaited on it.
+    Sync clients (``httpx.Client``) are pooled the same way for the sync methods.
+
+    Attributes:
+        limits (httpx.Limits): Connection pool limits for every client.
+        timeout (httpx.Timeout): Timeouts for every client.
+    """
+
+    def __init__(
+        self,
+        limits: httpx.Limits = None,
+        timeout: typing.Union[float, httpx.Timeout] = 10.0,
+        event_hooks: typing.Dict[str, typing.List[typing.Callable]] = None,
+        rate_limiter: RateLimiter = None,
+        retry_policy: RetryPolicy = None,
+        metrics: "Metrics" = None,
+        tracer: "Tracer" = None,
+    ):
+        """Initialize a pool.
+
+        Args:
+            limits (httpx.Limits, optional): Connection limits per host. Defaults to 100 connections, 20 kept alive.
+            timeout (Union[float, httpx.Timeout], optional): Request timeout in seconds.
+            event_hooks (dict, optional): httpx event hooks added to every client. Plain functions are wrapped for the async clients.
+            rate_limiter (RateLimiter, optional): Rate limiter every client sends through.
+            retry_policy (RetryPolicy, optional): Retry policy for failed requests of every client.
+            metrics (Metrics, optional): Metrics to record the latency of every request to.
+            tracer (Tracer, optional): Tracer to record every request as a span with.
+        """
+        self.limits = limits or httpx.Limits(
+            max_connections=100, max_keepalive_connections=20
+        )
+        self.timeout = timeout if isinstance(timeout, httpx.Timeout) else httpx.Timeout(timeout)
+        self._event_hooks = event_hooks or {}
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.metrics = metrics
+        self.tracer = tracer
+        self._async_clients = (
+            {}
+        )  # type: typing.Dict[tuple, typing.Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]]
+        self._sync_clients = {}  # type: typing.Dict[tuple, httpx.Client]
+        # clients replaced while their (idle) loop could not close them.
+        self._retired_async_clients = (
+            []
+        )  # type: typing.List[typing.Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]]
+        self.created = 0
+
+    def _create_async_client(self) -> httpx.AsyncClient:
+        self.created += 1
+        return self._install_transports(
+            httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                event_hooks={
+                    key: [_as_async_hook(hook) for hook in hooks]
+                    for key, hooks in self._event_hooks.items()
+                },
+            )
+        )
+
+    def _install_transports(self, client):
+        if self.metrics is not None:
+            install_metrics(client, self.metrics)
+        if self.rate_limiter is not None:
+            install_rate_limiter(client, self.rate_limiter)
+        if self.retry_policy is not None:
+            install_retry_policy(client, self.retry_policy)
+        if self.tracer is not None:
+            install_tracing(client, self.tracer)
+        return client
+
+    def get_sync_client(self, url: typing.Union[str, httpx.URL]) -> httpx.Client:
+        """Return the pooled sync client for the host of ``url``, creating it if needed.
+
+        Args:
+            url (Union[str, httpx.URL]): Any URL on the host.
+
+        Returns:
+            httpx.Client: The pooled client.
+        """
+        _key = _origin(url)
+        _client = self._sync_clients.get(_key)
+        if _client is None or _client.is_closed:
+            self.created += 1
+            _client = self._sync_clients[_key] = self._install_transports(
+                httpx.Client(
+                    limits=self.limits,
+                    timeout=self.timeout,
+                    event_hooks={
+                        key: list(hooks) for key, hooks in self._event_hooks.items()
+                    },
+                )
+            )
+        return _client
+
+    def get_async_client(self, url: typing.Union[str, httpx.URL]) -> httpx.AsyncClient:
+        """Return the pooled client for the host of ``url``, creating it if needed.
+
+        Args:
+            url (Union[str, httpx.URL]): Any URL on the host.
+
+        Returns:
+            httpx.AsyncClient: The pooled client.
+        """
+        _key = _origin(url)
+        _loop = _running_loop()
+        _entry = self._async_clients.get(_key)
+        if _entry is not None and not _entry[1].is_closed:
+            if _entry[0] is _loop or _loop is None:
+                return _entry[1]
+            if _entry[0] is None:
+                # created outside of a loop, it belongs to the first loop that uses it.
+                self._async_clients[_key] = (_loop, _entry[1])
+                return _entry[1]
+
+        if _entry is not None:
+            _log.debug("replacing pooled client for {} from another event loop", _key[1])
+            self._retire(*_entry)
+        _client = self._create_async_client()
+        self._async_clients[_key] = (_loop, _client)
+        return _client
+
+    def _retire(self, loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient):
+        """Close a client of another event loop on that loop, or keep it until it can be."""
+        if client.is_closed:
+            return
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        elif not loop.is_closed():
+            self._retired_async_clients.append((loop, client))
+        else:
+            # its connections went down with the loop, there is nothing left to close.
+            _log.debug("dropping pooled client of a closed event loop")
+
+    async def request(
+        self, method: str, url: typing.Union[str, httpx.URL], **kwargs
+    ) -> httpx.Response:
+        """Send a request through the pooled client for the url's host.
+
+        Takes the same keyword arguments as ``httpx.AsyncClient.request``.
+        """
+        return await self.get_async_client(url).request(method, url, **kwargs)
+
+    def sync_request(
+        self, method: str, url: typing.Union[str, httpx.URL], **kwargs
+    ) -> httpx.Response:
+        """Send a request through the pooled sync client for the url's host.
+
+        Takes the same keyword arguments as ``httpx.Client.request``.
+        """
+        return self.get_sync_client(url).request(method, url, **kwargs)
+
+    async def open(self, *urls: str):
+        """Create the clients for ``urls`` up front, usually on application startup."""
+        for url in urls:
+            self.get_async_client(url)
+
+    def close(self):
+        """Close the sync clients."""
+        _clients, self._sync_clients = self._sync_clients, {}
+        for _client in _clients.values():
+            _client.close()
+
+    async def aclose(self):
+        """Close every client, usually on application shutdown.
+
+        Async clients of another event loop are closed on that loop if it is running,
+        kept until ``aclose`` is awaited on it if it is idle, and dropped if it is closed.
+        """
+        self.close()
+        _loop = _running_loop()
+        _clients, self._async_clients = self._async_clients, {}
+        _retired, self._retired_async_clients = self._retired_async_clients, []
+        for _client_loop, _client in list(_clients.values()) + _retired:
+            if _client_loop is _loop or _client_loop is None:
+                await _client.aclose()
+            else:
+                self._retire(_client_loop, _client)
+
+    def __len__(self) -> int:
+        return len(self._async_clients) + len(self._sync_clients)
@@ -0,0 +1,100 @@
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+import json
+import typing
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _fallback_default(obj: typing.Any) -> typing.Any:
+    """Called by the backends for objects they cannot serialize natively (pydantic models etc.)"""
+    return jsonable_encoder(obj)
+
+
+class JSONBackend(object):
+    """Base class for JSON backends used on the ``/interactions`` endpoint.
+
+    Backends parse raw request bytes directly and encode straight to bytes.
+    """
+
+    name = "base"
+
+    def loads(self, data: typing.Union[bytes, str]) -> typing.Any:
+        raise NotImplementedError  # pragma: no cover
+
+    def dumps(self, obj: typing.Any) -> bytes:
+        raise NotImplementedError  # pragma: no cover
+
+
+class StdlibJSONBackend(JSONBackend):
+    """The standard library ``json`` module."""
+
+    name = "json"
+
+    def loads(self, data: typing.Union[bytes, str]) -> typing.Any:
+        return json.loads(data)
+
+    def dumps(self, obj: typing.Any) -> bytes:
+        return json.dumps(
+            obj, ensure_ascii=False, separators=(",", ":"), default=_fallback_default
+        ).encode("utf-8")
+
+
+class OrjsonJSONBackend(JSONBackend):
+    """``orjson``, used by default when it is installed."""
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError(
+                "orjson is not installed. Install it with `pip install orjson` or use the json backend."
+            )
+
+    def loads(self, data: typing.Union[bytes, str]) -> typing.Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: typing.Any) -> bytes:
+        return orjson.dumps(obj, default=_fallback_default)
+
+
+_BACKENDS = {
+    StdlibJSONBackend.name: StdlibJSONBackend,
+    OrjsonJSONBackend.name: OrjsonJSONBackend,
+}
+
+
+def resolve_json_backend(
+    backend: typing.Union[str, JSONBackend, None] = None
+) -> JSONBackend:
+    """Return a JSON backend.
+
+    Args:
+        backend (Union[str, JSONBackend, None], optional): "orjson", "json", a JSONBackend instance, or None to pick orjson if it's installed.
+
+    Raises:
+        ValueError: Unknown backend name.
+        ImportError: orjson was requested but is not installed.
+
+    Returns:
+        JSONBackend: The backend.
+    """
+    if backend is None:
+        return OrjsonJSONBackend() if orjson is not None else StdlibJSONBackend()
+    if isinstance(backend, JSONBackend):
+        return backend
+    if backend not in _BACKENDS:
+        raise ValueError(
+            f"Unknown JSON backend {backend!r}, expected one of {list(_BACKENDS)}"
+        )
+    return _BACKENDS[backend]()
+
+
+class PreEncodedJSONResponse(Response):
+    """A JSON response whose body has already been encoded to bytes,
+    skipping ``jsonable_encoder`` and the default ``JSONResponse`` rendering."""
+
+    media_type = "application/json"
@@ -0,0 +1,161 @@
+from loguru import logger
+from enum import Enum
+import typing
+
+
+class LoggingSubsystems(str, Enum):
+    """Parts of dispike whose hot-path logging can be tuned separately.
+
+    Attributes:
+        SERVER: The ``/interactions`` endpoint and dispatch.
+        VERIFICATION: The request verification middleware.
+        NETWORK: Outgoing requests to Discord (httpx event hooks).
+    """
+
+    SERVER = "server"
+    VERIFICATION = "verification"
+    NETWORK = "network"
+
+
+_LEVEL_NUMBERS = {
+    "TRACE": 5,
+    "DEBUG": 10,
+    "INFO": 20,
+    "NETWORK": 20,
+    "SUCCESS": 25,
+    "WARNING": 30,
+    "ERROR": 40,
+    "CRITICAL": 50,
+    "OFF": float("inf"),
+}
+
+
+def _level_number(level: typing.Union[str, int]) -> float:
+    if isinstance(level, int):
+        return level
+    try:
+        return _LEVEL_NUMBERS[level.upper()]
+    except KeyError:
+        raise ValueError(
+            f"Unknown log level {level!r}, expected one of {list(_LEVEL_NUMBERS)}"
+        )
+
+
+class SubsystemLogger(object):
+    """A cheap level gate in front of loguru for one subsystem.
+
+    When a message is below the subsystem's level, the call returns after a single
+    comparison, before loguru is touched. Messages use loguru's brace formatting
+    (``log.info("event: {}", name)``), so arguments are only formatted if emitted.
+
+    Records carry ``subsystem`` in their ``extra`` dict.
+    """
+
+    __slots__ = ("subsystem", "min_level_no", "body_sample_rate", "_body_counter", "_logger")
+
+    def __init__(self, subsystem: str, level: typing.Union[str, int] = "TRACE"):
+        self.subsystem = subsystem
+        self.min_level_no = _level_number(level)
+        self.body_sample_rate = 1
+        self._body_counter = 0
+        self._logger = logger.bind(subsystem=subsystem)
+
+    def is_enabled(self, level: typing.Union[str, int]) -> bool:
+        """Returns whether a message at ``level`` would be passed on to loguru."""
+        return _level_number(level) >= self.min_level_no
+
+    def log(self, level: str, message: str, *args, **kwargs):
+        if _LEVEL_NUMBERS.get(level, 0) < self.min_level_no:
+            return
+        self._logger.opt(depth=1).log(level, message, *args, **kwargs)
+
+    def trace(self, message: str, *args, **kwargs):
+        if 5 < self.min_level_no:
+            return
+        self._logger.opt(depth=1).trace(message, *args, **kwargs)
+
+    def debug(self, message: str, *args, **kwargs):
+        if 10 < self.min_level_no:
+            return
+        self._logger.opt(depth=1).debug(message, *args, **kwargs)
+
+    def info(self, message: str, *args, **kwargs):
+        if 20 < self.min_level_no:
+            return
+        self._logger.opt(depth=1).info(message, *args, **kwargs)
+
+    def warning(self, message: str, *args, **kwargs):
+        if 30 < self.min_level_no:
+            return
+        self._logger.opt(depth=1).warning(message, *args, **kwargs)
+
+    def error(self, message: str, *args, **kwargs):
+        if 40 < self.min_level_no:
+            return
+        self._logger.opt(depth=1).error(message, *args, **kwargs)
+
+    def exception(self, message: str, *args, exc_info: BaseException = None, **kwargs):
+        """Log an error with the traceback of ``exc_info``, or of the exception being handled."""
+        if 40 < self.min_level_no:
+            return
+        self._logger.opt(depth=1, exception=exc_info or True).error(message, *args, **kwargs)
+
+    def should_sample_body(self) -> bool:
+        """Returns True for 1 in every ``body_sample_rate`` calls (0 disables body logging)."""
+        if not self.body_sample_rate:
+            return False
+        self._body_counter += 1
+        if self._body_counter >= self.body_sample_rate:
+            self._body_counter = 0
+            return True
+        return False
+
+    def body(self, message: str, body: typing.Any, level: str = "INFO"):
+        """Log a request/response body, subject to the level and body sampling."""
+        if _LEVEL_NUMBERS.get(level, 0) < self.min_level_no or not self.should_sample_body():
+            return
+        self._logger.opt(depth=1).log(level, message, body)
+
+
+_subsystem_loggers = {
+    subsystem.value: SubsystemLogger(subsystem.value)
+    for subsystem in LoggingSubsystems
+}
+
+
+def get_subsystem_logger(
+    subsystem: typing.Union[LoggingSubsystems, str]
+) -> SubsystemLogger:
+    """Return the shared logger for a subsystem.
+
+    The same object is always returned, so ``configure_logging`` applies to
+    loggers that were fetched earlier.
+    """
+    if isinstance(subsystem, LoggingSubsystems):
+        subsystem = subsystem.value
+    if subsystem not in _subsystem_loggers:
+        _subsystem_loggers[subsystem] = SubsystemLogger(subsystem)
+    return _subsystem_loggers[subsystem]
+
+
+def configure_logging(
+    levels: typing.Dict[typing.Union[LoggingSubsystems, str], typing.Union[str, int]] = None,
+    body_sample_rate: int = None,
+):
+    """Configure hot-path logging.
+
+    Args:
+        levels (dict, optional): Minimum level per subsystem, e.g. ``{"server": "WARNING", "network": "OFF"}``.
+        body_sample_rate (int, optional): Log 1 in N interaction bodies. 0 disables body logging, 1 logs every body.
+
+    Example:
+        configure_logging(levels={"server": "INFO", "verification": "WARNING"}, body_sample_rate=100)
+    """
+    for subsystem, level in (levels or {}).items():
+        get_subsystem_logger(subsystem).min_level_no = _level_number(level)
+    if body_sample_rate is not None:
+        if body_sample_rate < 0:
+            raise ValueError("body_sample_rate cannot be negative.")
+        for subsystem_logger in _subsystem_loggers.values():
+            subsystem_logger.body_sample_rate = body_sample_rate
+            subsystem_logger._body_counter = 0
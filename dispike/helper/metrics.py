@@ -0,0 +1,384 @@
+import asyncio
+import bisect
+import glob
+import json
+import os
+import threading
+import typing
+
+from .logging_control import get_subsystem_logger, LoggingSubsystems
+
+if typing.TYPE_CHECKING:
+    from .task_supervisor import DeferredTaskSupervisor
+
+
+_log = get_subsystem_logger(LoggingSubsystems.SERVER)
+
+# upper bounds in seconds, from sub millisecond parsing to slow Discord requests.
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# name -> (type, help, label names)
+METRICS = {
+    "dispike_interactions_total": (
+        "counter",
+        "Interactions received, by event type and event name.",
+        ("type", "event"),
+    ),
+    "dispike_interactions_by_type_total": (
+        "counter",
+        "Interactions received, by event type.",
+        ("type",),
+    ),
+    "dispike_interaction_errors_total": (
+        "counter",
+        "Interactions whose handler raised, by event type and event name.",
+        ("type", "event"),
+    ),
+    "dispike_stage_duration_seconds": (
+        "histogram",
+        "Time spent per stage of an interaction (verification, parse, handler, serialize).",
+        ("stage",),
+    ),
+    "dispike_handler_duration_seconds": (
+        "histogram",
+        "Time until a handler produced the response, by event type and event name.",
+        ("type", "event"),
+    ),
+    "dispike_interaction_age_on_arrival_seconds": (
+        "histogram",
+        "Time from creation of an interaction by Discord (read from its id) until it arrived.",
+        (),
+    ),
+    "dispike_interaction_age_at_response_seconds": (
+        "histogram",
+        "Time from creation of an interaction by Discord until the initial response was ready.",
+        (),
+    ),
+    "dispike_verification_failures_total": (
+        "counter",
+        "Requests rejected by signature verification, by response status.",
+        ("status",),
+    ),
+    "dispike_deferred_tasks_total": (
+        "counter",
+        "Deferred tasks by outcome (submitted, completed, failed, rejected, cancelled).",
+        ("outcome",),
+    ),
+    "dispike_deferred_tasks": (
+        "gauge",
+        "Deferred tasks currently running or queued.",
+        ("state",),
+    ),
+    "dispike_http_request_duration_seconds": (
+        "histogram",
+        "Outgoing requests to Discord until the response headers arrived, by route and status.",
+        ("route", "status"),
+    ),
+}
+
+# Metric values a collector reports when the metrics are collected: (name, label values, value).
+Sample = typing.Tuple[str, typing.Tuple[str, ...], float]
+
+
+class _Histogram(object):
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets: int):
+        # one count per bucket (not cumulative), the last one is +Inf.
+        self.counts = [0] * (buckets + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class Metrics(object):
+    """Counters and latency histograms of a Dispike instance, rendered as Prometheus text.
+
+    Every metric is listed in ``METRICS``. Recording is a dictionary update under a lock,
+    so it is cheap enough for the hot path and safe from the threads the sync clients
+    run on.
+
+    When uvicorn runs several worker processes every process has its own metrics, and a
+    scrape only reaches one of them. Pass ``directory`` (or set ``DISPIKE_METRICS_DIR``)
+    to a directory shared by the workers: every process writes a snapshot of its metrics
+    to it every ``flush_interval`` seconds and on shutdown, and a scrape merges the
+    snapshots of all processes. Counters and histograms of stopped workers are kept,
+    their gauges are dropped. Empty the directory before starting the workers, or the
+    counters of earlier runs are added as well.
+
+    Attributes:
+        buckets (tuple): Upper bounds of the histogram buckets, in seconds.
+        directory (str): Snapshot directory shared by worker processes, or None.
+        flush_interval (float): Seconds between snapshots.
+        path (str): Path the metrics are served on.
+    """
+
+    def __init__(
+        self,
+        directory: str = None,
+        flush_interval: float = 5.0,
+        buckets: typing.Sequence[float] = DEFAULT_BUCKETS,
+        path: str = "/metrics",
+    ):
+        """Initialize metrics.
+
+        Args:
+            directory (str, optional): Snapshot directory shared by worker processes. Defaults to ``DISPIKE_METRICS_DIR``, unset keeps the metrics in this process only.
+            flush_interval (float, optional): Seconds between snapshots. Defaults to 5.
+            buckets (Sequence[float], optional): Upper bounds of the histogram buckets, in seconds.
+            path (str, optional): Path the metrics are served on. Defaults to "/metrics".
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.directory = directory or os.environ.get("DISPIKE_METRICS_DIR") or None
+        self.flush_interval = flush_interval
+        self.path = path
+        self._lock = threading.Lock()
+        self._counters = {}  # type: typing.Dict[typing.Tuple[str, tuple], float]
+        self._histograms = {}  # type: typing.Dict[typing.Tuple[str, tuple], _Histogram]
+        self._collectors = []  # type: typing.List[typing.Callable[[], typing.Iterable[Sample]]]
+        self._flusher = None  # type: typing.Optional[asyncio.Task]
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def inc(self, name: str, *labels: str, value: float = 1):
+        """Increase a counter.
+
+        Args:
+            name (str): Metric name, see ``METRICS``.
+            *labels (str): Label values, in the order of the metric's label names.
+            value (float, optional): Amount to add. Defaults to 1.
+        """
+        _key = (name, labels)
+        with self._lock:
+            self._counters[_key] = self._counters.get(_key, 0) + value
+
+    def observe(self, name: str, seconds: float, *labels: str):
+        """Record a duration in a histogram.
+
+        Args:
+            name (str): Metric name, see ``METRICS``.
+            seconds (float): The duration.
+            *labels (str): Label values, in the order of the metric's label names.
+        """
+        _key = (name, labels)
+        _bucket = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            _histogram = self._histograms.get(_key)
+            if _histogram is None:
+                _histogram = self._histograms[_key] = _Histogram(len(self.buckets))
+            _histogram.counts[_bucket] += 1
+            _histogram.sum += seconds
+            _histogram.count += 1
+
+    def add_collector(self, collector: typing.Callable[[], typing.Iterable[Sample]]):
+        """Add a function reporting current values whenever the metrics are collected.
+
+        Collectors report values kept elsewhere, such as the counters of the deferred
+        task supervisor. Their counters are absolute values, not increments.
+        """
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        """Return the metrics of this process as a JSON serializable dict."""
+        _counters = {}
+        _gauges = {}
+        for _collector in self._collectors:
+            for _name, _labels, _value in _collector():
+                _target = _gauges if METRICS[_name][0] == "gauge" else _counters
+                _target[(_name, tuple(_labels))] = _value
+        with self._lock:
+            _counters.update(self._counters)
+            _histograms = [
+                [name, list(labels), list(histogram.counts), histogram.sum, histogram.count]
+                for (name, labels), histogram in self._histograms.items()
+            ]
+        return {
+            "pid": os.getpid(),
+            "buckets": list(self.buckets),
+            "counters": [[name, list(labels), value] for (name, labels), value in _counters.items()],
+            "gauges": [[name, list(labels), value] for (name, labels), value in _gauges.items()],
+            "histograms": _histograms,
+        }
+
+    def _snapshot_path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"metrics-{pid}.json")
+
+    def flush(self):
+        """Write the snapshot of this process to the shared directory, if there is one."""
+        if self.directory is None:
+            return
+        _path = self._snapshot_path(os.getpid())
+        _temporary = f"{_path}.tmp"
+        with open(_temporary, "w") as snapshot_file:
+            json.dump(self.snapshot(), snapshot_file)
+        # replaced atomically, so a scrape never reads a half written snapshot.
+        os.replace(_temporary, _path)
+
+    def collect(self) -> dict:
+        """Return the metrics of every process writing to the shared directory, merged.
+
+        Without a directory, this is the snapshot of this process.
+        """
+        _snapshot = self.snapshot()
+        if self.directory is None:
+            return _snapshot
+        self.flush()
+        _snapshots = [_snapshot]
+        for _path in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+            if _path == self._snapshot_path(_snapshot["pid"]):
+                continue
+            try:
+                with open(_path) as snapshot_file:
+                    _snapshots.append(json.load(snapshot_file))
+            except (OSError, ValueError):
+                _log.warning("unable to read metrics snapshot {}, skipping it.", _path)
+        return self._merge(_snapshots)
+
+    def _merge(self, snapshots: typing.List[dict]) -> dict:
+        _counters = {}
+        _gauges = {}
+        _histograms = {}
+        for _snapshot in snapshots:
+            for _name, _labels, _value in _snapshot["counters"]:
+                _key = (_name, tuple(_labels))
+                _counters[_key] = _counters.get(_key, 0) + _value
+            if _snapshot["pid"] == os.getpid() or _is_alive(_snapshot["pid"]):
+                for _name, _labels, _value in _snapshot["gauges"]:
+                    _key = (_name, tuple(_labels))
+                    _gauges[_key] = _gauges.get(_key, 0) + _value
+            if _snapshot["buckets"] != list(self.buckets):
+                _log.warning("metrics of process {} use other buckets, skipping its histograms.", _snapshot["pid"])
+                continue
+            for _name, _labels, _counts, _sum, _count in _snapshot["histograms"]:
+                _key = (_name, tuple(_labels))
+                _merged = _histograms.get(_key)
+                if _merged is None:
+                    _histograms[_key] = [list(_counts), _sum, _count]
+                else:
+                    _merged[0] = [left + right for left, right in zip(_merged[0], _counts)]
+                    _merged[1] += _sum
+                    _merged[2] += _count
+        return {
+            "pid": os.getpid(),
+            "buckets": list(self.buckets),
+            "counters": [[name, list(labels), value] for (name, labels), value in _counters.items()],
+            "gauges": [[name, list(labels), value] for (name, labels), value in _gauges.items()],
+            "histograms": [
+                [name, list(labels), counts, total, count]
+                for (name, labels), (counts, total, count) in _histograms.items()
+            ],
+        }
+
+    def render(self) -> str:
+        """Return the collected metrics in the Prometheus text exposition format."""
+        _collected = self.collect()
+        _lines = {name: [] for name in METRICS}  # type: typing.Dict[str, typing.List[str]]
+        for _name, _labels, _value in sorted(_collected["counters"] + _collected["gauges"]):
+            _lines[_name].append(f"{_name}{_format_labels(_name, _labels)} {_format_value(_value)}")
+        _bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for _name, _labels, _counts, _sum, _count in sorted(_collected["histograms"]):
+            _cumulative = 0
+            for _bound, _bucket_count in zip(_bounds, _counts):
+                _cumulative += _bucket_count
+                _lines[_name].append(
+                    f"{_name}_bucket{_format_labels(_name, _labels, le=_bound)} {_cumulative}"
+                )
+            _lines[_name].append(f"{_name}_sum{_format_labels(_name, _labels)} {_format_value(_sum)}")
+            _lines[_name].append(f"{_name}_count{_format_labels(_name, _labels)} {_count}")
+
+        _output = []
+        for _name, (_type, _help, _) in METRICS.items():
+            if not _lines[_name]:
+                continue
+            _output.append(f"# HELP {_name} {_help}")
+            _output.append(f"# TYPE {_name} {_type}")
+            _output.extend(_lines[_name])
+        return "\n".join(_output) + "\n"
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError:
+                _log.exception("unable to write metrics snapshot.")
+
+    async def start(self):
+        """Start writing snapshots every ``flush_interval`` seconds, usually on application startup."""
+        if self.directory is not None and self._flusher is None:
+            self._flusher = asyncio.ensure_future(self._flush_periodically())
+
+    async def stop(self):
+        """Stop the periodic snapshots and write a last one, usually on application shutdown."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        self.flush()
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(name: str, values: typing.Sequence[str], le: str = None) -> str:
+    _pairs = [f'{label}="{_escape(str(value))}"' for label, value in zip(METRICS[name][2], values)]
+    if le is not None:
+        _pairs.append(f'le="{le}"')
+    return "{" + ",".join(_pairs) + "}" if _pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def deferred_task_collector(
+    supervisor: "DeferredTaskSupervisor",
+) -> typing.Callable[[], typing.List[Sample]]:
+    """Return a collector reporting the counters of a deferred task supervisor."""
+
+    def _collect() -> typing.List[Sample]:
+        _stats = supervisor.stats
+        return [
+            ("dispike_deferred_tasks", ("running",), _stats["running"]),
+            ("dispike_deferred_tasks", ("queued",), _stats["queued"]),
+        ] + [
+            ("dispike_deferred_tasks_total", (outcome,), _stats[outcome])
+            for outcome in ("submitted", "completed", "failed", "rejected", "cancelled")
+        ]
+
+    return _collect
+
+
+def resolve_metrics(metrics: typing.Union[bool, Metrics, None], **kwargs) -> typing.Optional[Metrics]:
+    """Return Metrics for ``True`` (created with ``kwargs``), the metrics themselves, or None."""
+    if metrics is None or metrics is False:
+        return None
+    if isinstance(metrics, Metrics):
+        return metrics
+    return Metrics(**kwargs)
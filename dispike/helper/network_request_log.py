@@ -1,17 +1,33 @@
 from loguru import logger
 import httpx
 
+from .logging_control import get_subsystem_logger, LoggingSubsystems
+
+_log = get_subsystem_logger(LoggingSubsystems.NETWORK)
+
 
 def dispike_httpx_event_hook_outgoing_request(request: httpx.Request):
-    logger.opt(colors=True).log(
+    if not _log.is_enabled("NETWORK"):
+        return
+    logger.opt(colors=True).bind(subsystem=_log.subsystem).log(
         "NETWORK",
-        f"Outgoing request <yellow>[{request.method}]</yellow> <white>{request.url}</white>: headers: <white>{request.headers}</white>",
+        "Outgoing request <yellow>[{}]</yellow> <white>{}</white>: headers: <white>{}</white>",
+        request.method,
+        request.url,
+        request.headers,
     )
 
 
 def dispike_httpx_event_hook_incoming_request(response: httpx.Response):
+    if not _log.is_enabled("NETWORK"):
+        return
     request = response.request  # type: httpx.Request
-    logger.opt(colors=True).log(
+    logger.opt(colors=True).bind(subsystem=_log.subsystem).log(
         "NETWORK",
-        f"Incoming request: <yellow>[{request.method}:{response.status_code}]</yellow> url: <white>{request.url}</white>: headers: <white>{request.headers}</white> ",
+        "Incoming request: <yellow>[{}:{}]</yellow> url: <white>{}</white>: headers: <white>{}</white> ",
+        request.method,
+        response.status_code,
+        request.url,
+        request.headers,
     )
+
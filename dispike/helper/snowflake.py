@@ -0,0 +1,119 @@
+import datetime
+import time
+import typing
+
+
+# milliseconds since the unix epoch of the first second of 2015, where snowflake time starts.
+DISCORD_EPOCH = 1420070400000
+
+# seconds Discord waits for the initial response to an interaction.
+INITIAL_RESPONSE_WINDOW = 3.0
+
+
+def snowflake_time(snowflake: typing.Union[int, str]) -> float:
+    """Return the unix timestamp (in seconds) a snowflake was created at.
+
+    Args:
+        snowflake (Union[int, str]): A Discord id.
+
+    Returns:
+        float: Seconds since the unix epoch, with millisecond precision.
+    """
+    return ((int(snowflake) >> 22) + DISCORD_EPOCH) / 1000
+
+
+def snowflake_datetime(snowflake: typing.Union[int, str]) -> datetime.datetime:
+    """Return the time a snowflake was created at, as an aware UTC datetime."""
+    return datetime.datetime.fromtimestamp(snowflake_time(snowflake), tz=datetime.timezone.utc)
+
+
+def time_snowflake(timestamp: float, high: bool = False) -> int:
+    """Return the lowest (or highest) snowflake that could have been created at ``timestamp``.
+
+    Useful to compare ids against a point in time, e.g. ``message.id > time_snowflake(yesterday)``.
+
+    Args:
+        timestamp (float): Seconds since the unix epoch.
+        high (bool, optional): Return the highest snowflake of that millisecond instead.
+
+    Returns:
+        int: The snowflake.
+    """
+    _milliseconds = int(timestamp * 1000) - DISCORD_EPOCH
+    return (_milliseconds << 22) + ((1 << 22) - 1 if high else 0)
+
+
+def deconstruct_snowflake(snowflake: typing.Union[int, str]) -> dict:
+    """Split a snowflake into the parts it is made of.
+
+    Returns:
+        dict: ``timestamp`` (seconds since the unix epoch), ``worker_id``, ``process_id`` and ``increment``.
+    """
+    _snowflake = int(snowflake)
+    return {
+        "timestamp": snowflake_time(_snowflake),
+        "worker_id": (_snowflake & 0x3E0000) >> 17,
+        "process_id": (_snowflake & 0x1F000) >> 12,
+        "increment": _snowflake & 0xFFF,
+    }
+
+
+class InteractionTiming(object):
+    """When an interaction was created by Discord and when it reached Dispike.
+
+    Creation time comes from the interaction id, arrival from the local clock when the
+    request came in. The difference (``age_on_arrival``) is the time spent between
+    Discord and us, so it also includes any clock skew between the two. The time since
+    arrival is measured with a monotonic clock.
+
+    Attributes:
+        created_at (float): Unix timestamp the interaction was created at.
+        received_at (float): Unix timestamp the request arrived at.
+    """
+
+    __slots__ = ("created_at", "received_at", "_received_monotonic")
+
+    def __init__(
+        self,
+        interaction_id: typing.Union[int, str],
+        received_at: float = None,
+        received_monotonic: float = None,
+    ):
+        """Initialize the timing of an interaction.
+
+        Args:
+            interaction_id (Union[int, str]): Id (snowflake) of the interaction.
+            received_at (float, optional): ``time.time()`` value it arrived at. Defaults to now.
+            received_monotonic (float, optional): ``time.monotonic()`` value it arrived at. Defaults to now.
+        """
+        self.created_at = snowflake_time(interaction_id)
+        self.received_at = time.time() if received_at is None else received_at
+        self._received_monotonic = (
+            time.monotonic() if received_monotonic is None else received_monotonic
+        )
+
+    @property
+    def age_on_arrival(self) -> float:
+        """Seconds from creation by Discord until the request arrived. Negative if our clock is behind."""
+        return self.received_at - self.created_at
+
+    @property
+    def since_arrival(self) -> float:
+        """Seconds since the request arrived."""
+        return time.monotonic() - self._received_monotonic
+
+    @property
+    def age(self) -> float:
+        """Seconds since Discord created the interaction."""
+        return max(0.0, self.age_on_arrival) + self.since_arrival
+
+    def remaining_budget(self, window: float = INITIAL_RESPONSE_WINDOW) -> float:
+        """Seconds left to send the initial response, never below 0.
+
+        A negative ``age_on_arrival`` (clock skew) counts as 0, so the budget is never
+        more than what is left since arrival.
+        """
+        return max(0.0, window - self.age)
+
+    def __repr__(self) -> str:
+        return f"<InteractionTiming age_on_arrival={self.age_on_arrival:.3f}s since_arrival={self.since_arrival:.3f}s>"
@@ -0,0 +1,200 @@
+from enum import Enum
+import asyncio
+import typing
+
+from ..errors.dispike import DeferredTaskQueueFull
+from .logging_control import get_subsystem_logger, LoggingSubsystems
+
+
+_log = get_subsystem_logger(LoggingSubsystems.SERVER)
+
+# asyncio.get_running_loop is Python 3.7+, inside a coroutine get_event_loop returns the same loop.
+_get_running_loop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)
+
+
+class OverflowPolicy(str, Enum):
+    """What the ``/interactions`` endpoint does with a deferred command when the supervisor is full.
+
+    Attributes:
+        REJECT: Respond with 503, Discord shows the interaction as failed.
+        DEGRADE: Respond with an empherical "busy" message instead of running the handler.
+    """
+
+    REJECT = "reject"
+    DEGRADE = "degrade"
+
+
+class DeferredTaskSupervisor(object):
+    """Runs deferred handlers and background tasks with an optional concurrency limit.
+
+    Every task is referenced until it finishes (so it cannot be garbage collected
+    mid-flight) and can be drained on shutdown. With a concurrency limit, tasks
+    over the limit wait for a slot, up to ``max_queue`` of them; anything beyond
+    that is refused with ``DeferredTaskQueueFull``.
+
+    Attributes:
+        submitted (int): Tasks accepted.
+        completed (int): Tasks that finished successfully.
+        failed (int): Tasks that raised.
+        rejected (int): Tasks refused because the supervisor was full.
+        cancelled (int): Tasks cancelled, usually while draining.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = None,
+        max_queue: int = None,
+        overflow_policy: OverflowPolicy = OverflowPolicy.REJECT,
+        drain_timeout: float = 10.0,
+    ):
+        """Initialize a supervisor.
+
+        Args:
+            max_concurrency (int, optional): Tasks allowed to run at once. Unlimited by default.
+            max_queue (int, optional): Tasks allowed to wait for a slot once max_concurrency is reached. Unlimited by default.
+            overflow_policy (OverflowPolicy, optional): "reject" or "degrade", see OverflowPolicy.
+            drain_timeout (float, optional): Seconds to wait for outstanding tasks on shutdown before cancelling them.
+        """
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        if max_queue is not None and max_queue < 0:
+            raise ValueError("max_queue cannot be negative.")
+
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.drain_timeout = drain_timeout
+
+        self._semaphore = None  # type: typing.Optional[asyncio.Semaphore]
+        self._semaphore_loop = None  # type: typing.Optional[asyncio.AbstractEventLoop]
+        self._tasks = set()  # type: typing.Set[asyncio.Task]
+        self._running = 0
+        self._closed = False
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cancelled = 0
+
+    @property
+    def capacity(self) -> typing.Optional[int]:
+        """Total tasks (running and queued) accepted at once, None if unbounded."""
+        if self.max_concurrency is None or self.max_queue is None:
+            return None
+        return self.max_concurrency + self.max_queue
+
+    @property
+    def is_full(self) -> bool:
+        _capacity = self.capacity
+        return self._closed or (_capacity is not None and len(self._tasks) >= _capacity)
+
+    def submit(self, coroutine: typing.Coroutine) -> asyncio.Task:
+        """Schedule a coroutine on the running loop.
+
+        Args:
+            coroutine (typing.Coroutine): The coroutine to run.
+
+        Raises:
+            DeferredTaskQueueFull: The supervisor is full or draining. The coroutine is closed without running.
+
+        Returns:
+            asyncio.Task: The scheduled task.
+        """
+        if self.is_full:
+            self.rejected += 1
+            coroutine.close()
+            raise DeferredTaskQueueFull(self.capacity)
+
+        if self.max_concurrency is None:
+            # no limit, run the coroutine directly and only track it.
+            _task = asyncio.ensure_future(coroutine)
+            self._running += 1
+        else:
+            _task = asyncio.ensure_future(self._run_with_slot(coroutine))
+
+        self.submitted += 1
+        self._tasks.add(_task)
+        _task.add_done_callback(self._task_done)
+        return _task
+
+    async def _run_with_slot(self, coroutine: typing.Coroutine):
+        _loop = _get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not _loop:
+            # before Python 3.10 a semaphore belongs to the loop it was created on, so one
+            # is created for the loop actually serving requests, again if that loop changes.
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = _loop
+        try:
+            async with self._semaphore:
+                self._running += 1
+                try:
+                    return await coroutine
+                finally:
+                    self._running -= 1
+        finally:
+            # closes the coroutine if it was cancelled while still queued.
+            coroutine.close()
+
+    def _task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if self.max_concurrency is None:
+            self._running -= 1
+
+        if task.cancelled():
+            self.cancelled += 1
+        elif task.exception() is not None:
+            self.failed += 1
+            _log.exception("deferred task {!r} failed", task, exc_info=task.exception())
+        else:
+            self.completed += 1
+
+    @property
+    def running(self) -> int:
+        """Tasks currently running."""
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        """Tasks waiting for a concurrency slot."""
+        return len(self._tasks) - self._running
+
+    @property
+    def stats(self) -> dict:
+        """Return the counters and current running/queued tasks."""
+        return {
+            "running": self.running,
+            "queued": self.queued,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+        }
+
+    async def drain(self, timeout: float = None) -> int:
+        """Stop accepting tasks and wait for outstanding ones to finish.
+
+        Args:
+            timeout (float, optional): Seconds to wait before cancelling what is left. Defaults to ``drain_timeout``.
+
+        Returns:
+            int: Number of tasks that had to be cancelled.
+        """
+        self._closed = True
+        if not self._tasks:
+            return 0
+
+        timeout = self.drain_timeout if timeout is None else timeout
+        _log.info("draining {} deferred tasks (timeout {}s)", len(self._tasks), timeout)
+        _, _pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for _task in _pending:
+            _task.cancel()
+        if _pending:
+            _log.warning("cancelled {} deferred tasks that did not finish in time", len(_pending))
+            await asyncio.wait(_pending)
+        return len(_pending)
+
+    def reopen(self):
+        """Accept tasks again after ``drain``."""
+        self._closed = False
@@ -0,0 +1,291 @@
+import collections
+import contextlib
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+import typing
+
+from .logging_control import get_subsystem_logger, LoggingSubsystems
+
+
+_log = get_subsystem_logger(LoggingSubsystems.SERVER)
+
+current_span_var = contextvars.ContextVar(
+    "dispike_current_span", default=None
+)  # type: contextvars.ContextVar[typing.Optional[Span]]
+interaction_id_var = contextvars.ContextVar(
+    "dispike_interaction_id", default=None
+)  # type: contextvars.ContextVar[typing.Optional[str]]
+
+_random = random.Random()
+
+
+def _new_id(bits: int) -> str:
+    return format(_random.getrandbits(bits), f"0{bits // 4}x")
+
+
+class Span(object):
+    """A timed operation, part of a trace.
+
+    Attributes:
+        name (str): What the span measures, e.g. "parse" or "http".
+        trace_id (str): Shared by every span of a trace.
+        span_id (str): Unique id of this span.
+        parent_id (str): Id of the span this one was started in, None for the root span.
+        interaction_id (str): Id of the interaction the span belongs to, if any.
+        start_time (float): ``time.time()`` value the span started at.
+        duration (float): Seconds the span took, None until it ended.
+        attributes (dict): Extra details, e.g. the event name or response status.
+        error (str): The exception that ended the span, if any.
+    """
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "interaction_id",
+        "start_time",
+        "duration",
+        "attributes",
+        "error",
+        "_started",
+        "_tracer",
+        "_root",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        tracer: "Tracer",
+        parent: "Span" = None,
+        attributes: dict = None,
+    ):
+        self.name = name
+        self.span_id = _new_id(64)
+        if parent is None:
+            self.trace_id = _new_id(128)
+            self.parent_id = None
+            self.interaction_id = interaction_id_var.get()
+            self._root = self
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            self.interaction_id = parent.interaction_id or interaction_id_var.get()
+            self._root = parent._root
+        self.attributes = attributes or {}
+        self.error = None
+        self.duration = None
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self._tracer = tracer
+
+    def set_attribute(self, key: str, value: typing.Any):
+        self.attributes[key] = value
+
+    def end(self, error: BaseException = None):
+        """End the span and hand it to the exporters. Later calls are ignored."""
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._started
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self._tracer._export(self)
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "interaction_id": self.interaction_id,
+            "start_time": self.start_time,
+            "duration": self.duration,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def __repr__(self) -> str:
+        return f"<Span {self.name} {self.span_id} parent={self.parent_id}>"
+
+
+class SpanExporter(object):
+    """Receives every span when it ends. Subclass it to send spans elsewhere."""
+
+    def export(self, span: Span):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps the most recent spans in memory, for tests and debugging.
+
+    Attributes:
+        spans (collections.deque): Ended spans, oldest first.
+    """
+
+    def __init__(self, maxlen: int = 10000):
+        self.spans = collections.deque(maxlen=maxlen)  # type: typing.Deque[Span]
+
+    def export(self, span: Span):
+        self.spans.append(span)
+
+    def trace(self, trace_id: str) -> typing.List[Span]:
+        """Return the spans of a trace, in the order they ended."""
+        return [span for span in self.spans if span.trace_id == trace_id]
+
+    def find(self, name: str) -> typing.List[Span]:
+        """Return the spans with this name, in the order they ended."""
+        return [span for span in self.spans if span.name == name]
+
+    def clear(self):
+        self.spans.clear()
+
+
+class JSONLinesSpanExporter(SpanExporter):
+    """Appends every span to a file as one JSON object per line.
+
+    Attributes:
+        path (str): File the spans are written to.
+    """
+
+    def __init__(self, path: typing.Union[str, "os.PathLike"], flush_every: int = 1):
+        """Initialize the exporter, opening (or creating) the file.
+
+        Args:
+            path (Union[str, os.PathLike]): File, appended to if it exists.
+            flush_every (int, optional): Flush the file every this many spans.
+        """
+        self.path = os.fspath(path)
+        self._flush_every = max(1, flush_every)
+        self._written = 0
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a")
+
+    def export(self, span: Span):
+        _line = json.dumps(span.as_dict(), default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(_line)
+            self._written += 1
+            if self._written % self._flush_every == 0:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class Tracer(object):
+    """Creates spans and hands them to exporters once they end.
+
+    The current span is kept in a context variable, so a span started while another is
+    current becomes its child, including across ``await`` and in tasks created while it
+    is current (deferred handlers and background tasks keep the interaction's trace).
+
+    On Python 3.6 the ``contextvars`` backport is used, but asyncio tasks do not copy the
+    context there, so spans of deferred handlers and background tasks start new traces.
+
+    Attributes:
+        exporters (list): Exporters every ended span is handed to.
+    """
+
+    def __init__(self, exporters: typing.Sequence[SpanExporter] = None):
+        """Initialize a tracer.
+
+        Args:
+            exporters (Sequence[SpanExporter], optional): Where ended spans go. Defaults to an InMemorySpanExporter.
+        """
+        self.exporters = list(exporters) if exporters is not None else [InMemorySpanExporter()]
+
+    def start_span(self, name: str, **attributes) -> Span:
+        """Start a span as a child of the current one, without making it current.
+
+        End it with ``Span.end``.
+        """
+        return Span(name, self, parent=current_span_var.get(), attributes=attributes)
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes) -> typing.Iterator[Span]:
+        """Start a span as a child of the current one and make it current until the block exits.
+
+        An exception leaving the block is recorded on the span.
+        """
+        _span = self.start_span(name, **attributes)
+        _token = current_span_var.set(_span)
+        try:
+            yield _span
+        except BaseException as error:
+            _span.end(error)
+            raise
+        finally:
+            current_span_var.reset(_token)
+            _span.end()
+
+    def _export(self, span: Span):
+        for _exporter in self.exporters:
+            try:
+                _exporter.export(span)
+            except Exception:
+                _log.exception("span exporter {} failed.", _exporter)
+
+    def close(self):
+        """Close every exporter, usually on application shutdown."""
+        for _exporter in self.exporters:
+            _exporter.close()
+
+
+class _NoSpan(object):
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def maybe_span(tracer: typing.Optional[Tracer], name: str, **attributes):
+    """Return ``tracer.span(...)``, or a context manager doing nothing if tracing is disabled."""
+    if tracer is None:
+        return _NO_SPAN
+    return tracer.span(name, **attributes)
+
+
+def current_span() -> typing.Optional[Span]:
+    """Return the span current in this context, None outside of a trace."""
+    return current_span_var.get()
+
+
+def current_interaction_id() -> typing.Optional[str]:
+    """Return the id of the interaction being handled in this context.
+
+    Also set in deferred handlers and background tasks started while handling it (Python 3.7+).
+    """
+    return interaction_id_var.get()
+
+
+def set_interaction_id(interaction_id: str) -> contextvars.Token:
+    """Set the interaction handled in the current context, and attach it to the current and root span."""
+    _span = current_span_var.get()
+    if _span is not None:
+        _span.interaction_id = _span._root.interaction_id = interaction_id
+    return interaction_id_var.set(interaction_id)
+
+
+def resolve_tracer(tracer: typing.Union[bool, Tracer, None]) -> typing.Optional[Tracer]:
+    """Return a Tracer for ``True``, the tracer itself, or None."""
+    if tracer is None or tracer is False:
+        return None
+    if isinstance(tracer, Tracer):
+        return tracer
+    return Tracer()
@@ -0,0 +1,187 @@
+import os
+import random
+import struct
+import time
+import typing
+
+from .logging_control import get_subsystem_logger, LoggingSubsystems
+
+
+_log = get_subsystem_logger(LoggingSubsystems.SERVER)
+
+# every recording starts with this, followed by records of (arrival time, body length, body).
+RECORDING_MAGIC = b"DSPKREC1"
+_RECORD_HEADER = struct.Struct("<dI")
+
+
+class RecordedInteraction(object):
+    """An interaction body read back from a recording.
+
+    Attributes:
+        arrived_at (float): ``time.time()`` value the interaction arrived at.
+        body (bytes): The verified request body, as Discord sent it.
+    """
+
+    __slots__ = ("arrived_at", "body")
+
+    def __init__(self, arrived_at: float, body: bytes):
+        self.arrived_at = arrived_at
+        self.body = body
+
+    def __repr__(self) -> str:
+        return f"<RecordedInteraction {self.arrived_at:.6f} {len(self.body)} bytes>"
+
+
+class TrafficRecorder(object):
+    """Appends verified interaction bodies and their arrival time to a file.
+
+    Records are length prefixed binary (an 8 byte arrival time and a 4 byte length before
+    every body), so recording costs one buffered write per interaction and a recording
+    can be appended to across restarts. A record cut short by a crash is ignored when
+    reading, and cut off when the recording is opened again so new records follow the
+    last complete one. Read recordings back with ``read_recording``, or replay them with
+    ``dispike.testing.replay``.
+
+    Recordings contain interaction tokens and user data, treat them like logs.
+
+    Attributes:
+        path (str): Recording file.
+        sample_rate (float): Share of interactions recorded, between 0 and 1.
+        recorded (int): Interactions recorded since this recorder was created.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sample_rate: float = 1.0,
+        flush_every: int = 1,
+        timer: typing.Callable[[], float] = time.time,
+    ):
+        """Initialize a recorder, opening (or creating) the recording.
+
+        Args:
+            path (str): Recording file, appended to (after its last complete record) if it exists.
+            sample_rate (float, optional): Share of interactions to record. Defaults to every interaction.
+            flush_every (int, optional): Flush the file every this many records. Raise to trade durability for fewer syscalls.
+            timer (typing.Callable[[], float], optional): Clock for arrival times, mainly for testing.
+
+        Raises:
+            ValueError: sample_rate is not between 0 and 1, or the file exists and is not a recording.
+        """
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1.")
+        self.path = path
+        self.sample_rate = sample_rate
+        self._flush_every = max(1, flush_every)
+        self._timer = timer
+        self._random = random.Random()
+        self.recorded = 0
+        self._file = open(path, "ab")
+        try:
+            self._truncate_partial_record()
+        except BaseException:
+            self._file.close()
+            raise
+        if self._file.tell() == 0:
+            self._file.write(RECORDING_MAGIC)
+            self._file.flush()
+
+    def _truncate_partial_record(self):
+        # a length header left by a crash would otherwise swallow the records appended after it.
+        _size = self._file.tell()
+        if _size == 0:
+            return
+        with open(self.path, "rb") as recording:
+            _magic = recording.read(len(RECORDING_MAGIC))
+            if _magic != RECORDING_MAGIC:
+                if RECORDING_MAGIC.startswith(_magic):
+                    # the crash happened while the recording was created.
+                    self._file.truncate(0)
+                    self._file.seek(0)
+                    return
+                raise ValueError(f"{self.path} is not a dispike traffic recording.")
+            _complete = _complete_length(recording, _size)
+        if _complete < _size:
+            _log.warning("{} ends with a partial record, cutting it off.", self.path)
+            self._file.truncate(_complete)
+            self._file.seek(_complete)
+
+    def record(self, body: bytes, arrived_at: float = None):
+        """Append one interaction body.
+
+        Args:
+            body (bytes): Verified request body.
+            arrived_at (float, optional): ``time.time()`` value it arrived at. Defaults to now.
+        """
+        if self._file is None:
+            return
+        if self.sample_rate < 1 and self._random.random() >= self.sample_rate:
+            return
+        self._file.write(
+            _RECORD_HEADER.pack(self._timer() if arrived_at is None else arrived_at, len(body))
+        )
+        self._file.write(body)
+        self.recorded += 1
+        if self.recorded % self._flush_every == 0:
+            self._file.flush()
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        """Flush and close the recording, later records are dropped."""
+        if self._file is not None:
+            _log.info("recorded {} interactions to {}", self.recorded, self.path)
+            self._file.close()
+            self._file = None
+
+
+def _complete_length(recording: typing.BinaryIO, size: int) -> int:
+    """Return the offset right after the last complete record, skipping over the bodies."""
+    _offset = len(RECORDING_MAGIC)
+    while True:
+        recording.seek(_offset)
+        _header = recording.read(_RECORD_HEADER.size)
+        if len(_header) < _RECORD_HEADER.size:
+            return _offset
+        _end = _offset + _RECORD_HEADER.size + _RECORD_HEADER.unpack(_header)[1]
+        if _end > size:
+            return _offset
+        _offset = _end
+
+
+def read_recording(path: str) -> typing.Iterator[RecordedInteraction]:
+    """Read the interactions of a recording, in the order they arrived.
+
+    Args:
+        path (str): Recording file.
+
+    Raises:
+        ValueError: The file is not a recording.
+
+    Yields:
+        RecordedInteraction: Every complete record.
+    """
+    with open(path, "rb") as recording:
+        if recording.read(len(RECORDING_MAGIC)) != RECORDING_MAGIC:
+            raise ValueError(f"{path} is not a dispike traffic recording.")
+        while True:
+            _header = recording.read(_RECORD_HEADER.size)
+            if len(_header) < _RECORD_HEADER.size:
+                break
+            _arrived_at, _length = _RECORD_HEADER.unpack(_header)
+            _body = recording.read(_length)
+            if len(_body) < _length:
+                _log.warning("{} ends with a partial record, ignoring it.", path)
+                break
+            yield RecordedInteraction(_arrived_at, _body)
+
+
+def resolve_traffic_recorder(
+    recorder: typing.Union[str, "os.PathLike", TrafficRecorder, None]
+) -> typing.Optional[TrafficRecorder]:
+    """Return a TrafficRecorder for a path, or the recorder itself."""
+    if recorder is None or isinstance(recorder, TrafficRecorder):
+        return recorder
+    return TrafficRecorder(os.fspath(recorder))
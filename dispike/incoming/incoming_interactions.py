@@ -5,7 +5,8 @@ from .attribute_helpers import (
     lookup_resolved_channel_helper,
     lookup_resolved_role_helper,
 )
-from pydantic import BaseModel, ValidationError, validator
+from pydantic import BaseModel, PrivateAttr, ValidationError, validator
+import datetime
 import typing
 from .discord_types.member import Member, PartialMember
 from .discord_types.message import Message
@@ -16,6 +17,7 @@ from loguru import logger
 
 from ..creating import CommandOption, SubcommandOption
 from ..creating.models.options import CommandTypes
+from ..helper.snowflake import InteractionTiming, snowflake_datetime
 
 try:
     from typing import Literal  # pragma: no cover
@@ -158,7 +160,44 @@ class IncomingDiscordMessageCommandData(BaseModel):
     name: str
 
 
-class IncomingDiscordSlashInteraction(BaseModel):
+class IncomingInteraction(BaseModel):
+
+    """Timing helpers shared by every incoming interaction.
+
+    Dispike records when the request arrived, so handlers can check how much of the
+    3 second window for the initial response is left (``remaining_budget``) and defer early.
+    """
+
+    _timing: InteractionTiming = PrivateAttr(default=None)
+
+    @property
+    def timing(self) -> InteractionTiming:
+        """Creation and arrival time of this interaction.
+
+        Interactions that did not arrive through Dispike count as arriving on first access.
+        """
+        _timing = self._timing
+        if not isinstance(_timing, InteractionTiming):
+            _timing = self._timing = InteractionTiming(self.id)
+        return _timing
+
+    @property
+    def created_at(self) -> datetime.datetime:
+        """When Discord created this interaction, read from its id."""
+        return snowflake_datetime(self.id)
+
+    @property
+    def age_on_arrival(self) -> float:
+        """Seconds from creation by Discord until the request reached Dispike."""
+        return self.timing.age_on_arrival
+
+    @property
+    def remaining_budget(self) -> float:
+        """Seconds left to send the initial response, before Discord shows the interaction failed."""
+        return self.timing.remaining_budget()
+
+
+class IncomingDiscordSlashInteraction(IncomingInteraction):
 
     """An incoming discord interaction that was triggered by a command, this is not intended for you to edit, and will not
     be accepted as an argument in any function.
@@ -217,7 +256,7 @@ class IncomingDiscordSlashInteraction(BaseModel):
             raise NoResolvedInteractions
 
 
-class IncomingDiscordButtonInteraction(BaseModel):
+class IncomingDiscordButtonInteraction(IncomingInteraction):
 
     """An incoming discord interaction that was triggered by a button press, this is not intended for you to edit, and will not
     be accepted as an argument in any function.
@@ -241,7 +280,7 @@ class IncomingDiscordButtonInteraction(BaseModel):
     version: typing.Optional[Literal[1]] = None
 
 
-class IncomingDiscordSelectMenuInteraction(BaseModel):
+class IncomingDiscordSelectMenuInteraction(IncomingInteraction):
 
     """An incoming discord interaction that was triggered by a select menu interaction, this is not intended for you to edit, and will not
     be accepted as an argument in any function.
@@ -265,7 +304,7 @@ class IncomingDiscordSelectMenuInteraction(BaseModel):
     version: typing.Optional[Literal[1]] = None
 
 
-class IncomingDiscordUserCommandInteraction(BaseModel):
+class IncomingDiscordUserCommandInteraction(IncomingInteraction):
 
     """An incoming discord interaction that was triggered by a user command interaction, this is not intended for you to edit, and will not
     be accepted as an argument in any function.
@@ -289,7 +328,7 @@ class IncomingDiscordUserCommandInteraction(BaseModel):
     version: typing.Optional[Literal[1]] = None
 
 
-class IncomingDiscordMessageCommandInteraction(BaseModel):
+class IncomingDiscordMessageCommandInteraction(IncomingInteraction):
 
     """An incoming discord interaction that was triggered by a message command interaction, this is not intended for you to edit, and will not
     be accepted as an argument in any function.
@@ -325,6 +364,7 @@ class IncomingApplicationCommand(BaseModel):
         description (int): Description of the command.
         options (Union[List[CommandOption], List[SubcommandOption]], optional): Selected options from the command.
         default_permission (bool, optional): Bool whether if uses default permissions.
+        type (int, optional): The type of command, see CommandTypes.
     """
 
     class Config:
@@ -338,6 +378,7 @@ class IncomingApplicationCommand(BaseModel):
         typing.Union[typing.List[CommandOption], typing.List[SubcommandOption]]
     ]
     default_permission: typing.Optional[bool]
+    type: typing.Optional[int]
 
     # ? not listed in docs but appears in request
     version: typing.Optional[str]
@@ -0,0 +1,142 @@
+from pydantic import BaseModel, ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.errors import MissingError
+from pydantic.fields import SHAPE_SINGLETON
+import copy
+import types
+import typing
+
+
+_view_classes = {}  # type: typing.Dict[typing.Type[BaseModel], typing.Type[LazyModelView]]
+
+
+class LazyModelView(object):
+    """A lazily validated, read-mostly view over a decoded interaction dict.
+
+    Exposes the same attributes as the pydantic model it wraps, but each field is only
+    validated (and converted, e.g. ``joined_at`` into a ``datetime``) the first time it
+    is read. Nested models are wrapped in views as well, so reading ``ctx.token`` never
+    touches ``ctx.member``.
+
+    Unlike the pydantic models, an invalid field only raises ``ValidationError`` when
+    it is accessed. Call ``to_model`` to validate everything at once.
+
+    You should not need to create these directly, pass ``lazy_context=True`` to Dispike.
+    """
+
+    __slots__ = ("_raw", "_values", "_private")
+    _model = BaseModel  # type: typing.Type[BaseModel]
+
+    def __init__(self, raw: dict):
+        object.__setattr__(self, "_raw", raw)
+        object.__setattr__(self, "_values", {})
+        # private attributes of the model (e.g. the interaction timing), kept apart from fields.
+        object.__setattr__(self, "_private", None)
+
+    def _validate_field(self, name: str) -> typing.Any:
+        _field = self._model.__fields__[name]
+        if _field.alias not in self._raw:
+            if _field.required:
+                raise ValidationError(
+                    [ErrorWrapper(MissingError(), loc=_field.alias)], self._model
+                )
+            if _field.default_factory is not None:
+                return _field.default_factory()
+            return copy.deepcopy(_field.default)
+
+        _raw_value = self._raw[_field.alias]
+        if (
+            _field.shape == SHAPE_SINGLETON
+            and isinstance(_raw_value, dict)
+            and isinstance(_field.type_, type)
+            and issubclass(_field.type_, BaseModel)
+        ):
+            return lazy_view_class(_field.type_)(_raw_value)
+
+        _value, _errors = _field.validate(
+            _raw_value, {}, loc=_field.alias, cls=self._model
+        )
+        if _errors:
+            raise ValidationError(
+                _errors if isinstance(_errors, list) else [_errors], self._model
+            )
+        return _value
+
+    def __getattr__(self, name: str) -> typing.Any:
+        # only called when normal lookup fails, so cached values are found on the second try below.
+        _values = self._values
+        if name in _values:
+            return _values[name]
+        if self._private is not None and name in self._private:
+            return self._private[name]
+        if name in self._model.__fields__:
+            _value = _values[name] = self._validate_field(name)
+            return _value
+
+        # methods defined on the model (lookup_resolved_member etc.) work on the view too.
+        _attribute = getattr(self._model, name)
+        if isinstance(_attribute, types.FunctionType):
+            return types.MethodType(_attribute, self)
+        if isinstance(_attribute, property):
+            return _attribute.fget(self)
+        return _attribute
+
+    def __setattr__(self, name: str, value: typing.Any):
+        if name in self._model.__private_attributes__:
+            if self._private is None:
+                object.__setattr__(self, "_private", {})
+            self._private[name] = value
+            return
+        self._values[name] = value
+
+    @property
+    def model_class(self) -> typing.Type[BaseModel]:
+        """The pydantic model this view stands in for."""
+        return self._model
+
+    def to_model(self) -> BaseModel:
+        """Fully validate the wrapped dict into the pydantic model.
+
+        Values assigned on the view take precedence over the raw dict.
+        """
+        _overrides = {
+            key: value.to_model() if isinstance(value, LazyModelView) else value
+            for key, value in self._values.items()
+        }
+        _model = self._model(**{**self._raw, **_overrides})
+        for key, value in (self._private or {}).items():
+            setattr(_model, key, value)
+        return _model
+
+    def dict(self, **kwargs) -> dict:
+        return self.to_model().dict(**kwargs)
+
+    def json(self, **kwargs) -> str:
+        return self.to_model().json(**kwargs)
+
+    def __repr__(self) -> str:
+        return f"<Lazy {self._model.__name__} view, {len(self._values)}/{len(self._model.__fields__)} fields parsed>"
+
+
+def lazy_view_class(model: typing.Type[BaseModel]) -> typing.Type[LazyModelView]:
+    """Return the (cached) lazy view class for a pydantic model.
+
+    Args:
+        model (typing.Type[BaseModel]): The model to mirror.
+
+    Returns:
+        typing.Type[LazyModelView]: A LazyModelView subclass named ``Lazy<Model>``.
+    """
+    _view_class = _view_classes.get(model)
+    if _view_class is None:
+        _view_class = _view_classes[model] = type(
+            f"Lazy{model.__name__}", (LazyModelView,), {"__slots__": (), "_model": model}
+        )
+    return _view_class
+
+
+def is_instance_of_model(obj: typing.Any, model: typing.Type[BaseModel]) -> bool:
+    """isinstance that also accepts lazy views standing in for ``model``."""
+    if isinstance(obj, model):
+        return True
+    return isinstance(obj, LazyModelView) and issubclass(obj._model, model)
@@ -16,11 +16,41 @@ from dispike.helper.network_request_log import (
 from .incoming import IncomingApplicationCommand
 from .creating import RegisterCommands
 from .creating.models import DiscordCommand
+from .creating.sync import CommandSyncEngine, SyncPlan
+from .creating.permissions_batch import GuildPermissionsDiff
+from .creating.fanout import (
+    FanOutReport,
+    fan_out,
+    permission_operations,
+    register_operations,
+)
 from .server import DiscordVerificationMiddleware
-from .server import router
+from .middlewares.verification import VerificationMode
+from .helper.json_backend import resolve_json_backend
+from .helper.traffic_recorder import TrafficRecorder, resolve_traffic_recorder
+from .helper.logging_control import configure_logging
+from .helper.task_supervisor import DeferredTaskSupervisor, OverflowPolicy
+from .helper.http_pool import HTTPClientPool
+from .helper.command_cache import CommandCache, MISSING
+from .helper.metrics import Metrics, deferred_task_collector, resolve_metrics
+from .helper.tracing import Tracer, resolve_tracer
+from .rest.ratelimit import RateLimiter, install_rate_limiter
+from .rest.retry import RetryPolicy, install_retry_policy
+from .rest.metrics import install_metrics
+from .rest.tracing import install_tracing
+from .rest import DEFAULT_API_BASE_URL
+from .server import router, metrics_endpoint
 from .interactions import EventCollection, PerCommandRegistrationSettings
+from .eventer_helpers.dispatch import (
+    CallbackRegistry,
+    EventInvoker,
+    compile_dispatch_table,
+    dispatch_key,
+)
 
 import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
 import httpx
 
@@ -32,6 +62,7 @@ from .creating.models.permissions import (
 
 if typing.TYPE_CHECKING:
     from .incoming import IncomingDiscordSlashInteraction  # pragma: no cover
+    from .helper.permissions_generator import PermissionGenerator  # pragma: no cover
     from .response import DiscordResponse  # pragma: no cover
 
 
@@ -58,13 +89,111 @@ class Dispike(object):
             application_id (str): Discord provided Client ID
             custom_context_argument_name (str, optional): Change the name of the context arugment when passing to a function. Set to "ctx".
             middleware_testing_skip_verification_key_request: (bool, optional): Skip middleware verification (NOT RECOMMENDED)
+            verification_mode (VerificationMode, optional): Verify signatures inline on the event loop ("inline", default) or in a bounded thread pool ("pool").
+            verification_workers (int, optional): Number of threads used for verification in pool mode.
+            verification_max_pending (int, optional): Verifications allowed to queue in pool mode before responding with 503. Defaults to 64.
+            signature_timestamp_tolerance (float, optional): Reject interactions signed more than this many seconds ago (or ahead). Disabled by default.
+            replay_cache_size (int, optional): Number of verified deliveries to remember. Duplicate deliveries get the original response back. Disabled by default.
+            replay_cache_ttl (float, optional): How long deliveries are remembered, in seconds. Never shorter than signature_timestamp_tolerance.
+            json_backend (Union[str, JSONBackend], optional): JSON backend for the /interactions endpoint, "orjson" or "json". Defaults to orjson if it's installed (``pip install dispike[orjson]``).
+            lazy_context (bool, optional): Pass lazily validated views instead of fully parsed pydantic models to handlers. Fields are validated on first access. Defaults to False.
+            log_levels (dict, optional): Minimum log level per subsystem ("server", "verification", "network"), e.g. {"server": "WARNING", "network": "OFF"}. Everything is logged by default.
+            log_body_sample_rate (int, optional): Log 1 in N interaction bodies. 0 disables body logging. Defaults to logging every body.
+            deferred_max_concurrency (int, optional): Deferred handlers and background tasks allowed to run at once. Unlimited by default.
+            deferred_max_queue (int, optional): Deferred tasks allowed to wait for a slot once deferred_max_concurrency is reached. Unlimited by default.
+            deferred_overflow_policy (OverflowPolicy, optional): When full, "reject" deferred commands with 503 (default) or "degrade" to an empherical busy message.
+            deferred_drain_timeout (float, optional): Seconds to wait for outstanding deferred tasks on shutdown. Defaults to 10.
+            auto_defer (bool, optional): Defer any command or component handler that has not responded within auto_defer_budget, and deliver its result by editing the original response. Defaults to False.
+            auto_defer_budget (float, optional): Seconds a handler gets before it is deferred. Discord expects a response within 3 seconds. Defaults to 2.5.
+            http_max_connections (int, optional): Connections the shared async HTTP client may open per host. Defaults to 100.
+            http_max_keepalive_connections (int, optional): Idle connections kept alive per host. Defaults to 20.
+            http_timeout (float, optional): Timeout in seconds for outgoing requests to Discord. Defaults to 10.
+            rate_limit (bool, optional): Follow Discord's rate limit headers, queueing requests per bucket and resending rate limited (429) requests. Defaults to True.
+            rate_limit_max_retries (int, optional): Times a rate limited request is sent again before the 429 is returned. Defaults to 3.
+            rate_limit_global_per_second (int, optional): Global requests per second allowed for the bot token. Defaults to 50, None disables it.
+            retry (bool, optional): Resend requests that failed with a transient error (5xx, 429, connection errors), see RetryPolicy. Defaults to True.
+            retry_policy (RetryPolicy, optional): Custom retry policy, for example with different retries per status code.
+            command_cache (bool, optional): Cache get_commands and command permission lookups. Entries are invalidated when commands or permissions are changed through Dispike. Defaults to False.
+            command_cache_ttl (float, optional): Seconds a cached lookup stays valid for. Defaults to 60.
+            command_cache_size (int, optional): Cached lookups kept at most. Defaults to 256.
+            api_base_url (str, optional): Base url of the Discord API, for example a local fake Discord (see dispike.testing). Defaults to "https://discord.com/api/v8".
+            record_traffic (Union[str, TrafficRecorder], optional): Append every verified interaction and its arrival time to this file, for replaying with dispike.testing.replay. Disabled by default.
+            metrics (Union[bool, Metrics], optional): Record interaction counters, stage and handler latency, deferred task counts and outgoing request latency, served in the Prometheus text format on metrics_path. Disabled by default.
+            metrics_path (str, optional): Path the metrics are served on, without signature verification. Defaults to "/metrics".
+            metrics_dir (str, optional): Directory shared by uvicorn worker processes to merge their metrics in. Defaults to the DISPIKE_METRICS_DIR environment variable.
+            metrics_flush_interval (float, optional): Seconds between writing the metrics of this process to metrics_dir. Defaults to 5.
+            tracing (Union[bool, Tracer], optional): Record a span per interaction, with child spans for verification, parsing, the handler, serializing, deferred tasks and outgoing requests. True keeps spans in memory, pass a Tracer for other exporters. Disabled by default.
         """
         self._bot_token = bot_token
         self._application_id = application_id
+        self._api_base_url = kwargs.get("api_base_url", DEFAULT_API_BASE_URL).rstrip("/")
+
+        if kwargs.get("log_levels") or kwargs.get("log_body_sample_rate") is not None:
+            configure_logging(
+                levels=kwargs.get("log_levels"),
+                body_sample_rate=kwargs.get("log_body_sample_rate"),
+            )
+
+        self._metrics = router._metrics = resolve_metrics(
+            kwargs.get("metrics"),
+            directory=kwargs.get("metrics_dir"),
+            flush_interval=kwargs.get("metrics_flush_interval", 5.0),
+            path=kwargs.get("metrics_path", "/metrics"),
+        )
+        self._tracer = router._tracer = resolve_tracer(kwargs.get("tracing"))
+
+        if kwargs.get("rate_limit", True):
+            self._rate_limiter = RateLimiter(
+                max_retries=kwargs.get("rate_limit_max_retries", 3),
+                global_limit_per_second=kwargs.get(
+                    "rate_limit_global_per_second", 50
+                ),
+            )
+        else:
+            self._rate_limiter = None
+
+        if kwargs.get("retry", True):
+            self._retry_policy = kwargs.get("retry_policy") or RetryPolicy()
+        else:
+            self._retry_policy = None
+
+        if kwargs.get("command_cache", False):
+            self._command_cache = CommandCache(
+                maxsize=kwargs.get("command_cache_size", 256),
+                ttl=kwargs.get("command_cache_ttl", 60.0),
+            )
+        else:
+            self._command_cache = None
+
+        self._http_pool = HTTPClientPool(
+            limits=httpx.Limits(
+                max_connections=kwargs.get("http_max_connections", 100),
+                max_keepalive_connections=kwargs.get(
+                    "http_max_keepalive_connections", 20
+                ),
+            ),
+            timeout=kwargs.get("http_timeout", 10.0),
+            event_hooks={
+                "response": [dispike_httpx_event_hook_incoming_request],
+                "request": [dispike_httpx_event_hook_outgoing_request],
+            },
+            rate_limiter=self._rate_limiter,
+            retry_policy=self._retry_policy,
+            metrics=self._metrics,
+            tracer=self._tracer,
+        )
 
         if bot_token is not None:
             self._registrator = RegisterCommands(
-                application_id=self._application_id, bot_token=self._bot_token
+                application_id=self._application_id,
+                bot_token=self._bot_token,
+                rate_limiter=self._rate_limiter,
+                retry_policy=self._retry_policy,
+                http_pool=self._http_pool,
+                command_cache=self._command_cache,
+                api_base_url=self._api_base_url,
+                metrics=self._metrics,
+                tracer=self._tracer,
             )
         else:
             self._registrator = False
@@ -76,12 +205,84 @@ class Dispike(object):
         else:
             self._testing_skip_verification_key_request = False
 
+        _verification_mode = VerificationMode(
+            kwargs.get("verification_mode", VerificationMode.INLINE)
+        )
+        # owned here rather than by the middleware, which Starlette rebuilds whenever
+        # middleware or exception handlers are added, so it can be shut down with the app.
+        self._verification_executor = None
+        if _verification_mode == VerificationMode.POOL:
+            self._verification_executor = ThreadPoolExecutor(
+                max_workers=kwargs.get("verification_workers"),
+                thread_name_prefix="dispike-verification",
+            )
         self._internal_application.add_middleware(
             DiscordVerificationMiddleware,
             client_public_key=client_public_key,
             testing_skip_verification_of_key=self._testing_skip_verification_key_request,
+            verification_mode=_verification_mode,
+            verification_workers=kwargs.get("verification_workers"),
+            verification_executor=self._verification_executor,
+            verification_max_pending=kwargs.get("verification_max_pending", 64),
+            signature_timestamp_tolerance=kwargs.get("signature_timestamp_tolerance"),
+            replay_cache_size=kwargs.get("replay_cache_size", 0),
+            replay_cache_ttl=kwargs.get("replay_cache_ttl"),
+            metrics=self._metrics,
+            tracer=self._tracer,
         )
         self._internal_application.include_router(router=router)
+        router._json_backend = resolve_json_backend(kwargs.get("json_backend"))
+        router._lazy_context = bool(kwargs.get("lazy_context", False))
+        self._traffic_recorder = router._traffic_recorder = resolve_traffic_recorder(
+            kwargs.get("record_traffic")
+        )
+        if self._traffic_recorder is not None:
+            self._internal_application.add_event_handler(
+                "shutdown", self._traffic_recorder.close
+            )
+        self._task_supervisor = router._task_supervisor = DeferredTaskSupervisor(
+            max_concurrency=kwargs.get("deferred_max_concurrency"),
+            max_queue=kwargs.get("deferred_max_queue"),
+            overflow_policy=kwargs.get(
+                "deferred_overflow_policy", OverflowPolicy.REJECT
+            ),
+            drain_timeout=kwargs.get("deferred_drain_timeout", 10.0),
+        )
+        _auto_defer_budget = None
+        if kwargs.get("auto_defer", False):
+            _auto_defer_budget = float(kwargs.get("auto_defer_budget", 2.5))
+            if not 0 < _auto_defer_budget < 3:
+                raise ValueError("auto_defer_budget must be between 0 and 3 seconds.")
+        router._auto_defer_budget = _auto_defer_budget
+        self._internal_application.add_event_handler(
+            "startup", self._task_supervisor.reopen
+        )
+        self._internal_application.add_event_handler(
+            "shutdown", self._task_supervisor.drain
+        )
+
+        self._internal_application.add_event_handler(
+            "startup", self._open_http_pool
+        )
+        # registered after the drain, deferred tasks may still need to reach Discord.
+        self._internal_application.add_event_handler(
+            "shutdown", self._http_pool.aclose
+        )
+        if self._verification_executor is not None:
+            self._internal_application.add_event_handler(
+                "shutdown",
+                functools.partial(self._verification_executor.shutdown, wait=False),
+            )
+        if self._metrics is not None:
+            self._metrics.add_collector(deferred_task_collector(self._task_supervisor))
+            self._internal_application.add_api_route(
+                self._metrics.path, metrics_endpoint, methods=["GET"], include_in_schema=False
+            )
+            self._internal_application.add_event_handler("startup", self._metrics.start)
+            # after the drain, so the snapshot includes the deferred tasks that finished.
+            self._internal_application.add_event_handler("shutdown", self._metrics.stop)
+        if self._tracer is not None:
+            self._internal_application.add_event_handler("shutdown", self._tracer.close)
         if not kwargs.get("custom_context_argument_name"):
             router._user_defined_setting_ctx_value = "ctx"
         else:
@@ -97,12 +298,20 @@ class Dispike(object):
 
         self._cache_router = router
         self._client = httpx.Client(
-            base_url=f"https://discord.com/api/v8/applications/{self._application_id}/",
+            base_url=f"{self._api_base_url}/applications/{self._application_id}/",
             event_hooks={
                 "response": [dispike_httpx_event_hook_incoming_request],
                 "request": [dispike_httpx_event_hook_outgoing_request],
             },
         )
+        if self._metrics is not None:
+            install_metrics(self._client, self._metrics)
+        if self._rate_limiter is not None:
+            install_rate_limiter(self._client, self._rate_limiter)
+        if self._retry_policy is not None:
+            install_retry_policy(self._client, self._retry_policy)
+        if self._tracer is not None:
+            install_tracing(self._client, self._tracer)
 
     @logger.catch(reraise=True)
     def reset_registration(self, new_bot_token=None, new_application_id=None):
@@ -127,7 +336,15 @@ class Dispike(object):
         else:
             _application_id = new_application_id
         self._registrator = RegisterCommands(
-            application_id=_application_id, bot_token=_bot_token
+            application_id=_application_id,
+            bot_token=_bot_token,
+            rate_limiter=self._rate_limiter,
+            retry_policy=self._retry_policy,
+            http_pool=self._http_pool,
+            command_cache=self._command_cache,
+            api_base_url=self._api_base_url,
+            metrics=self._metrics,
+            tracer=self._tracer,
         )
         self._bot_token = _bot_token
         self._application_id = _application_id
@@ -141,8 +358,22 @@ class Dispike(object):
 
     @staticmethod
     async def background(function: typing.Callable, *args, **kwargs):
+        """Run a coroutine function in the background, supervised like deferred handlers.
+
+        Raises:
+            DeferredTaskQueueFull: The deferred task supervisor is full.
+
+        Returns:
+            asyncio.Task: The scheduled task.
+        """
         logger.debug(f"register background to function {function}")
-        return asyncio.create_task(function(*args, **kwargs))
+        return router._task_supervisor.submit(function(*args, **kwargs))
+
+    @property
+    def deferred_tasks(self) -> DeferredTaskSupervisor:
+        """Returns the supervisor running deferred handlers and background tasks,
+        see ``.stats`` for its metrics."""
+        return self._task_supervisor
 
     @property
     def referenced_application(self) -> FastAPI:
@@ -172,6 +403,112 @@ class Dispike(object):
             raise BotTokenNotProvided("Registrating commands")
         return self._registrator.register
 
+    @property
+    def async_register(self) -> RegisterCommands.async_register:
+        """Returns a shortcut the RegisterCommands.async_register function
+
+        Returns:
+            RegisterCommands.async_register: internal RegisterCommands Object
+        """
+        if self._registrator == False:
+            raise BotTokenNotProvided("Registrating commands")
+        return self._registrator.async_register
+
+    @property
+    def async_bulk_overwrite_commands(
+        self,
+    ) -> RegisterCommands.async_bulk_overwrite_commands:
+        """Returns a shortcut the RegisterCommands.async_bulk_overwrite_commands function
+
+        Returns:
+            RegisterCommands.async_bulk_overwrite_commands: internal RegisterCommands Object
+        """
+        if self._registrator == False:
+            raise BotTokenNotProvided("Registrating commands")
+        return self._registrator.async_bulk_overwrite_commands
+
+    @property
+    def callbacks(self) -> dict:
+        """Registered callbacks, keyed by event type and then event name.
+
+        Assigning a new dict (which is copied) or editing this one in place updates the dispatch
+        table used by the ``/interactions`` endpoint.
+        """
+        return self._callbacks
+
+    @callbacks.setter
+    def callbacks(self, new_callbacks: dict):
+        self._callbacks = CallbackRegistry(new_callbacks, on_change=self._callbacks_changed)
+        self._dispatch_table = compile_dispatch_table(self._callbacks)
+        self._dispatch_table_stale = False
+
+    def _callbacks_changed(self):
+        # recompiled on the next lookup, so a burst of edits only compiles once.
+        self._dispatch_table_stale = True
+
+    async def _open_http_pool(self):
+        await self._http_pool.open(f"{self._api_base_url}/")
+
+    @property
+    def rate_limiter(self) -> typing.Optional[RateLimiter]:
+        """Returns the rate limiter shared by every outgoing request, None if rate limiting is disabled."""
+        return self._rate_limiter
+
+    @property
+    def retry_policy(self) -> typing.Optional[RetryPolicy]:
+        """Returns the retry policy shared by every outgoing request, None if retrying is disabled."""
+        return self._retry_policy
+
+    @property
+    def metrics(self) -> typing.Optional[Metrics]:
+        """Returns the metrics of this instance, None unless ``metrics`` was enabled."""
+        return self._metrics
+
+    @property
+    def tracer(self) -> typing.Optional[Tracer]:
+        """Returns the tracer of this instance, None unless ``tracing`` was enabled."""
+        return self._tracer
+
+    @property
+    def traffic_recorder(self) -> typing.Optional[TrafficRecorder]:
+        """Returns the recorder of incoming interactions, None unless ``record_traffic`` was passed."""
+        return self._traffic_recorder
+
+    @property
+    def api_base_url(self) -> str:
+        """Returns the base url every request to Discord is sent to."""
+        return self._api_base_url
+
+    @property
+    def command_cache(self) -> typing.Optional[CommandCache]:
+        """Returns the cache of command and permission lookups, None if caching is disabled.
+        See ``.stats`` for hit/miss counters."""
+        return self._command_cache
+
+    def _invalidate_commands(self, guild_id=None):
+        if self._command_cache is not None:
+            self._command_cache.invalidate_commands(guild_id)
+
+    def _invalidate_permissions(self, guild_id, command_id=None):
+        if self._command_cache is not None:
+            self._command_cache.invalidate_permissions(guild_id, command_id)
+
+    def _cache_permissions(self, permissions, guild_id, command_id=None, generation=None):
+        if self._command_cache is not None:
+            self._command_cache.set_permissions(
+                permissions, guild_id, command_id, generation=generation
+            )
+        return permissions
+
+    @property
+    def http_pool(self) -> HTTPClientPool:
+        """Returns the pool of keep-alive ``httpx.AsyncClient`` used for all async requests to Discord.
+
+        Returns:
+            HTTPClientPool: opened on startup and closed on shutdown of the FastAPI application.
+        """
+        return self._http_pool
+
     @property
     def shared_client(self) -> "httpx.Client":
         """Returns a pre-initialized ``httpx.Client`` that is used for requests internally.
@@ -196,6 +533,29 @@ class Dispike(object):
         )  # pragma: no cover
         return self.on
 
+    @staticmethod
+    def _get_commands_path(guild_only: bool, guild_id_passed: str) -> str:
+        if guild_only:
+            if not guild_id_passed or not isinstance(guild_id_passed, str):
+                raise TypeError(
+                    "You cannot have guild_only == True and NOT pass any guild id."
+                )
+            return f"/guilds/{guild_id_passed}/commands"
+        return f"/commands"
+
+    @staticmethod
+    def _handle_get_commands_response(
+        response: httpx.Response,
+    ) -> typing.List[IncomingApplicationCommand]:
+        try:
+            if response.status_code == 200:
+                return [IncomingApplicationCommand(**x) for x in response.json()]
+
+            raise DiscordAPIError(response.status_code, response.text)
+        except DiscordAPIError:
+            logger.exception("Discord API Failure.")
+            raise
+
     @logger.catch(reraise=True, message="Issue with getting commands from Discord")
     def get_commands(
         self, guild_only=False, guild_id_passed=None
@@ -212,54 +572,93 @@ class Dispike(object):
         Raises:
             DiscordAPIError: any Discord returned errors.
         """
-        if guild_only:
-            if not guild_id_passed or not isinstance(guild_id_passed, str):
-                raise TypeError(
-                    "You cannot have guild_only == True and NOT pass any guild id."
-                )
-            _url = f"/guilds/{guild_id_passed}/commands"
-        else:
-            _url = f"/commands"
-
-        try:
-            _send_request = self._registrator._client.get(
-                _url, headers=self._registrator.request_headers
-            )
-            if _send_request.status_code == 200:
-                return [IncomingApplicationCommand(**x) for x in _send_request.json()]
-
-            raise DiscordAPIError(_send_request.status_code, _send_request.text)
-        except DiscordAPIError:
-            logger.exception("Discord API Failure.")
-            raise
+        _url = self._get_commands_path(guild_only, guild_id_passed)
+        _scope = guild_id_passed if guild_only else None
+        _generation = None
+        if self._command_cache is not None:
+            _cached = self._command_cache.get_commands(_scope)
+            if _cached is not MISSING:
+                return _cached
+            _generation = self._command_cache.commands_generation(_scope)
+        _send_request = self._registrator._client.get(
+            _url, headers=self._registrator.request_headers
+        )
+        _commands = self._handle_get_commands_response(_send_request)
+        if self._command_cache is not None:
+            self._command_cache.set_commands(_commands, _scope, generation=_generation)
+        return _commands
 
-    @logger.catch(reraise=True, message="Issue with editing commands from Discord")
-    def edit_command(
-        self,
-        new_command: typing.Union[typing.List[DiscordCommand], DiscordCommand],
-        command_id: typing.Union[int, IncomingApplicationCommand] = None,
-        bulk=False,
-        guild_only=False,
-        guild_id_passed=False,
-    ) -> DiscordCommand:
-        """Edits a command provided with a command_id and a valid new command.
+    @logger.catch(reraise=True, message="Issue with getting commands from Discord")
+    async def async_get_commands(
+        self, guild_only=False, guild_id_passed=None
+    ) -> typing.List[IncomingApplicationCommand]:
+        """Async version of ``get_commands``, sent through the shared async client.
 
         Args:
-            command_id (int): Command ID
-            new_command ([DiscordCommand, List[DiscordCommand]]): A valid DiscordCommand object (or a dict with proper syntax, if a dict is passed no verification will be made and discord will return the syntax error)
             guild_only (bool, optional): whether to target a guild. Defaults to False.
-            guild_id_passed (bool, optional): guild id if guild_only is set to True. Defaults to None.
-            bulk (bool, optional): Whether to specifiy if this action will be a bulk action.
+            guild_id_passed ([type], optional): guild id if guild_only is set to True. Defaults to None.
 
         Returns:
-            DiscordCommand: Returns the DiscordCommand object created. (Will return a DiscordCommand irregardless of new_command)
+            typing.List[DiscordCommand]: Array of DiscordCommand
 
         Raises:
-            TypeError: Invalid types passed.
             DiscordAPIError: any Discord returned errors.
         """
+        _url = self._get_commands_path(guild_only, guild_id_passed)
+        _scope = guild_id_passed if guild_only else None
+        _generation = None
+        if self._command_cache is not None:
+            _cached = self._command_cache.get_commands(_scope)
+            if _cached is not MISSING:
+                return _cached
+            _generation = self._command_cache.commands_generation(_scope)
+        _send_request = await self._registrator._async_request("GET", _url)
+        _commands = self._handle_get_commands_response(_send_request)
+        if self._command_cache is not None:
+            self._command_cache.set_commands(_commands, _scope, generation=_generation)
+        return _commands
+
+    def get_command_id(self, name: str, guild_id: str = None) -> typing.Optional[int]:
+        """Return the id of a command by name, using the command cache's name index when enabled.
 
-    
+        Args:
+            name (str): Name of the command.
+            guild_id (str, optional): Guild of the command, global commands if not provided.
+
+        Returns:
+            Optional[int]: The command id, None if there is no such command.
+        """
+        if self._command_cache is not None:
+            _command_id = self._command_cache.command_id(name, guild_id)
+            if _command_id is not MISSING:
+                return _command_id
+        _commands = self.get_commands(
+            guild_only=guild_id is not None, guild_id_passed=guild_id
+        )
+        return next((command.id for command in _commands if command.name == name), None)
+
+    async def async_get_command_id(
+        self, name: str, guild_id: str = None
+    ) -> typing.Optional[int]:
+        """Async version of ``get_command_id``."""
+        if self._command_cache is not None:
+            _command_id = self._command_cache.command_id(name, guild_id)
+            if _command_id is not MISSING:
+                return _command_id
+        _commands = await self.async_get_commands(
+            guild_only=guild_id is not None, guild_id_passed=guild_id
+        )
+        return next((command.id for command in _commands if command.name == name), None)
+
+    @staticmethod
+    def _prepare_edit_command(
+        new_command: typing.Union[typing.List[DiscordCommand], DiscordCommand],
+        command_id: typing.Union[int, IncomingApplicationCommand],
+        bulk: bool,
+        guild_only: bool,
+        guild_id_passed,
+    ) -> typing.Tuple[str, str, typing.Union[dict, typing.List[dict]]]:
+        """Validate an edit and return its request method, path and body."""
         if command_id:
             if isinstance(command_id, IncomingApplicationCommand):
                 command_id = command_id.id
@@ -267,7 +666,7 @@ class Dispike(object):
                 command_id = int(command_id)
             else:
                 raise TypeError("The command ID must be either an interger or an IncomingApplicationCommand object.")
-        
+
         if not isinstance(new_command, (DiscordCommand, dict, list)):
             raise TypeError("New command must be a DiscordCommand or a valid dict.")
 
@@ -283,76 +682,176 @@ class Dispike(object):
         else:
             _url = "/commands"
         if bulk == True and isinstance(new_command, list):
-            _new_command = [command.dict() for command in new_command]
-            _selected_request_method = "PUT"
-        else:
-            _new_command = new_command.dict()
-            _selected_request_method = "PATCH"
+            return "PUT", _url, [command.dict() for command in new_command]
+        return "PATCH", _url, new_command.dict()
+
+    @staticmethod
+    def _handle_edit_command_response(
+        response: httpx.Response, bulk: bool
+    ) -> typing.Union[DiscordCommand, typing.List[DiscordCommand], bool]:
         try:
-            _send_request = self._registrator._client.request(
-                method=_selected_request_method,
-                url=_url,
-                headers=self._registrator.request_headers,
-                json=_new_command,
-            )
-            if _send_request.status_code != 200:
-                raise DiscordAPIError(_send_request.status_code, _send_request.text)
+            if response.status_code != 200:
+                raise DiscordAPIError(response.status_code, response.text)
 
             if bulk:
-                return [DiscordCommand(**x) for x in _send_request.json()]
+                return [DiscordCommand(**x) for x in response.json()]
             else:
-                return DiscordCommand(**_send_request.json())
+                return DiscordCommand(**response.json())
         except DiscordAPIError:
             # TODO: Maybe don't return false and just raise it?
             logger.exception("Discord API Failure.")
             return False
 
-    @logger.catch(reraise=True, message="Issue with deleting commands from Discord")
-    def delete_command(
-        self, command_id: typing.Union[int, IncomingApplicationCommand], guild_only=False, guild_id_passed=None
-    ) -> bool:
-        """Deletes a command, provided with a command_id
+    @logger.catch(reraise=True, message="Issue with editing commands from Discord")
+    def edit_command(
+        self,
+        new_command: typing.Union[typing.List[DiscordCommand], DiscordCommand],
+        command_id: typing.Union[int, IncomingApplicationCommand] = None,
+        bulk=False,
+        guild_only=False,
+        guild_id_passed=False,
+    ) -> DiscordCommand:
+        """Edits a command provided with a command_id and a valid new command.
 
         Args:
-            command_id (typing.Union[int, IncomingApplicationCommand]): Command ID required
-            guild_only (bool, optional): Whether to be a global action or target a guild. Defaults to False.
-            guild_id_passed ([type], optional): Guild ID if guild_only is set to True. Defaults to None.
+            command_id (int): Command ID
+            new_command ([DiscordCommand, List[DiscordCommand]]): A valid DiscordCommand object (or a dict with proper syntax, if a dict is passed no verification will be made and discord will return the syntax error)
+            guild_only (bool, optional): whether to target a guild. Defaults to False.
+            guild_id_passed (bool, optional): guild id if guild_only is set to True. Defaults to None.
+            bulk (bool, optional): Whether to specifiy if this action will be a bulk action.
 
         Returns:
-            bool: True if status code is 201, otherwise an error will be raised.
+            DiscordCommand: Returns the DiscordCommand object created. (Will return a DiscordCommand irregardless of new_command)
 
         Raises:
             TypeError: Invalid types passed.
             DiscordAPIError: any Discord returned errors.
         """
+        _selected_request_method, _url, _new_command = self._prepare_edit_command(
+            new_command, command_id, bulk, guild_only, guild_id_passed
+        )
+        _send_request = self._registrator._client.request(
+            method=_selected_request_method,
+            url=_url,
+            headers=self._registrator.request_headers,
+            json=_new_command,
+        )
+        self._invalidate_commands(guild_id_passed if guild_only else None)
+        return self._handle_edit_command_response(_send_request, bulk)
 
+    @logger.catch(reraise=True, message="Issue with editing commands from Discord")
+    async def async_edit_command(
+        self,
+        new_command: typing.Union[typing.List[DiscordCommand], DiscordCommand],
+        command_id: typing.Union[int, IncomingApplicationCommand] = None,
+        bulk=False,
+        guild_only=False,
+        guild_id_passed=False,
+    ) -> DiscordCommand:
+        """Async version of ``edit_command``, sent through the shared async client.
+
+        Args:
+            command_id (int): Command ID
+            new_command ([DiscordCommand, List[DiscordCommand]]): A valid DiscordCommand object (or a dict with proper syntax, if a dict is passed no verification will be made and discord will return the syntax error)
+            guild_only (bool, optional): whether to target a guild. Defaults to False.
+            guild_id_passed (bool, optional): guild id if guild_only is set to True. Defaults to None.
+            bulk (bool, optional): Whether to specifiy if this action will be a bulk action.
+
+        Returns:
+            DiscordCommand: Returns the DiscordCommand object created. (Will return a DiscordCommand irregardless of new_command)
+
+        Raises:
+            TypeError: Invalid types passed.
+            DiscordAPIError: any Discord returned errors.
+        """
+        _selected_request_method, _url, _new_command = self._prepare_edit_command(
+            new_command, command_id, bulk, guild_only, guild_id_passed
+        )
+        _send_request = await self._registrator._async_request(
+            _selected_request_method, _url, json=_new_command
+        )
+        self._invalidate_commands(guild_id_passed if guild_only else None)
+        return self._handle_edit_command_response(_send_request, bulk)
+
+    @staticmethod
+    def _delete_command_path(
+        command_id: typing.Union[int, IncomingApplicationCommand],
+        guild_only: bool,
+        guild_id_passed,
+    ) -> str:
         if isinstance(command_id, IncomingApplicationCommand):
             command_id = command_id.id
         elif isinstance(command_id, (str, int)):
             command_id = int(command_id)
         else:
             raise TypeError("The command ID must be either an interger or an IncomingApplicationCommand object.")
-        
+
         if guild_only:
             if not guild_id_passed:
                 raise TypeError(
                     "You cannot have guild_only == True and NOT pass any guild id."
                 )
-            _url = f"/guilds/{guild_id_passed}/commands/{command_id}"
-        else:
-            _url = f"/commands/{command_id}"
+            return f"/guilds/{guild_id_passed}/commands/{command_id}"
+        return f"/commands/{command_id}"
 
+    @staticmethod
+    def _handle_delete_command_response(response: httpx.Response) -> bool:
         try:
-            _send_request = self._registrator._client.delete(
-                _url, headers=self._registrator.request_headers
-            )
-            if _send_request.status_code != 204:
-                raise DiscordAPIError(_send_request.status_code, _send_request.text)
+            if response.status_code != 204:
+                raise DiscordAPIError(response.status_code, response.text)
             return True
         except DiscordAPIError:
             logger.exception("Discord API Failure.")
             raise
 
+    @logger.catch(reraise=True, message="Issue with deleting commands from Discord")
+    def delete_command(
+        self, command_id: typing.Union[int, IncomingApplicationCommand], guild_only=False, guild_id_passed=None
+    ) -> bool:
+        """Deletes a command, provided with a command_id
+
+        Args:
+            command_id (typing.Union[int, IncomingApplicationCommand]): Command ID required
+            guild_only (bool, optional): Whether to be a global action or target a guild. Defaults to False.
+            guild_id_passed ([type], optional): Guild ID if guild_only is set to True. Defaults to None.
+
+        Returns:
+            bool: True if status code is 201, otherwise an error will be raised.
+
+        Raises:
+            TypeError: Invalid types passed.
+            DiscordAPIError: any Discord returned errors.
+        """
+        _url = self._delete_command_path(command_id, guild_only, guild_id_passed)
+        _send_request = self._registrator._client.delete(
+            _url, headers=self._registrator.request_headers
+        )
+        self._invalidate_commands(guild_id_passed if guild_only else None)
+        return self._handle_delete_command_response(_send_request)
+
+    @logger.catch(reraise=True, message="Issue with deleting commands from Discord")
+    async def async_delete_command(
+        self, command_id: typing.Union[int, IncomingApplicationCommand], guild_only=False, guild_id_passed=None
+    ) -> bool:
+        """Async version of ``delete_command``, sent through the shared async client.
+
+        Args:
+            command_id (typing.Union[int, IncomingApplicationCommand]): Command ID required
+            guild_only (bool, optional): Whether to be a global action or target a guild. Defaults to False.
+            guild_id_passed ([type], optional): Guild ID if guild_only is set to True. Defaults to None.
+
+        Returns:
+            bool: True if status code is 201, otherwise an error will be raised.
+
+        Raises:
+            TypeError: Invalid types passed.
+            DiscordAPIError: any Discord returned errors.
+        """
+        _url = self._delete_command_path(command_id, guild_only, guild_id_passed)
+        _send_request = await self._registrator._async_request("DELETE", _url)
+        self._invalidate_commands(guild_id_passed if guild_only else None)
+        return self._handle_delete_command_response(_send_request)
+
     def set_command_permission(
         self, command_id: typing.Union[int, IncomingApplicationCommand], guild_id: int, new_permissions: "NewApplicationPermission"
     ) -> bool:
@@ -374,24 +873,26 @@ class Dispike(object):
         else:
             raise TypeError("The command ID must be either an interger or an IncomingApplicationCommand object.")
         
-        with httpx.Client() as client:
-            try:
+        try:
 
-                _set_command_permissions = client.put(
-                    f"https://discord.com/api/v8/applications/{self._application_id}/guilds/{guild_id}/commands/{command_id}/permissions",
-                    json=new_permissions.dict(),
-                    headers=self.return_bot_token_headers(),
-                )
-                _set_command_permissions.raise_for_status()
-                return True
-            except httpx.HTTPError:
-                logger.exception(
-                    f"Unable to set permission for command {command_id} for guild {guild_id}"
-                )
-                logger.debug(
-                    f"request: {_set_command_permissions.status_code}: {_set_command_permissions.text}"
-                )
-                return False
+            _set_command_permissions = self._client.put(
+                f"{self._api_base_url}/applications/{self._application_id}/guilds/{guild_id}/commands/{command_id}/permissions",
+                json=new_permissions.dict(),
+                headers=self.return_bot_token_headers(),
+            )
+            _set_command_permissions.raise_for_status()
+            return True
+        except httpx.HTTPError:
+            logger.exception(
+                f"Unable to set permission for command {command_id} for guild {guild_id}"
+            )
+            logger.debug(
+                f"request: {_set_command_permissions.status_code}: {_set_command_permissions.text}"
+            )
+            return False
+        finally:
+            # after the request, so a read racing it cannot cache the old permissions.
+            self._invalidate_permissions(guild_id, command_id)
 
     async def async_set_command_permission(
         self, command_id: typing.Union[int, IncomingApplicationCommand], guild_id, new_permissions: "NewApplicationPermission"
@@ -414,21 +915,23 @@ class Dispike(object):
         else:
             raise TypeError("The command ID must be either an interger or an IncomingApplicationCommand object.")
         
-        async with httpx.AsyncClient() as client:
-            try:
+        try:
 
-                _set_command_permissions = await client.put(
-                    f"https://discord.com/api/v8/applications/{self._application_id}/guilds/{guild_id}/commands/{command_id}/permissions",
-                    data=new_permissions.dict(),
-                    headers=self.return_bot_token_headers(),
-                )
-                _set_command_permissions.raise_for_status()
-                return True
-            except httpx.HTTPError:
-                logger.exception(
-                    f"Unable to set permission for command {command_id} for guild {guild_id}"
-                )
-                return False
+            _set_command_permissions = await self._http_pool.request(
+                "PUT",
+                f"{self._api_base_url}/applications/{self._application_id}/guilds/{guild_id}/commands/{command_id}/permissions",
+                json=new_permissions.dict(),
+                headers=self.return_bot_token_headers(),
+            )
+            _set_command_permissions.raise_for_status()
+            return True
+        except httpx.HTTPError:
+            logger.exception(
+                f"Unable to set permission for command {command_id} for guild {guild_id}"
+            )
+            return False
+        finally:
+            self._invalidate_permissions(guild_id, command_id)
 
     async def send_deferred_message(
         self,
@@ -441,21 +944,63 @@ class Dispike(object):
             original_context (IncomingDiscordSlashInteraction): The orginal context of the message.
             new_message (DiscordResponse): Message to send.
         """
-        async with httpx.AsyncClient(
-            base_url=f"https://discord.com/api/v8/webhooks/{self._application_id}/{original_context.token}/messages/",
-            headers={
-                "Content-Type": "application/json",
-            },
-        ) as client:
-            try:
-                # TODO: Probably change later to inside the DeferredResponse?
-                new_message._switch_to_followup_message()
-                logger.debug(f"sending deferred response : {new_message.response}")
-                response = await client.patch("/@original", json=new_message.response)
-                response.raise_for_status()
-            except httpx.HTTPError as req:
-                logger.exception(f"Unable to send deferred message!")
-                raise
+        # TODO: Probably change later to inside the DeferredResponse?
+        new_message._switch_to_followup_message()
+        await self._edit_original_response(original_context.token, new_message.response)
+
+    async def _edit_original_response(self, interaction_token: str, payload: dict):
+        """Edit the original response of an interaction (PATCH ``@original``).
+
+        Args:
+            interaction_token (str): Token of the interaction.
+            payload (dict): Message payload, e.g. ``{"content": "..."}``.
+        """
+        try:
+            logger.debug(f"sending deferred response : {payload}")
+            response = await self._http_pool.request(
+                "PATCH",
+                f"{self._api_base_url}/webhooks/{self._application_id}/{interaction_token}/messages/@original",
+                json=payload,
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as req:
+            logger.exception(f"Unable to send deferred message!")
+            raise
+
+    async def _create_followup_message(self, interaction_token: str, payload: dict):
+        """Send a followup message for an interaction (POST to the interaction webhook).
+
+        Args:
+            interaction_token (str): Token of the interaction.
+            payload (dict): Message payload, e.g. ``{"content": "...", "flags": 64}``.
+        """
+        try:
+            logger.debug(f"sending followup message : {payload}")
+            response = await self._http_pool.request(
+                "POST",
+                f"{self._api_base_url}/webhooks/{self._application_id}/{interaction_token}",
+                json=payload,
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as req:
+            logger.exception(f"Unable to send followup message!")
+            raise
+
+    async def _delete_original_response(self, interaction_token: str):
+        """Delete the original response of an interaction (DELETE ``@original``).
+
+        Args:
+            interaction_token (str): Token of the interaction.
+        """
+        try:
+            response = await self._http_pool.request(
+                "DELETE",
+                f"{self._api_base_url}/webhooks/{self._application_id}/{interaction_token}/messages/@original",
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as req:
+            logger.exception(f"Unable to delete original response!")
+            raise
 
     async def async_get_command_permission_in_guild(
         self, command_id, guild_id
@@ -470,27 +1015,41 @@ class Dispike(object):
             GuildApplicationCommandPermissions: Return if permissions exist.
             None: Return if no permissions exist.
         """
-        async with httpx.AsyncClient() as client:
-            try:
-                _request_command_permission = await client.get(
-                    f"https://discord.com/api/v8/applications/{self._application_id}/guilds/{guild_id}/commands/{command_id}/permissions"
+        _generation = None
+        if self._command_cache is not None:
+            _cached = self._command_cache.get_permissions(guild_id, command_id)
+            if _cached is not MISSING:
+                return _cached
+            _generation = self._command_cache.permissions_generation(guild_id, command_id)
+        try:
+            _request_command_permission = await self._http_pool.request(
+                "GET",
+                f"{self._api_base_url}/applications/{self._application_id}/guilds/{guild_id}/commands/{command_id}/permissions",
+                headers=self.return_bot_token_headers(),
+            )
+            if _request_command_permission.status_code == 404:
+                return self._cache_permissions(
+                    None, guild_id, command_id, generation=_generation
                 )
-                if _request_command_permission.status_code == 404:
-                    return None
-                elif _request_command_permission.status_code == 200:
-                    return GuildApplicationCommandPermissions(
+            elif _request_command_permission.status_code == 200:
+                return self._cache_permissions(
+                    GuildApplicationCommandPermissions(
                         **_request_command_permission.json()
-                    )
-                else:
-                    raise DiscordAPIError(
-                        status_code=_request_command_permission.status_code,
-                        request_text=_request_command_permission.text,
-                    )
-            except DiscordAPIError:
-                logger.error(
-                    f"Unable to get command permission! {_request_command_permission.status_code}"
+                    ),
+                    guild_id,
+                    command_id,
+                    generation=_generation,
+                )
+            else:
+                raise DiscordAPIError(
+                    status_code=_request_command_permission.status_code,
+                    request_text=_request_command_permission.text,
                 )
-                raise
+        except DiscordAPIError:
+            logger.error(
+                f"Unable to get command permission! {_request_command_permission.status_code}"
+            )
+            raise
 
     async def async_get_all_command_permissions_in_guild(
         self, guild_id
@@ -503,23 +1062,34 @@ class Dispike(object):
         Returns:
             typing.List[GuildApplicationCommandPermissions]: Permissions for all commands (if any permissions exist.)
         """
-        async with httpx.AsyncClient() as client:
-            try:
-                _request_command_permission = await client.get(
-                    f"https://discord.com/api/v8/applications/{self._application_id}/guilds/{guild_id}/commands/permissions"
-                )
+        _generation = None
+        if self._command_cache is not None:
+            _cached = self._command_cache.get_permissions(guild_id)
+            if _cached is not MISSING:
+                return _cached
+            _generation = self._command_cache.permissions_generation(guild_id)
+        try:
+            _request_command_permission = await self._http_pool.request(
+                "GET",
+                f"{self._api_base_url}/applications/{self._application_id}/guilds/{guild_id}/commands/permissions",
+                headers=self.return_bot_token_headers(),
+            )
 
-                if _request_command_permission.status_code not in [200, 201]:
-                    raise DiscordAPIError(
-                        status_code=_request_command_permission.status_code,
-                        request_text=_request_command_permission.text,
-                    )
-                return [
+            if _request_command_permission.status_code not in [200, 201]:
+                raise DiscordAPIError(
+                    status_code=_request_command_permission.status_code,
+                    request_text=_request_command_permission.text,
+                )
+            return self._cache_permissions(
+                [
                     GuildApplicationCommandPermissions(**x)
                     for x in _request_command_permission.json()
-                ]
-            except DiscordAPIError:
-                raise
+                ],
+                guild_id,
+                generation=_generation,
+            )
+        except DiscordAPIError:
+            raise
 
     def get_all_command_permissions_in_guild(
         self, guild_id: typing.Union[str, int]
@@ -532,23 +1102,32 @@ class Dispike(object):
         Returns:
             typing.List[GuildApplicationCommandPermissions]: Permissions for all commands (if any permissions exist.)
         """
-        with httpx.Client() as client:
-            try:
-                _request_command_permission = client.get(
-                    f"https://discord.com/api/v8/applications/{self._application_id}/guilds/{guild_id}/commands/permissions",
-                    headers=self.return_bot_token_headers(),
+        _generation = None
+        if self._command_cache is not None:
+            _cached = self._command_cache.get_permissions(guild_id)
+            if _cached is not MISSING:
+                return _cached
+            _generation = self._command_cache.permissions_generation(guild_id)
+        try:
+            _request_command_permission = self._client.get(
+                f"{self._api_base_url}/applications/{self._application_id}/guilds/{guild_id}/commands/permissions",
+                headers=self.return_bot_token_headers(),
+            )
+            if _request_command_permission.status_code not in [200, 201]:
+                raise DiscordAPIError(
+                    status_code=_request_command_permission.status_code,
+                    request_text=_request_command_permission.text,
                 )
-                if _request_command_permission.status_code not in [200, 201]:
-                    raise DiscordAPIError(
-                        status_code=_request_command_permission.status_code,
-                        request_text=_request_command_permission.text,
-                    )
-                return [
+            return self._cache_permissions(
+                [
                     GuildApplicationCommandPermissions(**x)
                     for x in _request_command_permission.json()
-                ]
-            except DiscordAPIError:
-                raise
+                ],
+                guild_id,
+                generation=_generation,
+            )
+        except DiscordAPIError:
+            raise
 
     def get_command_permission_in_guild(
         self, command_id: typing.Union[str, int], guild_id: typing.Union[str, int]
@@ -563,28 +1142,125 @@ class Dispike(object):
             GuildApplicationCommandPermissions: Return if permissions exist.
             None: Return if no permissions exist.
         """
-        with httpx.Client() as client:
-            try:
-                _request_command_permission = client.get(
-                    f"https://discord.com/api/v8/applications/{self._application_id}/guilds/{guild_id}/commands/{command_id}/permissions",
-                    headers=self.return_bot_token_headers(),
+        _generation = None
+        if self._command_cache is not None:
+            _cached = self._command_cache.get_permissions(guild_id, command_id)
+            if _cached is not MISSING:
+                return _cached
+            _generation = self._command_cache.permissions_generation(guild_id, command_id)
+        try:
+            _request_command_permission = self._client.get(
+                f"{self._api_base_url}/applications/{self._application_id}/guilds/{guild_id}/commands/{command_id}/permissions",
+                headers=self.return_bot_token_headers(),
+            )
+            if _request_command_permission.status_code == 404:
+                return self._cache_permissions(
+                    None, guild_id, command_id, generation=_generation
                 )
-                if _request_command_permission.status_code == 404:
-                    return None
-                elif _request_command_permission.status_code == 200:
-                    return GuildApplicationCommandPermissions(
+            elif _request_command_permission.status_code == 200:
+                return self._cache_permissions(
+                    GuildApplicationCommandPermissions(
                         **_request_command_permission.json()
-                    )
-                else:
-                    raise DiscordAPIError(
-                        status_code=_request_command_permission.status_code,
-                        request_text=_request_command_permission.text,
-                    )
-            except DiscordAPIError:
-                logger.error(
-                    f"Unable to get command permission! {_request_command_permission.status_code}"
+                    ),
+                    guild_id,
+                    command_id,
+                    generation=_generation,
                 )
-                raise
+            else:
+                raise DiscordAPIError(
+                    status_code=_request_command_permission.status_code,
+                    request_text=_request_command_permission.text,
+                )
+        except DiscordAPIError:
+            logger.error(
+                f"Unable to get command permission! {_request_command_permission.status_code}"
+            )
+            raise
+
+    def _handle_batch_permissions_response(
+        self, response: httpx.Response, diff: GuildPermissionsDiff
+    ) -> GuildPermissionsDiff:
+        if response.status_code != 200:
+            logger.error(
+                f"Unable to batch set command permissions for guild {diff.guild_id}: {response.status_code}"
+            )
+            raise DiscordAPIError(response.status_code, response.text)
+        logger.info(
+            f"Updated permissions of {len(diff.changed)} commands in guild {diff.guild_id}"
+        )
+        return diff
+
+    def batch_set_command_permissions(
+        self,
+        guild_id: typing.Union[str, int],
+        permissions: typing.Dict[
+            typing.Union[int, IncomingApplicationCommand],
+            typing.Union[NewApplicationPermission, "PermissionGenerator"],
+        ],
+        dry_run: bool = False,
+    ) -> GuildPermissionsDiff:
+        """Set permissions of many commands in a guild with a single request.
+
+        The current permissions are fetched once and compared locally. If nothing changed,
+        no request is sent, otherwise one batch request updates every changed command.
+        Permissions of commands not in ``permissions`` are kept.
+
+        Args:
+            guild_id (typing.Union[str, int]): The guild to be targeted.
+            permissions (Dict[Union[int, IncomingApplicationCommand], Union[NewApplicationPermission, PermissionGenerator]]): Wanted permissions per command.
+            dry_run (bool, optional): Only compute the difference.
+
+        Returns:
+            GuildPermissionsDiff: What changed (or, with dry_run, would change).
+
+        Raises:
+            DiscordAPIError: any Discord returned errors.
+        """
+        # diff against the live permissions, the batch replaces all of them.
+        self._invalidate_permissions(guild_id)
+        _diff = GuildPermissionsDiff(
+            guild_id, self.get_all_command_permissions_in_guild(guild_id), permissions
+        )
+        if dry_run or _diff.is_empty:
+            return _diff
+        try:
+            _send_request = self._client.put(
+                f"{self._api_base_url}/applications/{self._application_id}/guilds/{guild_id}/commands/permissions",
+                json=_diff.json(),
+                headers=self.return_bot_token_headers(),
+            )
+        finally:
+            self._invalidate_permissions(guild_id)
+        return self._handle_batch_permissions_response(_send_request, _diff)
+
+    async def async_batch_set_command_permissions(
+        self,
+        guild_id: typing.Union[str, int],
+        permissions: typing.Dict[
+            typing.Union[int, IncomingApplicationCommand],
+            typing.Union[NewApplicationPermission, "PermissionGenerator"],
+        ],
+        dry_run: bool = False,
+    ) -> GuildPermissionsDiff:
+        """Async version of ``batch_set_command_permissions``."""
+        self._invalidate_permissions(guild_id)
+        _diff = GuildPermissionsDiff(
+            guild_id,
+            await self.async_get_all_command_permissions_in_guild(guild_id),
+            permissions,
+        )
+        if dry_run or _diff.is_empty:
+            return _diff
+        try:
+            _send_request = await self._http_pool.request(
+                "PUT",
+                f"{self._api_base_url}/applications/{self._application_id}/guilds/{guild_id}/commands/permissions",
+                json=_diff.json(),
+                headers=self.return_bot_token_headers(),
+            )
+        finally:
+            self._invalidate_permissions(guild_id)
+        return self._handle_batch_permissions_response(_send_request, _diff)
 
     @staticmethod
     def _return_uvicorn_run_function():
@@ -707,6 +1383,24 @@ class Dispike(object):
             f"Event {event} is not in callbacks. Did you register this event?"
         )
 
+    def resolve_event_invoker(
+        self, event: str, type: str
+    ) -> typing.Optional[EventInvoker]:
+        """Returns the prepared invoker for an event, using the dispatch table.
+
+        Args:
+            event (str): Event name
+            type (str): Event type
+
+        Returns:
+            EventInvoker: The invoker, or None if nothing is registered.
+        """
+        if self._dispatch_table_stale:
+            # .callbacks was edited in place, bring the dispatch table up to date.
+            self._dispatch_table = compile_dispatch_table(self._callbacks)
+            self._dispatch_table_stale = False
+        return self._dispatch_table.get(dispatch_key(type, event))
+
     def return_event_function(self, event: str, type: str) -> dict:
         """Returns the function registered for the event.
 
@@ -720,8 +1414,9 @@ class Dispike(object):
         Returns:
             dict: containing func and settings
         """
-        if self.check_event_exists(event, type):
-            return self.callbacks[type][event]["function"]
+        _invoker = self.resolve_event_invoker(event, type)
+        if _invoker is not None:
+            return _invoker.function
         raise TypeError(
             f"Event {event} is not in callbacks. Did you register this event?"
         )
@@ -752,13 +1447,12 @@ class Dispike(object):
         Raises:
             TypeError: raises if event is not registered.
         """
-        if event not in self.callbacks[type]:
+        _invoker = self.resolve_event_invoker(event, type)
+        if _invoker is None:
             raise TypeError(
                 f"event {event} does not have a corresponding handler. Did you register this function/event?"
             )
-
-        _look_up_function = self.return_event_function(event, type)
-        return await _look_up_function(*args, **kwargs)
+        return await _invoker(*args, **kwargs)
 
     def _add_function_to_callbacks(
         self, function_name: str, function_type: EventTypes, function: typing.Callable
@@ -787,10 +1481,22 @@ class Dispike(object):
             raise TypeError(f"{function_name} ({function_type}) is already registered.")
         else:
             logger.debug(f"Adding {function_name} ({function_type}) to callbacks..")
+            _was_stale = self._dispatch_table_stale
             self.callbacks[function_type][function_name] = {
                 "settings": {},
                 "function": function,
             }
+            if not _was_stale:
+                # the table only misses this callback, add it instead of recompiling.
+                self._dispatch_table[
+                    dispatch_key(function_type, function_name)
+                ] = EventInvoker(
+                    event=function_name,
+                    type=function_type,
+                    function=function,
+                    settings=self.callbacks[function_type][function_name]["settings"],
+                )
+                self._dispatch_table_stale = False
 
     def register_event_command(
         self,
@@ -876,12 +1582,87 @@ class Dispike(object):
                 else:
                     self.register(command=command)
 
+    def sync_commands(
+        self,
+        commands: typing.List[typing.Union[DiscordCommand, PerCommandRegistrationSettings]],
+        cache_path: str = ".dispike_commands.json",
+        delete_unknown: bool = True,
+        force: bool = False,
+        dry_run: bool = False,
+    ) -> SyncPlan:
+        """Sync commands with Discord, only sending what changed. See CommandSyncEngine.
+
+        When the commands match the hashes in ``cache_path``, no request is made at all.
+
+        Args:
+            commands (List[Union[DiscordCommand, PerCommandRegistrationSettings]]): Every command, for example ``collection.command_schemas()``.
+            cache_path (str, optional): Path of the hash cache file.
+            delete_unknown (bool, optional): Delete commands that exist on Discord but not locally. Defaults to True.
+            force (bool, optional): Ignore the cache and compare every scope with Discord.
+            dry_run (bool, optional): Only compute the plan.
+
+        Returns:
+            SyncPlan: What was (or, with dry_run, would be) created, patched and deleted.
+        """
+        if self._registrator == False:
+            raise BotTokenNotProvided("Syncing commands")
+        return CommandSyncEngine(
+            self, cache_path=cache_path, delete_unknown=delete_unknown
+        ).sync(commands, force=force, dry_run=dry_run)
+
+    async def async_sync_commands(
+        self,
+        commands: typing.List[typing.Union[DiscordCommand, PerCommandRegistrationSettings]],
+        cache_path: str = ".dispike_commands.json",
+        delete_unknown: bool = True,
+        force: bool = False,
+        dry_run: bool = False,
+    ) -> SyncPlan:
+        """Async version of ``sync_commands``."""
+        if self._registrator == False:
+            raise BotTokenNotProvided("Syncing commands")
+        return await CommandSyncEngine(
+            self, cache_path=cache_path, delete_unknown=delete_unknown
+        ).async_sync(commands, force=force, dry_run=dry_run)
+
+    async def async_fan_out_to_guilds(
+        self,
+        commands: typing.List[typing.Union[DiscordCommand, PerCommandRegistrationSettings]] = None,
+        permissions: typing.Dict[
+            typing.Any,
+            typing.List[typing.Tuple[typing.Union[int, IncomingApplicationCommand], NewApplicationPermission]],
+        ] = None,
+        max_concurrency: int = 10,
+    ) -> FanOutReport:
+        """Register commands and set command permissions across many guilds concurrently.
+
+        Up to ``max_concurrency`` guilds are handled at once, requests of one guild are sent one
+        after another (registrations first), and every request goes through the rate limiter.
+        A failure is recorded in the report and does not stop other requests.
+
+        Args:
+            commands (List[Union[DiscordCommand, PerCommandRegistrationSettings]], optional): Commands to register, PerCommandRegistrationSettings with a guild id are registered in that guild, the rest globally.
+            permissions (Dict[Any, List[Tuple[Union[int, IncomingApplicationCommand], NewApplicationPermission]]], optional): ``{guild_id: [(command_id, new_permissions), ...]}``
+            max_concurrency (int, optional): Guilds handled at once. Defaults to 10.
+
+        Returns:
+            FanOutReport: Results per guild, see ``.failed_guilds``.
+        """
+        if self._registrator == False:
+            raise BotTokenNotProvided("Registrating commands")
+        _operations = register_operations(self, commands or [])
+        for guild_id, guild_operations in permission_operations(
+            self, permissions or {}
+        ).items():
+            _operations.setdefault(guild_id, []).extend(guild_operations)
+        return await fan_out(_operations, max_concurrency=max_concurrency)
+
     def clear_all_event_callbacks(self, event_type: "EventTypes" = None):
         """Clears all event callbacks."""
         if not event_type:
             self.callbacks = {"command": {}, "component": {}}
         else:
-            self.callbacks[event_type] = {}
+            self._callbacks[event_type] = {}
 
     @staticmethod
     def _detect_functions_with_event_decorator(collection: EventCollection):
@@ -1,22 +1,69 @@
 from loguru import logger
-from fastapi.responses import JSONResponse, Response
-from fastapi import HTTPException
+from fastapi.responses import JSONResponse
 from nacl.signing import VerifyKey
 from nacl.exceptions import BadSignatureError
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
 
+import asyncio
+import functools
+import time
 import typing
 
+from ..helper.cache import TTLCache
+from ..helper.logging_control import get_subsystem_logger, LoggingSubsystems
+from ..helper.tracing import maybe_span
+
 if typing.TYPE_CHECKING:
     from fastapi import FastAPI  # pragma: no cover
+    from ..helper.metrics import Metrics  # pragma: no cover
+    from ..helper.tracing import Tracer  # pragma: no cover
+
+
+_log = get_subsystem_logger(LoggingSubsystems.VERIFICATION)
+
+# asyncio.get_running_loop is Python 3.7+, inside a coroutine get_event_loop returns the same loop.
+_get_running_loop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)
+
+_SIGNATURE_HEADER = b"x-signature-ed25519"
+_TIMESTAMP_HEADER = b"x-signature-timestamp"
+
+
+class VerificationMode(str, Enum):
+    """Where signature verification runs.
+
+    INLINE verifies on the event loop, POOL hands verification to a bounded thread pool
+    (PyNaCl releases the GIL while verifying).
+    """
 
+    INLINE = "inline"
+    POOL = "pool"
 
-class DiscordVerificationMiddleware(BaseHTTPMiddleware):
+
+class _ReplayEntry(object):
+    """A verified delivery remembered by the replay cache, plus the response it produced."""
+
+    __slots__ = ("timestamp", "body", "response")
+
+    def __init__(self, timestamp: str, body: bytes):
+        self.timestamp = timestamp
+        self.body = body
+        # resolves to (status, headers, body), or None if the original request failed.
+        self.response = _get_running_loop().create_future()
+
+    def matches(self, timestamp: str, body: bytes) -> bool:
+        return self.timestamp == timestamp and self.body == body
+
+
+class DiscordVerificationMiddleware(object):
 
     """Main middleware for verifying requests are signed by Discord.
     Per documentation.
 
+    This is a pure ASGI middleware, the request body is read exactly once,
+    verified and then placed in the ASGI scope (``scope["state"]["_cached_body"]``)
+    where it is available to endpoints as ``request.state._cached_body``.
+
     You should not need to import this directly.
     """
 
@@ -26,14 +73,32 @@ class DiscordVerificationMiddleware(BaseHTTPMiddleware):
         *,
         client_public_key: str,
         testing_skip_verification_of_key: bool = False,
+        verification_mode: VerificationMode = VerificationMode.INLINE,
+        verification_workers: int = None,
+        verification_max_pending: int = 64,
+        signature_timestamp_tolerance: float = None,
+        replay_cache_size: int = 0,
+        replay_cache_ttl: float = None,
+        verification_executor: ThreadPoolExecutor = None,
+        metrics: "Metrics" = None,
+        tracer: "Tracer" = None,
     ):
         """Initialize middleware
 
         Args:
             app (FastAPI): A valid, initialized FastAPI object
             client_public_key (str): a valid client public key
+            verification_mode (VerificationMode, optional): Verify inline on the event loop, or in a thread pool. Defaults to inline.
+            verification_workers (int, optional): Thread pool size when using the pool mode. Defaults to the ThreadPoolExecutor default.
+            verification_max_pending (int, optional): Maximum verifications queued or running in the pool before requests are rejected with 503.
+            signature_timestamp_tolerance (float, optional): Reject requests whose X-Signature-Timestamp is more than this many seconds away from now. Disabled by default.
+            replay_cache_size (int, optional): Remember this many verified deliveries, duplicates get the original response back instead of running the handler again. Disabled (0) by default.
+            replay_cache_ttl (float, optional): Seconds a delivery is remembered. Defaults to signature_timestamp_tolerance, or 300 seconds. Never shorter than signature_timestamp_tolerance.
+            verification_executor (ThreadPoolExecutor, optional): Thread pool to verify in when using the pool mode, shut down by its owner. Defaults to a new pool of verification_workers threads.
+            metrics (Metrics, optional): Metrics to record verification latency and failures to. Its path is passed through without verification.
+            tracer (Tracer, optional): Tracer to open the span of every interaction with, verification is its first child span.
         """
-        super().__init__(app)
+        self.app = app
         self._client_public_key = client_public_key
         logger.info(f"pub: {self._client_public_key}")
         self._verification_key = VerifyKey(bytes.fromhex(self._client_public_key))
@@ -43,6 +108,37 @@ class DiscordVerificationMiddleware(BaseHTTPMiddleware):
                 "Disabling verification of key on middleware!"
             )  # pragma: no cover
 
+        self._verification_mode = VerificationMode(verification_mode)
+        self._verification_max_pending = verification_max_pending
+        self._pending_verifications = 0
+        if self._verification_mode == VerificationMode.POOL:
+            if verification_max_pending < 1:
+                raise ValueError("verification_max_pending must be at least 1.")
+            self._verification_executor = verification_executor or ThreadPoolExecutor(
+                max_workers=verification_workers,
+                thread_name_prefix="dispike-verification",
+            )
+        else:
+            self._verification_executor = None
+
+        self._signature_timestamp_tolerance = signature_timestamp_tolerance
+        if replay_cache_size:
+            if replay_cache_ttl is None:
+                replay_cache_ttl = signature_timestamp_tolerance or 300.0
+            elif signature_timestamp_tolerance and replay_cache_ttl < signature_timestamp_tolerance:
+                # a delivery forgotten before its timestamp expires could be replayed and accepted.
+                _log.warning(
+                    "replay_cache_ttl ({}s) is shorter than signature_timestamp_tolerance, using {}s.",
+                    replay_cache_ttl,
+                    signature_timestamp_tolerance,
+                )
+                replay_cache_ttl = signature_timestamp_tolerance
+            self._replay_cache = TTLCache(maxsize=replay_cache_size, ttl=replay_cache_ttl)
+        else:
+            self._replay_cache = None
+        self._metrics = metrics
+        self._tracer = tracer
+
     def verify_request(self, passed_signature: str, timestamp: str, body):
         """Verifies keys.
 
@@ -56,7 +152,7 @@ class DiscordVerificationMiddleware(BaseHTTPMiddleware):
         """
 
         if self._skip_verification_of_key:
-            logger.warning("Verification is disabled! Please re-enable by passing middleware_testing_skip_verification_key_request to False in the main Dispike instance, or set testing_skip_verification_of_key to False.")
+            _log.warning("Verification is disabled! Please re-enable by passing middleware_testing_skip_verification_key_request to False in the main Dispike instance, or set testing_skip_verification_of_key to False.")
             return True, 200
 
         try:
@@ -64,51 +160,255 @@ class DiscordVerificationMiddleware(BaseHTTPMiddleware):
             self._verification_key.verify(message, bytes.fromhex(passed_signature))
             return True, 200
         except BadSignatureError:
-            logger.error("bad signature")
+            _log.error("bad signature")
             return False, 401
         except Exception:
-            logger.exception("exception on verifying request")
+            _log.exception("exception on verifying request")
             return False, 500
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: typing.Callable[[Request], typing.Awaitable[Response]],
-    ) -> Response:
+    async def _verify_off_loop(
+        self, passed_signature: str, timestamp: str, body: bytes
+    ) -> typing.Tuple[bool, int]:
+        """Runs ``verify_request`` in the verification pool.
+
+        Fails fast with a 503 if the pool already has ``verification_max_pending``
+        verifications queued or running.
+
+        Returns:
+            tuple: bool, status_code
+        """
+        if self._pending_verifications >= self._verification_max_pending:
+            _log.warning("verification pool saturated, rejecting request.")
+            return False, 503
+
+        self._pending_verifications += 1
+        try:
+            return await _get_running_loop().run_in_executor(
+                self._verification_executor,
+                functools.partial(
+                    self.verify_request,
+                    passed_signature=passed_signature,
+                    timestamp=timestamp,
+                    body=body,
+                ),
+            )
+        finally:
+            self._pending_verifications -= 1
+
+    def is_timestamp_fresh(self, timestamp: str) -> bool:
+        """Checks X-Signature-Timestamp against the configured tolerance.
+
+        Args:
+            timestamp (str): timestamp provided by discord in headers
+
+        Returns:
+            bool: True if fresh (or if the freshness check is disabled).
+        """
+        if self._signature_timestamp_tolerance is None:
+            return True
+        try:
+            return (
+                abs(time.time() - float(timestamp))
+                <= self._signature_timestamp_tolerance
+            )
+        except ValueError:
+            return False
+
+    @staticmethod
+    async def _send_cached_response(
+        response: typing.Tuple[int, list, bytes], send: typing.Callable
+    ):
+        _status, _headers, _body = response
+        await send({"type": "http.response.start", "status": _status, "headers": _headers})
+        await send({"type": "http.response.body", "body": _body, "more_body": False})
+
+    @staticmethod
+    def _capture_response(
+        send: typing.Callable,
+    ) -> typing.Tuple[typing.Callable, dict]:
+        """Wraps send so the response can be stored in the replay cache.
+
+        Returns:
+            tuple: the wrapped send, and a dict which is filled as the response is sent.
+        """
+        _captured = {"status": None, "headers": [], "body": []}
+
+        async def _send(message: dict):
+            if message["type"] == "http.response.start":
+                _captured["status"] = message["status"]
+                _captured["headers"] = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                _captured["body"].append(message.get("body", b""))
+            await send(message)
+
+        return _send, _captured
+
+    @staticmethod
+    def _find_verification_headers(
+        scope: dict,
+    ) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
+        """Pulls the signature and timestamp headers out of a raw ASGI scope.
+
+        Args:
+            scope (dict): ASGI connection scope
+
+        Returns:
+            tuple: signature, timestamp (either may be None if missing)
+        """
+        _signature, _timestamp = None, None
+        for header_name, header_value in scope.get("headers", ()):
+            header_name = header_name.lower()
+            if header_name == _SIGNATURE_HEADER:
+                _signature = header_value.decode("latin-1")
+            elif header_name == _TIMESTAMP_HEADER:
+                _timestamp = header_value.decode("latin-1")
+        return _signature, _timestamp
+
+    @staticmethod
+    async def _read_body(receive: typing.Callable) -> typing.Optional[bytes]:
+        """Reads the full request body from the ASGI receive channel.
+
+        Args:
+            receive (typing.Callable): ASGI receive callable
+
+        Returns:
+            bytes: The body, or None if the client disconnected before finishing.
+        """
+        _chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            _chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(_chunks)
+
+    def _count_failure(self, status_code: int):
+        if self._metrics is not None:
+            self._metrics.inc("dispike_verification_failures_total", str(status_code))
+
+    async def __call__(
+        self, scope: dict, receive: typing.Callable, send: typing.Callable
+    ) -> None:
         """Intercepts, verifies and dispatches request.
 
         Args:
-            request (Request): Request object
-            call_next (typing.Callable[[Request], typing.Awaitable[Response]]): next API endpoint
+            scope (dict): ASGI connection scope
+            receive (typing.Callable): ASGI receive callable
+            send (typing.Callable): ASGI send callable
         """
-        logger.debug("intercepting request.")
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        if request.url.path == "/ping":
-            logger.info("ping, forwarding")
-            return await call_next(request)
+        _log.debug("intercepting request.")
 
-        try:
-            get_signature = request.headers["X-Signature-Ed25519"]
-            get_timestamp = request.headers["X-Signature-Timestamp"]
+        if scope["path"] == "/ping":
+            _log.info("ping, forwarding")
+            await self.app(scope, receive, send)
+            return
+        if self._metrics is not None and scope["path"] == self._metrics.path:
+            await self.app(scope, receive, send)
+            return
 
-            # https://github.com/encode/starlette/issues/495
-            # this is bugged. calling request body will cause a timeout when the next endpoint tries to .body too
-            get_body = await request.body()
+        # when the request arrived, the interaction's time budget is measured from here.
+        scope.setdefault("state", {})["_received_at"] = (time.time(), time.monotonic())
 
-            # so we need to store the body in the request state.
-            request.state._cached_body = get_body
-        except Exception:
-            # logger.exception("error getting needed data for verification")
-            return JSONResponse(
+        if self._tracer is None:
+            await self._verify_and_forward(scope, receive, send)
+            return
+        with self._tracer.span("interaction", path=scope["path"]):
+            await self._verify_and_forward(scope, receive, send)
+
+    async def _verify_and_forward(
+        self, scope: dict, receive: typing.Callable, send: typing.Callable
+    ) -> None:
+        """Verifies the request and forwards it to the application, or responds with an error."""
+        get_signature, get_timestamp = self._find_verification_headers(scope)
+        if get_signature is None or get_timestamp is None:
+            self._count_failure(400)
+            await JSONResponse(
                 status_code=400, content={"error_message": "Incorrect request."}
+            )(scope, receive, send)
+            return
+
+        if not self.is_timestamp_fresh(get_timestamp):
+            _log.warning("rejecting request with a stale signature timestamp.")
+            self._count_failure(401)
+            await JSONResponse(status_code=401)(scope, receive, send)
+            return
+
+        get_body = await self._read_body(receive)
+        if get_body is None:
+            return
+
+        _replay_key = None
+        if self._replay_cache is not None:
+            _replay_key = (scope["path"], get_signature)
+            _seen_delivery = self._replay_cache.get(_replay_key)  # type: _ReplayEntry
+            if _seen_delivery is not None and _seen_delivery.matches(
+                get_timestamp, get_body
+            ):
+                # identical signature, timestamp and body as an already verified delivery.
+                _cached_response = await asyncio.shield(_seen_delivery.response)
+                if _cached_response is not None:
+                    _log.info("duplicate delivery, replaying the original response.")
+                    await self._send_cached_response(_cached_response, send)
+                    return
+
+        _started = time.perf_counter()
+        with maybe_span(self._tracer, "verification") as _span:
+            if self._verification_executor is None:
+                _status_bool, _status_code = self.verify_request(
+                    passed_signature=get_signature, timestamp=get_timestamp, body=get_body
+                )
+            else:
+                _status_bool, _status_code = await self._verify_off_loop(
+                    passed_signature=get_signature, timestamp=get_timestamp, body=get_body
+                )
+            if _span is not None:
+                _span.set_attribute("status", _status_code)
+        if self._metrics is not None:
+            self._metrics.observe(
+                "dispike_stage_duration_seconds", time.perf_counter() - _started, "verification"
             )
+        if not _status_bool:
+            self._count_failure(_status_code)
+            await JSONResponse(status_code=_status_code)(scope, receive, send)
+            return
 
-        _status_bool, _status_code = self.verify_request(
-            passed_signature=get_signature, timestamp=get_timestamp, body=get_body
-        )
-        if _status_bool:
-            logger.info("approved request. forwarding call")
-            _dispatch_request = await call_next(request)
-            return _dispatch_request
+        # Hand the verified body to the endpoint through the scope, so it never has to be read twice.
+        scope.setdefault("state", {})["_cached_body"] = get_body
 
-        return JSONResponse(status_code=_status_code)
+        _body_sent = False
+
+        async def _replay_body() -> dict:
+            nonlocal _body_sent
+            if not _body_sent:
+                _body_sent = True
+                return {"type": "http.request", "body": get_body, "more_body": False}
+            return await receive()
+
+        _log.info("approved request. forwarding call")
+        if _replay_key is None:
+            await self.app(scope, _replay_body, send)
+            return
+
+        _delivery = _ReplayEntry(get_timestamp, get_body)
+        self._replay_cache.set(_replay_key, _delivery)
+        _send, _captured = self._capture_response(send)
+        _response = None
+        try:
+            await self.app(scope, _replay_body, _send)
+            if _captured["status"] is not None and _captured["status"] < 500:
+                _response = (
+                    _captured["status"],
+                    _captured["headers"],
+                    b"".join(_captured["body"]),
+                )
+        finally:
+            if _response is None:
+                # let a later duplicate run the handler again instead of replaying a failure.
+                self._replay_cache.pop(_replay_key)
+            _delivery.response.set_result(_response)
@@ -0,0 +1,2 @@
+# where every outgoing request is sent unless Dispike is given another ``api_base_url``.
+DEFAULT_API_BASE_URL = "https://discord.com/api/v8"
@@ -0,0 +1,83 @@
+import time
+import typing
+
+import httpcore
+import httpx
+
+from .ratelimit import _request_path, route_for
+
+if typing.TYPE_CHECKING:
+    from ..helper.metrics import Metrics
+
+
+_HTTP_REQUEST_DURATION = "dispike_http_request_duration_seconds"
+
+
+class InstrumentedAsyncTransport(httpcore.AsyncHTTPTransport):
+    """Wraps an async httpx transport, recording the latency of every request by route."""
+
+    def __init__(self, transport: httpcore.AsyncHTTPTransport, metrics: "Metrics"):
+        self._transport = transport
+        self.metrics = metrics
+
+    async def arequest(self, method, url, headers=None, stream=None, ext=None):
+        _route, _ = route_for(method.decode("ascii"), _request_path(url))
+        _started = time.perf_counter()
+        try:
+            _response = await self._transport.arequest(
+                method, url, headers=headers, stream=stream, ext=ext
+            )
+        except Exception:
+            self.metrics.observe(_HTTP_REQUEST_DURATION, time.perf_counter() - _started, _route, "error")
+            raise
+        self.metrics.observe(_HTTP_REQUEST_DURATION, time.perf_counter() - _started, _route, str(_response[0]))
+        return _response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class InstrumentedSyncTransport(httpcore.SyncHTTPTransport):
+    """Wraps a sync httpx transport, recording the latency of every request by route."""
+
+    def __init__(self, transport: httpcore.SyncHTTPTransport, metrics: "Metrics"):
+        self._transport = transport
+        self.metrics = metrics
+
+    def request(self, method, url, headers=None, stream=None, ext=None):
+        _route, _ = route_for(method.decode("ascii"), _request_path(url))
+        _started = time.perf_counter()
+        try:
+            _response = self._transport.request(
+                method, url, headers=headers, stream=stream, ext=ext
+            )
+        except Exception:
+            self.metrics.observe(_HTTP_REQUEST_DURATION, time.perf_counter() - _started, _route, "error")
+            raise
+        self.metrics.observe(_HTTP_REQUEST_DURATION, time.perf_counter() - _started, _route, str(_response[0]))
+        return _response
+
+    def close(self):
+        self._transport.close()
+
+
+def install_metrics(
+    client: typing.Union[httpx.Client, httpx.AsyncClient], metrics: "Metrics"
+) -> typing.Union[httpx.Client, httpx.AsyncClient]:
+    """Record the latency of every request of an httpx client.
+
+    Install before ``install_rate_limiter`` and ``install_retry_policy``, so every attempt
+    is recorded with its own status and time spent waiting for a rate limit is not.
+
+    Args:
+        client (Union[httpx.Client, httpx.AsyncClient]): The client, its transport gets wrapped.
+        metrics (Metrics): Metrics to record to.
+
+    Returns:
+        Union[httpx.Client, httpx.AsyncClient]: The same client.
+    """
+    if isinstance(client, httpx.AsyncClient):
+        client._transport = InstrumentedAsyncTransport(client._transport, metrics)
+    else:
+        client._transport = InstrumentedSyncTransport(client._transport, metrics)
+    return client
@@ -0,0 +1,414 @@
+import asyncio
+import json
+import re
+import threading
+import time
+import typing
+
+import httpcore
+import httpx
+
+from ..helper.logging_control import get_subsystem_logger, LoggingSubsystems
+
+
+_log = get_subsystem_logger(LoggingSubsystems.NETWORK)
+
+_API_PREFIX = re.compile(r"^/api/v\d+")
+# path segments whose value separates buckets, see "major parameters" in the Discord docs.
+_MAJOR_PARAMETERS = {"channels", "guilds", "webhooks"}
+_SNOWFLAKE = re.compile(r"^\d{15,20}$")
+
+# while the first request of a bucket is in flight, others check back this often.
+_PROBE_POLL_INTERVAL = 0.05
+
+
+def route_for(method: str, path: str) -> typing.Tuple[str, tuple]:
+    """Return the route and major parameters for a request.
+
+    Requests with the same route share a Discord rate limit bucket, unless their
+    major parameters (channel, guild or webhook) differ.
+
+    Args:
+        method (str): HTTP method
+        path (str): URL path, with or without the ``/api/v8`` prefix.
+
+    Returns:
+        Tuple[str, tuple]: e.g. ``("PATCH /webhooks/:webhooks/:token/messages/:id", ("APPID", "TOKEN"))``
+    """
+    _segments = _API_PREFIX.sub("", path).strip("/").split("/")
+    _route = []
+    _major = []
+    _previous = None
+    for index, segment in enumerate(_segments):
+        if _previous in _MAJOR_PARAMETERS:
+            _route.append(f":{_previous}")
+            _major.append(segment)
+        elif _previous is not None and _segments[index - 2 : index - 1] == ["webhooks"]:
+            # the webhook token is a major parameter as well.
+            _route.append(":token")
+            _major.append(segment)
+        elif _SNOWFLAKE.match(segment) or (
+            _previous in ("applications", "commands", "messages")
+            and segment != "@original"
+            and segment != "permissions"
+        ):
+            _route.append(":id")
+        else:
+            _route.append(segment)
+        _previous = segment
+    return f"{method.upper()} /{'/'.join(_route)}", tuple(_major)
+
+
+class RateLimitBucket(object):
+    """State of one Discord rate limit bucket, learned from response headers.
+
+    Attributes:
+        limit (int): Requests allowed per window, None until Discord tells us.
+        remaining (int): Requests left in the current window, None until Discord tells us.
+        reset_at (float): ``time.monotonic`` value at which the window resets.
+        unlimited (bool): Responses for this bucket carry no rate limit headers.
+        in_flight (int): Requests sent whose response has not been seen yet.
+    """
+
+    __slots__ = ("limit", "remaining", "reset_at", "probing", "unlimited", "in_flight")
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset_at = 0.0
+        self.probing = False
+        self.unlimited = False
+        self.in_flight = 0
+
+    @property
+    def known(self) -> bool:
+        return self.unlimited or self.remaining is not None
+
+    def __repr__(self) -> str:
+        return f"<RateLimitBucket {self.remaining}/{self.limit} reset_at={self.reset_at:.3f}>"
+
+
+class RateLimiter(object):
+    """Discord rate limit bookkeeping shared by every client of a Dispike instance.
+
+    Before a request is sent, ``acquire`` either reserves a slot in the request's bucket
+    or says how long to wait. Responses are fed back through ``update``, which learns
+    bucket limits from the ``X-RateLimit-*`` headers and handles 429s, including the
+    global limit. The first request to an unknown bucket is sent alone, so a burst
+    against a fresh bucket does not end up as a burst of 429s.
+
+    Thread-safe, the state is shared between the sync and async clients.
+
+    Attributes:
+        max_retries (int): How many times a request that got a 429 is sent again.
+        global_limit_per_second (int): Requests allowed per second across all buckets. None disables it.
+        rate_limited (int): Number of 429 responses seen.
+        waited (float): Seconds requests spent waiting for a bucket or the global limit.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        global_limit_per_second: int = 50,
+        timer: typing.Callable[[], float] = time.monotonic,
+    ):
+        """Initialize a rate limiter.
+
+        Args:
+            max_retries (int, optional): Times a rate limited (429) request is sent again before giving up.
+            global_limit_per_second (int, optional): Discord's global request limit, None to disable.
+            timer (typing.Callable[[], float], optional): Clock, mainly for testing.
+        """
+        self.max_retries = max_retries
+        self.global_limit_per_second = global_limit_per_second
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._route_hashes = {}  # type: typing.Dict[str, str]
+        self._buckets = {}  # type: typing.Dict[tuple, RateLimitBucket]
+        self._global_reset_at = 0.0
+        self._window_started_at = 0.0
+        self._window_count = 0
+        self.rate_limited = 0
+        self.waited = 0.0
+
+    def _bucket(self, route: str, major: tuple) -> RateLimitBucket:
+        _key = (self._route_hashes.get(route, route), major)
+        _bucket = self._buckets.get(_key)
+        if _bucket is None:
+            _bucket = self._buckets[_key] = RateLimitBucket()
+        return _bucket
+
+    def bucket(self, method: str, path: str) -> RateLimitBucket:
+        """Return the bucket a request would be counted against."""
+        with self._lock:
+            return self._bucket(*route_for(method, path))
+
+    def _global_delay(self, now: float) -> float:
+        if self._global_reset_at > now:
+            return self._global_reset_at - now
+        if self.global_limit_per_second is None:
+            return 0.0
+        if now - self._window_started_at >= 1:
+            self._window_started_at = now
+            self._window_count = 0
+        if self._window_count >= self.global_limit_per_second:
+            return self._window_started_at + 1 - now
+        return 0.0
+
+    def acquire(
+        self, route: str, major: tuple, count_global: bool = True
+    ) -> typing.Tuple[float, bool]:
+        """Reserve a request slot.
+
+        Args:
+            route (str): Route, see ``route_for``
+            major (tuple): Major parameters, see ``route_for``
+            count_global (bool, optional): Whether the request counts towards the global limit. Requests without a bot token (interaction webhooks) do not.
+
+        Returns:
+            Tuple[float, bool]: Seconds to wait before trying again (0 if a slot was reserved), and
+            whether this request is probing an unknown bucket (and must be reported with ``update``).
+        """
+        with self._lock:
+            _now = self._timer()
+            _bucket = self._bucket(route, major)
+            _delay = self._global_delay(_now) if count_global else 0.0
+            if _delay or _bucket.unlimited:
+                pass
+            elif _bucket.known:
+                if _bucket.reset_at <= _now:
+                    # the window is over, but requests sent since count towards the next one.
+                    # Without a known limit, let one request through to learn the new state.
+                    _limit = 1 if _bucket.limit is None else _bucket.limit
+                    _bucket.remaining = max(0, _limit - _bucket.in_flight)
+                if _bucket.remaining <= 0:
+                    _delay = max(_bucket.reset_at - _now, _PROBE_POLL_INTERVAL)
+            elif _bucket.probing:
+                _delay = _PROBE_POLL_INTERVAL
+            if _delay:
+                self.waited += _delay
+                return _delay, False
+
+            if count_global:
+                self._window_count += 1
+            if _bucket.unlimited:
+                return 0.0, False
+            _bucket.in_flight += 1
+            if _bucket.known:
+                _bucket.remaining -= 1
+                return 0.0, False
+            _bucket.probing = True
+            return 0.0, True
+
+    def release(self, route: str, major: tuple):
+        """Give back a reserved slot when the request failed without a response."""
+        with self._lock:
+            _bucket = self._bucket(route, major)
+            _bucket.probing = False
+            _bucket.in_flight = max(0, _bucket.in_flight - 1)
+
+    def update(
+        self,
+        route: str,
+        major: tuple,
+        status_code: int,
+        headers: typing.Mapping[str, str],
+        body: bytes = b"",
+    ) -> typing.Optional[float]:
+        """Learn from a response.
+
+        Args:
+            route (str): Route, see ``route_for``
+            major (tuple): Major parameters, see ``route_for``
+            status_code (int): Response status code
+            headers (Mapping[str, str]): Response headers (lowercase keys).
+            body (bytes, optional): Response body, only read for 429 responses.
+
+        Returns:
+            Optional[float]: For a 429, seconds to wait before sending the request again.
+        """
+        with self._lock:
+            _now = self._timer()
+            _bucket = self._bucket(route, major)
+            _bucket.probing = False
+            _bucket.in_flight = max(0, _bucket.in_flight - 1)
+
+            _hash = headers.get("x-ratelimit-bucket")
+            if _hash is not None and self._route_hashes.get(route) != _hash:
+                # the bucket learned under the route name now lives under Discord's bucket hash.
+                self._buckets.pop((self._route_hashes.get(route, route), major), None)
+                self._route_hashes[route] = _hash
+                _bucket = self._buckets.setdefault((_hash, major), _bucket)
+
+            if "x-ratelimit-remaining" in headers:
+                _bucket.unlimited = False
+                # the headers do not count requests still in flight, which may be
+                # answered by the time another request of this bucket arrives.
+                _bucket.remaining = max(0, int(headers["x-ratelimit-remaining"]) - _bucket.in_flight)
+                if "x-ratelimit-limit" in headers:
+                    _bucket.limit = int(headers["x-ratelimit-limit"])
+                if "x-ratelimit-reset-after" in headers:
+                    _bucket.reset_at = _now + float(headers["x-ratelimit-reset-after"])
+            elif status_code != 429 and _bucket.remaining is None:
+                _bucket.unlimited = True
+
+            if status_code != 429:
+                return None
+
+            self.rate_limited += 1
+            _retry_after, _global = self._parse_rate_limited(headers, body)
+            if _global:
+                _log.warning("hit the global rate limit, waiting {}s", _retry_after)
+                self._global_reset_at = _now + _retry_after
+            else:
+                _log.warning("rate limited on {} {}, waiting {}s", route, major, _retry_after)
+                _bucket.unlimited = False
+                _bucket.remaining = 0
+                _bucket.reset_at = max(_bucket.reset_at, _now + _retry_after)
+                if _bucket.limit is None:
+                    _bucket.limit = 1
+            return _retry_after
+
+    @staticmethod
+    def _parse_rate_limited(
+        headers: typing.Mapping[str, str], body: bytes
+    ) -> typing.Tuple[float, bool]:
+        _global = headers.get("x-ratelimit-global", "").lower() == "true"
+        _retry_after = None
+        try:
+            _body = json.loads(body) if body else {}
+            _retry_after = _body.get("retry_after")
+            _global = _global or bool(_body.get("global"))
+        except (ValueError, AttributeError):
+            pass
+        if _retry_after is None:
+            _retry_after = headers.get("retry-after") or headers.get(
+                "x-ratelimit-reset-after", 1
+            )
+        return float(_retry_after), _global
+
+    @property
+    def stats(self) -> dict:
+        """Return counters and the number of known buckets."""
+        return {
+            "buckets": len(self._buckets),
+            "rate_limited": self.rate_limited,
+            "waited": self.waited,
+        }
+
+
+def _decode_headers(headers: typing.List[typing.Tuple[bytes, bytes]]) -> dict:
+    return {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in headers}
+
+
+def _request_path(url: tuple) -> str:
+    return url[3].split(b"?", 1)[0].decode("ascii")
+
+
+def _is_authorized(headers: typing.Optional[typing.List[typing.Tuple[bytes, bytes]]]) -> bool:
+    return any(key.lower() == b"authorization" for key, _ in headers or ())
+
+
+class RateLimitedAsyncTransport(httpcore.AsyncHTTPTransport):
+    """Wraps an async httpx transport, waiting for rate limits and resending 429s."""
+
+    # statuses this transport already resends, outer retrying transports return them as is.
+    handled_statuses = frozenset({429})
+
+    def __init__(self, transport: httpcore.AsyncHTTPTransport, rate_limiter: RateLimiter):
+        self._transport = transport
+        self.rate_limiter = rate_limiter
+
+    async def arequest(self, method, url, headers=None, stream=None, ext=None):
+        _route, _major = route_for(method.decode("ascii"), _request_path(url))
+        _count_global = _is_authorized(headers)
+        _attempt = 0
+        while True:
+            _delay, _ = self.rate_limiter.acquire(_route, _major, _count_global)
+            if _delay:
+                await asyncio.sleep(_delay)
+                continue
+            try:
+                _status, _headers, _stream, _ext = await self._transport.arequest(
+                    method, url, headers=headers, stream=stream, ext=ext
+                )
+            except BaseException:
+                self.rate_limiter.release(_route, _major)
+                raise
+
+            _body = b""
+            if _status == 429:
+                _body = b"".join([chunk async for chunk in _stream])
+                await _stream.aclose()
+                _stream = httpcore.PlainByteStream(_body)
+            _retry_after = self.rate_limiter.update(
+                _route, _major, _status, _decode_headers(_headers), _body
+            )
+            if _retry_after is None or _attempt >= self.rate_limiter.max_retries:
+                return _status, _headers, _stream, _ext
+            _attempt += 1
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class RateLimitedSyncTransport(httpcore.SyncHTTPTransport):
+    """Wraps a sync httpx transport, waiting for rate limits and resending 429s."""
+
+    # statuses this transport already resends, outer retrying transports return them as is.
+    handled_statuses = frozenset({429})
+
+    def __init__(self, transport: httpcore.SyncHTTPTransport, rate_limiter: RateLimiter):
+        self._transport = transport
+        self.rate_limiter = rate_limiter
+
+    def request(self, method, url, headers=None, stream=None, ext=None):
+        _route, _major = route_for(method.decode("ascii"), _request_path(url))
+        _count_global = _is_authorized(headers)
+        _attempt = 0
+        while True:
+            _delay, _ = self.rate_limiter.acquire(_route, _major, _count_global)
+            if _delay:
+                time.sleep(_delay)
+                continue
+            try:
+                _status, _headers, _stream, _ext = self._transport.request(
+                    method, url, headers=headers, stream=stream, ext=ext
+                )
+            except BaseException:
+                self.rate_limiter.release(_route, _major)
+                raise
+
+            _body = b""
+            if _status == 429:
+                _body = b"".join(_stream)
+                _stream.close()
+                _stream = httpcore.PlainByteStream(_body)
+            _retry_after = self.rate_limiter.update(
+                _route, _major, _status, _decode_headers(_headers), _body
+            )
+            if _retry_after is None or _attempt >= self.rate_limiter.max_retries:
+                return _status, _headers, _stream, _ext
+            _attempt += 1
+
+    def close(self):
+        self._transport.close()
+
+
+def install_rate_limiter(
+    client: typing.Union[httpx.Client, httpx.AsyncClient], rate_limiter: RateLimiter
+) -> typing.Union[httpx.Client, httpx.AsyncClient]:
+    """Route every request of an httpx client through a rate limiter.
+
+    Args:
+        client (Union[httpx.Client, httpx.AsyncClient]): The client, its transport gets wrapped.
+        rate_limiter (RateLimiter): Shared rate limiter.
+
+    Returns:
+        Union[httpx.Client, httpx.AsyncClient]: The same client.
+    """
+    if isinstance(client, httpx.AsyncClient):
+        client._transport = RateLimitedAsyncTransport(client._transport, rate_limiter)
+    else:
+        client._transport = RateLimitedSyncTransport(client._transport, rate_limiter)
+    return client
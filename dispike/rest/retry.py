@@ -0,0 +1,313 @@
+import asyncio
+import contextvars
+import random
+import time
+import typing
+
+import httpcore
+import httpx
+
+from ..helper.logging_control import get_subsystem_logger, LoggingSubsystems
+
+
+_log = get_subsystem_logger(LoggingSubsystems.NETWORK)
+
+# interaction tokens (and the webhooks using them) are valid for 15 minutes.
+INTERACTION_TOKEN_LIFETIME = 15 * 60
+
+# ``time.monotonic`` value after which retrying is pointless, set per interaction by the
+# ``/interactions`` endpoint. Deferred handlers and followups inherit it through the context,
+# except on Python 3.6 where asyncio tasks do not copy the context and only ``deadline`` applies.
+interaction_deadline = contextvars.ContextVar(
+    "dispike_interaction_deadline", default=None
+)  # type: contextvars.ContextVar[typing.Optional[float]]
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "PATCH", "DELETE"})
+
+# errors raised before the request could have reached Discord, safe to resend for any method.
+_NOT_SENT_ERRORS = (httpcore.ConnectError, httpcore.ConnectTimeout, httpcore.PoolTimeout)
+_TRANSIENT_ERRORS = (
+    httpcore.NetworkError,
+    httpcore.TimeoutException,
+    httpcore.RemoteProtocolError,
+)
+
+# a 500 usually means Discord could not handle this particular request, so it is not retried.
+DEFAULT_STATUS_RETRIES = {429: 2, 502: 3, 503: 3, 504: 3}
+
+
+def set_interaction_deadline(received_at: float = None) -> contextvars.Token:
+    """Bound retries in the current context by the lifetime of an interaction token.
+
+    Args:
+        received_at (float, optional): ``time.monotonic`` value the interaction arrived at. Defaults to now.
+
+    Returns:
+        contextvars.Token: Token to reset the deadline with.
+    """
+    if received_at is None:
+        received_at = time.monotonic()
+    return interaction_deadline.set(received_at + INTERACTION_TOKEN_LIFETIME)
+
+
+class RetryPolicy(object):
+    """When and how long to wait before resending a failed request to Discord.
+
+    Responses are retried per status code, with exponential backoff and full jitter
+    (a random delay between 0 and ``backoff_base * 2 ** attempt``, capped at
+    ``backoff_max``), or the ``Retry-After`` header when Discord sends one.
+
+    Only idempotent methods (GET, PUT, PATCH, DELETE) are resent after a server error
+    or a failed connection, since a POST may already have created a message. A POST is
+    only resent when Discord did not process it: a 429, or a connection that could not be
+    opened at all.
+
+    Retries stop at the deadline: ``deadline`` seconds after the first attempt, or the
+    expiry of the interaction token for requests made while handling an interaction.
+
+    Attributes:
+        status_retries (dict): Times each status code is retried, status codes not in here are returned at once.
+        error_retries (int): Times a request is resent after a connection error or timeout.
+        backoff_base (float): Backoff of the first retry, in seconds.
+        backoff_max (float): Longest backoff, in seconds.
+        deadline (float): Seconds after the first attempt after which nothing is resent.
+        retried (int): Number of requests resent.
+    """
+
+    def __init__(
+        self,
+        status_retries: typing.Dict[int, int] = None,
+        error_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        deadline: float = INTERACTION_TOKEN_LIFETIME,
+        idempotent_methods: typing.Iterable[str] = IDEMPOTENT_METHODS,
+        jitter: typing.Callable[[], float] = random.random,
+        timer: typing.Callable[[], float] = time.monotonic,
+    ):
+        """Initialize a retry policy.
+
+        Args:
+            status_retries (Dict[int, int], optional): Retries per status code. Defaults to 2 for 429, 3 for 502, 503 and 504.
+            error_retries (int, optional): Retries after connection errors and timeouts.
+            backoff_base (float, optional): Backoff of the first retry in seconds, doubled for every following one.
+            backoff_max (float, optional): Longest backoff in seconds.
+            deadline (float, optional): Seconds after the first attempt after which nothing is resent. Defaults to the 15 minute token lifetime.
+            idempotent_methods (Iterable[str], optional): Methods that may be resent after Discord might have processed them.
+            jitter (typing.Callable[[], float], optional): Returns a random number in [0, 1), mainly for testing.
+            timer (typing.Callable[[], float], optional): Clock, mainly for testing.
+        """
+        self.status_retries = dict(
+            DEFAULT_STATUS_RETRIES if status_retries is None else status_retries
+        )
+        self.error_retries = error_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self.idempotent_methods = frozenset(method.upper() for method in idempotent_methods)
+        self._jitter = jitter
+        self._timer = timer
+        self.retried = 0
+
+    def backoff(self, attempt: int) -> float:
+        """Jittered delay before retry number ``attempt`` (starting at 0)."""
+        return self._jitter() * min(self.backoff_max, self.backoff_base * 2 ** attempt)
+
+    def deadline_for(self, started_at: float) -> float:
+        """``time.monotonic`` value after which a request started at ``started_at`` is not resent."""
+        _deadline = started_at + self.deadline
+        _interaction_deadline = interaction_deadline.get()
+        if _interaction_deadline is not None:
+            return min(_deadline, _interaction_deadline)
+        return _deadline
+
+    def response_delay(
+        self,
+        method: str,
+        status_code: int,
+        headers: typing.Mapping[str, str],
+        attempt: int,
+        deadline: float,
+    ) -> typing.Optional[float]:
+        """Seconds to wait before resending a request that got ``status_code``, None to return the response.
+
+        Args:
+            method (str): Request method
+            status_code (int): Response status code
+            headers (Mapping[str, str]): Response headers (lowercase keys).
+            attempt (int): Retries already made for this status code.
+            deadline (float): See ``deadline_for``
+        """
+        if attempt >= self.status_retries.get(status_code, 0):
+            return None
+        if status_code != 429 and method.upper() not in self.idempotent_methods:
+            return None
+        _delay = self.backoff(attempt)
+        _retry_after = headers.get("retry-after")
+        if _retry_after is not None:
+            try:
+                _delay = max(_delay, float(_retry_after))
+            except ValueError:
+                pass
+        return self._within_deadline(_delay, deadline)
+
+    def error_delay(
+        self, method: str, error: Exception, attempt: int, deadline: float
+    ) -> typing.Optional[float]:
+        """Seconds to wait before resending a request that raised ``error``, None to re-raise it."""
+        if attempt >= self.error_retries or not isinstance(error, _TRANSIENT_ERRORS):
+            return None
+        if (
+            not isinstance(error, _NOT_SENT_ERRORS)
+            and method.upper() not in self.idempotent_methods
+        ):
+            return None
+        return self._within_deadline(self.backoff(attempt), deadline)
+
+    def _within_deadline(self, delay: float, deadline: float) -> typing.Optional[float]:
+        if self._timer() + delay >= deadline:
+            _log.debug("not retrying, the deadline would pass in {}s", delay)
+            return None
+        self.retried += 1
+        return delay
+
+
+async def _aclose_stream(stream):
+    # streams built by mocking libraries may not implement closing.
+    _aclose = getattr(stream, "aclose", None)
+    if _aclose is not None:
+        await _aclose()
+
+
+def _close_stream(stream):
+    _close = getattr(stream, "close", None)
+    if _close is not None:
+        _close()
+
+
+def _decode_headers(headers: typing.List[typing.Tuple[bytes, bytes]]) -> dict:
+    return {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in headers}
+
+
+def _handled_statuses(transport) -> frozenset:
+    # statuses resent by a transport further down the chain (the rate limiter owns 429s),
+    # retrying them here as well would multiply the attempts of both layers.
+    _handled = frozenset()
+    while transport is not None:
+        _handled |= getattr(transport, "handled_statuses", frozenset())
+        transport = getattr(transport, "_transport", None)
+    return _handled
+
+
+class RetryingAsyncTransport(httpcore.AsyncHTTPTransport):
+    """Wraps an async httpx transport, resending requests according to a RetryPolicy."""
+
+    def __init__(self, transport: httpcore.AsyncHTTPTransport, retry_policy: RetryPolicy):
+        self._transport = transport
+        self.retry_policy = retry_policy
+        self._handled_statuses = _handled_statuses(transport)
+
+    async def arequest(self, method, url, headers=None, stream=None, ext=None):
+        _method = method.decode("ascii")
+        _deadline = self.retry_policy.deadline_for(self.retry_policy._timer())
+        _status_attempts = {}
+        _error_attempts = 0
+        while True:
+            try:
+                _status, _headers, _stream, _ext = await self._transport.arequest(
+                    method, url, headers=headers, stream=stream, ext=ext
+                )
+            except Exception as error:
+                _delay = self.retry_policy.error_delay(
+                    _method, error, _error_attempts, _deadline
+                )
+                if _delay is None:
+                    raise
+                _log.warning("{} {} failed with {!r}, retrying in {}s", _method, url[3].decode("latin-1"), error, _delay)
+                _error_attempts += 1
+                await asyncio.sleep(_delay)
+                continue
+
+            if _status in self._handled_statuses:
+                return _status, _headers, _stream, _ext
+            _attempt = _status_attempts.get(_status, 0)
+            _delay = self.retry_policy.response_delay(
+                _method, _status, _decode_headers(_headers), _attempt, _deadline
+            )
+            if _delay is None:
+                return _status, _headers, _stream, _ext
+            _log.warning("{} {} returned {}, retrying in {}s", _method, url[3].decode("latin-1"), _status, _delay)
+            _status_attempts[_status] = _attempt + 1
+            await _aclose_stream(_stream)
+            await asyncio.sleep(_delay)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class RetryingSyncTransport(httpcore.SyncHTTPTransport):
+    """Wraps a sync httpx transport, resending requests according to a RetryPolicy."""
+
+    def __init__(self, transport: httpcore.SyncHTTPTransport, retry_policy: RetryPolicy):
+        self._transport = transport
+        self.retry_policy = retry_policy
+        self._handled_statuses = _handled_statuses(transport)
+
+    def request(self, method, url, headers=None, stream=None, ext=None):
+        _method = method.decode("ascii")
+        _deadline = self.retry_policy.deadline_for(self.retry_policy._timer())
+        _status_attempts = {}
+        _error_attempts = 0
+        while True:
+            try:
+                _status, _headers, _stream, _ext = self._transport.request(
+                    method, url, headers=headers, stream=stream, ext=ext
+                )
+            except Exception as error:
+                _delay = self.retry_policy.error_delay(
+                    _method, error, _error_attempts, _deadline
+                )
+                if _delay is None:
+                    raise
+                _log.warning("{} {} failed with {!r}, retrying in {}s", _method, url[3].decode("latin-1"), error, _delay)
+                _error_attempts += 1
+                time.sleep(_delay)
+                continue
+
+            if _status in self._handled_statuses:
+                return _status, _headers, _stream, _ext
+            _attempt = _status_attempts.get(_status, 0)
+            _delay = self.retry_policy.response_delay(
+                _method, _status, _decode_headers(_headers), _attempt, _deadline
+            )
+            if _delay is None:
+                return _status, _headers, _stream, _ext
+            _log.warning("{} {} returned {}, retrying in {}s", _method, url[3].decode("latin-1"), _status, _delay)
+            _status_attempts[_status] = _attempt + 1
+            _close_stream(_stream)
+            time.sleep(_delay)
+
+    def close(self):
+        self._transport.close()
+
+
+def install_retry_policy(
+    client: typing.Union[httpx.Client, httpx.AsyncClient], retry_policy: RetryPolicy
+) -> typing.Union[httpx.Client, httpx.AsyncClient]:
+    """Resend failed requests of an httpx client according to a retry policy.
+
+    Install after ``install_rate_limiter`` so every resent request still waits for its bucket.
+    429s are then left to the rate limiter, which already resends them.
+
+    Args:
+        client (Union[httpx.Client, httpx.AsyncClient]): The client, its transport gets wrapped.
+        retry_policy (RetryPolicy): Shared retry policy.
+
+    Returns:
+        Union[httpx.Client, httpx.AsyncClient]: The same client.
+    """
+    if isinstance(client, httpx.AsyncClient):
+        client._transport = RetryingAsyncTransport(client._transport, retry_policy)
+    else:
+        client._transport = RetryingSyncTransport(client._transport, retry_policy)
+    return client
@@ -0,0 +1,73 @@
+import typing
+
+import httpcore
+import httpx
+
+from .ratelimit import _request_path, route_for
+
+if typing.TYPE_CHECKING:
+    from ..helper.tracing import Tracer
+
+
+class TracedAsyncTransport(httpcore.AsyncHTTPTransport):
+    """Wraps an async httpx transport, recording every request as an "http" span."""
+
+    def __init__(self, transport: httpcore.AsyncHTTPTransport, tracer: "Tracer"):
+        self._transport = transport
+        self.tracer = tracer
+
+    async def arequest(self, method, url, headers=None, stream=None, ext=None):
+        _method = method.decode("ascii")
+        _route, _ = route_for(_method, _request_path(url))
+        with self.tracer.span("http", method=_method, route=_route) as _span:
+            _response = await self._transport.arequest(
+                method, url, headers=headers, stream=stream, ext=ext
+            )
+            _span.set_attribute("status", _response[0])
+            return _response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class TracedSyncTransport(httpcore.SyncHTTPTransport):
+    """Wraps a sync httpx transport, recording every request as an "http" span."""
+
+    def __init__(self, transport: httpcore.SyncHTTPTransport, tracer: "Tracer"):
+        self._transport = transport
+        self.tracer = tracer
+
+    def request(self, method, url, headers=None, stream=None, ext=None):
+        _method = method.decode("ascii")
+        _route, _ = route_for(_method, _request_path(url))
+        with self.tracer.span("http", method=_method, route=_route) as _span:
+            _response = self._transport.request(
+                method, url, headers=headers, stream=stream, ext=ext
+            )
+            _span.set_attribute("status", _response[0])
+            return _response
+
+    def close(self):
+        self._transport.close()
+
+
+def install_tracing(
+    client: typing.Union[httpx.Client, httpx.AsyncClient], tracer: "Tracer"
+) -> typing.Union[httpx.Client, httpx.AsyncClient]:
+    """Record every request of an httpx client as a span of the current trace.
+
+    Install after ``install_rate_limiter`` and ``install_retry_policy``, so the span covers
+    the request as the caller sees it, including rate limit waits and retries.
+
+    Args:
+        client (Union[httpx.Client, httpx.AsyncClient]): The client, its transport gets wrapped.
+        tracer (Tracer): Tracer to record spans with.
+
+    Returns:
+        Union[httpx.Client, httpx.AsyncClient]: The same client.
+    """
+    if isinstance(client, httpx.AsyncClient):
+        client._transport = TracedAsyncTransport(client._transport, tracer)
+    else:
+        client._transport = TracedSyncTransport(client._transport, tracer)
+    return client
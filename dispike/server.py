@@ -15,29 +15,51 @@ from dispike.incoming import (
 )
 from .eventer import EventTypes
 from .eventer_helpers.determine_event_information import determine_event_information
-from .response import DiscordResponse, DeferredResponse, DeferredEmphericalResponse
+from .eventer_helpers.dispatch import EventInvoker, ResponseStrategy
+from .helper.json_backend import resolve_json_backend, PreEncodedJSONResponse
+from .incoming.lazy import lazy_view_class
+from .helper.logging_control import get_subsystem_logger, LoggingSubsystems
+from .helper.task_supervisor import DeferredTaskSupervisor, OverflowPolicy
+from .errors.dispike import DeferredTaskQueueFull
+from .rest.retry import set_interaction_deadline
+from .helper.tracing import maybe_span, set_interaction_id
+from .helper.snowflake import InteractionTiming, INITIAL_RESPONSE_WINDOW
+from .response import DiscordResponse
 from dispike.creating.components import ComponentTypes
-import json
+from dispike.creating.models.options import CommandTypes
 import typing
 import asyncio
+import time
 import warnings
 
 
 if typing.TYPE_CHECKING:
     from .main import Dispike
+    from .helper.metrics import Metrics
+    from .helper.tracing import Tracer
 
 router = APIRouter()
 router._dispike_instance = None
+router._json_backend = resolve_json_backend()
+router._lazy_context = False
+router._task_supervisor = DeferredTaskSupervisor()
+router._traffic_recorder = None
+router._metrics = None  # type: typing.Optional[Metrics]
+router._tracer = None  # type: typing.Optional[Tracer]
+router._auto_defer_budget = None  # type: typing.Optional[float]
 interaction = router._dispike_instance  # type: Dispike
 
 
 _RAISE_FOR_TESTING = False
 
+_log = get_subsystem_logger(LoggingSubsystems.SERVER)
+
 
 async def _run_and_log_async(coroutine: typing.Coroutine) -> None:
-    logger.debug(f"Incoming deferred coroutine.. {coroutine}")
-    await coroutine
-    logger.debug(f"Deferred coroutine completed!")
+    _log.debug("Incoming deferred coroutine.. {}", coroutine)
+    with maybe_span(router._tracer, "deferred"):
+        await coroutine
+    _log.debug("Deferred coroutine completed!")
 
 
 @router.get("/ping")
@@ -47,162 +69,357 @@ async def ping():
     )
 
 
-@router.post("/interactions")
-async def handle_interactions(request: Request) -> Response:
-    if router._dispike_instance == None:
-        return PlainTextResponse(
-            "If you see this, Dispike has not been properly configured. Make sure to create a Dispike instance before starting this endpoint."
-        )
+async def metrics_endpoint():
+    """Serves the metrics in the Prometheus text format. Dispike adds it when ``metrics`` is enabled."""
+    if router._metrics is None:
+        return PlainTextResponse("Metrics are not enabled.", status_code=404)
+    return PlainTextResponse(
+        router._metrics.render(), media_type="text/plain; version=0.0.4"
+    )
 
-    logger.info("interaction recieved.")
 
-    _get_request_body = json.loads(request.state._cached_body.decode())
-    logger.info(_get_request_body)
-    if _get_request_body["type"] == 1:
-        logger.info("handling ACK Ping.")
-        return {"type": 1}
+_COMMAND = EventTypes.COMMAND.value
+_COMPONENT = EventTypes.COMPONENT.value
+_USER_COMMAND = EventTypes.USER_COMMAND.value
+_MESSAGE_COMMAND = EventTypes.MESSAGE_COMMAND.value
+# message flag of ephemeral responses.
+_EPHEMERAL_FLAG = 1 << 6
 
-    if _get_request_body["type"] == 2:
-        # ["data"]["type"] represents if its a message or user command
 
-        if _get_request_body["data"]["type"] == 2:
-            # 2 is user command
+def _build_context(model: typing.Type, body: dict) -> typing.Any:
+    """Parse into the pydantic model, or wrap in a lazy view when lazy_context is enabled."""
+    if router._lazy_context:
+        return lazy_view_class(model)(body)
+    return model(**body)
 
-            _parse_to_object = IncomingDiscordUserCommandInteraction(
-                **_get_request_body
-            )
 
-            # Confusingly construct a member object
-            _member = Member(
-                **{
-                    **_get_request_body["data"]["resolved"]["members"][
-                        _parse_to_object.data.target_id
-                    ],
-                    "user": {
-                        **_get_request_body["data"]["resolved"]["users"][
-                            _parse_to_object.data.target_id
-                        ]
-                    },
-                }
-            )
+def _parse_slash_command(body: dict) -> typing.Tuple[str, typing.Any, dict]:
+    _parse_to_object = _build_context(IncomingDiscordSlashInteraction, body)
+    _event_name, arguments = determine_event_information(_parse_to_object)
+    return _event_name, _parse_to_object, arguments
 
-            # Set that member object as the target
-            _parse_to_object.data.__setattr__("target", _member)
 
-            _get_res = await router._dispike_instance.emit(
-                _get_request_body["data"]["name"],
-                EventTypes.USER_COMMAND,
-                _parse_to_object,
-            )
-            return _get_res.response
-        elif _get_request_body["data"]["type"] == 3:
-            # 3 is message command
+def _parse_user_command(body: dict) -> typing.Tuple[str, typing.Any, dict]:
+    _parse_to_object = _build_context(IncomingDiscordUserCommandInteraction, body)
 
-            _parse_to_object = IncomingDiscordMessageCommandInteraction(
-                **_get_request_body
-            )
+    # Confusingly construct a member object
+    _member = _build_context(
+        Member,
+        {
+            **body["data"]["resolved"]["members"][_parse_to_object.data.target_id],
+            "user": {
+                **body["data"]["resolved"]["users"][_parse_to_object.data.target_id]
+            },
+        },
+    )
 
-            _message = Message(
-                **_get_request_body["data"]["resolved"]["messages"][
-                    _parse_to_object.data.target_id
-                ]
-            )
+    # Set that member object as the target
+    _parse_to_object.data.__setattr__("target", _member)
+    return body["data"]["name"], _parse_to_object, None
 
-            # Set that message object as the target
-            _parse_to_object.data.__setattr__("target", _message)
 
-            _get_res = await router._dispike_instance.emit(
-                _get_request_body["data"]["name"],
-                EventTypes.MESSAGE_COMMAND,
-                _parse_to_object,
-            )
-            return _get_res.response
+def _parse_message_command(body: dict) -> typing.Tuple[str, typing.Any, dict]:
+    _parse_to_object = _build_context(IncomingDiscordMessageCommandInteraction, body)
 
-    if _get_request_body["type"] == 3:
-        if _get_request_body["data"]["component_type"] == ComponentTypes.BUTTON.value:
-            # Button
-            _parse_to_object = IncomingDiscordButtonInteraction(**_get_request_body)
+    _message = _build_context(
+        Message, body["data"]["resolved"]["messages"][_parse_to_object.data.target_id]
+    )
 
-            _get_res = await router._dispike_instance.emit(
-                _get_request_body["data"]["custom_id"],
-                EventTypes.COMPONENT,
-                _parse_to_object,
+    # Set that message object as the target
+    _parse_to_object.data.__setattr__("target", _message)
+    return body["data"]["name"], _parse_to_object, None
+
+
+def _parse_button(body: dict) -> typing.Tuple[str, typing.Any, dict]:
+    return (
+        body["data"]["custom_id"],
+        _build_context(IncomingDiscordButtonInteraction, body),
+        None,
+    )
+
+
+def _parse_select_menu(body: dict) -> typing.Tuple[str, typing.Any, dict]:
+    return (
+        body["data"]["custom_id"],
+        _build_context(IncomingDiscordSelectMenuInteraction, body),
+        None,
+    )
+
+
+# (interaction type, data.type or data.component_type) -> (event type, parser)
+_SLASH_COMMAND_ROUTE = (_COMMAND, _parse_slash_command)
+_INTERACTION_ROUTES = {
+    (2, CommandTypes.SLASH.value): _SLASH_COMMAND_ROUTE,
+    (2, CommandTypes.USER.value): (_USER_COMMAND, _parse_user_command),
+    (2, CommandTypes.MESSAGE.value): (_MESSAGE_COMMAND, _parse_message_command),
+    (3, ComponentTypes.BUTTON.value): (_COMPONENT, _parse_button),
+    (3, ComponentTypes.SELECT_MENU.value): (_COMPONENT, _parse_select_menu),
+}
+
+
+def _resolve_interaction_route(
+    body: dict,
+) -> typing.Tuple[str, typing.Callable[[dict], typing.Tuple[str, typing.Any, dict]]]:
+    """Find the event type and parser for an incoming interaction with a single lookup.
+
+    Anything unknown is treated as a slash command, like it always has been.
+    """
+    _data = body.get("data") or {}
+    if body["type"] == 3:
+        _sub_type = _data.get("component_type")
+    else:
+        _sub_type = _data.get("type", CommandTypes.SLASH.value)
+    return _INTERACTION_ROUTES.get((body["type"], _sub_type), _SLASH_COMMAND_ROUTE)
+
+
+@router.post("/interactions", response_class=PreEncodedJSONResponse)
+async def interactions_endpoint(request: Request) -> Response:
+    """The ``/interactions`` endpoint. Encodes the result of ``handle_interactions``
+    with the configured JSON backend, so FastAPI's ``jsonable_encoder`` never runs."""
+    _result = await handle_interactions(request)
+    if not isinstance(_result, Response):
+        _started = time.perf_counter()
+        with maybe_span(router._tracer, "serialize"):
+            if isinstance(_result, DiscordResponse):
+                _result = _result.response
+            _result = PreEncodedJSONResponse(router._json_backend.dumps(_result))
+        if router._metrics is not None:
+            router._metrics.observe(
+                "dispike_stage_duration_seconds", time.perf_counter() - _started, "serialize"
             )
-            return _get_res.response
-        if (
-            _get_request_body["data"]["component_type"]
-            == ComponentTypes.SELECT_MENU.value
-        ):
-            # Select Menu
-            _parse_to_object = IncomingDiscordSelectMenuInteraction(**_get_request_body)
-
-            _get_res = await router._dispike_instance.emit(
-                _get_request_body["data"]["custom_id"],
-                EventTypes.COMPONENT,
-                _parse_to_object,
+    _timing = getattr(request.state, "_interaction_timing", None)  # type: InteractionTiming
+    if _timing is not None:
+        _record_age_at_response(_timing)
+    return _result
+
+
+def _record_age_at_response(timing: InteractionTiming):
+    _age = timing.age
+    if router._metrics is not None:
+        router._metrics.observe("dispike_interaction_age_at_response_seconds", _age)
+    if _age > INITIAL_RESPONSE_WINDOW:
+        _log.warning(
+            "responding {:.3f}s after the interaction was created ({:.3f}s on arrival), Discord may have given up on it.",
+            _age,
+            timing.age_on_arrival,
+        )
+
+
+def _deferred_overflow_response(event_name: str) -> typing.Union[Response, dict]:
+    """Response for a deferred command that the task supervisor could not accept."""
+    _log.warning("deferred task supervisor is full, not running {}", event_name)
+    if router._task_supervisor.overflow_policy is OverflowPolicy.DEGRADE:
+        return DiscordResponse(
+            content="This bot is busy right now, please try again in a moment.",
+            empherical=True,
+        ).response
+    return PlainTextResponse("Deferred task queue is full.", status_code=503)
+
+
+async def handle_interactions(request: Request) -> Response:
+    if router._dispike_instance == None:
+        return PlainTextResponse(
+            "If you see this, Dispike has not been properly configured. Make sure to create a Dispike instance before starting this endpoint."
+        )
+
+    _log.info("interaction recieved.")
+
+    _started = time.perf_counter()
+    with maybe_span(router._tracer, "parse"):
+        _get_request_body = router._json_backend.loads(request.state._cached_body)
+        _log.body("{}", _get_request_body)
+        if _get_request_body["type"] == 1:
+            _log.info("handling ACK Ping.")
+            return {"type": 1}
+        if router._traffic_recorder is not None:
+            router._traffic_recorder.record(request.state._cached_body)
+
+        _received_at, _received_monotonic = getattr(
+            request.state, "_received_at", (None, None)
+        )
+        _timing = request.state._interaction_timing = InteractionTiming(
+            _get_request_body["id"], _received_at, _received_monotonic
+        )
+        # outgoing requests made for this interaction (followups, deferred edits) stop
+        # retrying once its token expires, and are traced as part of it.
+        set_interaction_deadline(_received_monotonic)
+        set_interaction_id(_get_request_body["id"])
+        _event_type, _parse_interaction = _resolve_interaction_route(_get_request_body)
+        _event_name, _parse_to_object, arguments = _parse_interaction(_get_request_body)
+        _parse_to_object._timing = _timing
+    if router._metrics is not None:
+        router._metrics.observe(
+            "dispike_stage_duration_seconds", time.perf_counter() - _started, "parse"
+        )
+        router._metrics.observe(
+            "dispike_interaction_age_on_arrival_seconds", max(0.0, _timing.age_on_arrival)
+        )
+    _invoker = router._dispike_instance.resolve_event_invoker(_event_name, _event_type)
+    _dispatch = _dispatch_interaction(
+        _event_type, _event_name, _invoker, _parse_to_object, arguments
+    )
+    if router._metrics is not None:
+        # measured inside the auto defer wrapping, a deferred handler is timed until it finishes.
+        _dispatch = _measure_dispatch(
+            _dispatch, _event_type, _event_name, registered=_invoker is not None
+        )
+    if router._auto_defer_budget is not None:
+        _dispatch = _dispatch_with_auto_defer(
+            _dispatch, _event_type, _event_name, _get_request_body["token"]
+        )
+    if router._tracer is None:
+        return await _dispatch
+    with router._tracer.span("handler", event_type=_event_type, event_name=_event_name):
+        return await _dispatch
+
+
+async def _measure_dispatch(
+    dispatch: typing.Coroutine, event_type: str, event_name: str, registered: bool
+) -> typing.Union[Response, dict]:
+    """Await a dispatch, recording its counters and handler latency."""
+    _metrics = router._metrics
+    if not registered:
+        # custom ids and unknown names are unbounded, keep the label set small.
+        event_name = "unregistered"
+    _metrics.inc("dispike_interactions_total", event_type, event_name)
+    _metrics.inc("dispike_interactions_by_type_total", event_type)
+    _started = time.perf_counter()
+    try:
+        return await dispatch
+    except Exception:
+        _metrics.inc("dispike_interaction_errors_total", event_type, event_name)
+        raise
+    finally:
+        _elapsed = time.perf_counter() - _started
+        _metrics.observe("dispike_stage_duration_seconds", _elapsed, "handler")
+        _metrics.observe("dispike_handler_duration_seconds", _elapsed, event_type, event_name)
+
+
+async def _dispatch_with_auto_defer(
+    dispatch: typing.Coroutine, event_type: str, event_name: str, token: str
+) -> typing.Union[Response, dict]:
+    """Run a dispatch within the auto defer budget.
+
+    If the handler takes longer, respond with a deferred response (type 6 for components,
+    type 5 otherwise) and deliver its result later, see ``_deliver_late_response``.
+    """
+    _task = asyncio.ensure_future(dispatch)
+    try:
+        _done, _ = await asyncio.wait({_task}, timeout=router._auto_defer_budget)
+    except asyncio.CancelledError:
+        _task.cancel()
+        raise
+    if _done:
+        return _task.result()
+
+    try:
+        router._task_supervisor.submit(
+            _deliver_late_response(_task, event_type, event_name, token)
+        )
+    except DeferredTaskQueueFull:
+        _task.cancel()
+        return _deferred_overflow_response(event_name)
+
+    _log.info("{} exceeded the auto defer budget, deferring response.", event_name)
+    return {"type": 6} if event_type == _COMPONENT else {"type": 5}
+
+
+async def _deliver_late_response(
+    task: "asyncio.Task", event_type: str, event_name: str, token: str
+) -> None:
+    """Deliver the result of a handler that was deferred by the auto defer budget.
+
+    After a type 6 defer the original response is the message holding the component, so
+    only an update (type 7) edits it and anything else is sent as a followup. After a
+    type 5 defer the original response is the "thinking" message, which is edited, unless
+    the result is ephemeral: the deferred message is public, so it is deleted and the
+    result sent as an ephemeral followup instead.
+    """
+    _result = await task
+    if isinstance(_result, DiscordResponse):
+        _result = _result.response
+    if not isinstance(_result, dict) or not _result.get("data"):
+        # deferred or empty responses have nothing to edit the original response with.
+        _log.debug("{} finished after deferring, nothing to send.", event_name)
+        return
+    _dispike = router._dispike_instance
+    _data = _result["data"]
+    if event_type == _COMPONENT:
+        if _result.get("type") == 7:
+            _log.debug("{} finished after deferring, updating the component message.", event_name)
+            await _dispike._edit_original_response(token, _data)
+        else:
+            _log.debug("{} finished after deferring, sending a followup.", event_name)
+            await _dispike._create_followup_message(token, _data)
+    elif _data.get("flags", 0) & _EPHEMERAL_FLAG:
+        _log.debug("{} finished after deferring, sending an ephemeral followup.", event_name)
+        await _dispike._create_followup_message(token, _data)
+        await _dispike._delete_original_response(token)
+    else:
+        _log.debug("{} finished after deferring, editing original response.", event_name)
+        await _dispike._edit_original_response(token, _data)
+
+
+async def _dispatch_interaction(
+    _event_type: str,
+    _event_name: str,
+    _invoker: typing.Optional[EventInvoker],
+    _parse_to_object: typing.Any,
+    arguments: dict,
+) -> typing.Union[Response, DiscordResponse, dict]:
+    if _event_type != _COMMAND:
+        # components, user and message commands
+        if _invoker is None:
+            raise TypeError(
+                f"event {_event_name} does not have a corresponding handler. Did you register this function/event?"
             )
-            return _get_res.response
+        _get_res = await _invoker(_parse_to_object)
+        return _get_res.response
 
-    _parse_to_object = IncomingDiscordSlashInteraction(**_get_request_body)
-    _event_name, arguments = determine_event_information(_parse_to_object)
-    logger.debug(f"incoming event name: {_event_name}")
-    if not router._dispike_instance.check_event_exists(_event_name, EventTypes.COMMAND):
-        logger.debug("discarding event not existing.")
+    _log.debug("incoming event name: {}", _event_name)
+    if _invoker is None:
+        _log.debug("discarding event not existing.")
         warnings.warn(
             f"Event {_event_name} does not exist or does not have a callback.",
             UserWarning,
         )
         return {"type": 5}
 
-    # _event_settings = router._dispike_instance.return_event_settings(_event_name)
-
     arguments[router._user_defined_setting_ctx_value] = _parse_to_object
 
-    # Check the type hint for the return type, fallback for checking the type if no hints are provided
+    # The return type hint was resolved once at registration, see EventInvoker.
+    _response_strategy = _invoker.response_strategy
     try:
-        _type_hinted_request = router._dispike_instance.view_event_function_return_type(
-            _event_name, EventTypes.COMMAND
-        )
-        _type_hinted_returned_value = _type_hinted_request["return"]
-        if _type_hinted_returned_value == DiscordResponse:
-            _get_res = await router._dispike_instance.emit(
-                _event_name, EventTypes.COMMAND, **arguments
-            )
+        if _response_strategy is ResponseStrategy.IMMEDIATE:
+            _get_res = await _invoker(**arguments)
 
-            logger.debug(_get_res.response)
+            _log.debug("{}", _get_res.response)
             return _get_res.response
-        elif (
-            _type_hinted_returned_value == DeferredResponse
-            or _type_hinted_returned_value == DeferredEmphericalResponse
-        ):
-            logger.debug("This is a deferred response...")
-
-            asyncio.create_task(
-                _run_and_log_async(
-                    router._dispike_instance.emit(
-                        _event_name, EventTypes.COMMAND, **arguments
-                    )
+        elif _response_strategy is ResponseStrategy.DEFERRED:
+            _log.debug("This is a deferred response...")
+
+            try:
+                router._task_supervisor.submit(
+                    _run_and_log_async(_invoker(**arguments))
                 )
-            )
-            return _type_hinted_returned_value.response
+            except DeferredTaskQueueFull:
+                return _deferred_overflow_response(_event_name)
+            return _invoker.return_hint.response
 
-        elif _type_hinted_returned_value == dict:
-            return await router._dispike_instance.emit(
-                _event_name, EventTypes.COMMAND, **arguments
-            )
-    except KeyError:
-        logger.error(
+        elif _response_strategy is ResponseStrategy.DICT:
+            return await _invoker(**arguments)
+    except Exception:
+        _log.exception("unhandled exception for returning hinted value")
+        raise
+
+    if _invoker.return_hint is None:
+        _log.error(
             "unable to find return value for type hint.. resorting to guessing.."
         )
         if _RAISE_FOR_TESTING:
             raise AssertionError("No hinting!")  # pragma: no cover
-    except Exception:
-        logger.exception("unhandled exception for returning hinted value")
-        raise
 
-    interaction_data = await router._dispike_instance.emit(
-        _event_name, EventTypes.COMMAND, **arguments
-    )
+    interaction_data = await _invoker(**arguments)
     if isinstance(interaction_data, DiscordResponse):
         interaction_data: DiscordResponse
         return interaction_data.response
@@ -214,8 +431,9 @@ async def handle_interactions(request: Request) -> Response:
         f"Command {_event_name} has not been configured with a valid callback function.",
         UserWarning,
     )
-    logger.warning(
-        f"Command {_event_name} has not been configured with a valid callback function."
+    _log.warning(
+        "Command {} has not been configured with a valid callback function.",
+        _event_name,
     )
 
     # Backup response, simply acknowledge. (Type 5)
@@ -0,0 +1,2 @@
+from .fake_discord import FakeDiscord, FakeDiscordServer, RecordedRequest, serve_in_thread
+from .replay import ReplayLoadGenerator, ReplayReport
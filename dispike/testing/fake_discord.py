@@ -0,0 +1,487 @@
+"""An in-process fake of the Discord REST API, for tests and benchmarks.
+
+``FakeDiscord`` is a plain ASGI app implementing the endpoints Dispike calls:
+application commands (global and guild), command permissions, interaction callbacks
+and webhook followups. State is kept in memory. Latency, injected errors and
+Discord style rate limits (``X-RateLimit-*`` headers and 429 responses) are
+configurable, so outgoing behavior such as connection reuse, retries and rate
+limiting can be measured against a real socket instead of a mock.
+
+    fake = FakeDiscord(latency=0.05, rate_limit=5, rate_limit_window=1)
+    server = serve_in_thread(fake)
+    bot = Dispike(..., api_base_url=server.api_base_url)
+    ...
+    server.stop()
+
+Or from a shell: ``python -m dispike.testing.fake_discord --port 8081``
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import socket
+import threading
+import time
+import typing
+
+from ..rest.ratelimit import route_for
+
+_API_PREFIX = re.compile(r"^/api/v\d+")
+# 2015-01-01, the start of Discord snowflakes.
+DISCORD_EPOCH = 1420070400000
+
+
+class RecordedRequest(object):
+    """A request served by the fake.
+
+    Attributes:
+        method (str): HTTP method
+        path (str): Path without the ``/api/vN`` prefix.
+        status (int): Status code answered.
+        body (Any): Decoded JSON body, None if there was none.
+        received_at (float): ``time.monotonic`` value the request arrived at.
+    """
+
+    __slots__ = ("method", "path", "status", "body", "received_at")
+
+    def __init__(self, method: str, path: str, status: int, body: typing.Any, received_at: float):
+        self.method = method
+        self.path = path
+        self.status = status
+        self.body = body
+        self.received_at = received_at
+
+    def __repr__(self) -> str:
+        return f"<RecordedRequest {self.method} {self.path} {self.status}>"
+
+
+class _Window(object):
+    __slots__ = ("started_at", "count")
+
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.count = 0
+
+
+class FakeDiscord(object):
+    """ASGI app behaving like the parts of the Discord API that Dispike uses.
+
+    Attributes:
+        commands (Dict[Optional[str], Dict[str, dict]]): Commands per guild id (None for global commands), by command id.
+        permissions (Dict[str, Dict[str, list]]): Permissions per guild id, by command id.
+        messages (Dict[str, Dict[str, dict]]): Webhook messages per interaction token, by message id (or ``"@original"``).
+        requests (List[RecordedRequest]): Every request served, in order.
+        rate_limited (int): Requests answered with a 429.
+        errors_injected (int): Requests answered with an injected error.
+    """
+
+    def __init__(
+        self,
+        latency: typing.Union[float, typing.Callable[[str, str], float]] = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 502,
+        rate_limit: typing.Optional[int] = None,
+        rate_limit_window: float = 1.0,
+        require_auth: bool = True,
+        seed: int = None,
+    ):
+        """Initialize the fake.
+
+        Args:
+            latency (Union[float, Callable[[str, str], float]], optional): Seconds every request takes, or a function of method and path returning them.
+            error_rate (float, optional): Share of requests answered with ``error_status`` instead, between 0 and 1.
+            error_status (int, optional): Status code of injected errors. Defaults to 502.
+            rate_limit (int, optional): Requests allowed per bucket and window, None for no rate limits (and no rate limit headers).
+            rate_limit_window (float, optional): Length of a rate limit window in seconds.
+            require_auth (bool, optional): Answer application endpoints without a ``Bot`` authorization header with a 401.
+            seed (int, optional): Seed for the error injection, for reproducible runs.
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.require_auth = require_auth
+        self._random = random.Random(seed)
+        self._failures = []  # type: typing.List[typing.List]
+        self._windows = {}  # type: typing.Dict[tuple, _Window]
+        self._sequence = 0
+        self.reset()
+
+    def reset(self):
+        """Forget every command, permission, message and recorded request."""
+        self.commands = {}  # type: typing.Dict[typing.Optional[str], typing.Dict[str, dict]]
+        self.permissions = {}  # type: typing.Dict[str, typing.Dict[str, list]]
+        self.messages = {}  # type: typing.Dict[str, typing.Dict[str, dict]]
+        self.requests = []  # type: typing.List[RecordedRequest]
+        self.rate_limited = 0
+        self.errors_injected = 0
+        self._windows.clear()
+        self._failures.clear()
+
+    def fail_next(self, status: int = 502, count: int = 1, path_contains: str = None):
+        """Answer the next ``count`` requests (optionally only those whose path contains ``path_contains``) with ``status``."""
+        self._failures.append([status, count, path_contains])
+
+    def snowflake(self) -> str:
+        """A new, unique snowflake id."""
+        self._sequence += 1
+        return str(
+            ((int(time.time() * 1000) - DISCORD_EPOCH) << 22) | (self._sequence & 0x3FFFFF)
+        )
+
+    def count(self, method: str = None, path_contains: str = None) -> int:
+        """Number of recorded requests matching a method and/or a part of the path."""
+        return sum(
+            1
+            for request in self.requests
+            if (method is None or request.method == method.upper())
+            and (path_contains is None or path_contains in request.path)
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                _message = await receive()
+                if _message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif _message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        _received_at = time.monotonic()
+        _chunks = []
+        while True:
+            _message = await receive()
+            _chunks.append(_message.get("body", b""))
+            if not _message.get("more_body"):
+                break
+        _raw = b"".join(_chunks)
+        try:
+            _body = json.loads(_raw) if _raw else None
+        except ValueError:
+            _body = None
+
+        _method = scope["method"].upper()
+        _path = _API_PREFIX.sub("", scope["path"]).rstrip("/") or "/"
+        _headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope["headers"]}
+
+        _latency = self.latency(_method, _path) if callable(self.latency) else self.latency
+        if _latency:
+            await asyncio.sleep(_latency)
+
+        _status, _payload, _extra_headers = self._handle(_method, _path, _headers, _body)
+        self.requests.append(RecordedRequest(_method, _path, _status, _body, _received_at))
+
+        _response_headers = [(b"content-type", b"application/json")] + [
+            (key.encode("latin-1"), str(value).encode("latin-1")) for key, value in _extra_headers
+        ]
+        _content = b"" if _payload is None else json.dumps(_payload).encode()
+        await send({"type": "http.response.start", "status": _status, "headers": _response_headers})
+        await send({"type": "http.response.body", "body": _content})
+
+    def _handle(self, method: str, path: str, headers: dict, body) -> typing.Tuple[int, typing.Any, list]:
+        _rate_limit_headers = []
+        if self.rate_limit is not None:
+            _route, _major = route_for(method, path)
+            _now = time.monotonic()
+            _window = self._windows.get((_route, _major))
+            if _window is None or _now - _window.started_at >= self.rate_limit_window:
+                _window = self._windows[(_route, _major)] = _Window(_now)
+            _reset_after = round(self.rate_limit_window - (_now - _window.started_at), 3)
+            if _window.count >= self.rate_limit:
+                self.rate_limited += 1
+                return (
+                    429,
+                    {"message": "You are being rate limited.", "retry_after": _reset_after, "global": False},
+                    [("retry-after", _reset_after), ("x-ratelimit-scope", "user")],
+                )
+            _window.count += 1
+            _rate_limit_headers = [
+                ("x-ratelimit-bucket", hashlib.md5(_route.encode()).hexdigest()[:16]),
+                ("x-ratelimit-limit", self.rate_limit),
+                ("x-ratelimit-remaining", self.rate_limit - _window.count),
+                ("x-ratelimit-reset-after", _reset_after),
+            ]
+
+        _injected = self._injected_status(path)
+        if _injected is not None:
+            self.errors_injected += 1
+            return _injected, {"message": "Injected error", "code": 0}, _rate_limit_headers
+
+        _segments = path.strip("/").split("/")
+        if _segments[0] == "applications" and len(_segments) >= 3:
+            if self.require_auth and not headers.get("authorization", "").startswith("Bot "):
+                return 401, {"message": "401: Unauthorized", "code": 0}, _rate_limit_headers
+            _status, _payload = self._applications(method, _segments[1], _segments[2:], body)
+        elif _segments[0] == "webhooks" and len(_segments) >= 3:
+            _status, _payload = self._webhooks(method, _segments[2], _segments[3:], body)
+        elif _segments[0] == "interactions" and _segments[3:] == ["callback"] and method == "POST":
+            _status, _payload = self._callback(_segments[2], body)
+        else:
+            _status, _payload = 404, {"message": "404: Not Found", "code": 0}
+        return _status, _payload, _rate_limit_headers
+
+    def _injected_status(self, path: str) -> typing.Optional[int]:
+        for failure in self._failures:
+            _status, _count, _path_contains = failure
+            if _path_contains is None or _path_contains in path:
+                failure[1] -= 1
+                if failure[1] <= 0:
+                    self._failures.remove(failure)
+                return _status
+        if self.error_rate and self._random.random() < self.error_rate:
+            return self.error_status
+        return None
+
+    def _applications(self, method: str, application_id: str, segments: list, body):
+        _guild_id = None
+        if segments[0] == "guilds" and len(segments) >= 3:
+            _guild_id, segments = segments[1], segments[2:]
+        if segments[0] != "commands":
+            return _not_found()
+        _commands = self.commands.setdefault(_guild_id, {})
+
+        if segments == ["commands"]:
+            if method == "GET":
+                return 200, list(_commands.values())
+            if method == "POST":
+                return self._upsert_command(application_id, _guild_id, body)
+            if method == "PUT":
+                return self._overwrite_commands(application_id, _guild_id, body)
+            return _method_not_allowed()
+
+        if segments == ["commands", "permissions"] and _guild_id is not None:
+            _guild_permissions = self.permissions.setdefault(_guild_id, {})
+            if method == "GET":
+                return 200, [
+                    _permissions_payload(command_id, application_id, _guild_id, permissions)
+                    for command_id, permissions in _guild_permissions.items()
+                ]
+            if method == "PUT":
+                # the batch endpoint replaces the permissions of every command.
+                _guild_permissions.clear()
+                for entry in body or []:
+                    _guild_permissions[str(entry["id"])] = entry.get("permissions", [])
+                return 200, [
+                    _permissions_payload(command_id, application_id, _guild_id, permissions)
+                    for command_id, permissions in _guild_permissions.items()
+                ]
+            return _method_not_allowed()
+
+        _command_id = segments[1]
+        if len(segments) == 3 and segments[2] == "permissions" and _guild_id is not None:
+            _guild_permissions = self.permissions.setdefault(_guild_id, {})
+            if method == "GET":
+                if _command_id not in _guild_permissions:
+                    return 404, {"message": "Unknown application command permissions", "code": 10066}
+                return 200, _permissions_payload(
+                    _command_id, application_id, _guild_id, _guild_permissions[_command_id]
+                )
+            if method == "PUT":
+                _guild_permissions[_command_id] = (body or {}).get("permissions", [])
+                return 200, _permissions_payload(
+                    _command_id, application_id, _guild_id, _guild_permissions[_command_id]
+                )
+            return _method_not_allowed()
+
+        if len(segments) != 2:
+            return _not_found()
+        if _command_id not in _commands:
+            return 404, {"message": "Unknown application command", "code": 10063}
+        if method == "GET":
+            return 200, _commands[_command_id]
+        if method == "PATCH":
+            _command = dict(_commands[_command_id])
+            _command.update({key: value for key, value in (body or {}).items() if key not in ("id", "application_id")})
+            _command["version"] = self.snowflake()
+            _commands[_command_id] = _command
+            return 200, _command
+        if method == "DELETE":
+            del _commands[_command_id]
+            self.permissions.get(_guild_id, {}).pop(_command_id, None)
+            return 204, None
+        return _method_not_allowed()
+
+    def _command_payload(self, application_id: str, guild_id, body: dict, command_id: str) -> dict:
+        _command = {
+            "id": command_id,
+            "application_id": application_id,
+            "name": body.get("name"),
+            "description": body.get("description", ""),
+            "options": body.get("options") or [],
+            "default_permission": body.get("default_permission", True),
+            "type": body.get("type", 1),
+            "version": self.snowflake(),
+        }
+        if guild_id is not None:
+            _command["guild_id"] = guild_id
+        return _command
+
+    def _find_command(self, guild_id, body: dict) -> typing.Optional[str]:
+        for command_id, command in self.commands.get(guild_id, {}).items():
+            if command["name"] == body.get("name") and command["type"] == body.get("type", 1):
+                return command_id
+        return None
+
+    def _upsert_command(self, application_id: str, guild_id, body):
+        if not isinstance(body, dict) or not body.get("name"):
+            return 400, {"message": "Invalid Form Body", "code": 50035}
+        # creating a command with an existing name overwrites it.
+        _existing = self._find_command(guild_id, body)
+        _command = self._command_payload(application_id, guild_id, body, _existing or self.snowflake())
+        self.commands[guild_id][_command["id"]] = _command
+        return (200 if _existing else 201), _command
+
+    def _overwrite_commands(self, application_id: str, guild_id, body):
+        if not isinstance(body, list) or any(not isinstance(item, dict) or not item.get("name") for item in body):
+            return 400, {"message": "Invalid Form Body", "code": 50035}
+        _commands = {}
+        for item in body:
+            _command_id = self._find_command(guild_id, item) or self.snowflake()
+            _commands[_command_id] = self._command_payload(application_id, guild_id, item, _command_id)
+        self.commands[guild_id] = _commands
+        return 200, list(_commands.values())
+
+    def _webhooks(self, method: str, token: str, segments: list, body):
+        _messages = self.messages.setdefault(token, {})
+        if not segments:
+            if method != "POST":
+                return _method_not_allowed()
+            _message = dict(body or {}, id=self.snowflake())
+            _messages[_message["id"]] = _message
+            return 200, _message
+        if segments[0] != "messages" or len(segments) != 2:
+            return _not_found()
+        _message_id = segments[1]
+        if method == "PATCH" and _message_id == "@original" and _message_id not in _messages:
+            # the original response may have been deferred, it exists once it is edited.
+            _messages[_message_id] = {"id": self.snowflake()}
+        if _message_id not in _messages:
+            return 404, {"message": "Unknown Message", "code": 10008}
+        if method == "GET":
+            return 200, _messages[_message_id]
+        if method == "PATCH":
+            _messages[_message_id] = dict(_messages[_message_id], **(body or {}))
+            return 200, _messages[_message_id]
+        if method == "DELETE":
+            del _messages[_message_id]
+            return 204, None
+        return _method_not_allowed()
+
+    def _callback(self, token: str, body):
+        _data = (body or {}).get("data") or {}
+        self.messages.setdefault(token, {})["@original"] = dict(_data, id=self.snowflake())
+        return 204, None
+
+
+def _permissions_payload(command_id: str, application_id: str, guild_id: str, permissions: list) -> dict:
+    return {
+        "id": command_id,
+        "application_id": application_id,
+        "guild_id": guild_id,
+        "permissions": permissions,
+    }
+
+
+def _not_found():
+    return 404, {"message": "404: Not Found", "code": 0}
+
+
+def _method_not_allowed():
+    return 405, {"message": "405: Method Not Allowed", "code": 0}
+
+
+class FakeDiscordServer(object):
+    """A FakeDiscord served by uvicorn in a background thread, see ``serve_in_thread``.
+
+    Attributes:
+        app (FakeDiscord): The fake being served.
+        host (str): Host it listens on.
+        port (int): Port it listens on.
+    """
+
+    def __init__(self, app: FakeDiscord, host: str, port: int, server, thread: threading.Thread):
+        self.app = app
+        self.host = host
+        self.port = port
+        self._server = server
+        self._thread = thread
+
+    @property
+    def api_base_url(self) -> str:
+        """Pass as ``api_base_url`` to Dispike."""
+        return f"http://{self.host}:{self.port}/api/v8"
+
+    def stop(self, timeout: float = 5.0):
+        self._server.should_exit = True
+        self._thread.join(timeout)
+
+    def __enter__(self) -> "FakeDiscordServer":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def serve_in_thread(app: FakeDiscord = None, host: str = "127.0.0.1", port: int = 0) -> FakeDiscordServer:
+    """Serve a FakeDiscord with uvicorn in a daemon thread, returning once it accepts connections.
+
+    Args:
+        app (FakeDiscord, optional): The fake to serve, a default one if None.
+        host (str, optional): Host to listen on.
+        port (int, optional): Port to listen on, a free one if 0.
+
+    Returns:
+        FakeDiscordServer: The running server.
+    """
+    import uvicorn
+
+    app = app or FakeDiscord()
+    if port == 0:
+        with socket.socket() as _socket:
+            _socket.bind((host, 0))
+            port = _socket.getsockname()[1]
+    _server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="error", lifespan="off"))
+    _server.install_signal_handlers = lambda: None
+    _thread = threading.Thread(target=_server.run, daemon=True)
+    _thread.start()
+    while not _server.started:
+        if not _thread.is_alive():
+            raise RuntimeError(f"Fake Discord could not be started on {host}:{port}")
+        time.sleep(0.01)
+    return FakeDiscordServer(app, host, port, _server, _thread)
+
+
+def main(argv: typing.List[str] = None):
+    import uvicorn
+
+    _parser = argparse.ArgumentParser(description="Serve a fake Discord REST API.")
+    _parser.add_argument("--host", default="127.0.0.1")
+    _parser.add_argument("--port", type=int, default=8081)
+    _parser.add_argument("--latency", type=float, default=0.0, help="seconds every request takes")
+    _parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing")
+    _parser.add_argument("--error-status", type=int, default=502)
+    _parser.add_argument("--rate-limit", type=int, default=None, help="requests per bucket and window")
+    _parser.add_argument("--rate-limit-window", type=float, default=1.0)
+    _args = _parser.parse_args(argv)
+    uvicorn.run(
+        FakeDiscord(
+            latency=_args.latency,
+            error_rate=_args.error_rate,
+            error_status=_args.error_status,
+            rate_limit=_args.rate_limit,
+            rate_limit_window=_args.rate_limit_window,
+        ),
+        host=_args.host,
+        port=_args.port,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
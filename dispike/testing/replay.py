@@ -0,0 +1,361 @@
+"""Replay recorded interaction traffic against a Dispike app, in-process.
+
+Recordings are made with the ``record_traffic`` option of Dispike (see
+``dispike.helper.traffic_recorder``). Every recorded body is re-signed with a test
+key and fed straight into the ASGI app, no network involved, so the results show
+the capacity of the app itself for a real traffic mix. Build the Dispike instance
+under test with the generator's public key, and point ``api_base_url`` at a fake
+Discord (``dispike.testing.fake_discord``) if handlers send followups.
+
+    generator = ReplayLoadGenerator.from_recording("traffic.rec", signing_key=key)
+    bot = Dispike(client_public_key=generator.public_key, ...)
+    report = await generator.run(bot, concurrency=32)
+    print(report.format())
+
+Or from a shell, with ``bot`` built from the public key of the seed:
+
+    python -m dispike.testing.replay traffic.rec --app mybot:bot --signing-key <hex seed> --rate 500
+"""
+import argparse
+import asyncio
+import importlib
+import itertools
+import json
+import math
+import sys
+import time
+import typing
+
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey
+
+from ..helper.traffic_recorder import RecordedInteraction, read_recording
+from ..server import _resolve_interaction_route
+
+if typing.TYPE_CHECKING:
+    from ..main import Dispike  # pragma: no cover
+
+
+def percentile(samples: typing.List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (0 if there are none)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, math.ceil(round(pct / 100.0 * len(ordered), 9)) - 1))
+    return ordered[index]
+
+
+def event_name_of(body: dict) -> str:
+    """Label of an interaction in reports, e.g. ``command:forex.latest`` or ``component:click_me``."""
+    try:
+        _event_type, _parse_interaction = _resolve_interaction_route(body)
+        return f"{_event_type}:{_parse_interaction(body)[0]}"
+    except Exception:
+        return f"unknown:type {body.get('type')}"
+
+
+class EventStats(object):
+    """Results of one event name.
+
+    Attributes:
+        name (str): Event label, see ``event_name_of``.
+        latencies (List[float]): Latency of every successful request, in milliseconds.
+        errors (int): Requests answered with a status of 400 or higher, or raising.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = []  # type: typing.List[float]
+        self.errors = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies) + self.errors
+
+    def as_dict(self, elapsed: float) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "throughput_rps": self.count / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(self.latencies, 50),
+            "p99_ms": percentile(self.latencies, 99),
+            "p999_ms": percentile(self.latencies, 99.9),
+            "max_ms": max(self.latencies, default=0.0),
+        }
+
+
+class ReplayReport(object):
+    """Throughput and latency percentiles of a replay, per event name and in total.
+
+    Attributes:
+        events (Dict[str, EventStats]): Results per event name.
+        elapsed (float): Seconds the replay took.
+    """
+
+    def __init__(self):
+        self.events = {}  # type: typing.Dict[str, EventStats]
+        self.elapsed = 0.0
+
+    def _stats(self, name: str) -> EventStats:
+        _stats = self.events.get(name)
+        if _stats is None:
+            _stats = self.events[name] = EventStats(name)
+        return _stats
+
+    @property
+    def total(self) -> EventStats:
+        _total = EventStats("total")
+        for stats in self.events.values():
+            _total.latencies.extend(stats.latencies)
+            _total.errors += stats.errors
+        return _total
+
+    def as_dict(self) -> dict:
+        return {
+            "elapsed": self.elapsed,
+            "total": self.total.as_dict(self.elapsed),
+            "events": {name: stats.as_dict(self.elapsed) for name, stats in sorted(self.events.items())},
+        }
+
+    def format(self) -> str:
+        _lines = [
+            f"{'event':<36}{'count':>8}{'errors':>8}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'p999 ms':>9}"
+        ]
+        for stats in sorted(self.events.values(), key=lambda stats: -stats.count) + [self.total]:
+            _result = stats.as_dict(self.elapsed)
+            _lines.append(
+                f"{stats.name:<36}{_result['count']:>8}{_result['errors']:>8}{_result['throughput_rps']:>10.0f}"
+                f"{_result['p50_ms']:>9.3f}{_result['p99_ms']:>9.3f}{_result['p999_ms']:>9.3f}"
+            )
+        return "\n".join(_lines)
+
+
+class _SignedRequest(object):
+    __slots__ = ("event", "body", "scope", "offset")
+
+    def __init__(self, event: str, body: bytes, scope: dict, offset: float):
+        self.event = event
+        self.body = body
+        self.scope = scope
+        self.offset = offset
+
+
+class ReplayLoadGenerator(object):
+    """Drives an ASGI app with recorded interactions, re-signed with a test key.
+
+    Requests are signed once up front, so signing does not count towards the
+    measured latency; do not combine long replays with a short
+    ``signature_timestamp_tolerance``.
+    """
+
+    def __init__(
+        self,
+        interactions: typing.Iterable[typing.Union[RecordedInteraction, bytes]],
+        signing_key: SigningKey = None,
+        path: str = "/interactions",
+    ):
+        """Initialize a load generator.
+
+        Args:
+            interactions (Iterable[Union[RecordedInteraction, bytes]]): Recorded interactions (or bare bodies), in arrival order.
+            signing_key (SigningKey, optional): Key to sign with. Defaults to a new key.
+            path (str, optional): Path interactions are posted to.
+        """
+        self.signing_key = signing_key or SigningKey.generate()
+        _timestamp = str(int(time.time()))
+        self._requests = []  # type: typing.List[_SignedRequest]
+        _first_arrival = None
+        for index, interaction in enumerate(interactions):
+            if isinstance(interaction, RecordedInteraction):
+                _body, _arrived_at = interaction.body, interaction.arrived_at
+            else:
+                _body, _arrived_at = interaction, float(index)
+            if _first_arrival is None:
+                _first_arrival = _arrived_at
+            _signature = self.signing_key.sign(_timestamp.encode() + _body).signature.hex()
+            self._requests.append(
+                _SignedRequest(
+                    event_name_of(json.loads(_body)),
+                    _body,
+                    _signed_scope(path, _body, _signature, _timestamp),
+                    _arrived_at - _first_arrival,
+                )
+            )
+
+    @classmethod
+    def from_recording(cls, path: str, signing_key: SigningKey = None) -> "ReplayLoadGenerator":
+        """Load every interaction of a recording made with ``record_traffic``."""
+        return cls(read_recording(path), signing_key=signing_key)
+
+    @property
+    def public_key(self) -> str:
+        """Hex public key to create the Dispike instance under test with."""
+        return self.signing_key.verify_key.encode(encoder=HexEncoder).decode()
+
+    def __len__(self) -> int:
+        return len(self._requests)
+
+    async def run(
+        self,
+        app: typing.Union["Dispike", typing.Callable],
+        concurrency: int = None,
+        rate: float = None,
+        speed: float = None,
+        requests: int = None,
+    ) -> ReplayReport:
+        """Replay the interactions and measure them.
+
+        Exactly one of ``concurrency``, ``rate`` and ``speed`` sets the load. With a rate or
+        speed, latency is measured from when a request was due rather than when it was sent,
+        so a backed up app is not flattered (no coordinated omission).
+
+        Args:
+            app (Union[Dispike, Callable]): A Dispike instance or any ASGI app.
+            concurrency (int, optional): Keep this many requests in flight, sending the next as soon as one finishes.
+            rate (float, optional): Send this many requests per second, regardless of how fast the app answers.
+            speed (float, optional): Keep the recorded arrival times, sped up by this factor (2 replays twice as fast).
+            requests (int, optional): Requests to send, cycling through the recording. Defaults to every interaction once.
+
+        Returns:
+            ReplayReport: Results per event name.
+        """
+        if sum(option is not None for option in (concurrency, rate, speed)) != 1:
+            raise TypeError("Pass exactly one of concurrency, rate or speed.")
+        if not self._requests:
+            raise ValueError("There are no interactions to replay.")
+        if hasattr(app, "referenced_application"):
+            app = app.referenced_application
+        _count = len(self._requests) if requests is None else requests
+        _report = ReplayReport()
+        _started = time.perf_counter()
+
+        if concurrency is not None:
+            _iterator = itertools.islice(itertools.cycle(self._requests), _count)
+
+            async def _worker():
+                for request in _iterator:
+                    await self._send(app, request, time.perf_counter(), _report)
+
+            await asyncio.gather(*[_worker() for _ in range(concurrency)])
+        else:
+            _duration = self._requests[-1].offset
+            _tasks = []
+            for index, request in enumerate(itertools.islice(itertools.cycle(self._requests), _count)):
+                if rate is not None:
+                    _due = _started + index / rate
+                else:
+                    # every further pass over the recording starts after the previous one.
+                    _lap = index // len(self._requests)
+                    _due = _started + (_lap * (_duration + 1e-3) + request.offset) / speed
+                _delay = _due - time.perf_counter()
+                if _delay > 0:
+                    await asyncio.sleep(_delay)
+                _tasks.append(asyncio.ensure_future(self._send(app, request, _due, _report)))
+            await asyncio.gather(*_tasks)
+
+        _report.elapsed = time.perf_counter() - _started
+        return _report
+
+    @staticmethod
+    async def _send(app, request: _SignedRequest, due: float, report: ReplayReport):
+        _stats = report._stats(request.event)
+        try:
+            _status = await _call_asgi(app, request.scope, request.body)
+        except Exception:
+            _status = 500
+        if _status >= 400:
+            _stats.errors += 1
+        else:
+            _stats.latencies.append((time.perf_counter() - due) * 1000)
+
+
+def _signed_scope(path: str, body: bytes, signature: str, timestamp: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 80),
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"x-signature-ed25519", signature.encode()),
+            (b"x-signature-timestamp", timestamp.encode()),
+        ],
+    }
+
+
+async def _call_asgi(app, scope: dict, body: bytes) -> int:
+    """Run one request through an ASGI app, returning the response status."""
+    _received = False
+    _status = 0
+
+    async def receive():
+        nonlocal _received
+        if not _received:
+            _received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal _status
+        if message["type"] == "http.response.start":
+            _status = message["status"]
+
+    await app(dict(scope), receive, send)
+    return _status
+
+
+def _load_app(reference: str):
+    _module, _, _attribute = reference.partition(":")
+    _app = importlib.import_module(_module)
+    for part in (_attribute or "app").split("."):
+        _app = getattr(_app, part)
+    return _app
+
+
+def main(argv: typing.List[str] = None):
+    _parser = argparse.ArgumentParser(description="Replay recorded interactions against a Dispike app.")
+    _parser.add_argument("recording", help="file recorded with the record_traffic option")
+    _parser.add_argument("--app", help="module:attribute of the Dispike instance (or ASGI app) to drive")
+    _parser.add_argument("--signing-key", help="hex seed of the test signing key the app verifies with")
+    _parser.add_argument("--print-public-key", action="store_true", help="print the public key of --signing-key and exit")
+    _load = _parser.add_mutually_exclusive_group()
+    _load.add_argument("--concurrency", type=int, help="requests kept in flight")
+    _load.add_argument("--rate", type=float, help="requests per second")
+    _load.add_argument("--speed", type=float, help="replay the recorded timing, sped up by this factor")
+    _parser.add_argument("--requests", type=int, help="requests to send, cycling through the recording")
+    _parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    _args = _parser.parse_args(argv)
+
+    _signing_key = SigningKey(_args.signing_key, encoder=HexEncoder) if _args.signing_key else SigningKey.generate()
+    if _args.print_public_key:
+        print(_signing_key.verify_key.encode(encoder=HexEncoder).decode())
+        return
+    if not _args.app or not _args.signing_key:
+        _parser.error("--app and --signing-key are required to replay.")
+
+    _generator = ReplayLoadGenerator.from_recording(_args.recording, signing_key=_signing_key)
+    _concurrency = _args.concurrency
+    if _concurrency is None and _args.rate is None and _args.speed is None:
+        _concurrency = 1
+    _report = asyncio.run(
+        _generator.run(
+            _load_app(_args.app),
+            concurrency=_concurrency,
+            rate=_args.rate,
+            speed=_args.speed,
+            requests=_args.requests,
+        )
+    )
+    print(json.dumps(_report.as_dict(), indent=2) if _args.json else _report.format())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
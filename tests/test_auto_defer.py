@@ -0,0 +1,270 @@
+import asyncio
+import json
+
+import pytest
+import respx
+from httpx import Response
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey
+
+from dispike import Dispike, server
+from dispike.eventer import EventTypes
+from dispike.response import DiscordResponse
+
+
+def create_dispike(**kwargs) -> Dispike:
+    return Dispike(
+        client_public_key=SigningKey.generate()
+        .verify_key.encode(encoder=HexEncoder)
+        .decode(),
+        bot_token="BOTTOKEN",
+        application_id="APPID",
+        **kwargs,
+    )
+
+
+_member = {
+    "deaf": False,
+    "joined_at": "2019-05-12T18:36:16.878000+00:00",
+    "mute": False,
+    "pending": False,
+    "permissions": "2147483647",
+    "roles": [],
+    "user": {
+        "avatar": None,
+        "discriminator": "3333",
+        "id": "234234213122123",
+        "public_flags": 0,
+        "username": "exo",
+    },
+}
+
+
+def create_mocked_request(body: dict):
+    class MockState:
+        _cached_body = json.dumps(body).encode()
+
+    class MockRequest:
+        state = MockState
+
+    return MockRequest
+
+
+def command_body(name: str) -> dict:
+    return {
+        "channel_id": "123123",
+        "data": {"id": "12312312", "name": name, "type": 1},
+        "guild_id": "123123",
+        "id": "123123123132",
+        "member": _member,
+        "token": "FAKETOKEN",
+        "type": 2,
+        "version": 1,
+    }
+
+
+def button_body(custom_id: str) -> dict:
+    return {
+        "application_id": "APPID",
+        "channel_id": "123123",
+        "data": {"component_type": 2, "custom_id": custom_id},
+        "guild_id": "123123",
+        "id": "123123123132",
+        "member": _member,
+        "message": {
+            "attachments": [],
+            "author": {
+                "avatar": None,
+                "bot": True,
+                "discriminator": "0000",
+                "id": "1",
+                "public_flags": 0,
+                "username": "bot",
+            },
+            "channel_id": "123123",
+            "components": [],
+            "content": "original",
+            "edited_timestamp": None,
+            "embeds": [],
+            "flags": 0,
+            "id": "2",
+            "mention_everyone": False,
+            "mention_roles": [],
+            "mentions": [],
+            "pinned": False,
+            "timestamp": "2021-06-01T00:00:00.000000+00:00",
+            "tts": False,
+            "type": 0,
+        },
+        "token": "FAKETOKEN",
+        "type": 3,
+        "version": 1,
+    }
+
+
+@pytest.fixture
+def auto_defer_dispike(monkeypatch):
+    # the router is shared, restore its settings once the test is done.
+    for _attribute in ("_dispike_instance", "_task_supervisor", "_auto_defer_budget"):
+        monkeypatch.setattr(server.router, _attribute, getattr(server.router, _attribute))
+    _dispike = create_dispike(auto_defer=True, auto_defer_budget=0.05)
+    server.router._dispike_instance = _dispike
+    return _dispike
+
+
+@pytest.mark.asyncio
+async def test_fast_handler_responds_inline(auto_defer_dispike: Dispike):
+    async def fast(ctx) -> DiscordResponse:
+        return DiscordResponse(content="fast")
+
+    auto_defer_dispike.on("fast", EventTypes.COMMAND, func=fast)
+    _result = await server.handle_interactions(create_mocked_request(command_body("fast")))
+    assert _result["data"]["content"] == "fast"
+    assert auto_defer_dispike.deferred_tasks.submitted == 0
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_slow_command_is_deferred_and_edited_later(auto_defer_dispike: Dispike):
+    route = respx.patch(
+        "https://discord.com/api/v8/webhooks/APPID/FAKETOKEN/messages/@original"
+    ).mock(return_value=Response(200))
+
+    async def slow(ctx) -> DiscordResponse:
+        await asyncio.sleep(0.2)
+        return DiscordResponse(content="slow")
+
+    auto_defer_dispike.on("slow", EventTypes.COMMAND, func=slow)
+    _result = await server.handle_interactions(create_mocked_request(command_body("slow")))
+    assert _result == {"type": 5}
+    assert not route.called
+
+    assert await auto_defer_dispike.deferred_tasks.drain(timeout=1) == 0
+    assert route.called
+    assert json.loads(route.calls.last.request.content)["content"] == "slow"
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_slow_component_is_deferred_with_type_6(auto_defer_dispike: Dispike):
+    route = respx.patch(
+        "https://discord.com/api/v8/webhooks/APPID/FAKETOKEN/messages/@original"
+    ).mock(return_value=Response(200))
+    followup_route = respx.post("https://discord.com/api/v8/webhooks/APPID/FAKETOKEN").mock(
+        return_value=Response(200)
+    )
+
+    async def slow_button(ctx) -> DiscordResponse:
+        await asyncio.sleep(0.2)
+        return DiscordResponse(content="clicked", update_message=True)
+
+    auto_defer_dispike.on("slow_button", EventTypes.COMPONENT, func=slow_button)
+    _result = await server.handle_interactions(
+        create_mocked_request(button_body("slow_button"))
+    )
+    assert _result == {"type": 6}
+    await auto_defer_dispike.deferred_tasks.drain(timeout=1)
+    # an update (type 7) edits the message holding the button.
+    assert json.loads(route.calls.last.request.content)["content"] == "clicked"
+    assert not followup_route.called
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_slow_component_new_message_is_sent_as_followup(auto_defer_dispike: Dispike):
+    edit_route = respx.patch(
+        "https://discord.com/api/v8/webhooks/APPID/FAKETOKEN/messages/@original"
+    ).mock(return_value=Response(200))
+    followup_route = respx.post("https://discord.com/api/v8/webhooks/APPID/FAKETOKEN").mock(
+        return_value=Response(200)
+    )
+
+    async def slow_button(ctx) -> DiscordResponse:
+        await asyncio.sleep(0.2)
+        return DiscordResponse(content="a new message")
+
+    auto_defer_dispike.on("slow_button", EventTypes.COMPONENT, func=slow_button)
+    _result = await server.handle_interactions(
+        create_mocked_request(button_body("slow_button"))
+    )
+    assert _result == {"type": 6}
+    await auto_defer_dispike.deferred_tasks.drain(timeout=1)
+    # the message holding the button is left alone.
+    assert not edit_route.called
+    assert json.loads(followup_route.calls.last.request.content)["content"] == "a new message"
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_slow_ephemeral_command_keeps_its_flag(auto_defer_dispike: Dispike):
+    edit_route = respx.patch(
+        "https://discord.com/api/v8/webhooks/APPID/FAKETOKEN/messages/@original"
+    ).mock(return_value=Response(200))
+    delete_route = respx.delete(
+        "https://discord.com/api/v8/webhooks/APPID/FAKETOKEN/messages/@original"
+    ).mock(return_value=Response(204))
+    followup_route = respx.post("https://discord.com/api/v8/webhooks/APPID/FAKETOKEN").mock(
+        return_value=Response(200)
+    )
+
+    async def secret(ctx) -> DiscordResponse:
+        await asyncio.sleep(0.2)
+        return DiscordResponse(content="only you", empherical=True)
+
+    auto_defer_dispike.on("secret", EventTypes.COMMAND, func=secret)
+    _result = await server.handle_interactions(create_mocked_request(command_body("secret")))
+    assert _result == {"type": 5}
+    await auto_defer_dispike.deferred_tasks.drain(timeout=1)
+    assert not edit_route.called
+    assert delete_route.called
+    _sent = json.loads(followup_route.calls.last.request.content)
+    assert _sent["content"] == "only you"
+    assert _sent["flags"] == 64
+
+
+@pytest.mark.asyncio
+async def test_slow_handler_errors_are_counted(auto_defer_dispike: Dispike):
+    async def broken(ctx) -> dict:
+        await asyncio.sleep(0.2)
+        raise ValueError("broken")
+
+    auto_defer_dispike.on("broken", EventTypes.COMMAND, func=broken)
+    _result = await server.handle_interactions(create_mocked_request(command_body("broken")))
+    assert _result == {"type": 5}
+    await auto_defer_dispike.deferred_tasks.drain(timeout=1)
+    assert auto_defer_dispike.deferred_tasks.failed == 1
+
+
+def test_auto_defer_budget_must_fit_discord_deadline(monkeypatch):
+    monkeypatch.setattr(server.router, "_task_supervisor", server.router._task_supervisor)
+    with pytest.raises(ValueError):
+        create_dispike(auto_defer=True, auto_defer_budget=3)
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_deferred_handler_is_timed_until_it_finishes(monkeypatch):
+    for _attribute in ("_dispike_instance", "_task_supervisor", "_auto_defer_budget", "_metrics"):
+        monkeypatch.setattr(server.router, _attribute, getattr(server.router, _attribute))
+    _dispike = create_dispike(auto_defer=True, auto_defer_budget=0.05, metrics=True)
+    server.router._dispike_instance = _dispike
+    respx.patch(
+        "https://discord.com/api/v8/webhooks/APPID/FAKETOKEN/messages/@original"
+    ).mock(return_value=Response(200))
+
+    async def slow(ctx) -> DiscordResponse:
+        await asyncio.sleep(0.2)
+        return DiscordResponse(content="slow")
+
+    _dispike.on("slow", EventTypes.COMMAND, func=slow)
+    assert await server.handle_interactions(create_mocked_request(command_body("slow"))) == {"type": 5}
+    await _dispike.deferred_tasks.drain(timeout=1)
+
+    _histograms = {
+        (name, tuple(labels)): (sum_, count)
+        for name, labels, _, sum_, count in _dispike.metrics.snapshot()["histograms"]
+    }
+    _sum, _count = _histograms[("dispike_handler_duration_seconds", ("command", "slow"))]
+    assert _count == 1
+    # not cut off at the auto defer budget.
+    assert _sum >= 0.2
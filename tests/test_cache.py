@@ -0,0 +1,57 @@
+import pytest
+
+from dispike.helper.cache import TTLCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_hit_and_miss():
+    cache = TTLCache(maxsize=2, ttl=10)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.stats == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_cache_expires_entries():
+    timer = FakeTimer()
+    cache = TTLCache(maxsize=2, ttl=10, timer=timer)
+    cache.set("a", 1)
+    timer.now = 9.9
+    assert "a" in cache
+    timer.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_cache_invalidate_predicate():
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set(("guild", 1), 1)
+    cache.set(("guild", 2), 2)
+    cache.set(("global",), 3)
+    cache.invalidate(lambda key: key[0] == "guild")
+    assert len(cache) == 1
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_cache_invalid_size():
+    with pytest.raises(ValueError):
+        TTLCache(maxsize=0)
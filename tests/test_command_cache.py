@@ -0,0 +1,201 @@
+import pytest
+import respx
+from httpx import Response
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey
+
+from dispike import Dispike
+from dispike.creating.models import DiscordCommand
+from dispike.creating.models.permissions import (
+    ApplicationCommandPermissions,
+    ApplicationCommandPermissionType,
+    NewApplicationPermission,
+)
+from dispike.helper.command_cache import MISSING, CommandCache
+
+API = "https://discord.com/api/v8/applications/APPID"
+COMMANDS = [
+    {"id": "1234", "application_id": "7890", "name": "wave", "description": "Send a wave!"},
+    {"id": "3344", "application_id": "7890", "name": "hug", "description": "Send a hug!"},
+]
+PERMISSIONS = {
+    "id": "1234",
+    "application_id": "7890",
+    "permissions": [{"id": "10", "type": 1, "permission": True}],
+}
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def dispike_object():
+    return Dispike(
+        client_public_key=SigningKey.generate().verify_key.encode(encoder=HexEncoder).decode(),
+        bot_token="BOTTOKEN",
+        application_id="APPID",
+        command_cache=True,
+    )
+
+
+def test_command_cache_expires_and_indexes_names():
+    from dispike.incoming import IncomingApplicationCommand
+
+    timer = FakeTimer()
+    cache = CommandCache(ttl=10, timer=timer)
+    assert cache.get_commands() is MISSING
+    cache.set_commands([IncomingApplicationCommand(**command) for command in COMMANDS])
+    assert cache.command_id("hug") == 3344
+    assert cache.command_id("nope") is None
+    assert cache.command_id("hug", guild_id="1111") is MISSING
+    timer.now = 10
+    assert cache.command_id("hug") is MISSING
+
+
+def test_invalidating_guild_commands_drops_guild_permissions():
+    cache = CommandCache()
+    cache.set_commands([], guild_id=1111)
+    cache.set_permissions(None, 1111, 1234)
+    cache.set_permissions([], 2222)
+    cache.invalidate_commands(1111)
+    assert cache.get_commands(1111) is MISSING
+    assert cache.get_permissions(1111, 1234) is MISSING
+    assert cache.get_permissions(2222) == []
+    cache.invalidate_commands()
+    assert cache.get_permissions(2222) is MISSING
+
+
+def test_get_commands_is_cached_until_edited(dispike_object: Dispike):
+    with respx.mock() as mock:
+        _get = mock.get(f"{API}/commands").mock(return_value=Response(200, json=COMMANDS))
+        mock.delete(f"{API}/commands/1234").mock(return_value=Response(204))
+        assert len(dispike_object.get_commands()) == 2
+        assert dispike_object.get_command_id("hug") == 3344
+        assert _get.call_count == 1
+
+        dispike_object.delete_command(1234)
+        dispike_object.get_commands()
+        assert _get.call_count == 2
+    assert dispike_object.command_cache.stats["hits"] == 1
+
+
+def test_registering_invalidates_guild_commands(dispike_object: Dispike):
+    with respx.mock() as mock:
+        _get = mock.get(f"{API}/guilds/1111/commands").mock(return_value=Response(200, json=[]))
+        mock.post(f"{API}/guilds/1111/commands").mock(return_value=Response(201))
+        dispike_object.get_commands(guild_only=True, guild_id_passed="1111")
+        dispike_object.get_commands(guild_only=True, guild_id_passed="1111")
+        dispike_object.register(
+            DiscordCommand(name="wave", description="Send a wave!"),
+            guild_only=True,
+            guild_to_target="1111",
+        )
+        dispike_object.get_commands(guild_only=True, guild_id_passed="1111")
+    assert _get.call_count == 2
+
+
+def test_lookups_that_raced_an_invalidation_are_dropped():
+    cache = CommandCache()
+    _single = cache.permissions_generation(1111, 1234)
+    _other = cache.permissions_generation(1111, 4321)
+    _guild = cache.permissions_generation(2222)
+    _commands = cache.commands_generation()
+    cache.invalidate_permissions(1111, 1234)
+    cache.set_permissions(None, 1111, 1234, generation=_single)
+    cache.set_permissions(None, 1111, 4321, generation=_other)
+    assert cache.get_permissions(1111, 1234) is MISSING
+    assert cache.get_permissions(1111, 4321) is None
+
+    cache.invalidate_commands()
+    cache.set_permissions([], 2222, generation=_guild)
+    cache.set_commands([], generation=_commands)
+    assert cache.get_permissions(2222) is MISSING
+    assert cache.get_commands() is MISSING
+    cache.set_commands([], generation=cache.commands_generation())
+    assert cache.get_commands() == []
+
+
+def test_permissions_are_cached_until_set(dispike_object: Dispike):
+    with respx.mock() as mock:
+        _get = mock.get(f"{API}/guilds/1111/commands/1234/permissions").mock(
+            return_value=Response(200, json=PERMISSIONS)
+        )
+        _missing = mock.get(f"{API}/guilds/1111/commands/4321/permissions").mock(
+            return_value=Response(404)
+        )
+        mock.put(f"{API}/guilds/1111/commands/1234/permissions").mock(
+            return_value=Response(200)
+        )
+        assert dispike_object.get_command_permission_in_guild(1234, 1111).id == 1234
+        assert dispike_object.get_command_permission_in_guild(1234, 1111).id == 1234
+        assert dispike_object.get_command_permission_in_guild(4321, 1111) is None
+        assert dispike_object.get_command_permission_in_guild(4321, 1111) is None
+        assert _get.call_count == 1 and _missing.call_count == 1
+
+        dispike_object.set_command_permission(
+            1234,
+            1111,
+            NewApplicationPermission(
+                permissions=[
+                    ApplicationCommandPermissions(
+                        id=10, type=ApplicationCommandPermissionType.ROLE, permission=False
+                    )
+                ]
+            ),
+        )
+        dispike_object.get_command_permission_in_guild(1234, 1111)
+        assert _get.call_count == 2
+
+
+def test_permissions_read_during_a_set_are_not_kept(dispike_object: Dispike):
+    with respx.mock() as mock:
+        _get = mock.get(f"{API}/guilds/1111/commands/1234/permissions").mock(
+            return_value=Response(200, json=PERMISSIONS)
+        )
+
+        def _racing_read(request):
+            # another lookup caches the permissions while the update is in flight.
+            dispike_object.get_command_permission_in_guild(1234, 1111)
+            return Response(200)
+
+        mock.put(f"{API}/guilds/1111/commands/1234/permissions").mock(side_effect=_racing_read)
+        assert dispike_object.set_command_permission(
+            1234, 1111, NewApplicationPermission(permissions=[])
+        )
+        dispike_object.get_command_permission_in_guild(1234, 1111)
+        assert _get.call_count == 2
+
+
+def test_permissions_fetched_during_a_set_are_not_kept(dispike_object: Dispike):
+    with respx.mock() as mock:
+        def _stale_read(request):
+            # the update lands while this lookup is still waiting on Discord.
+            dispike_object._invalidate_permissions(1111, 1234)
+            return Response(200, json=PERMISSIONS)
+
+        _get = mock.get(f"{API}/guilds/1111/commands/1234/permissions").mock(
+            side_effect=_stale_read
+        )
+        dispike_object.get_command_permission_in_guild(1234, 1111)
+        dispike_object.get_command_permission_in_guild(1234, 1111)
+        assert _get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_async_lookups_share_the_cache(dispike_object: Dispike):
+    with respx.mock() as mock:
+        _get = mock.get(f"{API}/commands").mock(return_value=Response(200, json=COMMANDS))
+        _all = mock.get(f"{API}/guilds/1111/commands/permissions").mock(
+            return_value=Response(200, json=[PERMISSIONS])
+        )
+        assert await dispike_object.async_get_command_id("wave") == 1234
+        assert len(dispike_object.get_commands()) == 2
+        await dispike_object.async_get_all_command_permissions_in_guild(1111)
+        assert len(dispike_object.get_all_command_permissions_in_guild(1111)) == 1
+    assert _get.call_count == 1 and _all.call_count == 1
+    await dispike_object.http_pool.aclose()
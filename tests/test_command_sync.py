@@ -0,0 +1,160 @@
+import json
+
+import pytest
+import respx
+from httpx import Response
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey
+
+from dispike import Dispike, PerCommandRegistrationSettings
+from dispike.creating.models import CommandOption, DiscordCommand, OptionTypes
+from dispike.creating.sync import SyncActionType, hash_commands, normalize_command
+from dispike.errors.network import DiscordAPIError
+
+API = "https://discord.com/api/v8/applications/APPID"
+
+
+@pytest.fixture
+def dispike_object():
+    return Dispike(
+        client_public_key=SigningKey.generate().verify_key.encode(encoder=HexEncoder).decode(),
+        bot_token="BOTTOKEN",
+        application_id="APPID",
+    )
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "commands.json")
+
+
+def wave_command(description="Send a wave!"):
+    return DiscordCommand(
+        name="wave",
+        description=description,
+        options=[
+            CommandOption(
+                name="person", description="person to target", type=OptionTypes.USER, required=True
+            )
+        ],
+    )
+
+
+def remote(command: DiscordCommand, command_id: int) -> dict:
+    return {**command.dict(exclude_none=True), "id": command_id, "application_id": 1, "version": "1"}
+
+
+def test_normalized_remote_and_local_commands_are_equal():
+    _local = wave_command()
+    _remote = {**remote(_local, 1), "options": [{"name": "person", "description": "person to target", "type": 6, "required": True}]}
+    assert normalize_command(_local) == normalize_command(_remote)
+    assert hash_commands([_local, DiscordCommand(name="hug", description="hug")]) == hash_commands(
+        [DiscordCommand(name="hug", description="hug"), _local]
+    )
+
+
+def test_sync_sends_minimal_plan_then_nothing(dispike_object: Dispike, cache_path):
+    _local = [wave_command(), DiscordCommand(name="hug", description="Send a hug!"), DiscordCommand(name="new", description="brand new")]
+    with respx.mock() as mock:
+        mock.get(f"{API}/commands").mock(
+            return_value=Response(
+                200,
+                json=[
+                    remote(wave_command(), 1),
+                    remote(DiscordCommand(name="hug", description="outdated"), 2),
+                    remote(DiscordCommand(name="old", description="gone"), 3),
+                ],
+            )
+        )
+        _create = mock.post(f"{API}/commands").mock(return_value=Response(201, json={}))
+        _patch = mock.patch(f"{API}/commands/2").mock(return_value=Response(200, json={}))
+        _delete = mock.delete(f"{API}/commands/3").mock(return_value=Response(204))
+        _plan = dispike_object.sync_commands(_local, cache_path=cache_path)
+
+    assert sorted((action.type, action.name) for action in _plan.actions) == [
+        (SyncActionType.CREATE, "new"),
+        (SyncActionType.DELETE, "old"),
+        (SyncActionType.PATCH, "hug"),
+    ]
+    assert json.loads(_create.calls.last.request.content)["name"] == "new"
+    assert json.loads(_patch.calls.last.request.content)["description"] == "Send a hug!"
+    assert _delete.called
+
+    with open(cache_path) as cache_file:
+        assert json.load(cache_file)["scopes"] == {"global": hash_commands(_local)}
+
+    # no routes are mocked, any request would fail.
+    with respx.mock():
+        _plan = dispike_object.sync_commands(list(reversed(_local)), cache_path=cache_path)
+    assert _plan.is_empty
+    assert _plan.unchanged == ["global"]
+    assert _plan.fetched == []
+
+
+def test_only_changed_guild_is_fetched(dispike_object: Dispike, cache_path):
+    _commands = [
+        PerCommandRegistrationSettings(schema=wave_command(), guild_id="111"),
+        PerCommandRegistrationSettings(schema=wave_command(), guild_id="222"),
+    ]
+    with respx.mock() as mock:
+        mock.get(f"{API}/guilds/111/commands").mock(return_value=Response(200, json=[]))
+        mock.get(f"{API}/guilds/222/commands").mock(return_value=Response(200, json=[]))
+        mock.post(f"{API}/guilds/111/commands").mock(return_value=Response(201, json={}))
+        mock.post(f"{API}/guilds/222/commands").mock(return_value=Response(201, json={}))
+        dispike_object.sync_commands(_commands, cache_path=cache_path)
+
+    _commands[1] = PerCommandRegistrationSettings(schema=wave_command("Wave harder!"), guild_id="222")
+    with respx.mock() as mock:
+        _fetch = mock.get(f"{API}/guilds/222/commands").mock(
+            return_value=Response(200, json=[remote(wave_command(), 5)])
+        )
+        _patch = mock.patch(f"{API}/guilds/222/commands/5").mock(return_value=Response(200, json={}))
+        _plan = dispike_object.sync_commands(_commands, cache_path=cache_path)
+    assert _plan.unchanged == ["111"]
+    assert _plan.fetched == ["222"]
+    assert _fetch.call_count == 1 and _patch.call_count == 1
+
+
+def test_failed_sync_keeps_cache(dispike_object: Dispike, cache_path):
+    with respx.mock() as mock:
+        mock.get(f"{API}/commands").mock(return_value=Response(200, json=[]))
+        mock.post(f"{API}/commands").mock(return_value=Response(400, json={}))
+        with pytest.raises(DiscordAPIError):
+            dispike_object.sync_commands([wave_command()], cache_path=cache_path)
+    with pytest.raises(FileNotFoundError):
+        open(cache_path)
+
+
+def test_dry_run_and_removed_scope(dispike_object: Dispike, cache_path):
+    with respx.mock() as mock:
+        mock.get(f"{API}/guilds/111/commands").mock(return_value=Response(200, json=[]))
+        mock.post(f"{API}/guilds/111/commands").mock(return_value=Response(201, json={}))
+        dispike_object.sync_commands(
+            [PerCommandRegistrationSettings(schema=wave_command(), guild_id="111")],
+            cache_path=cache_path,
+        )
+
+    # only the guild that had commands before is compared.
+    with respx.mock() as mock:
+        mock.get(f"{API}/guilds/111/commands").mock(
+            return_value=Response(200, json=[remote(wave_command(), 9)])
+        )
+        _plan = dispike_object.sync_commands([], cache_path=cache_path, dry_run=True)
+    assert [(action.type, action.scope, action.command_id) for action in _plan.actions] == [
+        (SyncActionType.DELETE, "111", 9)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_async_sync(dispike_object: Dispike, cache_path):
+    with respx.mock() as mock:
+        mock.get(f"{API}/commands").mock(return_value=Response(200, json=[]))
+        _create = mock.post(f"{API}/commands").mock(return_value=Response(201, json={}))
+        _plan = await dispike_object.async_sync_commands([wave_command()], cache_path=cache_path)
+    assert _create.call_count == 1
+    assert len(_plan) == 1
+
+    with respx.mock():
+        _plan = await dispike_object.async_sync_commands([wave_command()], cache_path=cache_path)
+    assert _plan.unchanged == ["global"]
+    await dispike_object.http_pool.aclose()
@@ -0,0 +1,210 @@
+from dispike import Dispike
+import dispike.main
+from dispike.eventer import EventTypes
+from dispike.eventer_helpers.dispatch import (
+    EventInvoker,
+    compile_dispatch_table,
+    dispatch_key,
+)
+from dispike.server import _resolve_interaction_route, _parse_button, _parse_slash_command
+import pytest
+
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey
+
+verification_key = SigningKey.generate().verify_key.encode(encoder=HexEncoder)
+
+
+@pytest.fixture
+def dispike_object():
+    return Dispike(
+        client_public_key=verification_key.decode(),
+        bot_token="BOTTOKEN",
+        application_id="APPID",
+    )
+
+
+async def sample_callback(*args, **kwargs):
+    return "called"
+
+
+def test_dispatch_key_uses_plain_strings():
+    assert dispatch_key(EventTypes.COMMAND, "sample") == ("command", "sample")
+    assert type(dispatch_key(EventTypes.COMMAND, "sample")[0]) is str
+    assert dispatch_key("component", "sample") == ("component", "sample")
+
+
+def test_compile_dispatch_table():
+    _table = compile_dispatch_table(
+        {
+            EventTypes.COMMAND: {"sample": {"settings": {}, "function": sample_callback}},
+            "component": {"button": {"function": sample_callback}},
+        }
+    )
+    assert set(_table) == {("command", "sample"), ("component", "button")}
+    assert isinstance(_table[("command", "sample")], EventInvoker)
+    assert _table[("component", "button")].settings == {}
+
+
+def test_registration_compiles_invoker(dispike_object: Dispike):
+    dispike_object.on("sample", EventTypes.COMMAND, func=sample_callback)
+    _invoker = dispike_object.resolve_event_invoker("sample", EventTypes.COMMAND)
+    assert _invoker.function is sample_callback
+    assert _invoker.type == "command"
+    assert dispike_object.resolve_event_invoker("sample", EventTypes.COMPONENT) is None
+
+
+@pytest.mark.asyncio
+async def test_assigning_callbacks_recompiles(dispike_object: Dispike):
+    dispike_object.callbacks = {
+        "command": {"assigned": {"settings": {}, "function": sample_callback}},
+        "component": {},
+    }
+    assert await dispike_object.emit("assigned", EventTypes.COMMAND) == "called"
+    dispike_object.clear_all_event_callbacks()
+    assert dispike_object.resolve_event_invoker("assigned", "command") is None
+
+
+@pytest.mark.asyncio
+async def test_in_place_callback_edit_is_picked_up(dispike_object: Dispike):
+    dispike_object.callbacks["component"]["late"] = {
+        "settings": {},
+        "function": sample_callback,
+    }
+    assert await dispike_object.emit("late", EventTypes.COMPONENT) == "called"
+
+
+@pytest.mark.asyncio
+async def test_in_place_callback_replacement_is_picked_up(dispike_object: Dispike):
+    async def replacement(*args, **kwargs):
+        return "replaced"
+
+    dispike_object.on("sample", EventTypes.COMMAND, func=sample_callback)
+    dispike_object.callbacks["command"]["sample"]["function"] = replacement
+    assert await dispike_object.emit("sample", EventTypes.COMMAND) == "replaced"
+    dispike_object.callbacks["command"]["sample"] = {"settings": {}, "function": sample_callback}
+    assert await dispike_object.emit("sample", EventTypes.COMMAND) == "called"
+
+
+def test_in_place_callback_deletion_is_picked_up(dispike_object: Dispike):
+    dispike_object.on("sample", EventTypes.COMMAND, func=sample_callback)
+    del dispike_object.callbacks["command"]["sample"]
+    assert dispike_object.resolve_event_invoker("sample", EventTypes.COMMAND) is None
+
+
+def test_lookups_only_recompile_after_an_edit(dispike_object: Dispike, monkeypatch):
+    _compiled = []
+
+    def counting_compile(callbacks):
+        _compiled.append(1)
+        return compile_dispatch_table(callbacks)
+
+    monkeypatch.setattr(dispike.main, "compile_dispatch_table", counting_compile)
+    dispike_object.on("sample", EventTypes.COMMAND, func=sample_callback)
+    for _ in range(3):
+        assert dispike_object.resolve_event_invoker("sample", EventTypes.COMMAND) is not None
+        assert dispike_object.resolve_event_invoker("missing", EventTypes.COMMAND) is None
+    assert _compiled == []
+
+    dispike_object.callbacks["command"].pop("sample")
+    dispike_object.callbacks.setdefault("component", {})["late"] = {"settings": {}, "function": sample_callback}
+    assert dispike_object.resolve_event_invoker("sample", EventTypes.COMMAND) is None
+    assert dispike_object.resolve_event_invoker("late", EventTypes.COMPONENT) is not None
+    assert _compiled == [1]
+
+
+def test_clear_single_event_type(dispike_object: Dispike):
+    dispike_object.on("sample", EventTypes.COMPONENT, func=sample_callback)
+    dispike_object.clear_all_event_callbacks(EventTypes.COMPONENT)
+    assert dispike_object.resolve_event_invoker("sample", EventTypes.COMPONENT) is None
+
+
+@pytest.mark.parametrize(
+    "body,expected_type",
+    [
+        ({"type": 2, "data": {"type": 1}}, "command"),
+        ({"type": 2, "data": {}}, "command"),
+        ({"type": 2, "data": {"type": 2}}, "user_command"),
+        ({"type": 2, "data": {"type": 3}}, "message_command"),
+        ({"type": 3, "data": {"component_type": 2}}, "component"),
+        ({"type": 3, "data": {"component_type": 3}}, "component"),
+        ({"type": 4, "data": {}}, "command"),
+    ],
+)
+def test_resolve_interaction_route(body, expected_type):
+    assert _resolve_interaction_route(body)[0] == expected_type
+
+
+def test_resolve_interaction_route_parsers():
+    assert _resolve_interaction_route({"type": 3, "data": {"component_type": 2}})[1] is _parse_button
+    assert _resolve_interaction_route({"type": 5, "data": {}})[1] is _parse_slash_command
+
+
+from dispike.eventer_helpers.dispatch import ResponseStrategy
+from dispike.response import DiscordResponse, DeferredResponse, DeferredEmphericalResponse
+
+
+async def hinted_discord_response(*args, **kwargs) -> DiscordResponse:
+    pass
+
+
+async def hinted_deferred(*args, **kwargs) -> DeferredResponse:
+    pass
+
+
+async def hinted_deferred_empherical(*args, **kwargs) -> DeferredEmphericalResponse:
+    pass
+
+
+async def hinted_dict(*args, **kwargs) -> dict:
+    pass
+
+
+async def hinted_other(*args, **kwargs) -> str:
+    pass
+
+
+async def hinted_forward_reference(*args, **kwargs) -> "LateResponse":
+    pass
+
+
+@pytest.mark.parametrize(
+    "function,strategy",
+    [
+        (hinted_discord_response, ResponseStrategy.IMMEDIATE),
+        (hinted_deferred, ResponseStrategy.DEFERRED),
+        (hinted_deferred_empherical, ResponseStrategy.DEFERRED),
+        (hinted_dict, ResponseStrategy.DICT),
+        (hinted_other, ResponseStrategy.GUESS),
+        (sample_callback, ResponseStrategy.GUESS),
+    ],
+)
+def test_response_strategy_resolved_at_registration(function, strategy):
+    _invoker = EventInvoker("sample", EventTypes.COMMAND, function)
+    assert _invoker._response_strategy is strategy
+    assert _invoker.response_strategy is strategy
+
+
+def test_response_strategy_without_hint_has_no_return_hint():
+    assert EventInvoker("sample", "command", sample_callback).return_hint is None
+    assert (
+        EventInvoker("sample", "command", hinted_deferred_empherical).return_hint
+        is DeferredEmphericalResponse
+    )
+
+
+def test_forward_reference_resolved_on_first_dispatch():
+    global LateResponse
+    _invoker = EventInvoker("sample", "command", hinted_forward_reference)
+    assert _invoker._response_strategy is None
+
+    LateResponse = DiscordResponse
+    try:
+        assert _invoker.response_strategy is ResponseStrategy.IMMEDIATE
+    finally:
+        del LateResponse
+
+
+def test_unresolvable_forward_reference_falls_back_to_guessing():
+    _invoker = EventInvoker("sample", "command", hinted_forward_reference)
+    assert _invoker.response_strategy is ResponseStrategy.GUESS
@@ -0,0 +1,175 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey
+
+from dispike import Dispike
+from dispike.creating.models import DiscordCommand
+from dispike.creating.models.permissions import (
+    ApplicationCommandPermissions,
+    ApplicationCommandPermissionType,
+    NewApplicationPermission,
+)
+from dispike.errors.network import DiscordAPIError
+from dispike.followup import FollowUpMessages
+from dispike.response import DiscordResponse
+from dispike.testing import FakeDiscord, serve_in_thread
+
+
+@pytest.fixture(scope="module")
+def server():
+    _server = serve_in_thread(FakeDiscord())
+    yield _server
+    _server.stop()
+
+
+@pytest.fixture
+def fake(server):
+    server.app.reset()
+    server.app.latency = 0.0
+    server.app.rate_limit = None
+    server.app.error_rate = 0.0
+    return server.app
+
+
+@pytest.fixture
+def bot(server, fake):
+    return Dispike(
+        client_public_key=SigningKey.generate().verify_key.encode(encoder=HexEncoder).decode(),
+        bot_token="BOTTOKEN",
+        application_id="7890",
+        api_base_url=server.api_base_url,
+    )
+
+
+def _command(name="wave"):
+    return DiscordCommand(name=name, description="Send a wave to a nice person!", options=[])
+
+
+class _Interaction:
+    token = "INTERACTIONTOKEN"
+
+
+def test_api_base_url_defaults_to_discord():
+    _bot = Dispike(
+        client_public_key=SigningKey.generate().verify_key.encode(encoder=HexEncoder).decode(),
+        bot_token="BOTTOKEN",
+        application_id="7890",
+    )
+    assert _bot.api_base_url == "https://discord.com/api/v8"
+    assert str(_bot._registrator._client.base_url).startswith("https://discord.com/api/v8/")
+
+
+def test_register_get_edit_delete(bot, fake):
+    assert bot.register(_command(), guild_only=True, guild_to_target="1111") is True
+    _commands = bot.get_commands(guild_only=True, guild_id_passed="1111")
+    assert [command.name for command in _commands] == ["wave"]
+
+    _edited = bot.edit_command(
+        DiscordCommand(name="wave", description="Wave harder.", options=[]),
+        command_id=_commands[0].id,
+        guild_only=True,
+        guild_id_passed="1111",
+    )
+    assert _edited.description == "Wave harder."
+
+    assert bot.delete_command(_commands[0].id, guild_only=True, guild_id_passed="1111") is True
+    assert bot.get_commands(guild_only=True, guild_id_passed="1111") == []
+    assert fake.count("DELETE") == 1
+
+
+def test_global_commands(bot, fake):
+    assert bot.register(_command("wave")) is True
+    assert bot.register(_command("ping")) is True
+    assert sorted(command.name for command in bot.get_commands()) == ["ping", "wave"]
+    assert len(fake.commands[None]) == 2
+
+
+def test_registering_an_existing_name_overwrites_it(bot, fake):
+    bot.register(_command(), guild_only=True, guild_to_target=1111)
+    bot.register(_command(), guild_only=True, guild_to_target=1111)
+    assert len(fake.commands["1111"]) == 1
+    assert len(bot.get_commands(guild_only=True, guild_id_passed="1111")) == 1
+    assert fake.count("POST") == 2
+
+
+def test_application_endpoints_require_a_bot_token(server, fake):
+    _response = httpx.get(f"{server.api_base_url}/applications/7890/commands")
+    assert _response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_permissions(bot, fake):
+    await bot.async_register(command=_command(), guild_only=True, guild_to_target=1111)
+    _command_id = (await bot.async_get_commands(guild_only=True, guild_id_passed="1111"))[0].id
+
+    assert await bot.async_get_command_permission_in_guild(_command_id, 1111) is None
+    _permissions = NewApplicationPermission(
+        permissions=[
+            ApplicationCommandPermissions(
+                id=42, type=ApplicationCommandPermissionType.USER, permission=True
+            )
+        ]
+    )
+    assert await bot.async_set_command_permission(_command_id, 1111, _permissions) is True
+    _current = await bot.async_get_command_permission_in_guild(_command_id, 1111)
+    assert _current.permissions[0].id == 42
+
+    _all = await bot.async_get_all_command_permissions_in_guild(1111)
+    assert [permission.id for permission in _all] == [_command_id]
+    await bot.http_pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_followups_and_deferred_response(bot, fake):
+    _followup = FollowUpMessages(bot=bot, interaction=_Interaction())
+    await _followup.async_create_follow_up_message(DiscordResponse(content="hello", follow_up_message=True))
+    assert fake.messages["INTERACTIONTOKEN"][str(_followup._message_id)]["content"] == "hello"
+
+    await _followup.async_edit_follow_up_message(DiscordResponse(content="edited", follow_up_message=True))
+    assert fake.messages["INTERACTIONTOKEN"][str(_followup._message_id)]["content"] == "edited"
+
+    await _followup.async_delete_follow_up_message()
+    assert str(_followup._message_id) not in fake.messages["INTERACTIONTOKEN"]
+
+    await bot._edit_original_response("INTERACTIONTOKEN", {"content": "deferred"})
+    assert fake.messages["INTERACTIONTOKEN"]["@original"]["content"] == "deferred"
+    await bot.http_pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_burst_never_reaches_the_caller(bot, fake):
+    fake.rate_limit = 2
+    fake.rate_limit_window = 0.2
+    _started = time.monotonic()
+    _results = await asyncio.gather(*[bot.async_get_commands() for _ in range(6)])
+    assert _results == [[]] * 6
+    # 6 requests at 2 per window need at least 3 windows.
+    assert time.monotonic() - _started >= 0.4
+    assert fake.rate_limited == 0
+    await bot.http_pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_are_retried(bot, fake):
+    fake.fail_next(502, path_contains="/commands")
+    assert await bot.async_get_commands() == []
+    assert fake.errors_injected == 1
+    assert fake.count("GET") == 2
+
+    fake.fail_next(500)
+    with pytest.raises(DiscordAPIError):
+        await bot.async_get_commands()
+    await bot.http_pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_latency(bot, fake):
+    fake.latency = lambda method, path: 0.1 if method == "GET" else 0.0
+    _started = time.monotonic()
+    await bot.async_get_commands()
+    assert time.monotonic() - _started >= 0.1
+    await bot.http_pool.aclose()
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+import respx
+from httpx import Response
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey
+
+from dispike import Dispike, PerCommandRegistrationSettings
+from dispike.creating.fanout import fan_out
+from dispike.creating.models import DiscordCommand
+from dispike.creating.models.permissions import (
+    ApplicationCommandPermissions,
+    ApplicationCommandPermissionType,
+    NewApplicationPermission,
+)
+from dispike.errors.network import DiscordAPIError
+
+API = "https://discord.com/api/v8/applications/APPID"
+
+
+@pytest.fixture
+def dispike_object():
+    return Dispike(
+        client_public_key=SigningKey.generate().verify_key.encode(encoder=HexEncoder).decode(),
+        bot_token="BOTTOKEN",
+        application_id="APPID",
+    )
+
+
+def new_permissions() -> NewApplicationPermission:
+    return NewApplicationPermission(
+        permissions=[
+            ApplicationCommandPermissions(
+                id=1234, type=ApplicationCommandPermissionType.ROLE, permission=True
+            )
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_fan_out_caps_concurrency_and_keeps_guild_order():
+    _in_flight = 0
+    _peak = 0
+    _order = {}
+
+    def operation(guild_id, index):
+        async def _run():
+            nonlocal _in_flight, _peak
+            _in_flight += 1
+            _peak = max(_peak, _in_flight)
+            await asyncio.sleep(0.01)
+            _order.setdefault(guild_id, []).append(index)
+            _in_flight -= 1
+            return index
+
+        return _run
+
+    _report = await fan_out(
+        {
+            str(guild_id): [(f"op {index}", operation(guild_id, index)) for index in range(3)]
+            for guild_id in range(12)
+        },
+        max_concurrency=4,
+    )
+    assert _peak == 4
+    assert _report.ok
+    assert all(order == [0, 1, 2] for order in _order.values())
+    assert [operation.result for operation in _report["7"].operations] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_register_and_permissions_across_guilds(dispike_object: Dispike):
+    _command = DiscordCommand(name="wave", description="Send a wave!")
+    _guilds = [str(guild_id) for guild_id in range(100, 120)]
+    with respx.mock() as mock:
+        for guild_id in _guilds:
+            mock.post(f"{API}/guilds/{guild_id}/commands").mock(
+                return_value=Response(500 if guild_id == "105" else 201, json={})
+            )
+            mock.put(f"{API}/guilds/{guild_id}/commands/1/permissions").mock(
+                return_value=Response(400 if guild_id == "110" else 200, json={})
+            )
+        _global = mock.post(f"{API}/commands").mock(return_value=Response(201, json={}))
+
+        _report = await dispike_object.async_fan_out_to_guilds(
+            commands=[_command]
+            + [PerCommandRegistrationSettings(schema=_command, guild_id=guild_id) for guild_id in _guilds],
+            permissions={guild_id: [(1, new_permissions())] for guild_id in _guilds},
+            max_concurrency=5,
+        )
+
+    assert _global.call_count == 1
+    assert len(_report.guilds) == 21
+    assert sorted(_report.failed_guilds) == ["105", "110"]
+    assert isinstance(_report["105"].errors[0].error, DiscordAPIError)
+    # the failed registration did not stop the permissions of that guild.
+    assert [operation.operation for operation in _report["105"].operations] == [
+        "register wave",
+        "permissions 1",
+    ]
+    assert _report["105"].operations[1].ok
+    assert [operation.ok for operation in _report["110"].operations] == [True, False]
+    await dispike_object.http_pool.aclose()
@@ -389,4 +389,23 @@ async def async_test_invalid_type_passed_to_followup_functions(
     with pytest.raises(TypeError):
         await followup_message_object.async_edit_follow_up_message(message="Invalid")
     with pytest.raises(TypeError):
-        await followup_message_object.async_delete_follow_up_message(message="Invalid")
\ No newline at end of file
+        await followup_message_object.async_delete_follow_up_message(message="Invalid")
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_followups_borrow_pooled_clients(
+    dispike_object: "Dispike", example_incoming_response, create_example_response
+):
+    respx.post(f"https://discord.com/api/v8/webhooks/APPID/exampleToken").mock(
+        return_value=Response(200, json={"id": "exampleIncomingToken"})
+    )
+    _pool = dispike_object.http_pool
+    for _ in range(20):
+        _followup = FollowUpMessages(dispike_object, example_incoming_response)
+        assert await _followup.async_create_follow_up_message(create_example_response)
+        _followup._message_id = None
+        assert _followup.create_follow_up_message(create_example_response)
+
+    # one async and one sync client for discord.com, however many followups are sent.
+    assert _pool.created == 2
+    await _pool.aclose()
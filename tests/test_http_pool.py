@@ -0,0 +1,155 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+import respx
+from httpx import Response
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey
+
+from dispike import Dispike, server
+from dispike.helper.http_pool import HTTPClientPool
+
+
+@pytest.fixture
+def dispike_object(monkeypatch):
+    monkeypatch.setattr(server.router, "_task_supervisor", server.router._task_supervisor)
+    return Dispike(
+        client_public_key=SigningKey.generate()
+        .verify_key.encode(encoder=HexEncoder)
+        .decode(),
+        bot_token="BOTTOKEN",
+        application_id="APPID",
+        http_max_connections=5,
+        http_max_keepalive_connections=2,
+        http_timeout=3,
+    )
+
+
+@pytest.mark.asyncio
+async def test_clients_are_pooled_per_host():
+    pool = HTTPClientPool()
+    _discord = pool.get_async_client("https://discord.com/api/v8/applications/1")
+    assert pool.get_async_client("https://discord.com/api/v8/webhooks/1") is _discord
+    assert pool.get_async_client("https://example.com/") is not _discord
+    assert len(pool) == 2
+    await pool.aclose()
+    assert _discord.is_closed
+    assert len(pool) == 0
+
+
+def test_client_is_recreated_for_a_new_event_loop():
+    pool = HTTPClientPool()
+
+    async def get_client():
+        return pool.get_async_client("https://discord.com/")
+
+    _first = asyncio.new_event_loop().run_until_complete(get_client())
+    _second = asyncio.new_event_loop().run_until_complete(get_client())
+    assert _first is not _second
+    assert pool.created == 2
+
+
+def test_replaced_client_is_closed_on_its_own_loop():
+    pool = HTTPClientPool()
+
+    async def get_client():
+        return pool.get_async_client("https://discord.com/")
+
+    _first_loop, _second_loop = asyncio.new_event_loop(), asyncio.new_event_loop()
+    _first = _first_loop.run_until_complete(get_client())
+    _second = _second_loop.run_until_complete(get_client())
+    # the first loop is idle, its client waits for aclose on that loop.
+    assert not _first.is_closed
+    _second_loop.run_until_complete(pool.aclose())
+    assert _second.is_closed and not _first.is_closed
+    _first_loop.run_until_complete(pool.aclose())
+    assert _first.is_closed
+    _first_loop.close()
+    _second_loop.close()
+
+
+def test_client_of_a_running_loop_is_closed_there():
+    pool = HTTPClientPool()
+
+    async def get_client():
+        return pool.get_async_client("https://discord.com/")
+
+    _other_loop = asyncio.new_event_loop()
+    _thread = threading.Thread(target=_other_loop.run_forever)
+    _thread.start()
+    try:
+        _first = asyncio.run_coroutine_threadsafe(get_client(), _other_loop).result(5)
+        _loop = asyncio.new_event_loop()
+        _loop.run_until_complete(get_client())
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), _other_loop).result(5)
+        assert _first.is_closed
+        _loop.run_until_complete(pool.aclose())
+        _loop.close()
+    finally:
+        _other_loop.call_soon_threadsafe(_other_loop.stop)
+        _thread.join()
+        _other_loop.close()
+
+
+def test_client_of_a_closed_loop_is_dropped():
+    pool = HTTPClientPool()
+
+    async def get_client():
+        return pool.get_async_client("https://discord.com/")
+
+    _first_loop = asyncio.new_event_loop()
+    _first_loop.run_until_complete(get_client())
+    _first_loop.close()
+    _second_loop = asyncio.new_event_loop()
+    _second = _second_loop.run_until_complete(get_client())
+    _second_loop.run_until_complete(pool.aclose())
+    assert _second.is_closed
+    assert pool._retired_async_clients == []
+    _second_loop.close()
+
+
+def test_dispike_configures_pool(dispike_object: Dispike):
+    assert dispike_object.http_pool.limits == httpx.Limits(
+        max_connections=5, max_keepalive_connections=2
+    )
+    assert dispike_object.http_pool.timeout == httpx.Timeout(3)
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_async_requests_reuse_pooled_client(dispike_object: Dispike):
+    respx.get(
+        "https://discord.com/api/v8/applications/APPID/guilds/1/commands/permissions"
+    ).mock(return_value=Response(200, json=[]))
+    respx.patch(
+        "https://discord.com/api/v8/webhooks/APPID/FAKETOKEN/messages/@original"
+    ).mock(return_value=Response(200))
+
+    await dispike_object.async_get_all_command_permissions_in_guild(1)
+    await dispike_object.async_get_all_command_permissions_in_guild(1)
+    await dispike_object._edit_original_response("FAKETOKEN", {"content": "hi"})
+    assert dispike_object.http_pool.created == 1
+    assert (
+        respx.calls.last.request.headers.get("content-type") == "application/json"
+    )
+    assert respx.calls[0].request.headers["authorization"] == "Bot BOTTOKEN"
+    await dispike_object.http_pool.aclose()
+
+
+def test_pool_follows_application_lifespan(dispike_object: Dispike):
+    from fastapi.testclient import TestClient
+
+    with TestClient(dispike_object.referenced_application):
+        assert len(dispike_object.http_pool) == 1
+    assert len(dispike_object.http_pool) == 0
+
+
+def test_sync_clients_are_pooled_and_closed():
+    pool = HTTPClientPool()
+    _client = pool.get_sync_client("https://discord.com/api/v8/")
+    assert pool.get_sync_client("https://discord.com/api/v8/webhooks/1") is _client
+    pool.close()
+    assert _client.is_closed
+    assert pool.get_sync_client("https://discord.com/") is not _client
@@ -0,0 +1,64 @@
+import pytest
+
+from dispike.helper.json_backend import (
+    OrjsonJSONBackend,
+    PreEncodedJSONResponse,
+    StdlibJSONBackend,
+    resolve_json_backend,
+)
+from dispike.response import DiscordResponse
+from dispike.creating.models.options import CommandTypes
+
+_backends = [StdlibJSONBackend()]
+try:
+    _backends.append(OrjsonJSONBackend())
+except ImportError:  # pragma: no cover
+    pass
+
+
+@pytest.mark.parametrize("backend", _backends, ids=lambda x: x.name)
+def test_backend_round_trip(backend):
+    _payload = DiscordResponse(content="sample 👋", empherical=True).response
+    _encoded = backend.dumps(_payload)
+    assert isinstance(_encoded, bytes)
+    assert backend.loads(_encoded) == _payload
+
+
+@pytest.mark.parametrize("backend", _backends, ids=lambda x: x.name)
+def test_backend_parses_raw_bytes(backend):
+    assert backend.loads(b'{"type": 1}') == {"type": 1}
+
+
+@pytest.mark.parametrize("backend", _backends, ids=lambda x: x.name)
+def test_backend_falls_back_for_unknown_objects(backend):
+    from dispike.creating.models.options import DiscordCommand
+
+    _encoded = backend.dumps(
+        {"command": DiscordCommand(name="sample", description="sample"), "type": CommandTypes.SLASH}
+    )
+    _decoded = backend.loads(_encoded)
+    assert _decoded["command"]["name"] == "sample"
+    assert _decoded["type"] == 1
+
+
+def test_resolve_json_backend():
+    assert isinstance(resolve_json_backend("json"), StdlibJSONBackend)
+    _custom = StdlibJSONBackend()
+    assert resolve_json_backend(_custom) is _custom
+    with pytest.raises(ValueError):
+        resolve_json_backend("not-a-backend")
+
+
+def test_resolve_default_prefers_orjson():
+    try:
+        import orjson  # noqa
+    except ImportError:  # pragma: no cover
+        assert isinstance(resolve_json_backend(), StdlibJSONBackend)
+    else:
+        assert isinstance(resolve_json_backend(), OrjsonJSONBackend)
+
+
+def test_pre_encoded_response_keeps_bytes():
+    _response = PreEncodedJSONResponse(b'{"type":1}')
+    assert _response.body == b'{"type":1}'
+    assert _response.media_type == "application/json"
@@ -0,0 +1,202 @@
+import datetime
+
+import pytest
+from pydantic import ValidationError
+
+from dispike.eventer_helpers.determine_event_information import (
+    determine_event_information,
+)
+from dispike.incoming import IncomingDiscordSlashInteraction, Member
+from dispike.incoming.discord_types.user import User
+from dispike.incoming.lazy import LazyModelView, is_instance_of_model, lazy_view_class
+
+
+def create_interaction_body(options=None) -> dict:
+    return {
+        "channel_id": "123123",
+        "data": {
+            "id": "12312312",
+            "name": "sendmessage",
+            "options": options
+            if options is not None
+            else [{"name": "message", "value": "test"}],
+            "type": 1,
+            "resolved": {
+                "users": {
+                    "33": {
+                        "avatar": None,
+                        "discriminator": "1111",
+                        "id": "33",
+                        "public_flags": 0,
+                        "username": "resolved",
+                    }
+                }
+            },
+        },
+        "guild_id": "123123",
+        "id": "123123123132",
+        "member": {
+            "deaf": False,
+            "is_pending": False,
+            "joined_at": "2019-05-12T18:36:16.878000+00:00",
+            "mute": False,
+            "nick": None,
+            "pending": False,
+            "permissions": "2147483647",
+            "premium_since": None,
+            "roles": ["123123"],
+            "user": {
+                "avatar": "b723979992a56",
+                "discriminator": "3333",
+                "id": "234234213122123",
+                "public_flags": 768,
+                "username": "exo",
+            },
+        },
+        "token": "Null",
+        "type": 2,
+        "version": 1,
+    }
+
+
+LazyInteraction = lazy_view_class(IncomingDiscordSlashInteraction)
+
+
+def test_view_class_is_cached():
+    assert lazy_view_class(IncomingDiscordSlashInteraction) is LazyInteraction
+    assert LazyInteraction.__name__ == "LazyIncomingDiscordSlashInteraction"
+
+
+def test_view_matches_model_attributes():
+    _body = create_interaction_body()
+    _model = IncomingDiscordSlashInteraction(**_body)
+    _view = LazyInteraction(_body)
+
+    assert _view.id == _model.id == 123123123132
+    assert _view.token == _model.token
+    assert _view.guild_id == _model.guild_id
+    assert _view.data.name == _model.data.name
+    assert _view.data.options == _model.data.options
+    assert _view.member.user.username == _model.member.user.username
+    assert _view.member.joined_at == _model.member.joined_at
+    assert isinstance(_view.member.joined_at, datetime.datetime)
+    assert _view.to_model() == _model
+    assert _view.dict() == _model.dict()
+
+
+def test_fields_are_validated_on_first_access_only():
+    _view = LazyInteraction(create_interaction_body())
+    assert _view.token == "Null"
+    assert set(_view._values) == {"token"}
+
+    _member = _view.member
+    assert isinstance(_member, LazyModelView)
+    assert _member.model_class is Member
+    assert set(_member._values) == set()
+    assert _view.member is _member
+
+
+def test_invalid_field_raises_on_access():
+    _body = create_interaction_body()
+    _body["member"]["joined_at"] = "not a date"
+    _view = LazyInteraction(_body)
+    assert _view.token == "Null"
+    with pytest.raises(ValidationError):
+        _view.member.joined_at
+
+
+def test_missing_required_and_default_fields():
+    _body = create_interaction_body()
+    del _body["token"]
+    del _body["version"]
+    _view = LazyInteraction(_body)
+    assert _view.version is None
+    with pytest.raises(ValidationError):
+        _view.token
+
+
+def test_unknown_attribute_raises():
+    with pytest.raises(AttributeError):
+        LazyInteraction(create_interaction_body()).not_a_field
+
+
+def test_model_methods_work_on_view():
+    _view = LazyInteraction(create_interaction_body())
+    _user = _view.lookup_resolved_user("33")
+    assert isinstance(_user, User)
+    assert _user.username == "resolved"
+
+
+def test_assigned_values_override_raw():
+    _view = lazy_view_class(Member)(create_interaction_body()["member"])
+    _view.nick = "changed"
+    assert _view.nick == "changed"
+    assert _view.to_model().nick == "changed"
+
+
+def test_is_instance_of_model():
+    _body = create_interaction_body()
+    assert is_instance_of_model(LazyInteraction(_body), IncomingDiscordSlashInteraction)
+    assert is_instance_of_model(IncomingDiscordSlashInteraction(**_body), IncomingDiscordSlashInteraction)
+    assert not is_instance_of_model(LazyInteraction(_body), Member)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        None,
+        [{"name": "message", "value": "test"}],
+        [{"name": "sub", "options": [{"name": "message", "value": "test"}]}],
+        [
+            {
+                "name": "group",
+                "options": [{"name": "sub", "options": [{"name": "message", "value": "test"}]}],
+            }
+        ],
+    ],
+)
+def test_determine_event_information_matches_eager_mode(options):
+    _body = create_interaction_body(options=options)
+    if options is None:
+        del _body["data"]["options"]
+    assert determine_event_information(LazyInteraction(_body)) == determine_event_information(
+        IncomingDiscordSlashInteraction(**_body)
+    )
+
+
+@pytest.mark.asyncio
+async def test_handle_interactions_in_lazy_mode(monkeypatch):
+    import json
+    from dispike import Dispike, server
+    from dispike.eventer import EventTypes
+    from dispike.response import DiscordResponse
+    from nacl.encoding import HexEncoder
+    from nacl.signing import SigningKey
+
+    _dispike = Dispike(
+        client_public_key=SigningKey.generate()
+        .verify_key.encode(encoder=HexEncoder)
+        .decode(),
+        bot_token="BOTTOKEN",
+        application_id="APPID",
+    )
+    monkeypatch.setattr(server.router, "_dispike_instance", _dispike)
+    monkeypatch.setattr(server.router, "_lazy_context", True)
+    _received = {}
+
+    async def handler(message, ctx) -> DiscordResponse:
+        _received["ctx"] = ctx
+        return DiscordResponse(content=message)
+
+    class MockState:
+        _cached_body = json.dumps(create_interaction_body()).encode()
+
+    class MockRequest:
+        state = MockState
+
+    _dispike.on("sendmessage", EventTypes.COMMAND, func=handler)
+    _result = await server.handle_interactions(MockRequest)
+
+    assert _result["data"]["content"] == "test"
+    assert isinstance(_received["ctx"], LazyModelView)
+    assert set(_received["ctx"]._values) == {"data"}
@@ -0,0 +1,88 @@
+import httpx
+import pytest
+from loguru import logger
+
+from dispike.helper.logging_control import (
+    LoggingSubsystems,
+    SubsystemLogger,
+    configure_logging,
+    get_subsystem_logger,
+)
+from dispike.helper.network_request_log import (
+    dispike_httpx_event_hook_outgoing_request,
+)
+
+
+@pytest.fixture
+def captured():
+    records = []
+    handler_id = logger.add(lambda message: records.append(message.record), level="TRACE")
+    yield records
+    logger.remove(handler_id)
+    configure_logging(
+        levels={subsystem: "TRACE" for subsystem in LoggingSubsystems},
+        body_sample_rate=1,
+    )
+
+
+class Unformattable:
+    def __format__(self, spec):
+        raise AssertionError("argument was formatted for a disabled message")
+
+
+def test_subsystem_logger_is_shared():
+    assert get_subsystem_logger("server") is get_subsystem_logger(
+        LoggingSubsystems.SERVER
+    )
+
+
+def test_records_are_tagged_with_subsystem(captured):
+    get_subsystem_logger("server").info("event {}", "sendmessage")
+    assert captured[-1]["message"] == "event sendmessage"
+    assert captured[-1]["extra"]["subsystem"] == "server"
+
+
+def test_disabled_level_skips_formatting(captured):
+    configure_logging(levels={"server": "WARNING"})
+    _log = get_subsystem_logger("server")
+    _log.info("body {}", Unformattable())
+    _log.debug("body {}", Unformattable())
+    assert captured == []
+    _log.warning("still {}", "here")
+    assert captured[-1]["message"] == "still here"
+
+
+def test_body_sampling(captured):
+    configure_logging(body_sample_rate=3)
+    _log = get_subsystem_logger("server")
+    for index in range(9):
+        _log.body("body {}", index)
+    assert [record["message"] for record in captured] == ["body 2", "body 5", "body 8"]
+
+
+def test_body_sampling_disabled(captured):
+    configure_logging(body_sample_rate=0)
+    get_subsystem_logger("server").body("body {}", Unformattable())
+    assert captured == []
+
+
+def test_network_hook_respects_level(captured):
+    request = httpx.Request("GET", "https://discord.com/api/v8/")
+    dispike_httpx_event_hook_outgoing_request(request)
+    assert captured[-1]["extra"]["subsystem"] == "network"
+
+    configure_logging(levels={"network": "OFF"})
+    captured.clear()
+    dispike_httpx_event_hook_outgoing_request(request)
+    assert captured == []
+
+
+def test_configure_logging_rejects_bad_values():
+    with pytest.raises(ValueError):
+        configure_logging(levels={"server": "LOUD"})
+    with pytest.raises(ValueError):
+        configure_logging(body_sample_rate=-1)
+
+
+def test_unknown_subsystem_gets_its_own_logger():
+    assert isinstance(get_subsystem_logger("custom"), SubsystemLogger)
@@ -0,0 +1,223 @@
+import json
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey
+
+from dispike import Dispike, server
+from dispike.helper.metrics import Metrics, deferred_task_collector
+from dispike.helper.task_supervisor import DeferredTaskSupervisor
+from dispike.response import DiscordResponse
+from dispike.testing import FakeDiscord, serve_in_thread
+
+
+@pytest.fixture(autouse=True)
+def unbound_router(monkeypatch):
+    # the router serves a single Dispike instance, let each test bind its own.
+    monkeypatch.setattr(server.router, "_dispike_instance", None)
+    monkeypatch.setattr(server.router, "_metrics", server.router._metrics)
+
+
+def _slash(name: str) -> bytes:
+    return json.dumps(
+        {
+            "channel_id": "123123",
+            "data": {"id": "12312312", "name": name, "options": [{"name": "message", "value": "test"}], "type": 1},
+            "guild_id": "123123",
+            "id": "123123123132",
+            "member": {
+                "deaf": False,
+                "is_pending": False,
+                "joined_at": "2019-05-12T18:36:16.878000+00:00",
+                "mute": False,
+                "nick": None,
+                "pending": False,
+                "permissions": "2147483647",
+                "premium_since": None,
+                "roles": [],
+                "user": {
+                    "avatar": "b723979992a56",
+                    "discriminator": "3333",
+                    "id": "234234213122123",
+                    "public_flags": 768,
+                    "username": "exo",
+                },
+            },
+            "token": "Null",
+            "type": 2,
+            "version": 1,
+        }
+    ).encode()
+
+
+def _lines(text: str) -> dict:
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+def test_render_counters_and_histograms():
+    _metrics = Metrics(buckets=(0.01, 0.1))
+    _metrics.inc("dispike_interactions_total", "command", "echo")
+    _metrics.inc("dispike_interactions_total", "command", "echo")
+    _metrics.observe("dispike_stage_duration_seconds", 0.005, "parse")
+    _metrics.observe("dispike_stage_duration_seconds", 0.05, "parse")
+    _metrics.observe("dispike_stage_duration_seconds", 0.5, "parse")
+
+    _text = _metrics.render()
+    assert "# TYPE dispike_interactions_total counter" in _text
+    assert "# TYPE dispike_stage_duration_seconds histogram" in _text
+    # metrics without values are left out.
+    assert "dispike_interaction_errors_total" not in _text
+    _values = _lines(_text)
+    assert _values['dispike_interactions_total{type="command",event="echo"}'] == "2"
+    assert _values['dispike_stage_duration_seconds_bucket{stage="parse",le="0.01"}'] == "1"
+    assert _values['dispike_stage_duration_seconds_bucket{stage="parse",le="0.1"}'] == "2"
+    assert _values['dispike_stage_duration_seconds_bucket{stage="parse",le="+Inf"}'] == "3"
+    assert _values['dispike_stage_duration_seconds_count{stage="parse"}'] == "3"
+    assert float(_values['dispike_stage_duration_seconds_sum{stage="parse"}']) == pytest.approx(0.555)
+
+
+def test_label_values_are_escaped():
+    _metrics = Metrics()
+    _metrics.inc("dispike_interactions_total", "component", 'say "hi"\\')
+    assert 'event="say \\"hi\\"\\\\"' in _metrics.render()
+
+
+def test_deferred_task_collector():
+    _supervisor = DeferredTaskSupervisor()
+    _supervisor.rejected = 2
+    _metrics = Metrics()
+    _metrics.add_collector(deferred_task_collector(_supervisor))
+    _values = _lines(_metrics.render())
+    assert _values['dispike_deferred_tasks_total{outcome="rejected"}'] == "2"
+    assert _values['dispike_deferred_tasks{state="running"}'] == "0"
+
+
+def _write_snapshot(directory, pid: int, metrics: Metrics):
+    _snapshot = metrics.snapshot()
+    _snapshot["pid"] = pid
+    with open(os.path.join(directory, f"metrics-{pid}.json"), "w") as snapshot_file:
+        json.dump(_snapshot, snapshot_file)
+
+
+def test_worker_processes_are_merged(tmp_path):
+    _directory = str(tmp_path)
+    _metrics = Metrics(directory=_directory)
+    _metrics.inc("dispike_interactions_total", "command", "echo")
+    _metrics.observe("dispike_stage_duration_seconds", 0.001, "parse")
+    _metrics.add_collector(lambda: [("dispike_deferred_tasks", ("running",), 1)])
+
+    # another worker that is still running (our parent), and one that stopped.
+    _other = Metrics()
+    _other.inc("dispike_interactions_total", "command", "echo", value=2)
+    _other.observe("dispike_stage_duration_seconds", 0.001, "parse")
+    _other.add_collector(lambda: [("dispike_deferred_tasks", ("running",), 3)])
+    _write_snapshot(_directory, os.getppid(), _other)
+    _write_snapshot(_directory, 2 ** 22 + 1, _other)
+
+    _values = _lines(_metrics.render())
+    assert _values['dispike_interactions_total{type="command",event="echo"}'] == "5"
+    assert _values['dispike_stage_duration_seconds_count{stage="parse"}'] == "3"
+    # gauges of stopped workers are dropped.
+    assert _values['dispike_deferred_tasks{state="running"}'] == "4"
+    assert os.path.exists(os.path.join(_directory, f"metrics-{os.getpid()}.json"))
+
+
+def test_metrics_directory_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("DISPIKE_METRICS_DIR", str(tmp_path))
+    assert Metrics().directory == str(tmp_path)
+
+
+def _create_bot(public_key: str, **kwargs) -> Dispike:
+    bot = Dispike(client_public_key=public_key, bot_token="BOTTOKEN", application_id="7890", **kwargs)
+
+    @bot.on("echo")
+    async def echo(ctx, message: str) -> DiscordResponse:
+        return DiscordResponse(content=message)
+
+    @bot.on("broken")
+    async def broken(ctx, message: str) -> DiscordResponse:
+        raise ValueError("broken")
+
+    return bot
+
+
+def _post(client: TestClient, signing_key: SigningKey, body: bytes, signature: str = None):
+    _timestamp = str(int(time.time()))
+    return client.post(
+        "/interactions",
+        data=body,
+        headers={
+            "X-Signature-Ed25519": signature or signing_key.sign(_timestamp.encode() + body).signature.hex(),
+            "X-Signature-Timestamp": _timestamp,
+        },
+    )
+
+
+def test_metrics_endpoint():
+    _signing_key = SigningKey.generate()
+    _bot = _create_bot(_signing_key.verify_key.encode(encoder=HexEncoder).decode(), metrics=True)
+    _client = TestClient(_bot.referenced_application, raise_server_exceptions=False)
+
+    assert _post(_client, _signing_key, _slash("echo")).status_code == 200
+    assert _post(_client, _signing_key, _slash("echo")).status_code == 200
+    assert _post(_client, _signing_key, _slash("missing")).status_code == 200
+    assert _post(_client, _signing_key, _slash("broken")).status_code == 500
+    assert _post(_client, _signing_key, _slash("echo"), signature="00" * 64).status_code == 401
+
+    # served without a signature, next to /ping.
+    _response = _client.get("/metrics")
+    assert _response.status_code == 200
+    assert _response.headers["content-type"].startswith("text/plain")
+    _values = _lines(_response.text)
+    assert _values['dispike_interactions_total{type="command",event="echo"}'] == "2"
+    assert _values['dispike_interactions_total{type="command",event="unregistered"}'] == "1"
+    assert _values['dispike_interactions_by_type_total{type="command"}'] == "4"
+    assert _values['dispike_interaction_errors_total{type="command",event="broken"}'] == "1"
+    assert _values['dispike_verification_failures_total{status="401"}'] == "1"
+    assert _values['dispike_handler_duration_seconds_count{type="command",event="echo"}'] == "2"
+    for _stage, _count in (("verification", "5"), ("parse", "4"), ("handler", "4"), ("serialize", "3")):
+        assert _values[f'dispike_stage_duration_seconds_count{{stage="{_stage}"}}'] == _count
+    assert _values['dispike_deferred_tasks_total{outcome="submitted"}'] == "0"
+
+
+def test_metrics_path_is_configurable():
+    _signing_key = SigningKey.generate()
+    _bot = _create_bot(
+        _signing_key.verify_key.encode(encoder=HexEncoder).decode(), metrics=True, metrics_path="/internal/metrics"
+    )
+    _client = TestClient(_bot.referenced_application)
+    assert _client.get("/internal/metrics").status_code == 200
+    assert _client.get("/metrics").status_code == 400
+
+
+def test_metrics_are_disabled_by_default():
+    _bot = _create_bot(SigningKey.generate().verify_key.encode(encoder=HexEncoder).decode())
+    assert _bot.metrics is None
+    # not served, and not exempt from verification.
+    assert TestClient(_bot.referenced_application).get("/metrics").status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_outgoing_request_latency_by_route():
+    _server = serve_in_thread(FakeDiscord())
+    try:
+        _bot = _create_bot(
+            SigningKey.generate().verify_key.encode(encoder=HexEncoder).decode(),
+            metrics=True,
+            api_base_url=_server.api_base_url,
+        )
+        _server.app.fail_next(502)
+        assert await _bot.async_get_commands() == []
+        assert _bot.get_commands() == []
+        await _bot.http_pool.aclose()
+    finally:
+        _server.stop()
+
+    _values = _lines(_bot.metrics.render())
+    # every attempt is recorded, the retried 502 as well.
+    _route = 'route="GET /applications/:id/commands"'
+    assert _values[f'dispike_http_request_duration_seconds_count{{{_route},status="200"}}'] == "2"
+    assert _values[f'dispike_http_request_duration_seconds_count{{{_route},status="502"}}'] == "1"
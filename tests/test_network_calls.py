@@ -1190,4 +1190,87 @@ def test_sync_no_permissions_get_all_command_permission_for_guild(
 
     assert len(_get_commands) == 0
 
-    dispike_object._application_id = "APPID"
\ No newline at end of file
+    dispike_object._application_id = "APPID"
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_async_get_commands_guild_only_call_successful(dispike_object: Dispike):
+    _route = respx.get(
+        "https://discord.com/api/v8/applications/APPID/guilds/EXAMPLE_GUILD/commands"
+    ).mock(
+        return_value=Response(
+            200,
+            json=[
+                {
+                    "id": "1234",
+                    "application_id": "7890",
+                    "name": "mccoolbotv1",
+                    "description": "McCoolbot is the coolest bot around.",
+                }
+            ],
+        )
+    )
+    _get_commands = await dispike_object.async_get_commands(
+        guild_only=True, guild_id_passed="EXAMPLE_GUILD"
+    )
+    assert len(_get_commands) == 1
+    assert isinstance(_get_commands[0], IncomingApplicationCommand)
+    assert _route.calls.last.request.headers["Authorization"] == "Bot BOTTOKEN"
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_async_get_commands_call_fail(dispike_object: Dispike):
+    respx.get("https://discord.com/api/v8/applications/APPID/commands").mock(
+        return_value=Response(500)
+    )
+    with pytest.raises(DiscordAPIError):
+        await dispike_object.async_get_commands()
+    with pytest.raises(TypeError):
+        await dispike_object.async_get_commands(guild_only=True)
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_async_single_edit_command_guild_only(
+    dispike_object: Dispike, example_edit_command: DiscordCommand
+):
+    respx.patch(
+        "https://discord.com/api/v8/applications/APPID/guilds/EXAMPLE_GUILD/commands/1234"
+    ).mock(return_value=Response(200, json=example_edit_command.dict()))
+    _edit_command = await dispike_object.async_edit_command(
+        new_command=example_edit_command,
+        command_id=1234,
+        guild_only=True,
+        guild_id_passed="EXAMPLE_GUILD",
+    )
+    assert isinstance(_edit_command, DiscordCommand)
+    assert _edit_command.name == example_edit_command.name
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_async_failed_bulk_edit_command_globally(
+    dispike_object: Dispike, example_edit_command: DiscordCommand
+):
+    respx.put("https://discord.com/api/v8/applications/APPID/commands").mock(
+        return_value=Response(400)
+    )
+    _edit_command = await dispike_object.async_edit_command(
+        new_command=[example_edit_command], bulk=True
+    )
+    assert _edit_command == False
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_async_delete_command(dispike_object: Dispike):
+    respx.delete("https://discord.com/api/v8/applications/APPID/commands/1234").mock(
+        return_value=Response(204)
+    )
+    respx.delete("https://discord.com/api/v8/applications/APPID/commands/4321").mock(
+        return_value=Response(404)
+    )
+    assert await dispike_object.async_delete_command(command_id=1234) == True
+    with pytest.raises(DiscordAPIError):
+        await dispike_object.async_delete_command(command_id="4321")
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+import respx
+from httpx import Response
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey
+
+from dispike import Dispike
+from dispike.creating.models.permissions import (
+    ApplicationCommandPermissions,
+    ApplicationCommandPermissionType,
+    NewApplicationPermission,
+)
+from dispike.errors.network import DiscordAPIError
+from dispike.helper.permissions_generator import PermissionGenerator
+
+PERMISSIONS = "https://discord.com/api/v8/applications/APPID/guilds/1111/commands/permissions"
+CURRENT = [
+    {
+        "id": "1",
+        "application_id": "7890",
+        "permissions": [{"id": "10", "type": 1, "permission": True}],
+    },
+    {
+        "id": "2",
+        "application_id": "7890",
+        "permissions": [{"id": "20", "type": 2, "permission": True}],
+    },
+]
+
+
+@pytest.fixture
+def dispike_object():
+    return Dispike(
+        client_public_key=SigningKey.generate().verify_key.encode(encoder=HexEncoder).decode(),
+        bot_token="BOTTOKEN",
+        application_id="APPID",
+    )
+
+
+def role_permission(role_id: int, permission: bool = True) -> NewApplicationPermission:
+    return NewApplicationPermission(
+        permissions=[
+            ApplicationCommandPermissions(
+                id=role_id, type=ApplicationCommandPermissionType.ROLE, permission=permission
+            )
+        ]
+    )
+
+
+def test_only_changed_commands_and_one_request(dispike_object: Dispike):
+    with respx.mock() as mock:
+        _current = mock.get(PERMISSIONS).mock(return_value=Response(200, json=CURRENT))
+        _batch = mock.put(PERMISSIONS).mock(return_value=Response(200, json=[]))
+        _diff = dispike_object.batch_set_command_permissions(
+            1111,
+            {
+                1: role_permission(10),
+                3: PermissionGenerator(
+                    restrict_to_role=[30], restricted_role_id=[30], allow_all_except_or_deny_all_except="deny_all"
+                ),
+            },
+        )
+    assert _current.call_count == 1 and _batch.call_count == 1
+    assert _diff.unchanged == [1]
+    assert list(_diff.changed) == [3]
+    _body = {command["id"]: command["permissions"] for command in json.loads(_batch.calls.last.request.content)}
+    # the batch endpoint replaces everything, untouched commands are sent along.
+    assert _body == {
+        1: [{"id": 10, "type": 1, "permission": True}],
+        2: [{"id": 20, "type": 2, "permission": True}],
+        3: [{"id": 30, "type": 1, "permission": False}],
+    }
+
+
+def test_nothing_changed_sends_nothing(dispike_object: Dispike):
+    with respx.mock() as mock:
+        mock.get(PERMISSIONS).mock(return_value=Response(200, json=CURRENT))
+        _diff = dispike_object.batch_set_command_permissions(1111, {1: role_permission(10)})
+    assert _diff.is_empty
+
+
+def test_dry_run(dispike_object: Dispike):
+    with respx.mock() as mock:
+        mock.get(PERMISSIONS).mock(return_value=Response(200, json=CURRENT))
+        _diff = dispike_object.batch_set_command_permissions(
+            1111, {2: role_permission(10)}, dry_run=True
+        )
+    assert list(_diff.changed) == [2]
+
+
+@pytest.mark.asyncio
+async def test_async_batch_set_command_permissions(dispike_object: Dispike):
+    with respx.mock() as mock:
+        mock.get(PERMISSIONS).mock(return_value=Response(200, json=CURRENT))
+        _batch = mock.put(PERMISSIONS).mock(
+            side_effect=[Response(200, json=[]), Response(403, json={})]
+        )
+        _diff = await dispike_object.async_batch_set_command_permissions(
+            1111, {1: role_permission(10, permission=False)}
+        )
+        assert list(_diff.changed) == [1]
+        with pytest.raises(DiscordAPIError):
+            await dispike_object.async_batch_set_command_permissions(
+                1111, {1: role_permission(10, permission=False)}
+            )
+    assert _batch.call_count == 2
+    await dispike_object.http_pool.aclose()
@@ -0,0 +1,224 @@
+import asyncio
+import json
+import time
+
+import httpcore
+import httpx
+import pytest
+
+from dispike.rest.ratelimit import (
+    RateLimitedAsyncTransport,
+    RateLimitedSyncTransport,
+    RateLimiter,
+    route_for,
+)
+
+
+class FakeDiscord:
+    """A tiny ASGI app that enforces Discord style per-bucket rate limits."""
+
+    def __init__(self, limit: int = 2, window: float = 0.2, global_429_once: bool = False):
+        self.limit = limit
+        self.window = window
+        self.global_429_once = global_429_once
+        self.windows = {}
+        self.violations = 0
+        self.served = 0
+
+    async def __call__(self, scope, receive, send):
+        _bucket = scope["path"].rsplit("/", 1)[0]  # one bucket per "directory"
+        _now = time.monotonic()
+        _started, _count = self.windows.get(_bucket, (_now, 0))
+        if _now - _started >= self.window:
+            _started, _count = _now, 0
+        _reset_after = self.window - (_now - _started)
+
+        if self.global_429_once:
+            self.global_429_once = False
+            return await self._send(send, 429, {"retry_after": 0.05, "global": True}, [])
+
+        if _count >= self.limit:
+            self.violations += 1
+            return await self._send(
+                send,
+                429,
+                {"retry_after": _reset_after, "global": False},
+                [(b"retry-after", str(_reset_after).encode())],
+            )
+
+        self.windows[_bucket] = (_started, _count + 1)
+        self.served += 1
+        await self._send(
+            send,
+            200,
+            {"ok": True},
+            [
+                (b"x-ratelimit-bucket", _bucket.encode()),
+                (b"x-ratelimit-limit", str(self.limit).encode()),
+                (b"x-ratelimit-remaining", str(self.limit - _count - 1).encode()),
+                (b"x-ratelimit-reset-after", str(_reset_after).encode()),
+            ],
+        )
+
+    @staticmethod
+    async def _send(send, status, body, headers):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"application/json")] + headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": json.dumps(body).encode()})
+
+
+def create_client(app, limiter: RateLimiter) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=RateLimitedAsyncTransport(httpx.ASGITransport(app=app), limiter),
+        base_url="https://discord.com/api/v8/",
+    )
+
+
+@pytest.mark.parametrize(
+    "method, path, expected",
+    [
+        ("GET", "/api/v8/applications/APPID/commands", ("GET /applications/:id/commands", ())),
+        (
+            "PUT",
+            "/api/v8/applications/APPID/guilds/123/commands/456/permissions",
+            ("PUT /applications/:id/guilds/:guilds/commands/:id/permissions", ("123",)),
+        ),
+        (
+            "PATCH",
+            "/api/v8/webhooks/APPID/TOKEN/messages/@original",
+            ("PATCH /webhooks/:webhooks/:token/messages/@original", ("APPID", "TOKEN")),
+        ),
+        (
+            "DELETE",
+            "/api/v8/webhooks/APPID/TOKEN/messages/812345678901234567",
+            ("DELETE /webhooks/:webhooks/:token/messages/:id", ("APPID", "TOKEN")),
+        ),
+    ],
+)
+def test_route_for(method, path, expected):
+    assert route_for(method, path) == expected
+
+
+@pytest.mark.asyncio
+async def test_burst_is_queued_instead_of_rate_limited():
+    fake = FakeDiscord(limit=2, window=0.2)
+    limiter = RateLimiter()
+    async with create_client(fake, limiter) as client:
+        responses = await asyncio.gather(
+            *[client.get("applications/APPID/commands") for _ in range(8)]
+        )
+    assert [response.status_code for response in responses] == [200] * 8
+    assert fake.violations == 0
+    assert limiter.rate_limited == 0
+    assert limiter.bucket("GET", "/api/v8/applications/APPID/commands").limit == 2
+
+
+@pytest.mark.asyncio
+async def test_major_parameters_use_separate_buckets():
+    fake = FakeDiscord(limit=1, window=5)
+    limiter = RateLimiter()
+    async with create_client(fake, limiter) as client:
+        _started = time.monotonic()
+        await client.get("applications/APPID/guilds/1/commands")
+        await client.get("applications/APPID/guilds/2/commands")
+    # a shared bucket would have waited for the 5 second window.
+    assert time.monotonic() - _started < 1
+    assert fake.violations == 0
+
+
+@pytest.mark.asyncio
+async def test_global_rate_limit_is_honored_and_retried():
+    fake = FakeDiscord(global_429_once=True)
+    limiter = RateLimiter()
+    async with create_client(fake, limiter) as client:
+        response = await client.get("applications/APPID/commands")
+    assert response.status_code == 200
+    assert limiter.rate_limited == 1
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries():
+    fake = FakeDiscord(limit=0, window=0.05)
+    limiter = RateLimiter(max_retries=2)
+    async with create_client(fake, limiter) as client:
+        response = await client.get("applications/APPID/commands")
+    assert response.status_code == 429
+    assert response.json()["global"] is False
+    assert limiter.rate_limited == 3
+
+
+def test_global_limit_per_second():
+    _now = [0.0]
+    limiter = RateLimiter(global_limit_per_second=2, timer=lambda: _now[0])
+    assert limiter.acquire("GET /a", ())[0] == 0
+    limiter.update("GET /a", (), 200, {})
+    assert limiter.acquire("GET /a", ())[0] == 0
+    assert limiter.acquire("GET /a", ())[0] == pytest.approx(1)
+    # interaction webhooks are not bound by the global limit.
+    assert limiter.acquire("GET /a", (), count_global=False)[0] == 0
+    _now[0] = 1.0
+    assert limiter.acquire("GET /a", ())[0] == 0
+
+
+class FakeSyncTransport(httpcore.SyncHTTPTransport):
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def request(self, method, url, headers=None, stream=None, ext=None):
+        self.calls += 1
+        status, headers, body = self.responses.pop(0)
+        return status, headers, httpcore.PlainByteStream(body), {}
+
+
+def test_sync_transport_resends_rate_limited_requests():
+    transport = FakeSyncTransport(
+        [
+            (429, [(b"retry-after", b"0.01")], b""),
+            (200, [(b"x-ratelimit-remaining", b"4"), (b"x-ratelimit-limit", b"5")], b"{}"),
+        ]
+    )
+    limiter = RateLimiter()
+    with httpx.Client(transport=RateLimitedSyncTransport(transport, limiter)) as client:
+        response = client.post("https://discord.com/api/v8/applications/APPID/commands")
+    assert response.status_code == 200
+    assert transport.calls == 2
+    assert limiter.bucket("POST", "/api/v8/applications/APPID/commands").remaining == 4
+
+
+def test_requests_in_flight_count_against_the_window():
+    _now = [0.0]
+    limiter = RateLimiter(timer=lambda: _now[0])
+    _headers = {"x-ratelimit-limit": "2", "x-ratelimit-remaining": "1", "x-ratelimit-reset-after": "1"}
+    assert limiter.acquire("GET /a", ()) == (0.0, True)
+    limiter.update("GET /a", (), 200, _headers)
+
+    _now[0] = 1.5
+    # the window reset, both slots are taken before any response arrives.
+    assert limiter.acquire("GET /a", ())[0] == 0
+    assert limiter.acquire("GET /a", ())[0] == 0
+    assert limiter.acquire("GET /a", ())[0] > 0
+    # the first response does not count the second request, which is still in flight.
+    limiter.update("GET /a", (), 200, _headers)
+    assert limiter.acquire("GET /a", ())[0] > 0
+
+
+def test_exhausted_bucket_without_a_limit_lets_one_request_through_after_reset():
+    _now = [0.0]
+    limiter = RateLimiter(timer=lambda: _now[0])
+    _headers = {"x-ratelimit-remaining": "0", "x-ratelimit-reset-after": "1"}
+    assert limiter.acquire("GET /a", ()) == (0.0, True)
+    limiter.update("GET /a", (), 200, _headers)
+    assert limiter.acquire("GET /a", ())[0] == pytest.approx(1)
+
+    _now[0] = 1.5
+    # the limit is unknown, one request probes the new window while the others wait.
+    assert limiter.acquire("GET /a", ())[0] == 0
+    assert limiter.acquire("GET /a", ())[0] > 0
+    limiter.update("GET /a", (), 200, {"x-ratelimit-remaining": "3", "x-ratelimit-reset-after": "1"})
+    assert limiter.acquire("GET /a", ())[0] == 0
@@ -188,3 +188,51 @@ def test_fail_updating_bot_token_same():
         target_item.bot_token = "EXAMPLE_BOT_TOKEN"
 
         assert target_item.request_headers == {"Authorization": "Bot NEW_BOT_TOKEN"}
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_async_register_command_guild_only():
+    _route = respx.post(
+        "https://discord.com/api/v8/applications/EXAMPLE_APP_ID/guilds/EXAMPLE_GUILD/commands"
+    ).mock(side_effect=[Response(201), Response(400)])
+    from dispike.creating.registrator import RegisterCommands
+
+    target_item = RegisterCommands(
+        application_id="EXAMPLE_APP_ID", bot_token="EXAMPLE_BOT_TOKEN"
+    )
+    command_to_be_created = DiscordCommand(name="wave", description="Send a wave!")
+    assert (
+        await target_item.async_register(
+            command_to_be_created, guild_only=True, guild_to_target="EXAMPLE_GUILD"
+        )
+        == True
+    )
+    with pytest.raises(DiscordAPIError):
+        await target_item.async_register(
+            command_to_be_created, guild_only=True, guild_to_target="EXAMPLE_GUILD"
+        )
+    with pytest.raises(TypeError):
+        await target_item.async_register(command_to_be_created, guild_only=True)
+    assert _route.calls.last.request.headers["Authorization"] == "Bot EXAMPLE_BOT_TOKEN"
+    await target_item._http_pool.aclose()
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_async_bulk_overwrite_commands():
+    _route = respx.put(
+        "https://discord.com/api/v8/applications/EXAMPLE_APP_ID/commands"
+    ).mock(return_value=Response(200, json=[{}, {}]))
+    from dispike.creating.registrator import RegisterCommands
+
+    target_item = RegisterCommands(
+        application_id="EXAMPLE_APP_ID", bot_token="EXAMPLE_BOT_TOKEN"
+    )
+    _commands = [
+        DiscordCommand(name="wave", description="Send a wave!"),
+        DiscordCommand(name="hug", description="Send a hug!"),
+    ]
+    assert await target_item.async_bulk_overwrite_commands(_commands) == True
+    assert len(_route.calls) == 1
+    await target_item._http_pool.aclose()
@@ -0,0 +1,180 @@
+import httpcore
+import httpx
+import pytest
+import respx
+
+from dispike.rest.ratelimit import RateLimitedAsyncTransport, RateLimitedSyncTransport, RateLimiter
+from dispike.rest.retry import (
+    RetryPolicy,
+    RetryingAsyncTransport,
+    RetryingSyncTransport,
+    interaction_deadline,
+    set_interaction_deadline,
+)
+
+
+class FakeAsyncTransport(httpcore.AsyncHTTPTransport):
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def arequest(self, method, url, headers=None, stream=None, ext=None):
+        self.calls += 1
+        _outcome = self.outcomes.pop(0)
+        if isinstance(_outcome, Exception):
+            raise _outcome
+        status, headers = _outcome
+        return status, headers, httpcore.PlainByteStream(b"{}"), {}
+
+
+class FakeSyncTransport(httpcore.SyncHTTPTransport):
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, headers=None, stream=None, ext=None):
+        self.calls += 1
+        _outcome = self.outcomes.pop(0)
+        if isinstance(_outcome, Exception):
+            raise _outcome
+        status, headers = _outcome
+        return status, headers, httpcore.PlainByteStream(b"{}"), {}
+
+
+def create_policy(**kwargs) -> RetryPolicy:
+    return RetryPolicy(jitter=lambda: 0, **kwargs)
+
+
+URL = "https://discord.com/api/v8/webhooks/APPID/TOKEN/messages/@original"
+
+
+@pytest.mark.asyncio
+async def test_idempotent_request_is_retried_on_server_errors():
+    transport = FakeAsyncTransport([(502, []), (503, []), (200, [])])
+    policy = create_policy()
+    async with httpx.AsyncClient(transport=RetryingAsyncTransport(transport, policy)) as client:
+        response = await client.patch(URL, json={"content": "hi"})
+    assert response.status_code == 200
+    assert transport.calls == 3
+    assert policy.retried == 2
+
+
+@pytest.mark.asyncio
+async def test_post_is_not_retried_once_discord_may_have_processed_it():
+    transport = FakeAsyncTransport([(502, []), (200, [])])
+    async with httpx.AsyncClient(
+        transport=RetryingAsyncTransport(transport, create_policy())
+    ) as client:
+        response = await client.post(URL, json={"content": "hi"})
+    assert response.status_code == 502
+    assert transport.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_post_is_retried_when_it_never_reached_discord():
+    transport = FakeAsyncTransport(
+        [httpcore.ConnectError("refused"), (429, [(b"retry-after", b"0")]), (200, [])]
+    )
+    async with httpx.AsyncClient(
+        transport=RetryingAsyncTransport(transport, create_policy())
+    ) as client:
+        response = await client.post(URL, json={"content": "hi"})
+    assert response.status_code == 200
+    assert transport.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_post_read_timeout_is_raised():
+    transport = FakeAsyncTransport([httpcore.ReadTimeout("slow"), (200, [])])
+    async with httpx.AsyncClient(
+        transport=RetryingAsyncTransport(transport, create_policy())
+    ) as client:
+        with pytest.raises(httpx.ReadTimeout):
+            await client.post(URL, json={"content": "hi"})
+    assert transport.calls == 1
+
+
+def test_sync_transport_gives_up_after_status_retries():
+    transport = FakeSyncTransport([(504, [])] * 3)
+    policy = create_policy(status_retries={504: 2})
+    with httpx.Client(transport=RetryingSyncTransport(transport, policy)) as client:
+        response = client.get(URL)
+    assert response.status_code == 504
+    assert transport.calls == 3
+
+
+def test_backoff_is_exponential_jittered_and_capped():
+    policy = RetryPolicy(backoff_base=1, backoff_max=5, jitter=lambda: 0.5)
+    assert [policy.backoff(attempt) for attempt in range(5)] == [0.5, 1, 2, 2.5, 2.5]
+
+
+def test_retry_after_header_is_respected():
+    policy = create_policy()
+    assert policy.response_delay("GET", 503, {"retry-after": "4"}, 0, float("inf")) == 4
+    assert policy.response_delay("GET", 404, {}, 0, float("inf")) is None
+
+
+def test_no_retry_past_the_deadline():
+    _now = [0.0]
+    policy = create_policy(deadline=10, timer=lambda: _now[0])
+    _deadline = policy.deadline_for(0.0)
+    assert policy.response_delay("GET", 503, {"retry-after": "5"}, 0, _deadline) == 5
+    _now[0] = 6.0
+    assert policy.response_delay("GET", 503, {"retry-after": "5"}, 0, _deadline) is None
+
+
+def test_interaction_deadline_bounds_retries():
+    policy = create_policy(deadline=10 * 60 * 60)
+    _token = set_interaction_deadline(received_at=100.0)
+    try:
+        assert policy.deadline_for(100.0) == 100.0 + 15 * 60
+    finally:
+        interaction_deadline.reset(_token)
+    assert policy.deadline_for(100.0) == 100.0 + 10 * 60 * 60
+
+
+@pytest.mark.asyncio
+async def test_followup_edit_survives_a_bad_gateway():
+    from nacl.encoding import HexEncoder
+    from nacl.signing import SigningKey
+
+    from dispike import Dispike
+
+    bot = Dispike(
+        client_public_key=SigningKey.generate().verify_key.encode(encoder=HexEncoder).decode(),
+        bot_token="BOTTOKEN",
+        application_id="APPID",
+        retry_policy=create_policy(),
+    )
+    with respx.mock() as mock:
+        _route = mock.patch(URL).mock(
+            side_effect=[httpx.Response(502), httpx.Response(200, json={})]
+        )
+        await bot._edit_original_response("TOKEN", {"content": "late"})
+    assert _route.call_count == 2
+    assert bot.retry_policy.retried == 1
+    await bot.http_pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_owns_429s_in_the_combined_stack():
+    transport = FakeAsyncTransport([(429, [(b"retry-after", b"0")])] * 20)
+    limiter = RateLimiter(max_retries=3)
+    policy = create_policy()
+    stack = RetryingAsyncTransport(RateLimitedAsyncTransport(transport, limiter), policy)
+    async with httpx.AsyncClient(transport=stack) as client:
+        response = await client.post(URL, json={"content": "hi"})
+    assert response.status_code == 429
+    # only the rate limiter resends the 429, the retry policy does not multiply it.
+    assert transport.calls == limiter.max_retries + 1
+    assert policy.retried == 0
+
+
+def test_server_errors_are_still_retried_through_the_rate_limiter():
+    transport = FakeSyncTransport([(502, []), (200, [])])
+    policy = create_policy()
+    stack = RetryingSyncTransport(RateLimitedSyncTransport(transport, RateLimiter()), policy)
+    with httpx.Client(transport=stack) as client:
+        response = client.get(URL)
+    assert response.status_code == 200
+    assert transport.calls == 2
@@ -3,6 +3,7 @@ from dispike.middlewares.verification import DiscordVerificationMiddleware
 from dispike.incoming.incoming_interactions import IncomingDiscordSlashInteraction
 from dispike.response import DiscordResponse
 from fastapi.testclient import TestClient
+from fastapi import Request
 from dispike.eventer import EventTypes
 from dispike import Dispike
 from unittest.mock import patch
@@ -481,3 +482,27 @@ async def test_default_ctx_argument_name():
         application_id="NotNeeded",
     )
     assert d._cache_router._user_defined_setting_ctx_value == "ctx"
+
+
+@app.post("/echo_cached_body")
+async def echo_cached_body(request: Request):
+    return {"cached": request.state._cached_body.decode(), "body": (await request.body()).decode()}
+
+
+def test_verified_body_passed_through_scope():
+    response = client.post(
+        "/echo_cached_body",
+        headers={
+            "X-Signature-Ed25519": signed_value.signature.decode(),
+            "x-Signature-Timestamp": _created_timestamp,
+        },
+        json=_created_message,
+    )
+    assert response.status_code == 200
+    assert response.json()["cached"] == json.dumps(_created_message)
+    assert response.json()["body"] == json.dumps(_created_message)
+
+
+def test_lifespan_passes_through_middleware():
+    with TestClient(app) as lifespan_client:
+        assert lifespan_client.get("/ping").status_code == 200
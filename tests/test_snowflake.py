@@ -0,0 +1,155 @@
+import datetime
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey
+
+from dispike import Dispike, server
+from dispike.helper.snowflake import (
+    InteractionTiming,
+    deconstruct_snowflake,
+    snowflake_datetime,
+    snowflake_time,
+    time_snowflake,
+)
+from dispike.incoming import IncomingDiscordSlashInteraction
+from dispike.incoming.lazy import lazy_view_class
+from dispike.response import DiscordResponse
+
+
+@pytest.fixture(autouse=True)
+def unbound_router(monkeypatch):
+    # the router serves a single Dispike instance, let each test bind its own.
+    monkeypatch.setattr(server.router, "_dispike_instance", None)
+    monkeypatch.setattr(server.router, "_metrics", server.router._metrics)
+    monkeypatch.setattr(server.router, "_lazy_context", server.router._lazy_context)
+
+
+def test_snowflake_time():
+    # example from the Discord documentation.
+    assert snowflake_time(175928847299117063) == 1462015105.796
+    assert snowflake_time("175928847299117063") == 1462015105.796
+    assert snowflake_datetime(175928847299117063) == datetime.datetime(
+        2016, 4, 30, 11, 18, 25, 796000, tzinfo=datetime.timezone.utc
+    )
+    assert deconstruct_snowflake(175928847299117063) == {
+        "timestamp": 1462015105.796,
+        "worker_id": 1,
+        "process_id": 0,
+        "increment": 7,
+    }
+
+
+def test_time_snowflake():
+    assert snowflake_time(time_snowflake(1462015105.796)) == 1462015105.796
+    assert time_snowflake(1462015105.796) <= 175928847299117063 <= time_snowflake(1462015105.796, high=True)
+
+
+def test_interaction_timing():
+    _now = time.time()
+    _timing = InteractionTiming(time_snowflake(_now - 0.5), received_at=_now, received_monotonic=time.monotonic() - 1)
+    assert _timing.age_on_arrival == pytest.approx(0.5, abs=0.01)
+    assert _timing.since_arrival == pytest.approx(1, abs=0.05)
+    assert _timing.age == pytest.approx(1.5, abs=0.05)
+    assert _timing.remaining_budget() == pytest.approx(1.5, abs=0.05)
+    assert InteractionTiming(time_snowflake(_now - 10)).remaining_budget() == 0
+
+
+def test_clock_skew_does_not_extend_the_budget():
+    # created "in the future" when our clock is behind Discord's.
+    _timing = InteractionTiming(time_snowflake(time.time() + 2))
+    assert _timing.age_on_arrival < 0
+    assert _timing.remaining_budget() <= 3.0
+
+
+def _body(interaction_id: int) -> dict:
+    return {
+        "channel_id": "123123",
+        "data": {"id": "12312312", "name": "budget", "type": 1},
+        "guild_id": "123123",
+        "id": str(interaction_id),
+        "member": {
+            "deaf": False,
+            "is_pending": False,
+            "joined_at": "2019-05-12T18:36:16.878000+00:00",
+            "mute": False,
+            "nick": None,
+            "pending": False,
+            "permissions": "2147483647",
+            "premium_since": None,
+            "roles": [],
+            "user": {
+                "avatar": "b723979992a56",
+                "discriminator": "3333",
+                "id": "234234213122123",
+                "public_flags": 768,
+                "username": "exo",
+            },
+        },
+        "token": "Null",
+        "type": 2,
+        "version": 1,
+    }
+
+
+def test_context_exposes_the_budget():
+    _interaction_id = time_snowflake(time.time() - 1)
+    _ctx = IncomingDiscordSlashInteraction(**_body(_interaction_id))
+    assert _ctx.created_at == snowflake_datetime(_interaction_id)
+    assert _ctx.age_on_arrival == pytest.approx(1, abs=0.05)
+    assert _ctx.remaining_budget == pytest.approx(2, abs=0.05)
+    # the timing is not part of the model's data.
+    assert "_timing" not in _ctx.dict()
+
+
+def test_lazy_context_exposes_the_budget():
+    _interaction_id = time_snowflake(time.time() - 1)
+    _view = lazy_view_class(IncomingDiscordSlashInteraction)(_body(_interaction_id))
+    _timing = InteractionTiming(_interaction_id)
+    _view._timing = _timing
+    assert _view.timing is _timing
+    assert _view.remaining_budget == pytest.approx(2, abs=0.05)
+    # the timing was recorded on arrival, no field had to be parsed.
+    assert set(_view._values) == set()
+    assert _view.to_model().timing is _timing
+
+
+@pytest.mark.parametrize("lazy_context", [False, True])
+def test_handlers_get_the_budget(lazy_context):
+    _signing_key = SigningKey.generate()
+    _bot = Dispike(
+        client_public_key=_signing_key.verify_key.encode(encoder=HexEncoder).decode(),
+        bot_token="BOTTOKEN",
+        application_id="7890",
+        lazy_context=lazy_context,
+        metrics=True,
+    )
+    _seen = {}
+
+    @_bot.on("budget")
+    async def budget(ctx) -> DiscordResponse:
+        _seen["age_on_arrival"] = ctx.age_on_arrival
+        _seen["remaining_budget"] = ctx.remaining_budget
+        return DiscordResponse(content="ok")
+
+    _body_bytes = json.dumps(_body(time_snowflake(time.time() - 0.5))).encode()
+    _timestamp = str(int(time.time()))
+    _client = TestClient(_bot.referenced_application)
+    _response = _client.post(
+        "/interactions",
+        data=_body_bytes,
+        headers={
+            "X-Signature-Ed25519": _signing_key.sign(_timestamp.encode() + _body_bytes).signature.hex(),
+            "X-Signature-Timestamp": _timestamp,
+        },
+    )
+    assert _response.status_code == 200
+    assert _seen["age_on_arrival"] == pytest.approx(0.5, abs=0.1)
+    assert 2 < _seen["remaining_budget"] < 2.5
+
+    _metrics = _client.get("/metrics").text
+    assert "dispike_interaction_age_on_arrival_seconds_count 1" in _metrics
+    assert "dispike_interaction_age_at_response_seconds_count 1" in _metrics
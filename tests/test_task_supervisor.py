@@ -0,0 +1,228 @@
+import asyncio
+import json
+
+import pytest
+from loguru import logger
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey
+
+from dispike import Dispike, server
+from dispike.errors.dispike import DeferredTaskQueueFull
+from dispike.eventer import EventTypes
+from dispike.helper.task_supervisor import DeferredTaskSupervisor, OverflowPolicy
+from dispike.response import DeferredResponse
+
+
+@pytest.mark.asyncio
+async def test_unbounded_supervisor_tracks_tasks():
+    supervisor = DeferredTaskSupervisor()
+    _event = asyncio.Event()
+
+    async def sample():
+        await _event.wait()
+        return "done"
+
+    task = supervisor.submit(sample())
+    await asyncio.sleep(0)
+    assert supervisor.stats["running"] == 1
+    _event.set()
+    assert await task == "done"
+    await asyncio.sleep(0)
+    assert supervisor.stats == {
+        "running": 0,
+        "queued": 0,
+        "submitted": 1,
+        "completed": 1,
+        "failed": 0,
+        "rejected": 0,
+        "cancelled": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_and_queue():
+    supervisor = DeferredTaskSupervisor(max_concurrency=1, max_queue=1)
+    _event = asyncio.Event()
+
+    async def sample():
+        await _event.wait()
+
+    supervisor.submit(sample())
+    supervisor.submit(sample())
+    await asyncio.sleep(0)
+    assert (supervisor.running, supervisor.queued) == (1, 1)
+
+    _rejected = sample()
+    with pytest.raises(DeferredTaskQueueFull):
+        supervisor.submit(_rejected)
+    assert _rejected.cr_frame is None  # closed without running
+    assert supervisor.rejected == 1
+
+    _event.set()
+    await supervisor.drain(timeout=1)
+    assert supervisor.completed == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_tasks_are_counted():
+    supervisor = DeferredTaskSupervisor()
+
+    async def broken():
+        raise ValueError("broken")
+
+    task = supervisor.submit(broken())
+    await asyncio.wait([task])
+    assert supervisor.failed == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_tasks_are_logged_with_their_traceback():
+    records = []
+    handler_id = logger.add(lambda message: records.append(message.record), level="ERROR")
+    try:
+        supervisor = DeferredTaskSupervisor()
+
+        async def broken():
+            raise ValueError("broken")
+
+        await asyncio.wait([supervisor.submit(broken())])
+    finally:
+        logger.remove(handler_id)
+    assert len(records) == 1
+    assert "broken" in records[0]["message"]
+    assert records[0]["exception"].type is ValueError
+    assert records[0]["exception"].traceback is not None
+
+
+def test_concurrency_limit_works_across_event_loops():
+    supervisor = DeferredTaskSupervisor(max_concurrency=1)
+
+    async def run():
+        async def work():
+            await asyncio.sleep(0)
+            return "done"
+
+        # the second task waits on the semaphore, which must belong to this loop.
+        return await asyncio.gather(supervisor.submit(work()), supervisor.submit(work()))
+
+    for _ in range(2):
+        _loop = asyncio.new_event_loop()
+        try:
+            assert _loop.run_until_complete(run()) == ["done", "done"]
+        finally:
+            _loop.close()
+    assert supervisor.completed == 4
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_then_cancels():
+    supervisor = DeferredTaskSupervisor(max_concurrency=2)
+
+    async def quick():
+        await asyncio.sleep(0.01)
+
+    async def stuck():
+        await asyncio.sleep(60)
+
+    supervisor.submit(quick())
+    supervisor.submit(stuck())
+    assert await supervisor.drain(timeout=0.1) == 1
+    assert supervisor.completed == 1
+    assert supervisor.cancelled == 1
+
+    with pytest.raises(DeferredTaskQueueFull):
+        supervisor.submit(quick())
+    supervisor.reopen()
+    await supervisor.submit(quick())
+
+
+def create_dispike(**kwargs) -> Dispike:
+    return Dispike(
+        client_public_key=SigningKey.generate()
+        .verify_key.encode(encoder=HexEncoder)
+        .decode(),
+        bot_token="BOTTOKEN",
+        application_id="APPID",
+        **kwargs,
+    )
+
+
+def create_mocked_request(command_name: str):
+    class MockState:
+        _cached_body = json.dumps(
+            {
+                "channel_id": "123123",
+                "data": {"id": "12312312", "name": command_name, "type": 1},
+                "guild_id": "123123",
+                "id": "123123123132",
+                "member": {
+                    "deaf": False,
+                    "joined_at": "2019-05-12T18:36:16.878000+00:00",
+                    "mute": False,
+                    "pending": False,
+                    "permissions": "2147483647",
+                    "roles": [],
+                    "user": {
+                        "avatar": None,
+                        "discriminator": "3333",
+                        "id": "234234213122123",
+                        "public_flags": 0,
+                        "username": "exo",
+                    },
+                },
+                "token": "Null",
+                "type": 2,
+                "version": 1,
+            }
+        ).encode()
+
+    class MockRequest:
+        state = MockState
+
+    return MockRequest
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "policy", [OverflowPolicy.REJECT, OverflowPolicy.DEGRADE]
+)
+async def test_deferred_commands_respect_overflow_policy(monkeypatch, policy):
+    # the router is shared, restore its settings once the test is done.
+    for _attribute in ("_dispike_instance", "_task_supervisor"):
+        monkeypatch.setattr(server.router, _attribute, getattr(server.router, _attribute))
+    _dispike = create_dispike(
+        deferred_max_concurrency=1,
+        deferred_max_queue=0,
+        deferred_overflow_policy=policy,
+    )
+    server.router._dispike_instance = _dispike
+    _event = asyncio.Event()
+
+    async def slow(ctx) -> DeferredResponse:
+        await _event.wait()
+
+    _dispike.on("slow", EventTypes.COMMAND, func=slow)
+
+    assert await server.handle_interactions(create_mocked_request("slow")) == {
+        "type": 5
+    }
+    _overflow = await server.handle_interactions(create_mocked_request("slow"))
+    if policy is OverflowPolicy.REJECT:
+        assert _overflow.status_code == 503
+    else:
+        assert _overflow["type"] == 4
+        assert _overflow["data"]["flags"] == 64
+
+    _event.set()
+    assert await _dispike.deferred_tasks.drain(timeout=1) == 0
+    assert _dispike.deferred_tasks.stats["rejected"] == 1
+
+
+def test_shutdown_drains_deferred_tasks(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(server.router, "_task_supervisor", server.router._task_supervisor)
+    _dispike = create_dispike()
+    with TestClient(_dispike.referenced_application):
+        assert not _dispike.deferred_tasks.is_full
+    assert _dispike.deferred_tasks.is_full  # closed after shutdown
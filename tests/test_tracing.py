@@ -0,0 +1,216 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey
+
+from dispike import Dispike, server
+from dispike.helper.tracing import (
+    InMemorySpanExporter,
+    JSONLinesSpanExporter,
+    SpanExporter,
+    Tracer,
+    current_interaction_id,
+    current_span,
+)
+from dispike.response import DeferredResponse, DiscordResponse
+from dispike.testing import FakeDiscord, serve_in_thread
+
+
+@pytest.fixture(autouse=True)
+def unbound_router(monkeypatch):
+    # the router serves a single Dispike instance, let each test bind its own.
+    monkeypatch.setattr(server.router, "_dispike_instance", None)
+    monkeypatch.setattr(server.router, "_tracer", server.router._tracer)
+
+
+def test_nested_spans():
+    _exporter = InMemorySpanExporter()
+    _tracer = Tracer(exporters=[_exporter])
+    with _tracer.span("root", path="/interactions") as _root:
+        assert current_span() is _root
+        with _tracer.span("child") as _child:
+            assert current_span() is _child
+        assert current_span() is _root
+    assert current_span() is None
+
+    assert [span.name for span in _exporter.spans] == ["child", "root"]
+    assert _child.trace_id == _root.trace_id
+    assert _child.parent_id == _root.span_id
+    assert _root.parent_id is None
+    assert _root.attributes == {"path": "/interactions"}
+    assert _root.duration >= _child.duration >= 0
+
+
+def test_errors_are_recorded():
+    _exporter = InMemorySpanExporter()
+    _tracer = Tracer(exporters=[_exporter])
+    with pytest.raises(ValueError):
+        with _tracer.span("failing"):
+            raise ValueError("nope")
+    assert _exporter.find("failing")[0].error == "ValueError: nope"
+    assert len(_exporter.spans) == 1
+
+
+def test_failing_exporter_does_not_break_the_trace():
+    class _Broken(SpanExporter):
+        def export(self, span):
+            raise RuntimeError("unreachable collector")
+
+    _exporter = InMemorySpanExporter()
+    with Tracer(exporters=[_Broken(), _exporter]).span("root"):
+        pass
+    assert len(_exporter.spans) == 1
+
+
+def test_json_lines_exporter(tmp_path):
+    _path = tmp_path / "spans.jsonl"
+    _tracer = Tracer(exporters=[JSONLinesSpanExporter(_path)])
+    with _tracer.span("root"):
+        with _tracer.span("child", status=200):
+            pass
+    _tracer.close()
+
+    _spans = [json.loads(line) for line in _path.read_text().splitlines()]
+    assert [span["name"] for span in _spans] == ["child", "root"]
+    assert _spans[0]["parent_id"] == _spans[1]["span_id"]
+    assert _spans[0]["attributes"] == {"status": 200}
+
+
+@pytest.mark.asyncio
+async def test_tasks_keep_the_trace():
+    _exporter = InMemorySpanExporter()
+    _tracer = Tracer(exporters=[_exporter])
+
+    async def _later():
+        with _tracer.span("later"):
+            await asyncio.sleep(0)
+
+    with _tracer.span("root") as _root:
+        _task = asyncio.ensure_future(_later())
+    await _task
+    assert _exporter.find("later")[0].parent_id == _root.span_id
+
+
+def _slash(name: str) -> bytes:
+    return json.dumps(
+        {
+            "application_id": "7890",
+            "channel_id": "123123",
+            "data": {"id": "12312312", "name": name, "options": [{"name": "message", "value": "test"}], "type": 1},
+            "guild_id": "123123",
+            "id": "123123123132",
+            "member": {
+                "deaf": False,
+                "is_pending": False,
+                "joined_at": "2019-05-12T18:36:16.878000+00:00",
+                "mute": False,
+                "nick": None,
+                "pending": False,
+                "permissions": "2147483647",
+                "premium_since": None,
+                "roles": [],
+                "user": {
+                    "avatar": "b723979992a56",
+                    "discriminator": "3333",
+                    "id": "234234213122123",
+                    "public_flags": 768,
+                    "username": "exo",
+                },
+            },
+            "token": "INTERACTIONTOKEN",
+            "type": 2,
+            "version": 1,
+        }
+    ).encode()
+
+
+def _post(client: TestClient, signing_key: SigningKey, body: bytes):
+    _timestamp = str(int(time.time()))
+    return client.post(
+        "/interactions",
+        data=body,
+        headers={
+            "X-Signature-Ed25519": signing_key.sign(_timestamp.encode() + body).signature.hex(),
+            "X-Signature-Timestamp": _timestamp,
+        },
+    )
+
+
+def test_interaction_spans():
+    _signing_key = SigningKey.generate()
+    _bot = Dispike(
+        client_public_key=_signing_key.verify_key.encode(encoder=HexEncoder).decode(),
+        bot_token="BOTTOKEN",
+        application_id="7890",
+        tracing=True,
+    )
+
+    @_bot.on("echo")
+    async def echo(ctx, message: str) -> DiscordResponse:
+        return DiscordResponse(content=message)
+
+    assert _post(TestClient(_bot.referenced_application), _signing_key, _slash("echo")).status_code == 200
+
+    _exporter = _bot.tracer.exporters[0]  # type: InMemorySpanExporter
+    _root = _exporter.find("interaction")[0]
+    _spans = {span.name: span for span in _exporter.trace(_root.trace_id)}
+    assert sorted(_spans) == ["handler", "interaction", "parse", "serialize", "verification"]
+    for _name in ("verification", "parse", "handler", "serialize"):
+        assert _spans[_name].parent_id == _root.span_id
+    assert _spans["verification"].attributes["status"] == 200
+    assert _spans["handler"].attributes == {"event_type": "command", "event_name": "echo"}
+    assert _root.interaction_id == _spans["handler"].interaction_id == "123123123132"
+
+
+def test_deferred_handler_and_followup_requests_join_the_trace():
+    _fake_discord = serve_in_thread(FakeDiscord())
+    _signing_key = SigningKey.generate()
+    _bot = Dispike(
+        client_public_key=_signing_key.verify_key.encode(encoder=HexEncoder).decode(),
+        bot_token="BOTTOKEN",
+        application_id="7890",
+        api_base_url=_fake_discord.api_base_url,
+        tracing=True,
+    )
+    _seen = {}
+
+    @_bot.on("echo")
+    async def echo(ctx, message: str) -> DeferredResponse:
+        _seen["interaction_id"] = current_interaction_id()
+        await _bot.send_deferred_message(ctx, DiscordResponse(content=message))
+
+    try:
+        with TestClient(_bot.referenced_application) as _client:
+            assert _post(_client, _signing_key, _slash("echo")).json() == {"type": 5}
+        # the application shutdown drained the deferred task.
+        assert _fake_discord.app.messages["INTERACTIONTOKEN"]["@original"]["content"] == "test"
+    finally:
+        _fake_discord.stop()
+
+    assert _seen["interaction_id"] == "123123123132"
+    _exporter = _bot.tracer.exporters[0]  # type: InMemorySpanExporter
+    _handler = _exporter.find("handler")[0]
+    _deferred = _exporter.find("deferred")[0]
+    _http = _exporter.find("http")[0]
+    assert _deferred.trace_id == _http.trace_id == _handler.trace_id
+    assert _deferred.parent_id == _handler.span_id
+    assert _http.parent_id == _deferred.span_id
+    assert _http.interaction_id == "123123123132"
+    assert _http.attributes == {
+        "method": "PATCH",
+        "route": "PATCH /webhooks/:webhooks/:token/messages/@original",
+        "status": 200,
+    }
+
+
+def test_tracing_is_disabled_by_default():
+    _bot = Dispike(
+        client_public_key=SigningKey.generate().verify_key.encode(encoder=HexEncoder).decode(),
+        bot_token="BOTTOKEN",
+        application_id="7890",
+    )
+    assert _bot.tracer is None
@@ -0,0 +1,255 @@
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey
+
+from dispike import Dispike, server
+from dispike.helper.traffic_recorder import (
+    RecordedInteraction,
+    TrafficRecorder,
+    read_recording,
+)
+from dispike.response import DiscordResponse
+from dispike.testing import ReplayLoadGenerator
+from dispike.testing.replay import event_name_of, percentile
+
+
+@pytest.fixture(autouse=True)
+def unbound_router(monkeypatch):
+    # the router serves a single Dispike instance, let each test bind its own.
+    monkeypatch.setattr(server.router, "_dispike_instance", None)
+    monkeypatch.setattr(server.router, "_traffic_recorder", server.router._traffic_recorder)
+
+
+def _member():
+    return {
+        "deaf": False,
+        "is_pending": False,
+        "joined_at": "2019-05-12T18:36:16.878000+00:00",
+        "mute": False,
+        "nick": None,
+        "pending": False,
+        "permissions": "2147483647",
+        "premium_since": None,
+        "roles": [],
+        "user": {
+            "avatar": "b723979992a56",
+            "discriminator": "3333",
+            "id": "234234213122123",
+            "public_flags": 768,
+            "username": "exo",
+        },
+    }
+
+
+def _slash(name: str) -> bytes:
+    return json.dumps(
+        {
+            "channel_id": "123123",
+            "data": {"id": "12312312", "name": name, "options": [{"name": "message", "value": "test"}], "type": 1},
+            "guild_id": "123123",
+            "id": "123123123132",
+            "member": _member(),
+            "token": "Null",
+            "type": 2,
+            "version": 1,
+        }
+    ).encode()
+
+
+def _button(custom_id: str) -> bytes:
+    return json.dumps(
+        {
+            "channel_id": "123123",
+            "data": {"component_type": 2, "custom_id": custom_id},
+            "guild_id": "123123",
+            "id": "123123123132",
+            "member": _member(),
+            "token": "Null",
+            "type": 3,
+            "version": 1,
+        }
+    ).encode()
+
+
+def _create_bot(public_key: str, **kwargs) -> Dispike:
+    bot = Dispike(client_public_key=public_key, bot_token="BOTTOKEN", application_id="APPID", **kwargs)
+
+    @bot.on("echo")
+    async def echo(ctx, message: str) -> DiscordResponse:
+        return DiscordResponse(content=message)
+
+    @bot.on("click", type="component")
+    async def click(ctx) -> DiscordResponse:
+        return DiscordResponse(content="clicked")
+
+    return bot
+
+
+def test_recording_round_trip(tmp_path):
+    _path = str(tmp_path / "traffic.rec")
+    _recorder = TrafficRecorder(_path, timer=lambda: 100.0)
+    _recorder.record(b'{"a": 1}')
+    _recorder.record(b'{"b": 2}', arrived_at=101.5)
+    _recorder.close()
+    # recordings are appended to across restarts.
+    _recorder = TrafficRecorder(_path)
+    _recorder.record(b'{"c": 3}', arrived_at=102.0)
+    _recorder.close()
+
+    _records = list(read_recording(_path))
+    assert [(record.arrived_at, record.body) for record in _records] == [
+        (100.0, b'{"a": 1}'),
+        (101.5, b'{"b": 2}'),
+        (102.0, b'{"c": 3}'),
+    ]
+
+
+def test_partial_record_is_ignored(tmp_path):
+    _path = str(tmp_path / "traffic.rec")
+    _recorder = TrafficRecorder(_path)
+    _recorder.record(b'{"a": 1}')
+    _recorder.record(b'{"b": 2}')
+    _recorder.close()
+    with open(_path, "r+b") as recording:
+        recording.truncate(recording.seek(0, 2) - 3)
+    assert [record.body for record in read_recording(_path)] == [b'{"a": 1}']
+
+
+@pytest.mark.parametrize("cut", [3, 8 + 4])
+def test_restart_after_a_crash_appends_after_the_last_complete_record(tmp_path, cut):
+    _path = str(tmp_path / "traffic.rec")
+    _recorder = TrafficRecorder(_path)
+    _recorder.record(b'{"a": 1}')
+    _recorder.record(b'{"b": 2}')
+    _recorder.close()
+    # the crash cut the last record short, in its body or in its header.
+    with open(_path, "r+b") as recording:
+        recording.truncate(recording.seek(0, 2) - cut)
+
+    _recorder = TrafficRecorder(_path)
+    _recorder.record(b'{"c": 3}')
+    _recorder.record(b'{"d": 4}')
+    _recorder.close()
+    assert [record.body for record in read_recording(_path)] == [
+        b'{"a": 1}',
+        b'{"c": 3}',
+        b'{"d": 4}',
+    ]
+
+
+def test_restart_after_a_crash_while_creating_the_recording(tmp_path):
+    _path = tmp_path / "traffic.rec"
+    _path.write_bytes(b"DSPK")
+    _recorder = TrafficRecorder(str(_path))
+    _recorder.record(b'{"a": 1}')
+    _recorder.close()
+    assert [record.body for record in read_recording(str(_path))] == [b'{"a": 1}']
+
+
+def test_not_a_recording(tmp_path):
+    _path = tmp_path / "other.bin"
+    _path.write_bytes(b"something else")
+    with pytest.raises(ValueError):
+        list(read_recording(str(_path)))
+
+
+def test_sample_rate(tmp_path):
+    _recorder = TrafficRecorder(str(tmp_path / "traffic.rec"), sample_rate=0)
+    _recorder.record(b"{}")
+    assert _recorder.recorded == 0
+    with pytest.raises(ValueError):
+        TrafficRecorder(str(tmp_path / "traffic.rec"), sample_rate=2)
+
+
+def test_dispike_records_verified_interactions(tmp_path):
+    _path = str(tmp_path / "traffic.rec")
+    _signing_key = SigningKey.generate()
+    _bot = _create_bot(_signing_key.verify_key.encode(encoder=HexEncoder).decode(), record_traffic=_path)
+    _client = TestClient(_bot.referenced_application)
+
+    def _post(body: bytes, signature: str = None):
+        _timestamp = str(int(time.time()))
+        return _client.post(
+            "/interactions",
+            data=body,
+            headers={
+                "X-Signature-Ed25519": signature or _signing_key.sign(_timestamp.encode() + body).signature.hex(),
+                "X-Signature-Timestamp": _timestamp,
+            },
+        )
+
+    assert _post(_slash("echo")).status_code == 200
+    assert _post(_button("click")).status_code == 200
+    # pings and requests failing verification are not recorded.
+    assert _post(json.dumps({"id": "1", "token": "t", "type": 1, "version": 1}).encode()).status_code == 200
+    assert _post(_slash("echo"), signature="00" * 64).status_code == 401
+    _bot.traffic_recorder.close()
+
+    assert [record.body for record in read_recording(_path)] == [_slash("echo"), _button("click")]
+
+
+def test_event_name_of():
+    assert event_name_of(json.loads(_slash("echo"))) == "command:echo"
+    assert event_name_of(json.loads(_button("click"))) == "component:click"
+    assert event_name_of({"type": 2, "data": {}}).startswith("unknown")
+
+
+def test_percentile():
+    _samples = list(range(1, 1001))
+    assert percentile(_samples, 50) == 500
+    assert percentile(_samples, 99) == 990
+    assert percentile(_samples, 99.9) == 999
+    assert percentile([], 50) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_replay_with_concurrency():
+    _generator = ReplayLoadGenerator([_slash("echo"), _slash("echo"), _button("click"), _slash("missing")])
+    _bot = _create_bot(_generator.public_key)
+    _report = await _generator.run(_bot, concurrency=4, requests=40)
+
+    assert _report.events["command:echo"].count == 20
+    assert _report.events["command:echo"].errors == 0
+    assert _report.events["component:click"].count == 10
+    assert _report.events["component:click"].errors == 0
+    _result = _report.as_dict()
+    assert _result["total"]["count"] == 40
+    assert _result["events"]["command:echo"]["p999_ms"] >= _result["events"]["command:echo"]["p50_ms"] > 0
+    assert "command:echo" in _report.format()
+
+
+@pytest.mark.asyncio
+async def test_replay_counts_errors():
+    _generator = ReplayLoadGenerator([_button("unregistered")])
+    _report = await _generator.run(_create_bot(_generator.public_key), concurrency=1, requests=3)
+    assert _report.events["component:unregistered"].errors == 3
+
+
+@pytest.mark.asyncio
+async def test_replay_at_a_rate():
+    _generator = ReplayLoadGenerator([_slash("echo")])
+    _report = await _generator.run(_create_bot(_generator.public_key), rate=200, requests=20)
+    assert _report.total.count == 20
+    # 20 requests at 200/s are spread over about 0.1s.
+    assert _report.elapsed >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_replay_keeps_recorded_timing():
+    _generator = ReplayLoadGenerator(
+        [RecordedInteraction(10.0, _slash("echo")), RecordedInteraction(10.2, _slash("echo"))]
+    )
+    _report = await _generator.run(_create_bot(_generator.public_key), speed=2)
+    assert _report.total.count == 2
+    assert _report.elapsed >= 0.1
+
+
+@pytest.mark.asyncio
+async def test_replay_needs_one_load_option():
+    _generator = ReplayLoadGenerator([_slash("echo")])
+    with pytest.raises(TypeError):
+        await _generator.run(_create_bot(_generator.public_key), concurrency=1, rate=5)
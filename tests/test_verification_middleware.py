@@ -0,0 +1,208 @@
+import json
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey
+
+from dispike import Dispike, server
+from dispike.middlewares.verification import (
+    DiscordVerificationMiddleware,
+    VerificationMode,
+)
+
+_generated_signing_key = SigningKey.generate()
+verification_key = _generated_signing_key.verify_key.encode(encoder=HexEncoder).decode()
+
+_created_timestamp = "1111111"
+_created_message = {"id": "1111222", "token": "random_fa", "type": 1, "version": 1}
+
+
+def signed_headers(body: dict, timestamp: str = _created_timestamp) -> dict:
+    signed = _generated_signing_key.sign(
+        f"{timestamp}{json.dumps(body)}".encode(), encoder=HexEncoder
+    )
+    return {
+        "X-Signature-Ed25519": signed.signature.decode(),
+        "X-Signature-Timestamp": timestamp,
+    }
+
+
+def create_app(**middleware_kwargs) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        DiscordVerificationMiddleware,
+        client_public_key=verification_key,
+        **middleware_kwargs,
+    )
+
+    @app.post("/interactions")
+    async def interactions():
+        return {"type": 1}
+
+    return app
+
+
+def test_pool_mode_verifies_valid_request():
+    client = TestClient(create_app(verification_mode=VerificationMode.POOL))
+    response = client.post(
+        "/interactions", headers=signed_headers(_created_message), json=_created_message
+    )
+    assert response.status_code == 200
+    assert response.json() == {"type": 1}
+
+
+def test_pool_mode_rejects_bad_signature():
+    client = TestClient(create_app(verification_mode="pool", verification_workers=1))
+    response = client.post(
+        "/interactions",
+        headers=signed_headers(_created_message),
+        json={"invalid": "string"},
+    )
+    assert response.status_code == 401
+
+
+def test_pool_mode_fails_fast_when_saturated():
+    app = create_app(verification_mode=VerificationMode.POOL, verification_max_pending=1)
+    client = TestClient(app)
+    # build the middleware stack, then pretend the pool is already full.
+    client.get("/ping")
+    app.middleware_stack.app._pending_verifications = 1
+    response = client.post(
+        "/interactions", headers=signed_headers(_created_message), json=_created_message
+    )
+    assert response.status_code == 503
+
+
+def test_invalid_max_pending():
+    with pytest.raises(ValueError):
+        DiscordVerificationMiddleware(
+            None,
+            client_public_key=verification_key,
+            verification_mode=VerificationMode.POOL,
+            verification_max_pending=0,
+        )
+
+
+def test_inline_mode_has_no_executor():
+    middleware = DiscordVerificationMiddleware(None, client_public_key=verification_key)
+    assert middleware._verification_executor is None
+
+
+def create_counting_app(**middleware_kwargs):
+    app = FastAPI()
+    app.add_middleware(
+        DiscordVerificationMiddleware,
+        client_public_key=verification_key,
+        **middleware_kwargs,
+    )
+    app.state.calls = 0
+
+    @app.post("/interactions")
+    async def interactions():
+        app.state.calls += 1
+        return {"type": 4, "data": {"content": str(app.state.calls)}}
+
+    return app
+
+
+def test_stale_timestamp_rejected():
+    client = TestClient(create_app(signature_timestamp_tolerance=5))
+    response = client.post(
+        "/interactions", headers=signed_headers(_created_message), json=_created_message
+    )
+    assert response.status_code == 401
+
+
+def test_fresh_timestamp_accepted():
+    client = TestClient(create_app(signature_timestamp_tolerance=5))
+    _timestamp = str(int(time.time()))
+    response = client.post(
+        "/interactions",
+        headers=signed_headers(_created_message, timestamp=_timestamp),
+        json=_created_message,
+    )
+    assert response.status_code == 200
+
+
+def test_unparseable_timestamp_rejected():
+    middleware = DiscordVerificationMiddleware(
+        None, client_public_key=verification_key, signature_timestamp_tolerance=5
+    )
+    assert middleware.is_timestamp_fresh("not-a-timestamp") == False
+    assert middleware.is_timestamp_fresh(str(time.time())) == True
+
+
+def test_duplicate_delivery_returns_cached_response():
+    app = create_counting_app(replay_cache_size=16)
+    client = TestClient(app)
+    _headers = signed_headers(_created_message)
+
+    first = client.post("/interactions", headers=_headers, json=_created_message)
+    second = client.post("/interactions", headers=_headers, json=_created_message)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json() == {"type": 4, "data": {"content": "1"}}
+    assert app.state.calls == 1
+
+
+def test_replay_cache_does_not_skip_verification_for_altered_body():
+    app = create_counting_app(replay_cache_size=16)
+    client = TestClient(app)
+    _headers = signed_headers(_created_message)
+
+    client.post("/interactions", headers=_headers, json=_created_message)
+    response = client.post("/interactions", headers=_headers, json={"type": 1})
+    assert response.status_code == 401
+    assert app.state.calls == 1
+
+
+def test_replay_cache_disabled_by_default():
+    app = create_counting_app()
+    client = TestClient(app)
+    _headers = signed_headers(_created_message)
+    client.post("/interactions", headers=_headers, json=_created_message)
+    client.post("/interactions", headers=_headers, json=_created_message)
+    assert app.state.calls == 2
+
+
+def test_replay_cache_ttl_is_never_shorter_than_the_tolerance():
+    middleware = DiscordVerificationMiddleware(
+        None,
+        client_public_key=verification_key,
+        signature_timestamp_tolerance=300,
+        replay_cache_size=16,
+        replay_cache_ttl=10,
+    )
+    assert middleware._replay_cache.ttl == 300
+    middleware = DiscordVerificationMiddleware(
+        None,
+        client_public_key=verification_key,
+        signature_timestamp_tolerance=300,
+        replay_cache_size=16,
+        replay_cache_ttl=600,
+    )
+    assert middleware._replay_cache.ttl == 600
+
+
+def test_dispike_shuts_down_the_verification_pool(monkeypatch):
+    monkeypatch.setattr(server.router, "_dispike_instance", None)
+    monkeypatch.setattr(server.router, "_task_supervisor", server.router._task_supervisor)
+    bot = Dispike(
+        client_public_key=verification_key,
+        bot_token="BOTTOKEN",
+        application_id="APPID",
+        verification_mode="pool",
+    )
+    _executor = bot._verification_executor
+    with TestClient(bot.referenced_application) as client:
+        _timestamp = str(int(time.time()))
+        _ping = {"id": "1111222", "token": "random_fa", "type": 1, "version": 1}
+        response = client.post(
+            "/interactions", headers=signed_headers(_ping, _timestamp), data=json.dumps(_ping)
+        )
+        assert response.json() == {"type": 1}
+        assert not _executor._shutdown
+    assert _executor._shutdown